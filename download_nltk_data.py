@@ -1,13 +1,38 @@
+import argparse
 import os
-import certifi
-import nltk
+import sys
 
-# Ensure SSL uses certifi's certificate bundle
-os.environ['SSL_CERT_FILE'] = certifi.where()
+# Installs only the NLTK packages listed in src/main/data/nltk_resources.txt into a project-local directory, nltk_data by default.
+# Usage: python3 download_nltk_data.py [--dir DIR] [--source DIR]
+# With --source the packages are copied from another NLTK data directory, so no network access is needed.
 
-# Verify that SSL is using the correct certificates
-print(f"SSL certificate file: {os.environ['SSL_CERT_FILE']}")
-print(f"Certifi location: {certifi.where()}")
+ROOT_PATH = os.path.dirname(os.path.realpath(__file__))
+BASE_PATH = os.path.join(ROOT_PATH, "src")
+sys.path.insert(0, BASE_PATH)
 
-# Download NLTK data
-nltk.download('all')
\ No newline at end of file
+from main.repositories.NltkResourceRepository import NltkResourceRepository
+from main.services.NltkDataService import NltkDataService, get_nltk_data_dir
+
+def parse_args(argv: list | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python3 download_nltk_data.py", description="Install the NLTK packages the app uses")
+    parser.add_argument("--dir", default=get_nltk_data_dir(BASE_PATH), help="directory to install into, as set by NLTK_DATA_DIR")
+    parser.add_argument("--source", help="NLTK data directory to copy the packages from instead of downloading them")
+    return parser.parse_args(argv)
+
+
+def main(argv: list | None = None) -> None:
+    args = parse_args(argv)
+    nltk_data_service = NltkDataService(NltkResourceRepository(BASE_PATH), os.path.abspath(args.dir))
+    if args.source != None:
+        nltk_data_service.install_from_source(args.source)
+    else:
+        import certifi
+        # Ensure SSL uses certifi's certificate bundle
+        os.environ['SSL_CERT_FILE'] = certifi.where()
+        nltk_data_service.download()
+    nltk_data_service.verify()
+    print(f"NLTK data installed in {nltk_data_service.nltk_data_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,31 @@
 import os
 
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 
 from main.controllers.AcceptanceCriteriaController import AcceptanceCriteriaController
-from main.repositories.QuantifiersRespository import QuantifiersRepository
-from main.repositories.VagueTermsRepository import VagueTermsRepository
-from main.repositories.EscapeClauseRepository import EscapeClauseRepository
-from main.repositories.VerbExceptionRepository import VerbExceptionRepository
-from main.repositories.WeakVerbsRepository import WeakVerbsRepository
+from main.controllers.HealthController import HealthController
+from main.controllers.MetricsController import MetricsController
+from main.repositories.WordlistDatabase import WordlistDatabase
 from main.routes.AcceptanceCriteriaBP import AcceptanceCriteriaBP
+from main.routes.HealthBP import HealthBP
+from main.routes.MetricsBP import MetricsBP
 from main.routes.UserStoryBP import UserStoryBP
 from main.routes.WordlistsBP import WordlistsBP
-from main.repositories.VerbNounExceptionRepository import VerbNounExceptionRepository
-from main.repositories.NounExceptionRepository import NounExceptionRepository
-from main.services.acceptancecriteria.AcceptanceCriteriaAnalyser import AcceptanceCriteriaAnalyser
-from main.services.acceptancecriteria.AcceptanceCriteriaPreprocessor import AcceptanceCriteriaPreprocessor
-from main.services.ambiguity.AmbiguityAnalyser import AmbiguityAnalyser
-from main.services.userstories.UserStoryPreprocessor import UserStoryPreprocessor
-from main.services.userstories.UserStoryAnalyser import UserStoryAnalyser
-from main.services.WordlistService import WordlistService
-from main.services.NLPService import NLPService
+from main.services.AcSessionService import AcSessionService
+from main.services.AnalysisExecutor import AnalysisExecutor
+from main.services.AnalysisServices import AnalysisServices
+from main.services.InstrumentationService import InstrumentationService
+from main.services.PredictionLogService import PredictionLogService
+from main.services.ResultCacheService import ResultCacheService
+from main.services.TaggingCacheService import TaggingCacheService
+from main.services.WordlistService import set_current_tenant
 from main.controllers.UserStoryController import UserStoryController
 from main.controllers.WordController import WordController
 
-def create_app():
+DEFAULT_CONFIG_TYPE = 'config.DevelopmentConfig'
+
+def create_app(config_type: str | None = None):
     app = Flask(__name__)
     CORS(app)
     cors = CORS(app, resource={
@@ -32,61 +33,102 @@ def create_app():
             "origins":"*"
         }
     })
-    app.config.from_object('config')
+    app.config.from_object(config_type if config_type != None else os.environ.get('CONFIG_TYPE', DEFAULT_CONFIG_TYPE))
 
     base_path = os.path.dirname(os.path.realpath(__file__))
 
-    # register repositories
-    verb_noun_exception_repository = VerbNounExceptionRepository(base_path)
-    noun_exception_repository = NounExceptionRepository(base_path)
-    verb_exception_repository = VerbExceptionRepository(base_path)
-    vague_terms_repository = VagueTermsRepository(base_path)
-    escape_clause_repository = EscapeClauseRepository(base_path)
-    quantifiers_repository = QuantifiersRepository(base_path)
-    weak_verbs_repository = WeakVerbsRepository(base_path)
-
-    # register services
-    word_list_service = WordlistService(
-        verb_noun_exception_repository, 
-        noun_exception_repository, 
-        verb_exception_repository, 
-        vague_terms_repository,
-        escape_clause_repository,
-        quantifiers_repository,
-        weak_verbs_repository
+    # register repositories and services
+    tagging_cache_service = None
+    if app.config['TAGGING_CACHE_FILE'] != None:
+        tagging_cache_service = TaggingCacheService(app.config['TAGGING_CACHE_FILE'], app.config['TAGGING_CACHE_MAX_ENTRIES'])
+    wordlist_database = None
+    if app.config['WORDLIST_DATABASE_FILE'] != None:
+        wordlist_database = WordlistDatabase(app.config['WORDLIST_DATABASE_FILE'])
+    analysis_services = AnalysisServices(base_path, tagging_cache_service, wordlist_database)
+    missing_nltk_data = analysis_services.nltk_data_service.find_missing_resources()
+    if len(missing_nltk_data) > 0:
+        if app.config['REQUIRE_NLTK_DATA']:
+            raise LookupError(analysis_services.nltk_data_service.get_missing_message(missing_nltk_data))
+        app.logger.warning(analysis_services.nltk_data_service.get_missing_message(missing_nltk_data))
+    if app.config['WARM_UP_ON_START']:
+        for resource, seconds in analysis_services.warm_up().items():
+            app.logger.info(f"Loaded {resource} in {seconds:.3f}s")
+    instrumentation_service = InstrumentationService()
+    if app.config['METRICS_ENABLED']:
+        instrumentation_service.enable(analysis_services)
+    analysis_executor = AnalysisExecutor(
+        analysis_services.analysis_pipeline,
+        base_path,
+        app.config['ANALYSIS_PROCESS_POOL'],
+        app.config['ANALYSIS_WORKERS'],
+        app.config['ANALYSIS_CHUNK_SIZE'],
+        app.config['ANALYSIS_MIN_PARALLEL_ITEMS'],
+        instrumentation_service,
+        tagging_cache_service,
+        wordlist_database
+    )
+    prediction_log_service = PredictionLogService(
+        app.config['PREDICTION_LOG_FILE'],
+        app.config['PREDICTION_LOG_BUFFER_SIZE'],
+        app.config['PREDICTION_LOG_MAX_BYTES'],
+        app.config['PREDICTION_LOG_BACKUPS']
     )
-    nlp_service = NLPService(word_list_service)
-    user_story_preprocessor = UserStoryPreprocessor(nlp_service)
-    user_story_analyser = UserStoryAnalyser(nlp_service, word_list_service)
-    acceptance_criteria_preprocessor = AcceptanceCriteriaPreprocessor(nlp_service)
-    acceptance_criteria_analyser = AcceptanceCriteriaAnalyser(nlp_service, word_list_service)
-    ambiguity_analyser = AmbiguityAnalyser(nlp_service, word_list_service)
+    result_cache_service = ResultCacheService(
+        analysis_services.word_list_service,
+        app.config['RESULT_CACHE_MAX_SIZE'],
+        app.config['RESULT_CACHE_TTL']
+    )
+    ac_session_service = AcSessionService(
+        analysis_services.acceptance_criteria_analyser.unique_analyser,
+        app.config['AC_SESSION_MAX_SESSIONS'],
+        app.config['AC_SESSION_TTL'],
+        analysis_services.word_list_service
+    )
+
+    def select_tenant():
+        try:
+            set_current_tenant(request.headers.get(app.config['TENANT_HEADER']))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+    app.before_request(select_tenant)
 
     # register controllers
     user_story_controller = UserStoryController(
-        user_story_preprocessor, 
-        user_story_analyser, 
-        ambiguity_analyser
+        analysis_services.analysis_pipeline,
+        analysis_executor,
+        prediction_log_service,
+        app.config['STORY_BATCH_MAX_ITEMS'],
+        app.config['STORY_BATCH_MAX_BYTES'],
+        result_cache_service,
+        app.config['STORY_STREAM_MAX_LINE_BYTES']
     )
     acceptance_criteria_controller = AcceptanceCriteriaController(
-        acceptance_criteria_preprocessor, 
-        acceptance_criteria_analyser, 
-        ambiguity_analyser
+        analysis_services.analysis_pipeline,
+        analysis_executor,
+        prediction_log_service,
+        result_cache_service,
+        ac_session_service
     )
-    word_controller = WordController(word_list_service)
+    word_controller = WordController(analysis_services.word_list_service)
+    metrics_controller = MetricsController(instrumentation_service, prediction_log_service, result_cache_service)
+    health_controller = HealthController(analysis_services)
 
     # create blueprints
     user_story_bp = UserStoryBP(user_story_controller)
     acceptance_criteria_bp = AcceptanceCriteriaBP(acceptance_criteria_controller)
     word_list_bp = WordlistsBP(word_controller)
+    metrics_bp = MetricsBP(metrics_controller)
+    health_bp = HealthBP(health_controller)
 
     # register blueprints
     app.register_blueprint(user_story_bp.user_story_bp, url_prefix='/story')
     app.register_blueprint(acceptance_criteria_bp.acceptance_criteria_bp, url_prefix='/ac')
     app.register_blueprint(word_list_bp.word_list_bp, url_prefix='/word')
+    app.register_blueprint(metrics_bp.metrics_bp, url_prefix='/metrics')
+    app.register_blueprint(health_bp.health_bp, url_prefix='/ready')
 
     return app
 
 if __name__ == '__main__':
     app = create_app()
-    app.run(port=8000,debug=True)
\ No newline at end of file
+    app.run(port=8000, debug=app.config['DEBUG'])
\ No newline at end of file
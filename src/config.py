@@ -1,5 +1,65 @@
 import os
 
-SECRET_KEY = os.urandom(32)
 basedir = os.path.abspath(os.path.dirname(__file__))
-DEBUG = True
\ No newline at end of file
+
+# pick one of the classes below by setting CONFIG_TYPE, e.g. CONFIG_TYPE=config.ProductionConfig
+class Config():
+    SECRET_KEY = os.environ.get('SECRET_KEY', os.urandom(32))
+    DEBUG = False
+    TESTING = False
+    # load the tagger, tokeniser and wordlists when the app is created rather than on the first request
+    WARM_UP_ON_START = False
+    # refuse to start when an NLTK package from main/data/nltk_resources.txt is missing, otherwise only log a warning
+    REQUIRE_NLTK_DATA = False
+
+    # prediction log
+    PREDICTION_LOG_FILE = "prediction_log.jsonl"
+    PREDICTION_LOG_BUFFER_SIZE = 1000
+    PREDICTION_LOG_MAX_BYTES = 10 * 1024 * 1024
+    PREDICTION_LOG_BACKUPS = 5
+
+    # POST /story/batch
+    STORY_BATCH_MAX_ITEMS = 5000
+    STORY_BATCH_MAX_BYTES = 5 * 1024 * 1024
+    # POST /story/stream: the body isn't limited, only each of its lines
+    STORY_STREAM_MAX_LINE_BYTES = 64 * 1024
+
+    # parallel analysis: large submissions are split into chunks and analysed by a pool of worker processes
+    ANALYSIS_PROCESS_POOL = False
+    ANALYSIS_WORKERS = os.cpu_count()
+    ANALYSIS_CHUNK_SIZE = 25
+    ANALYSIS_MIN_PARALLEL_ITEMS = 50
+    # GET /metrics: rule and NLP timings are only recorded when enabled, the prediction log counters are always reported
+    METRICS_ENABLED = False
+
+    # result cache in front of POST /story and POST /ac: results are dropped when a wordlist changes, a size of 0 turns the cache off
+    RESULT_CACHE_MAX_SIZE = 10000
+    RESULT_CACHE_TTL = 3600
+    # POST /ac/session: sessions are kept in memory by each app process, so a client must keep talking to the same process
+    AC_SESSION_MAX_SESSIONS = 1000
+    AC_SESSION_TTL = 1800
+    # persistent POS tagging cache shared by every worker process, off unless a file is set
+    TAGGING_CACHE_FILE = None
+    TAGGING_CACHE_MAX_ENTRIES = 100000
+    # keep the wordlists in a SQLite file instead of the text files in main/data, which fill it the first time it is used
+    WORDLIST_DATABASE_FILE = None
+    # request header selecting the tenant whose wordlist additions are layered over the shared lists
+    TENANT_HEADER = 'X-Tenant'
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class TestingConfig(Config):
+    TESTING = True
+
+
+class ProductionConfig(Config):
+    # the models are loaded before gunicorn forks its workers, so every worker shares them
+    WARM_UP_ON_START = True
+    REQUIRE_NLTK_DATA = True
+    PREDICTION_LOG_FILE = os.environ.get('PREDICTION_LOG_FILE', Config.PREDICTION_LOG_FILE)
+    TAGGING_CACHE_FILE = os.environ.get('TAGGING_CACHE_FILE')
+    WORDLIST_DATABASE_FILE = os.environ.get('WORDLIST_DATABASE_FILE')
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
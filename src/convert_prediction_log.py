@@ -0,0 +1,13 @@
+import sys
+
+from main.services.PredictionLogService import LEGACY_PREDICTION_LOG_FILE, PREDICTION_LOG_FILE, convert_legacy_log
+
+# Converts the old prediction_log.json (one JSON object rewritten on every request)
+# into the append-only JSON Lines log written by PredictionLogService.
+# Usage: python3 convert_prediction_log.py [legacy log file] [new log file]
+
+if __name__ == '__main__':
+    legacy_log_file = sys.argv[1] if len(sys.argv) > 1 else LEGACY_PREDICTION_LOG_FILE
+    log_file = sys.argv[2] if len(sys.argv) > 2 else PREDICTION_LOG_FILE
+    converted = convert_legacy_log(legacy_log_file, log_file)
+    print(f"Converted {converted} records from {legacy_log_file} to {log_file}")
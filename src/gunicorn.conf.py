@@ -0,0 +1,15 @@
+import os
+
+# Settings for serving the app with gunicorn, run from src with: gunicorn -c gunicorn.conf.py wsgi:app
+# Every setting can be changed with an environment variable.
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = "gthread"
+# analysing a large batch is CPU bound and can take a while
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+# create the app, and so load the tagger and wordlists, once in the master process before forking
+# the workers then share the loaded models through copy-on-write instead of each loading their own
+preload_app = True
+accesslog = "-"
@@ -0,0 +1,285 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from main.models.AnalysisContext import AnalysisContext
+from main.services.AnalysisExecutor import CHUNK_SIZE
+from main.services.AnalysisServices import AnalysisServices
+
+# Times every stage of the analysis pipeline over the shipped test data and scaled up copies of it.
+# Usage: python3 -m main.benchmark [--scale N ...] [--output FILE] [--baseline FILE] [--threshold FRACTION]
+# Exits with status 1 when compared against a baseline and a regression is found.
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+DATA_PATH = os.path.dirname(BASE_PATH)
+STORY_DATA_FILE = os.path.join(DATA_PATH, "us-test-data.txt")
+AC_DATA_FILE = os.path.join(DATA_PATH, "ac-test-data.txt")
+RESULTS_FILE = "benchmark_results.json"
+SCALES = [1, 10]
+THRESHOLD = 0.2
+MIN_DIFFERENCE_MS = 0.05
+PERCENTILES = [50, 95, 99]
+SEED = 0
+TOTAL_STAGE = "total"
+UNIQUE_STAGE = "Unique.are_unique"
+STORY_PIPELINE_STAGE = "AnalysisPipeline.analyse_stories"
+AC_PIPELINE_STAGE = "AnalysisPipeline.analyse_acceptance_criteria"
+
+def parse_args(argv: list | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python3 -m main.benchmark", description="Benchmark the preprocessing and analysis pipeline")
+    parser.add_argument("--scale", type=int, nargs="+", default=SCALES, help="how many copies of the test data to put in each corpus")
+    parser.add_argument("--output", default=RESULTS_FILE, help="file to write the results to as JSON")
+    parser.add_argument("--baseline", help="results file from an earlier run to check for regressions against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="fraction a measurement can get worse by before it is flagged")
+    parser.add_argument("--min-difference-ms", type=float, default=MIN_DIFFERENCE_MS, help="latency changes smaller than this are never flagged")
+    return parser.parse_args(argv)
+
+
+def read_corpus(file_name: str) -> list:
+    """
+    Returns the non-blank lines of a test data file
+    """
+    with open(file_name, encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip() != ""]
+
+
+def scale_corpus(lines: list, scale: int, seed: int = SEED) -> list:
+    """
+    Builds a synthetic corpus of scale copies of the lines, shuffled the same way on every run
+    """
+    if scale == 1:
+        return list(lines)
+    corpus = list(lines) * scale
+    random.Random(seed).shuffle(corpus)
+    return corpus
+
+
+def percentile(samples: list, percent: float) -> float:
+    """
+    Nearest-rank percentile of a sorted list of samples
+    """
+    rank = max(1, -(-len(samples) * percent // 100))
+    return samples[int(rank) - 1]
+
+
+def summarise_samples(samples: list) -> dict:
+    """
+    Latency summary, in milliseconds, of the samples for one stage
+    """
+    samples = sorted(samples)
+    summary = {"samples": len(samples)}
+    for percent in PERCENTILES:
+        summary[f"p{percent}_ms"] = round(percentile(samples, percent) * 1000, 4)
+    summary["mean_ms"] = round(sum(samples) * 1000 / len(samples), 4)
+    summary["total_ms"] = round(sum(samples) * 1000, 4)
+    return summary
+
+
+def time_stage(timings: dict, stage: str, function, *args):
+    """
+    Calls a function, adding how long it took to the samples of a stage
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    timings.setdefault(stage, []).append(time.perf_counter() - start)
+    return result
+
+
+def get_ambiguity_checkers(analysis_services: AnalysisServices) -> list:
+    ambiguity_analyser = analysis_services.ambiguity_analyser
+    return [
+        ("Subjectivity.is_subjective", ambiguity_analyser.subjectivity_analyser.is_subjective),
+        ("Vagueness.is_vague", ambiguity_analyser.vagueness_analyser.is_vague),
+        ("NonCommitment.is_non_commital", ambiguity_analyser.non_commitment_analyser.is_non_commital),
+        ("Anaphora.has_anaphora", ambiguity_analyser.anaphora_analyser.has_anaphora),
+        ("Quantifiers.has_quantifiers", ambiguity_analyser.quantifier_analyser.has_quantifiers),
+        ("Weakness.is_weak", ambiguity_analyser.weakness_analyser.is_weak),
+    ]
+
+
+def get_story_rules(analysis_services: AnalysisServices) -> list:
+    user_story_analyser = analysis_services.user_story_analyser
+    return [
+        ("WellFormed.is_well_formed", user_story_analyser.well_formed_analyser.is_well_formed),
+        ("Atomic.is_atomic", user_story_analyser.atomic_analyser.is_atomic),
+        ("Minimal.is_minimal", user_story_analyser.minimal_analyser.is_minimal),
+        ("FullSentence.is_full_sentence", user_story_analyser.full_sentence_analyser.is_full_sentence),
+        ("Uniform.is_uniform", user_story_analyser.uniform_analyser.is_uniform),
+    ] + get_ambiguity_checkers(analysis_services)
+
+
+def get_ac_rules(analysis_services: AnalysisServices) -> list:
+    acceptance_criteria_analyser = analysis_services.acceptance_criteria_analyser
+    return [
+        ("Integrous.is_integrous", acceptance_criteria_analyser.integrous_analyser.is_integrous),
+        ("Essential.is_essential", acceptance_criteria_analyser.essential_analyser.is_essential),
+        ("Singular.is_singular", acceptance_criteria_analyser.singular_analyser.is_singular),
+    ]
+
+
+def analyse_stories(analysis_services: AnalysisServices, corpus: list, timings: dict) -> None:
+    """
+    Analyses each story on its own, in the same order as AnalysisPipeline.analyse_story, timing every stage
+    """
+    rules = get_story_rules(analysis_services)
+    for story_text in corpus:
+        start = time.perf_counter()
+        user_story, can_be_processed = time_stage(timings, "pre_process_story_text", analysis_services.user_story_preprocessor.pre_process_story_text, story_text)
+        if can_be_processed:
+            for stage, rule in rules:
+                time_stage(timings, stage, rule, user_story)
+        timings.setdefault(TOTAL_STAGE, []).append(time.perf_counter() - start)
+
+
+def analyse_acceptance_criteria(analysis_services: AnalysisServices, corpus: list, timings: dict) -> None:
+    """
+    Analyses each AC on its own, in the same order as the /ac endpoint, timing every stage
+    As in the endpoint, the ambiguity checks run even when an AC can't be processed. Uniqueness is checked once over the whole corpus, as it needs every AC
+    """
+    rules = get_ac_rules(analysis_services)
+    ambiguity_checkers = get_ambiguity_checkers(analysis_services)
+    analysed_criteria = []
+    for ac_number, ac_text in enumerate(corpus):
+        start = time.perf_counter()
+        ac, can_be_processed = time_stage(timings, "pre_process_ac_text", analysis_services.acceptance_criteria_preprocessor.pre_process_ac_text, (ac_text, ac_number))
+        if can_be_processed:
+            for stage, rule in rules:
+                time_stage(timings, stage, rule, ac)
+        for stage, checker in ambiguity_checkers:
+            time_stage(timings, stage, checker, ac)
+        timings.setdefault(TOTAL_STAGE, []).append(time.perf_counter() - start)
+        analysed_criteria.append(ac)
+    time_stage(timings, UNIQUE_STAGE, analysis_services.acceptance_criteria_analyser.unique_analyser.are_unique, analysed_criteria)
+
+
+def analyse_stories_in_pipeline(analysis_services: AnalysisServices, corpus: list, timings: dict) -> None:
+    """
+    Analyses the stories in chunks through AnalysisPipeline.analyse_stories, as the batch endpoint and the CLI do, timing each chunk as one sample
+    Each chunk shares one analysis context, so the batch tagging and memoising the per-item stages miss are measured
+    """
+    for start in range(0, len(corpus), CHUNK_SIZE):
+        time_stage(timings, STORY_PIPELINE_STAGE, analysis_services.analysis_pipeline.analyse_stories, corpus[start:start + CHUNK_SIZE], AnalysisContext())
+        timings.setdefault(TOTAL_STAGE, []).append(timings[STORY_PIPELINE_STAGE][-1])
+
+
+def analyse_acceptance_criteria_in_pipeline(analysis_services: AnalysisServices, corpus: list, timings: dict) -> None:
+    """
+    Analyses the ACs in chunks through AnalysisPipeline.analyse_acceptance_criteria, timing each chunk, then checks the whole corpus for uniqueness
+    Each chunk shares one analysis context, so the batch tagging and memoising the per-item stages miss are measured
+    """
+    acs = list(enumerate(corpus))
+    analysed_criteria = []
+    for start in range(0, len(acs), CHUNK_SIZE):
+        chunk = [(ac_text, ac_number) for ac_number, ac_text in acs[start:start + CHUNK_SIZE]]
+        analysed_criteria += time_stage(timings, AC_PIPELINE_STAGE, analysis_services.analysis_pipeline.analyse_acceptance_criteria, chunk, AnalysisContext())
+        timings.setdefault(TOTAL_STAGE, []).append(timings[AC_PIPELINE_STAGE][-1])
+    time_stage(timings, UNIQUE_STAGE, analysis_services.analysis_pipeline.find_uniqueness_defects, analysed_criteria)
+
+
+def measure_peak_memory(analyse, analysis_services: AnalysisServices, corpus: list) -> int:
+    """
+    Peak bytes allocated by Python while analysing the corpus
+    Measured in a separate run, as tracing allocations slows down everything being timed
+    """
+    tracemalloc.start()
+    try:
+        analyse(analysis_services, corpus, {})
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_corpus(analyse, analysis_services: AnalysisServices, corpus: list) -> dict:
+    """
+    Times every stage of analysing one corpus
+    """
+    timings = {}
+    start = time.perf_counter()
+    analyse(analysis_services, corpus, timings)
+    seconds = time.perf_counter() - start
+    return {
+        "items": len(corpus),
+        "seconds": round(seconds, 6),
+        "items_per_second": round(len(corpus) / seconds, 2) if seconds > 0 else None,
+        "peak_memory_bytes": measure_peak_memory(analyse, analysis_services, corpus),
+        "stages": {stage: summarise_samples(samples) for stage, samples in timings.items()}
+    }
+
+
+def run_benchmarks(analysis_services: AnalysisServices, scales: list, story_lines: list, ac_lines: list) -> dict:
+    """
+    Benchmarks the stories and ACs at every scale
+    """
+    analysis_services.warm_up()
+    corpora = {}
+    for scale in scales:
+        corpora[f"stories_x{scale}"] = benchmark_corpus(analyse_stories, analysis_services, scale_corpus(story_lines, scale))
+        corpora[f"acs_x{scale}"] = benchmark_corpus(analyse_acceptance_criteria, analysis_services, scale_corpus(ac_lines, scale))
+        corpora[f"stories_pipeline_x{scale}"] = benchmark_corpus(analyse_stories_in_pipeline, analysis_services, scale_corpus(story_lines, scale))
+        corpora[f"acs_pipeline_x{scale}"] = benchmark_corpus(analyse_acceptance_criteria_in_pipeline, analysis_services, scale_corpus(ac_lines, scale))
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "corpora": corpora
+    }
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float = THRESHOLD, min_difference_ms: float = MIN_DIFFERENCE_MS) -> list:
+    """
+    Compares results against a baseline, returning a message for every measurement that got worse by more than the threshold
+    Only corpora and stages found in both are compared
+    """
+    regressions = []
+    for corpus_name, corpus in results["corpora"].items():
+        baseline_corpus = baseline["corpora"].get(corpus_name)
+        if baseline_corpus == None:
+            continue
+        if baseline_corpus["items_per_second"] and corpus["items_per_second"] \
+                and corpus["items_per_second"] < baseline_corpus["items_per_second"] * (1 - threshold):
+            regressions.append(f"{corpus_name}: items/sec fell from {baseline_corpus['items_per_second']} to {corpus['items_per_second']}")
+        if corpus["peak_memory_bytes"] > baseline_corpus["peak_memory_bytes"] * (1 + threshold):
+            regressions.append(f"{corpus_name}: peak memory rose from {baseline_corpus['peak_memory_bytes']} to {corpus['peak_memory_bytes']} bytes")
+        for stage, summary in corpus["stages"].items():
+            baseline_summary = baseline_corpus["stages"].get(stage)
+            if baseline_summary == None:
+                continue
+            for percent in PERCENTILES:
+                key = f"p{percent}_ms"
+                if summary[key] > baseline_summary[key] * (1 + threshold) and summary[key] - baseline_summary[key] >= min_difference_ms:
+                    regressions.append(f"{corpus_name}: {stage} {key} rose from {baseline_summary[key]} to {summary[key]}")
+    return regressions
+
+
+def main(argv: list | None = None) -> None:
+    args = parse_args(argv)
+    analysis_services = AnalysisServices(BASE_PATH)
+    results = run_benchmarks(analysis_services, args.scale, read_corpus(STORY_DATA_FILE), read_corpus(AC_DATA_FILE))
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    for corpus_name, corpus in results["corpora"].items():
+        total = corpus["stages"][TOTAL_STAGE]
+        print(f"{corpus_name}: {corpus['items']} items, {corpus['items_per_second']} items/sec, p50 {total['p50_ms']} ms, p99 {total['p99_ms']} ms, peak {corpus['peak_memory_bytes']} bytes")
+    print(f"Results written to {args.output}")
+
+    if args.baseline != None:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.threshold, args.min_difference_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if len(regressions) > 0:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from main.services.AnalysisExecutor import CHUNK_SIZE, AnalysisExecutor
+from main.services.AnalysisServices import AnalysisServices
+from main.services.InstrumentationService import InstrumentationService
+
+# Analyses one user story or AC per line without the Flask app and writes the defects as JSON Lines.
+# Usage: python3 -m main.cli [--type story|ac] [--jobs N] [--corpus] [--stats] [--output FILE] [FILE ...]
+# Reads from stdin when no files are given, or when a file is "-".
+
+STORY = "story"
+AC = "ac"
+STDIN = "-"
+CORPUS_SUFFIX = "_corpus"
+# the NumPy rules only pay off over many lines at once, so corpus chunks are as large as this allows
+CORPUS_CHUNK_SIZE = 5000
+
+def parse_args(argv: list | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python3 -m main.cli", description="Analyse one user story or AC per line and write the defects as JSON Lines")
+    parser.add_argument("files", nargs="*", default=[STDIN], help="files to analyse, or - for stdin")
+    parser.add_argument("--type", choices=[STORY, AC], default=STORY, help="whether each line is a user story or an AC")
+    parser.add_argument("--jobs", type=int, default=1, help="number of worker processes to analyse with")
+    parser.add_argument("--corpus", action="store_true", help="work out the count-based rules for each chunk of lines at once with NumPy, for large audits")
+    parser.add_argument("--stats", action="store_true", help="write throughput and per-rule timings to stderr when done")
+    parser.add_argument("--output", default=STDIN, help="file to write results to, or - for stdout")
+    return parser.parse_args(argv)
+
+
+def read_lines(files: list) -> list:
+    """
+    Returns (file name, line number, text) for every non-blank line of the files
+    """
+    lines = []
+    for file_name in files:
+        file = sys.stdin if file_name == STDIN else open(file_name, encoding="utf-8")
+        try:
+            for line_number, line in enumerate(file, 1):
+                if line.strip() != "":
+                    lines.append((file_name, line_number, line.strip()))
+        finally:
+            if file is not sys.stdin:
+                file.close()
+    return lines
+
+
+def prepare_story_defects(user_story) -> list:
+    """
+    Formats the defects of a user story the same way as POST /story
+    """
+    return [{"title": defect, "description": descriptions} for defect, descriptions in user_story.defects.items()]
+
+
+def prepare_ac_defects(ac) -> list:
+    """
+    Formats the defects of an AC the same way as POST /ac
+    """
+    return [{"title": defect, "descriptions": descriptions} for defect, descriptions in ac.defects.items()]
+
+
+def get_stats(num_items: int, seconds: float, instrumentation_service: InstrumentationService) -> dict:
+    """
+    Summarises the throughput of a run and the time spent in each rule
+    """
+    rules = {}
+    for name, stat in sorted(instrumentation_service.get_stats().items(), key=lambda item: item[1]["seconds"], reverse=True):
+        rules[name] = {"calls": stat["calls"], "seconds": round(stat["seconds"], 6), "mean_ms": round(stat["seconds"] * 1000 / stat["calls"], 4)}
+    return {
+        "items": num_items,
+        "seconds": round(seconds, 6),
+        "items_per_second": round(num_items / seconds, 2) if seconds > 0 else None,
+        "rules": rules
+    }
+
+
+def get_chunk_size(args: argparse.Namespace, num_lines: int) -> int:
+    """
+    The number of lines analysed at once: large chunks in corpus mode, split evenly between the jobs
+    """
+    if not args.corpus:
+        return CHUNK_SIZE
+    return max(CHUNK_SIZE, min(CORPUS_CHUNK_SIZE, -(-num_lines // args.jobs)))
+
+
+def run(args: argparse.Namespace, analysis_services: AnalysisServices, output, stats_output) -> int:
+    """
+    Analyses every line of the input files, writing one JSON object per line to output in input order
+    Returns the number of lines analysed
+    """
+    lines = read_lines(args.files)
+    instrumentation_service = InstrumentationService()
+    if args.stats:
+        instrumentation_service.enable(analysis_services)
+    analysis_executor = AnalysisExecutor(
+        analysis_services.analysis_pipeline,
+        analysis_services.base_path,
+        args.jobs > 1,
+        args.jobs,
+        get_chunk_size(args, len(lines)),
+        min_parallel_items=0,
+        instrumentation_service=instrumentation_service
+    )
+    if args.type == STORY:
+        method_name, items, prepare_defects = "analyse_stories", [text for _, _, text in lines], prepare_story_defects
+    else:
+        method_name, items, prepare_defects = "analyse_acceptance_criteria", [(text, i) for i, (_, _, text) in enumerate(lines)], prepare_ac_defects
+    if args.corpus:
+        method_name += CORPUS_SUFFIX
+
+    start_time = time.perf_counter()
+    try:
+        for start, results in analysis_executor.map_chunks(method_name, items):
+            for (file_name, line_number, text), result in zip(lines[start:start + len(results)], results):
+                output.write(json.dumps({"file": file_name, "line": line_number, "text": text, "defects": prepare_defects(result)}) + "\n")
+    finally:
+        analysis_executor.shutdown()
+    seconds = time.perf_counter() - start_time
+
+    if args.stats:
+        stats_output.write(json.dumps(get_stats(len(lines), seconds, instrumentation_service), indent=2) + "\n")
+    return len(lines)
+
+
+def main(argv: list | None = None) -> None:
+    args = parse_args(argv)
+    if args.jobs < 1:
+        sys.exit("--jobs must be at least 1")
+    analysis_services = AnalysisServices(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    output = sys.stdout if args.output == STDIN else open(args.output, "w", encoding="utf-8")
+    try:
+        run(args, analysis_services, output, sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,75 +1,76 @@
-from datetime import datetime
-import json
-import os
 from flask import request
 
-from main.services.acceptancecriteria.AcceptanceCriteriaPreprocessor import AcceptanceCriteriaPreprocessor
-from main.services.acceptancecriteria.AcceptanceCriteriaAnalyser import AcceptanceCriteriaAnalyser
+from main.models.AcceptanceCriteria import AcceptanceCriteria
 from main.resources.ACErrorTypes import ACErrorTypes
-from main.services.ambiguity.AmbiguityAnalyser import AmbiguityAnalyser
+from main.services.AnalysisExecutor import AnalysisExecutor
+from main.services.AcSessionService import AcSessionService, get_content_hash
+from main.services.AnalysisPipeline import AnalysisPipeline
+from main.services.PredictionLogService import PredictionLogService
+from main.services.ResultCacheService import AC_RESULT, ResultCacheService
+
+TAGGER_CALLS_HEADER = "X-Tagger-Calls"
 
 class AcceptanceCriteriaController():
 
-    def __init__(self, acceptance_criteria_preprocessor: AcceptanceCriteriaPreprocessor, acceptance_criteria_analyser: AcceptanceCriteriaAnalyser, ambiguity_analyser: AmbiguityAnalyser) -> None:
-        self.acceptance_criteria_preprocessor = acceptance_criteria_preprocessor
-        self.acceptance_criteria_analyser = acceptance_criteria_analyser
-        self.ambiguity_analyser = ambiguity_analyser
+    def __init__(self, analysis_pipeline: AnalysisPipeline, analysis_executor: AnalysisExecutor, prediction_log_service: PredictionLogService,
+                 result_cache_service: ResultCacheService | None = None, ac_session_service: AcSessionService | None = None) -> None:
+        self.analysis_pipeline = analysis_pipeline
+        self.analysis_executor = analysis_executor
+        self.prediction_log_service = prediction_log_service
+        self.result_cache_service = result_cache_service
+        self.ac_session_service = ac_session_service
         self.ac_error_types = ACErrorTypes()
 
     
+    def prepare_defects(self, ac: AcceptanceCriteria) -> list:
+        """
+        Prepare the defects of one AC to be returned by the API
+        """
+        return [{"title": defect, "descriptions": descriptions} for defect, descriptions in ac.defects.items()]
+
+
     def prepare_defects_for_return(self, acceptance_criteria: list, uniqueness_defects: list):
         """
         Create a json response for the user
         """
         results_list = []
         for ac in acceptance_criteria:
-            defects = []
-            for defect in ac.defects:
-                new_defect = {"title": defect, "descriptions": ac.defects[defect]}
-                defects.append(new_defect)
-            new_entry = {"title": f"AC {ac.ac_number + 1}", "defects": defects}
+            new_entry = {"title": f"AC {ac.ac_number + 1}", "defects": self.prepare_defects(ac)}
             results_list.append(new_entry)
         if len(uniqueness_defects) > 0:
             results_list.append({"title": self.ac_error_types.uniqueness, "defects": uniqueness_defects})
         return results_list
     
 
-    def process_ac(self, ac_tuple):
+    def analyse_acceptance_criteria(self, acs: list) -> list:
         """
-        Process an AC if it is able to be processed
+        Analyses a list of (AC text, AC number) tuples, returning the analysed ACs in the same order
+        ACs analysed recently take their defects from the result cache, and only the rest are sent through the pipeline
         """
-        ac, flag = ac_tuple
-        if flag:
-            return self.acceptance_criteria_analyser.analyse_acceptance_criteria(ac)
-        else:
-            return ac
-        
-    
-    def log_attempt(self, acs: list, results: list, us_number: str) -> None:
-        """
-        Log attempts in json file
-        """
-        datetime_key = datetime.now().isoformat()
+        if self.result_cache_service == None:
+            return self.analysis_executor.map("analyse_acceptance_criteria", acs)
+        cached_defects = [self.result_cache_service.get(AC_RESULT, ac_text) for ac_text, ac_number in acs]
+        uncached_acs = [ac for ac, defect_records in zip(acs, cached_defects) if defect_records == None]
+        analysed_criteria = iter(self.analysis_executor.map("analyse_acceptance_criteria", uncached_acs) if len(uncached_acs) > 0 else [])
 
-        attempt = {
-            "type": "ac",
-            "us_number": us_number,
-            "input": acs,
-            "output": results
-        }
+        acceptance_criteria = []
+        for (ac_text, ac_number), defect_records in zip(acs, cached_defects):
+            if defect_records == None:
+                ac = next(analysed_criteria)
+                self.result_cache_service.put(AC_RESULT, ac_text, ac.defect_records)
+            else:
+                ac = AcceptanceCriteria(ac_text.lower(), ac_text)
+                ac.ac_number = ac_number
+                ac.defect_records = defect_records
+            acceptance_criteria.append(ac)
+        return acceptance_criteria
 
-        log_file = "prediction_log.json"
-            
-        if os.path.exists(log_file):
-            with open(log_file, "r") as f:
-                log_data = json.load(f)
-        else:
-            log_data = {}
-        
-        log_data[datetime_key] = attempt
 
-        with open(log_file, "w") as f:
-            json.dump(log_data, f, indent=4)
+    def log_attempt(self, acs: list, results: list, us_number: str) -> None:
+        """
+        Log attempts in the prediction log
+        """
+        self.prediction_log_service.log_attempt("ac", us_number, acs, results)
 
 
     # POST /ac
@@ -84,11 +85,43 @@ class AcceptanceCriteriaController():
         except:
             us_number = 0
         acs = [(ac, i) for i, ac in enumerate(acceptance_criteria)]
-        processed_criteria = list(map(self.acceptance_criteria_preprocessor.pre_process_ac_text, acs))
-        analysed_criteria = list(map(self.process_ac, processed_criteria))
-        criteria_with_ambiguity_checks = list(map(self.ambiguity_analyser.is_unambiguous, analysed_criteria))
-        uniqueness_defects = self.acceptance_criteria_analyser.unique_analyser.are_unique(criteria_with_ambiguity_checks)
+        criteria_with_ambiguity_checks = self.analyse_acceptance_criteria(acs)
+        uniqueness_defects = self.analysis_pipeline.find_uniqueness_defects(criteria_with_ambiguity_checks)
         return_data = self.prepare_defects_for_return(criteria_with_ambiguity_checks, uniqueness_defects)
         self.log_attempt(acceptance_criteria, return_data, us_number)
-        return return_data
-        
+        tagger_calls = self.analysis_pipeline.count_tagger_calls(criteria_with_ambiguity_checks)
+        return return_data, 200, {TAGGER_CALLS_HEADER: str(tagger_calls)}
+
+
+    # POST /ac/session
+    def check_acceptance_criteria_session(self) -> dict:
+        """
+        Takes the whole list of ACs for a story, each with a stable id and a content hash, and returns only what changed since the last request in the session
+        Only new or edited ACs need their text, and only those are analysed. Uniqueness is checked from the session's index of texts
+        """
+        data = request.get_json()
+        us_number = data.get('us_number', 0)
+        items = data['acceptance_criteria']
+        ac_ids = [item.get('id') for item in items]
+        if None in ac_ids or len(set(ac_ids)) != len(ac_ids):
+            return {"error": "Every AC needs a unique id"}, 400
+        texts = {item['id']: item['text'] for item in items if item.get('text') != None}
+        hashes = [(item['id'], item.get('hash', get_content_hash(texts[item['id']]) if item['id'] in texts else None)) for item in items]
+        if any(content_hash == None for ac_id, content_hash in hashes):
+            return {"error": "Every AC needs a hash or its text"}, 400
+
+        session = self.ac_session_service.get_session(data.get('session_id'))
+        with session.lock:
+            changed_ids = self.ac_session_service.get_changed_ids(session, hashes)
+            missing_ids = [ac_id for ac_id in changed_ids if ac_id not in texts]
+            if len(missing_ids) > 0:
+                return {"error": "The text of new or edited ACs is needed", "session_id": session.session_id, "missing": missing_ids}, 409
+
+            positions = {ac_id: position for position, ac_id in enumerate(ac_ids)}
+            analysed_criteria = self.analyse_acceptance_criteria([(texts[ac_id], positions[ac_id]) for ac_id in changed_ids])
+            analysed_defects = {ac_id: (ac.original_lower_text, self.prepare_defects(ac)) for ac_id, ac in zip(changed_ids, analysed_criteria)}
+            delta = self.ac_session_service.update_session(session, hashes, analysed_defects)
+
+        self.log_attempt([texts[ac_id] for ac_id in changed_ids], delta, us_number)
+        tagger_calls = self.analysis_pipeline.count_tagger_calls(analysed_criteria)
+        return delta, 200, {TAGGER_CALLS_HEADER: str(tagger_calls)}
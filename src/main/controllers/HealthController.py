@@ -0,0 +1,17 @@
+from main.services.AnalysisServices import AnalysisServices
+
+class HealthController():
+
+    def __init__(self, analysis_services: AnalysisServices) -> None:
+        self.analysis_services = analysis_services
+
+    # GET /ready
+    def get_readiness(self) -> dict:
+        """
+        Reports whether the app is ready to analyse text, which is once the tagger model has been loaded
+        Returns 503 until then, so a load balancer holds back traffic from a worker that is still warming up
+        If the app was warmed up on start, the seconds taken to load each resource are included
+        """
+        if self.analysis_services.is_warm():
+            return {"status": "ready", "tagger_loaded": True, "warm_up_seconds": self.analysis_services.warm_up_timings}, 200
+        return {"status": "warming_up", "tagger_loaded": False}, 503
@@ -0,0 +1,62 @@
+from flask import Response
+
+from main.services.InstrumentationService import InstrumentationService
+from main.services.PredictionLogService import PredictionLogService
+from main.services.ResultCacheService import ResultCacheService
+
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRIC_PREFIX = "story_quality"
+
+class MetricsController():
+
+    def __init__(self, instrumentation_service: InstrumentationService, prediction_log_service: PredictionLogService,
+                 result_cache_service: ResultCacheService | None = None) -> None:
+        self.instrumentation_service = instrumentation_service
+        self.prediction_log_service = prediction_log_service
+        self.result_cache_service = result_cache_service
+
+
+    def format_metric(self, name: str, metric_type: str, description: str, samples: list) -> list:
+        """
+        Formats one metric in the Prometheus text format, from a list of (labels, value) samples
+        """
+        lines = [f"# HELP {METRIC_PREFIX}_{name} {description}", f"# TYPE {METRIC_PREFIX}_{name} {metric_type}"]
+        for labels, value in samples:
+            label_text = ",".join(f'{label}="{label_value}"' for label, label_value in labels.items())
+            lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}" if label_text else f"{METRIC_PREFIX}_{name} {value}")
+        return lines
+
+
+    def prepare_metrics(self) -> str:
+        """
+        Formats the rule and NLP timings, the prediction log counters and the result cache counters in the Prometheus text format
+        """
+        stats = self.instrumentation_service.get_stats()
+        names = sorted(stats)
+        labels = {name: {"kind": self.instrumentation_service.get_kind(name), "name": name} for name in names}
+        lines = self.format_metric("instrumentation_enabled", "gauge", "Whether rule and NLP timings are being recorded",
+                                   [({}, int(self.instrumentation_service.enabled))])
+        lines += self.format_metric("analysis_calls_total", "counter", "Calls to each analysis rule and NLP primitive",
+                                    [(labels[name], stats[name]["calls"]) for name in names])
+        lines += self.format_metric("analysis_seconds_total", "counter", "Wall time spent in each analysis rule and NLP primitive",
+                                    [(labels[name], repr(stats[name]["seconds"])) for name in names])
+        lines += self.format_metric("prediction_log_written_records_total", "counter", "Records written to the prediction log",
+                                    [({}, self.prediction_log_service.written_records)])
+        lines += self.format_metric("prediction_log_dropped_records_total", "counter", "Records dropped because the prediction log could not keep up",
+                                    [({}, self.prediction_log_service.dropped_records)])
+        if self.result_cache_service != None:
+            lines += self.format_metric("result_cache_hits_total", "counter", "Stories and ACs whose defects were served from the result cache",
+                                        [({}, self.result_cache_service.hits)])
+            lines += self.format_metric("result_cache_misses_total", "counter", "Stories and ACs that were not in the result cache and had to be analysed",
+                                        [({}, self.result_cache_service.misses)])
+            lines += self.format_metric("result_cache_entries", "gauge", "Results currently held in the result cache",
+                                        [({}, len(self.result_cache_service))])
+        return "\n".join(lines) + "\n"
+
+
+    # GET /metrics
+    def get_metrics(self) -> Response:
+        """
+        Returns the collected metrics for Prometheus to scrape
+        """
+        return Response(self.prepare_metrics(), mimetype=PROMETHEUS_MIMETYPE)
@@ -1,19 +1,35 @@
-from datetime import datetime
 import json
-import os
-from flask import request
+from collections import deque
+from flask import Response, request, stream_with_context
 
-from main.models import UserStory
-from main.services.ambiguity.AmbiguityAnalyser import AmbiguityAnalyser
-from main.services.userstories.UserStoryPreprocessor import UserStoryPreprocessor
-from main.services.userstories.UserStoryAnalyser import UserStoryAnalyser
+from main.models.UserStory import UserStory
+from main.services.AnalysisExecutor import AnalysisExecutor
+from main.services.AnalysisPipeline import AnalysisPipeline
+from main.services.PredictionLogService import PredictionLogService
+from main.services.ResultCacheService import STORY_RESULT, ResultCacheService
+
+TAGGER_CALLS_HEADER = "X-Tagger-Calls"
+NDJSON_MIMETYPE = "application/x-ndjson"
+COMPLETION_ORDER = "completion"
+MAX_BATCH_ITEMS = 5000
+MAX_BATCH_BYTES = 5 * 1024 * 1024
+MAX_STREAM_LINE_BYTES = 64 * 1024
+# what each line of a streamed body was, in the order they were read
+STORY_LINE = "story"
+ERROR_LINE = "error"
 
 class UserStoryController():
 
-    def __init__(self, user_story_preprocessor: UserStoryPreprocessor, user_story_analyser: UserStoryAnalyser, ambiguity_analyser: AmbiguityAnalyser) -> None:
-        self.user_story_preprocessor = user_story_preprocessor
-        self.user_story_analyser = user_story_analyser
-        self.ambiguity_analyser = ambiguity_analyser
+    def __init__(self, analysis_pipeline: AnalysisPipeline, analysis_executor: AnalysisExecutor, prediction_log_service: PredictionLogService,
+                 max_batch_items: int = MAX_BATCH_ITEMS, max_batch_bytes: int = MAX_BATCH_BYTES, result_cache_service: ResultCacheService | None = None,
+                 max_stream_line_bytes: int = MAX_STREAM_LINE_BYTES) -> None:
+        self.analysis_pipeline = analysis_pipeline
+        self.analysis_executor = analysis_executor
+        self.prediction_log_service = prediction_log_service
+        self.max_batch_items = max_batch_items
+        self.max_batch_bytes = max_batch_bytes
+        self.result_cache_service = result_cache_service
+        self.max_stream_line_bytes = max_stream_line_bytes
 
     
     def prepare_results(self, user_story: UserStory):
@@ -21,37 +37,33 @@ class UserStoryController():
         Prepare the defects to be returned by the API
         """
         return_list = []
-        for defect in user_story.defects:
-            new_defect = {"title": defect, "description": user_story.defects[defect]}
+        for defect, descriptions in user_story.defects.items():
+            new_defect = {"title": defect, "description": descriptions}
             return_list.append(new_defect)
         return return_list
     
 
-    def log_attempt(self, acs: list, results: list, us_number: str) -> None:
+    def analyse_story(self, story_text: str) -> UserStory:
         """
-        Log attempts in json file
+        Returns the analysed user story, taking its defects from the result cache if the same story was analysed recently
         """
-        datetime_key = datetime.now().isoformat()
-
-        attempt = {
-            "type": "us",
-            "us_number": us_number,
-            "input": acs,
-            "output": results
-        }
+        if self.result_cache_service == None:
+            return self.analysis_pipeline.analyse_story(story_text)
+        defect_records = self.result_cache_service.get(STORY_RESULT, story_text)
+        if defect_records != None:
+            user_story = UserStory(story_text.lower(), story_text)
+            user_story.defect_records = defect_records
+            return user_story
+        user_story = self.analysis_pipeline.analyse_story(story_text)
+        self.result_cache_service.put(STORY_RESULT, story_text, user_story.defect_records)
+        return user_story
 
-        log_file = "prediction_log.json"
-            
-        if os.path.exists(log_file):
-            with open(log_file, "r") as f:
-                log_data = json.load(f)
-        else:
-            log_data = {}
-        
-        log_data[datetime_key] = attempt
 
-        with open(log_file, "w") as f:
-            json.dump(log_data, f, indent=4)
+    def log_attempt(self, acs: list, results: list, us_number: str) -> None:
+        """
+        Log attempts in the prediction log
+        """
+        self.prediction_log_service.log_attempt("us", us_number, acs, results)
 
 
     # POST /story
@@ -65,10 +77,114 @@ class UserStoryController():
             us_number = data['us_number']
         except:
             us_number = 0
-        user_story, can_be_processed = self.user_story_preprocessor.pre_process_story_text(story_text)
-        if can_be_processed:
-            user_story = self.user_story_analyser.analyse_user_story(user_story)
-            user_story = self.ambiguity_analyser.is_unambiguous(user_story)
+        user_story = self.analyse_story(story_text)
         return_results = self.prepare_results(user_story)
         self.log_attempt(story_text, return_results, us_number)
-        return return_results
+        return return_results, 200, {TAGGER_CALLS_HEADER: str(user_story.analysis_context.tagger_calls)}
+
+
+    # POST /story/batch
+    def check_user_story_batch(self) -> Response:
+        """
+        Takes a list of user stories with ids and streams back the defects found in each one as NDJSON
+        Stories are returned in input order, unless the request asks for "order": "completion"
+        """
+        request.max_content_length = self.max_batch_bytes
+        data = request.get_json()
+        stories = data.get('stories') if isinstance(data, dict) else None
+        if not isinstance(stories, list):
+            return {"error": "A batch should be a JSON object with a list of stories"}, 400
+        us_number = data.get('us_number', 0)
+        if len(stories) > self.max_batch_items:
+            return {"error": f"A batch should have no more than {self.max_batch_items} stories"}, 413
+        # checked before anything is streamed, as a story that fails later can only end the response after a 200
+        for i, story in enumerate(stories):
+            if not isinstance(story, dict) or not isinstance(story.get('story_text'), str):
+                return {"error": f"Story {i} should be a JSON object with a story_text", "index": i}, 400
+
+        story_ids = [story.get('id', i) for i, story in enumerate(stories)]
+        story_texts = [story['story_text'] for story in stories]
+        in_completion_order = data.get('order') == COMPLETION_ORDER
+
+        def generate_results():
+            for start, user_stories in self.analysis_executor.map_chunks("analyse_stories", story_texts, in_completion_order):
+                results = list(map(self.prepare_results, user_stories))
+                self.log_attempt(story_texts[start:start + len(results)], results, us_number)
+                for story_id, defects in zip(story_ids[start:start + len(results)], results):
+                    yield json.dumps({"id": story_id, "defects": defects}) + "\n"
+
+        return Response(stream_with_context(generate_results()), mimetype=NDJSON_MIMETYPE)
+
+
+
+    def read_lines(self, stream):
+        """
+        Yields (line number, line) for each non-blank line of an NDJSON body, reading one line at a time
+        A line longer than the limit is skipped up to its newline rather than read into memory, and yielded as None
+        """
+        line_number = 0
+        while True:
+            line = stream.readline(self.max_stream_line_bytes + 1)
+            if len(line) == 0:
+                return
+            line_number += 1
+            if len(line) > self.max_stream_line_bytes and not line.endswith(b"\n"):
+                while len(line) > 0 and not line.endswith(b"\n"):
+                    line = stream.readline(self.max_stream_line_bytes)
+                yield line_number, None
+            elif len(line.strip()) > 0:
+                yield line_number, line
+
+
+    def read_stories(self, stream, lines: deque):
+        """
+        Yields the text of each story in an NDJSON body as it is read, adding (STORY_LINE, its id) to lines
+        A story's id defaults to its line number. Lines that aren't a story are added as (ERROR_LINE, the error) instead
+        """
+        for line_number, line in self.read_lines(stream):
+            if line == None:
+                lines.append((ERROR_LINE, {"line": line_number, "error": f"A line should be no longer than {self.max_stream_line_bytes} bytes"}))
+                continue
+            try:
+                story = json.loads(line)
+                story_text = story['story_text']
+            except (ValueError, TypeError, KeyError):
+                story_text = None
+            if not isinstance(story_text, str):
+                lines.append((ERROR_LINE, {"line": line_number, "error": "A line should be a JSON object with a story_text"}))
+                continue
+            lines.append((STORY_LINE, story.get('id', line_number)))
+            yield story_text
+
+
+    def pop_errors(self, lines: deque):
+        """
+        Yields the errors read before the next story that is still being analysed, as NDJSON
+        """
+        while len(lines) > 0 and lines[0][0] == ERROR_LINE:
+            yield json.dumps(lines.popleft()[1]) + "\n"
+
+
+    # POST /story/stream
+    def check_user_story_stream(self) -> Response:
+        """
+        Takes user stories as NDJSON, one {"id", "story_text"} object per line, and streams back the defects found in each one as NDJSON in input order
+        Stories are analysed as they are read, and no more are read while the analysis is behind, so the body is never held in memory
+        Lines that aren't a story are reported as {"line", "error"} objects, in line order with the stories
+        """
+        us_number = request.args.get('us_number', 0)
+        stream = request.stream
+
+        def generate_results():
+            lines = deque()
+            stories = self.read_stories(stream, lines)
+            for story_texts, user_stories in self.analysis_executor.map_stream("analyse_stories", stories):
+                results = list(map(self.prepare_results, user_stories))
+                self.log_attempt(story_texts, results, us_number)
+                for defects in results:
+                    yield from self.pop_errors(lines)
+                    yield json.dumps({"id": lines.popleft()[1], "defects": defects}) + "\n"
+                yield from self.pop_errors(lines)
+            yield from self.pop_errors(lines)
+
+        return Response(stream_with_context(generate_results()), mimetype=NDJSON_MIMETYPE)
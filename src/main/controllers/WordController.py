@@ -1,6 +1,6 @@
 from flask import request
 
-from main.services.WordlistService import WordlistService
+from main.services.WordlistService import WORDLISTS, WordlistService
 
 class WordController():
 
@@ -12,24 +12,84 @@ class WordController():
         """
         Takes a new noun exception, and returns the updated list of noun exceptions
         """
-        word = request.get_json()['word']
-        updated_exceptions = self.word_list_service.add_noun_exception(word)
-        return updated_exceptions
+        return self.add_word(self.word_list_service.add_noun_exception)
 
     # POST /word/nounverb
     def add_noun_verb_exception(self) -> list:
         """
         Takes a new noun/verb exception, and returns the updated list of noun exceptions
         """
-        word = request.get_json()['word']
-        updated_exceptions = self.word_list_service.add_verb_noun_exception(word)
-        return updated_exceptions
+        return self.add_word(self.word_list_service.add_verb_noun_exception)
     
     # POST /word/verb
     def add_verb_exception(self) -> list:
         """
         Takes a new noun/verb exception, and returns the updated list of noun exceptions
         """
-        word = request.get_json()['word']
-        updated_exceptions = self.word_list_service.add_verb_exception(word)
-        return updated_exceptions
\ No newline at end of file
+        return self.add_word(self.word_list_service.add_verb_exception)
+
+    # GET /word/<wordlist>
+    def get_words(self, wordlist: str) -> list:
+        """
+        Returns the whole of a wordlist, in order
+        """
+        if wordlist not in WORDLISTS:
+            return self.unknown_wordlist(wordlist)
+        return self.word_list_service.get_words(wordlist)
+
+    # PUT /word/<wordlist>
+    def replace_words(self, wordlist: str) -> list:
+        """
+        Takes the whole of a wordlist as {"words": [...]}, replaces the list with it and returns the updated list
+        """
+        if wordlist not in WORDLISTS:
+            return self.unknown_wordlist(wordlist)
+        words = request.get_json().get('words')
+        if not isinstance(words, list):
+            return {"error": "The words must be a list"}, 400
+        try:
+            return self.word_list_service.replace_words(wordlist, words)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+    # GET /word/<wordlist>/<word>
+    def has_word(self, wordlist: str, word: str) -> dict:
+        """
+        Checks if a word is in a wordlist
+        """
+        if wordlist not in WORDLISTS:
+            return self.unknown_wordlist(wordlist)
+        try:
+            found = self.word_list_service.has_word(wordlist, word)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        if not found:
+            return {"error": f"{word} is not in the {wordlist} list"}, 404
+        return {"word": word}
+
+    # DELETE /word/<wordlist>/<word>
+    def delete_word(self, wordlist: str, word: str) -> list:
+        """
+        Removes a word from a wordlist and returns the updated list
+        """
+        if wordlist not in WORDLISTS:
+            return self.unknown_wordlist(wordlist)
+        try:
+            deleted = self.word_list_service.delete_word(wordlist, word)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        if not deleted:
+            return {"error": f"{word} is not in the {wordlist} list"}, 404
+        return self.word_list_service.get_words(wordlist)
+
+    def add_word(self, add) -> list:
+        """
+        Adds the word in the request with the given wordlist service method, returning the updated list, or a 400 if the word isn't valid
+        """
+        try:
+            return add(request.get_json().get('word'))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+    def unknown_wordlist(self, wordlist: str) -> tuple:
+        return {"error": f"There is no {wordlist} list, use one of: {', '.join(WORDLISTS)}"}, 404
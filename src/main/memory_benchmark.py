@@ -0,0 +1,200 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+from main.models.AcceptanceCriteria import AcceptanceCriteria
+from main.models.UserStory import UserStory
+from main.resources.ACErrorMessages import ACErrorMessages
+from main.resources.ACErrorTypes import ACErrorTypes
+from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
+from main.resources.AmbiguityErrorTypes import AmbiguityErrorTypes
+from main.resources.USErrorMessages import USErrorMessages
+from main.resources.USErrorTypes import USErrorTypes
+
+# Measures the memory held by analysed user stories and ACs, as slotted models with compact defect records
+# and in the layout they had before: plain objects with a dict of rendered messages.
+# Usage: python3 -m main.memory_benchmark [--scale N] [--output FILE] [--min-reduction FRACTION]
+# Exits with status 1 when the compact models don't save at least --min-reduction of the memory.
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+DATA_PATH = os.path.dirname(BASE_PATH)
+STORY_DATA_FILE = os.path.join(DATA_PATH, "us-test-data.txt")
+AC_DATA_FILE = os.path.join(DATA_PATH, "ac-test-data.txt")
+RESULTS_FILE = "memory_results.json"
+SCALE = 100
+MAX_LENGTH = 70
+
+us_types = USErrorTypes()
+us_messages = USErrorMessages(MAX_LENGTH)
+ac_types = ACErrorTypes()
+ac_messages = ACErrorMessages()
+ambiguity_types = AmbiguityErrorTypes()
+ambiguity_messages = AmbiguityErrorMessages()
+
+# the defects found in each item, cycled through the corpus: a few common rule defects and ambiguity defects with the words found
+STORY_DEFECTS = [
+    [],
+    [(us_types.well_formed, us_messages.missing_ends, None)],
+    [(us_types.atomic, us_messages.more_than_one_means, None), (ambiguity_types.ambiguity, ambiguity_messages.vague_terms, ["some", "easily"])],
+    [(us_types.full_sentence, us_messages.means_missing_noun, None), (us_types.uniform, us_messages.not_uniform, None)],
+    [(ambiguity_types.ambiguity, ambiguity_messages.anaphora, ["it"])],
+]
+AC_DEFECTS = [
+    [],
+    [(ac_types.integrous, ac_messages.missing_event, None)],
+    [(ac_types.essentiality, ac_messages.separating_punctuation, None), (ambiguity_types.ambiguity, ambiguity_messages.quantifiers, ["all"])],
+    [(ac_types.singularity, ac_messages.list_in_ac, None)],
+]
+
+def parse_args(argv: list | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python3 -m main.memory_benchmark", description="Benchmark the memory held by analysed user stories and ACs")
+    parser.add_argument("--scale", type=int, default=SCALE, help="how many copies of the test data to build")
+    parser.add_argument("--output", default=RESULTS_FILE, help="file to write the results to as JSON")
+    parser.add_argument("--min-reduction", type=float, help="fail if the compact models don't save at least this fraction of the memory")
+    return parser.parse_args(argv)
+
+
+class DictAnalysisContext():
+
+    def __init__(self) -> None:
+        self.sentence_tags = {}
+        self.word_tags = {}
+        self.phrase_matches = {}
+        self.token_features = {}
+        self.verb_noun_results = {}
+        self.word_counts = {}
+        self.tagger_calls = 0
+
+
+class DictUserStory():
+
+    def __init__(self, original_lower_text, original_text) -> None:
+        """
+        A user story in the layout the model had before it was slotted, with the defects rendered as they were found
+        """
+        self.role = None
+        self.means = None
+        self.ends = None
+        self.original_text = original_text
+        self.original_lower_text = original_lower_text
+        self.defects = {}
+        self.analysis_context = DictAnalysisContext()
+        self.role_pos = []
+        self.means_pos = []
+        self.ends_pos = []
+        self.using_potential_means = False
+        self.using_potential_ends = False
+
+    def add_defect(self, type: str, message, argument=None) -> None:
+        self.defects.setdefault(type, []).append(message if argument == None else message(argument))
+
+
+class DictAcceptanceCriteria():
+
+    def __init__(self, original_lower_text, original_text) -> None:
+        """
+        An AC in the layout the model had before it was slotted, with the defects rendered as they were found
+        """
+        self.context = None
+        self.event = None
+        self.outcome = None
+        self.original_text = original_text
+        self.original_lower_text = original_lower_text
+        self.defects = {}
+        self.analysis_context = DictAnalysisContext()
+        self.context_pos = []
+        self.event_pos = []
+        self.outcome_pos = []
+        self.ac_number = None
+        self.context_and_clauses = []
+        self.event_and_clauses = []
+        self.outcome_and_clauses = []
+
+    def add_defect(self, type: str, message, argument=None) -> None:
+        self.defects.setdefault(type, []).append(message if argument == None else message(argument))
+
+
+def read_corpus(file_name: str) -> list:
+    """
+    Returns the non-blank lines of a test data file
+    """
+    with open(file_name, encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip() != ""]
+
+
+def build_items(model, corpus: list, defect_sets: list) -> list:
+    """
+    Builds an analysed item of the model for every line, adding the next set of defects to each one
+    The arguments of ambiguity defects are copied for every item, as the analysers find them afresh for each one
+    """
+    items = []
+    for i, text in enumerate(corpus):
+        item = model(text.lower(), text)
+        for type, message, argument in defect_sets[i % len(defect_sets)]:
+            item.add_defect(type, message, list(argument) if argument != None else None)
+        items.append(item)
+    return items
+
+
+def measure_memory(model, corpus: list, defect_sets: list) -> int:
+    """
+    The bytes still allocated once every item of the corpus has been built
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        items = build_items(model, corpus, defect_sets)
+        allocated = tracemalloc.get_traced_memory()[0] - start
+        del items
+        return allocated
+    finally:
+        tracemalloc.stop()
+
+
+def compare_models(compact_model, dict_model, corpus: list, defect_sets: list) -> dict:
+    """
+    The memory held by the corpus in each layout, per item, and the fraction the compact models save
+    """
+    compact_bytes = measure_memory(compact_model, corpus, defect_sets)
+    dict_bytes = measure_memory(dict_model, corpus, defect_sets)
+    return {
+        "items": len(corpus),
+        "compact_bytes_per_item": round(compact_bytes / len(corpus), 1),
+        "dict_bytes_per_item": round(dict_bytes / len(corpus), 1),
+        "reduction": round(1 - compact_bytes / dict_bytes, 4)
+    }
+
+
+def run_benchmarks(scale: int, story_lines: list, ac_lines: list) -> dict:
+    return {
+        "scale": scale,
+        "python": sys.version.split()[0],
+        "models": {
+            "stories": compare_models(UserStory, DictUserStory, story_lines * scale, STORY_DEFECTS),
+            "acceptance_criteria": compare_models(AcceptanceCriteria, DictAcceptanceCriteria, ac_lines * scale, AC_DEFECTS)
+        }
+    }
+
+
+def main(argv: list | None = None) -> None:
+    args = parse_args(argv)
+    results = run_benchmarks(args.scale, read_corpus(STORY_DATA_FILE), read_corpus(AC_DATA_FILE))
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    for name, summary in results["models"].items():
+        print(f"{name}: {summary['compact_bytes_per_item']} bytes per item, {summary['dict_bytes_per_item']} before, {summary['reduction']:.1%} less")
+    print(f"Results written to {args.output}")
+
+    regressions = [name for name, summary in results["models"].items() if args.min_reduction != None and summary["reduction"] < args.min_reduction]
+    if len(regressions) > 0:
+        for name in regressions:
+            print(f"REGRESSION {name} only use {results['models'][name]['reduction']:.1%} less memory, not {args.min_reduction:.1%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
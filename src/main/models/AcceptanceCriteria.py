@@ -1,12 +1,21 @@
+from types import MappingProxyType
+
+from main.models.AnalysisContext import AnalysisContext
+from main.models.Defect import Defect
+
 class AcceptanceCriteria():
 
+    __slots__ = ("context", "event", "outcome", "original_text", "original_lower_text", "defect_records", "analysis_context",
+                 "context_pos", "event_pos", "outcome_pos", "ac_number", "context_and_clauses", "event_and_clauses", "outcome_and_clauses")
+
     def __init__(self, original_lower_text, original_text) -> None:
         self.context = None
         self.event = None
         self.outcome = None
         self.original_text = original_text
         self.original_lower_text = original_lower_text
-        self.defects = {}
+        self.defect_records = ()
+        self.analysis_context = AnalysisContext()
         self.context_pos = []
         self.event_pos = []
         self.outcome_pos = []
@@ -15,16 +24,28 @@ class AcceptanceCriteria():
         self.event_and_clauses = []
         self.outcome_and_clauses = []
 
-    def add_defect(self, type: str, error_message: str) -> None:
+    def add_defect(self, type: str, message, argument=None) -> None:
+        """
+        Add a defect to the found defects: a message of the error messages, or one of its message methods and the argument for it
+        """
+        self.defect_records += (Defect.get(type, message, argument),)
+
+    def has_defect(self, type: str, message=None, argument=None) -> bool:
+        """
+        Whether a defect of the type was found, from the given message and argument if there is one
+        """
+        return any(defect.type == type and (message == None or defect.is_for(message, argument)) for defect in self.defect_records)
+
+    @property
+    def defects(self) -> MappingProxyType:
         """
-        Add a defect to a dictionary of found defects
+        A read-only view of the text of the found defects, grouped by type in the order they were found
+        It is rendered from the defect records each time, so defects are only added with add_defect
         """
-        if type in self.defects:
-            errors = self.defects[type]
-            errors.append(error_message)
-            self.defects[type] = errors
-        else:
-            self.defects[type] = [error_message]
+        defects = {}
+        for defect in self.defect_records:
+            defects.setdefault(defect.type, []).append(defect.get_message())
+        return MappingProxyType({type: tuple(messages) for type, messages in defects.items()})
 
     def to_string(self) -> str:
         return f"Context: {self.context}, Event: {self.event}, Outcome: {self.outcome}"
\ No newline at end of file
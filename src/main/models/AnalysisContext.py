@@ -0,0 +1,105 @@
+from main.models.TokenFeatures import TokenFeatures
+
+class AnalysisContext():
+
+    __slots__ = ("sentence_tags", "word_tags", "phrase_matches", "token_features", "verb_noun_results", "word_counts", "tagger_calls")
+
+    def __init__(self) -> None:
+        self.sentence_tags = {}
+        self.word_tags = {}
+        self.phrase_matches = {}
+        self.token_features = {}
+        self.verb_noun_results = {}
+        self.word_counts = {}
+        self.tagger_calls = 0
+
+    def get_sentence_tags(self, text: str) -> list | None:
+        """
+        Get the memoised POS tags for text that was tagged sentence by sentence
+        """
+        return self.sentence_tags.get(text)
+
+    def add_sentence_tags(self, text: str, tags: list) -> None:
+        """
+        Memoise the POS tags for text that was tagged sentence by sentence
+        """
+        self.sentence_tags[text] = tags
+
+    def get_word_tags(self, text: str) -> list | None:
+        """
+        Get the memoised POS tags for text that was tagged as one run of words
+        """
+        return self.word_tags.get(text)
+
+    def add_word_tags(self, text: str, tags: list) -> None:
+        """
+        Memoise the POS tags for text that was tagged as one run of words
+        """
+        self.word_tags[text] = tags
+
+    def get_phrase_matches(self, version: int, text: str) -> dict | None:
+        """
+        Get the memoised wordlist phrase matches for text, found with the given version of the phrase matcher
+        """
+        return self.phrase_matches.get((version, text))
+
+    def add_phrase_matches(self, version: int, text: str, matches: dict) -> None:
+        """
+        Memoise the wordlist phrase matches for text
+        """
+        self.phrase_matches[(version, text)] = matches
+
+    def get_token_features(self, version: tuple, pos: list) -> TokenFeatures | None:
+        """
+        Get the memoised token features for a list of POS tags, worked out with the given version of the wordlists
+        The list itself is kept with its features, so a new list can't be mistaken for an old one that had the same id
+        """
+        memoised = self.token_features.get((version, id(pos)))
+        return memoised[1] if memoised != None and memoised[0] is pos else None
+
+    def add_token_features(self, version: tuple, pos: list, features: TokenFeatures) -> None:
+        """
+        Memoise the token features for a list of POS tags
+        """
+        self.token_features[(version, id(pos))] = (pos, features)
+
+    def get_verb_noun_result(self, pos: list, required_nouns: int, required_verbs: int, ignore_i_as_noun: bool) -> tuple | None:
+        """
+        Get a memoised (wordlist version, (found verbs, found nouns)) result of checking a list of POS tags for enough verbs and nouns
+        """
+        memoised = self.verb_noun_results.get((id(pos), required_nouns, required_verbs, ignore_i_as_noun))
+        return memoised[1:] if memoised != None and memoised[0] is pos else None
+
+    def add_verb_noun_result(self, pos: list, required_nouns: int, required_verbs: int, ignore_i_as_noun: bool, version: tuple, result: tuple) -> None:
+        """
+        Memoise the result of checking a list of POS tags for enough verbs and nouns, found with the given version of the wordlists
+        """
+        self.verb_noun_results[(id(pos), required_nouns, required_verbs, ignore_i_as_noun)] = (pos, version, result)
+
+    def get_word_count(self, text: str, separator: str | None = None) -> int | None:
+        """
+        Get the memoised number of words text splits into on the separator, or on whitespace
+        """
+        return self.word_counts.get((separator, text))
+
+    def add_word_count(self, text: str, separator: str | None, count: int) -> None:
+        """
+        Memoise the number of words text splits into on the separator, or on whitespace
+        """
+        self.word_counts[(separator, text)] = count
+
+    def record_tagger_call(self, calls: int = 1) -> None:
+        """
+        Count calls made to the POS tagger while analysing this text
+        """
+        self.tagger_calls += calls
+
+    def __getstate__(self) -> dict:
+        """
+        Only the tagger call count is kept when a context is sent between processes, the memoised tags, matches, features and counts are left behind
+        """
+        return {"tagger_calls": self.tagger_calls}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+        self.tagger_calls = state["tagger_calls"]
@@ -0,0 +1,54 @@
+from types import MethodType
+
+class Defect():
+
+    __slots__ = ("type", "code", "messages", "argument")
+
+    # records without an argument, shared by every story or AC with the same defect
+    interned = {}
+
+    def __init__(self, type: str, code: str, messages=None, argument=None) -> None:
+        """
+        A defect found in a user story or AC, kept as a compact record rather than the text of its message
+        Without an argument, the code is the message itself, which the messages object already holds
+        With one, the code is the name of the method of messages that renders the message from the argument
+        """
+        self.type = type
+        self.code = code
+        self.messages = messages
+        self.argument = argument
+
+    @classmethod
+    def get(cls, type: str, message, argument=None) -> "Defect":
+        """
+        Returns the record for a defect, from a message attribute of an error messages object, or one of its message methods and the argument for it
+        A record without an argument is shared by every object that has the same defect
+        Raises a TypeError if the message doesn't fit the argument, so a wrong message is caught where the defect is found rather than when it is rendered
+        """
+        if argument == None:
+            if not isinstance(message, str):
+                raise TypeError("A defect without an argument needs the text of its message")
+            key = (type, message)
+            defect = cls.interned.get(key)
+            if defect == None:
+                defect = cls.interned.setdefault(key, cls(type, message))
+            return defect
+        if not isinstance(message, MethodType) or getattr(message.__self__, message.__name__, None) != message:
+            raise TypeError("A defect with an argument needs a message method of an error messages object")
+        return cls(type, message.__name__, message.__self__, argument)
+
+    def is_for(self, message, argument=None) -> bool:
+        """
+        Whether the defect was made from the message, and the argument if there is one, without rendering it
+        """
+        if self.messages == None:
+            return self.code == message
+        return self.messages is getattr(message, "__self__", None) and self.code == getattr(message, "__name__", None) and self.argument == argument
+
+    def get_message(self) -> str:
+        """
+        Renders the text of the defect
+        """
+        if self.messages == None:
+            return self.code
+        return getattr(self.messages, self.code)(self.argument)
@@ -0,0 +1,68 @@
+IS_NOUN = "is_noun"
+IS_NOUN_IGNORING_I = "is_noun_ignoring_i"
+IS_VERB = "is_verb"
+IS_MODAL = "is_modal"
+IS_POTENTIAL_NOUN_OR_VERB = "is_potential_noun_or_verb"
+IS_VERB_NOUN_EXCEPTION = "is_verb_noun_exception"
+IS_WEAK_VERB = "is_weak_verb"
+
+class TokenFeatures():
+
+    __slots__ = ("words", IS_NOUN, IS_NOUN_IGNORING_I, IS_VERB, IS_MODAL, IS_POTENTIAL_NOUN_OR_VERB, IS_VERB_NOUN_EXCEPTION, IS_WEAK_VERB)
+
+    def __init__(self, words: tuple) -> None:
+        """
+        The word classes of every token in a tagged chunk, worked out once so the rules don't repeat the wordlist lookups
+        Each flag is a bytearray with a 1 for every token it holds for, so counting and finding them are single scans in C
+        """
+        self.words = words
+        self.is_noun = bytearray(len(words))
+        self.is_noun_ignoring_i = bytearray(len(words))
+        self.is_verb = bytearray(len(words))
+        self.is_modal = bytearray(len(words))
+        self.is_potential_noun_or_verb = bytearray(len(words))
+        self.is_verb_noun_exception = bytearray(len(words))
+        self.is_weak_verb = bytearray(len(words))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def count(self, flag: str) -> int:
+        """
+        Count the tokens a flag holds for
+        """
+        return getattr(self, flag).count(1)
+
+    def count_both(self, flag: str, other_flag: str) -> int:
+        """
+        Count the tokens both flags hold for
+        """
+        other = getattr(self, other_flag)
+        return sum(other[i] for i in self.positions(flag))
+
+    def positions(self, flag: str):
+        """
+        Yields the position of every token a flag holds for, in order
+        """
+        flags = getattr(self, flag)
+        position = flags.find(1)
+        while position != -1:
+            yield position
+            position = flags.find(1, position + 1)
+
+    def find(self, flag: str, start: int = 0) -> int:
+        """
+        Returns the position of the first token from start that a flag holds for, or -1 if there isn't one
+        """
+        return getattr(self, flag).find(1, start)
+
+    def find_nth(self, flag: str, n: int) -> int:
+        """
+        Returns the position of the nth token a flag holds for, counting from 1, or -1 if there are fewer than n
+        """
+        position = -1
+        for _ in range(n):
+            position = self.find(flag, position + 1)
+            if position == -1:
+                return -1
+        return position
@@ -1,28 +1,49 @@
+from types import MappingProxyType
+
+from main.models.AnalysisContext import AnalysisContext
+from main.models.Defect import Defect
+
 class UserStory():
 
+    __slots__ = ("role", "means", "ends", "original_text", "original_lower_text", "defect_records", "analysis_context",
+                 "role_pos", "means_pos", "ends_pos", "using_potential_means", "using_potential_ends")
+
     def __init__(self, original_lower_text, original_text) -> None:
         self.role = None
         self.means = None
         self.ends = None
         self.original_text = original_text
         self.original_lower_text = original_lower_text
-        self.defects = {}
+        self.defect_records = ()
+        self.analysis_context = AnalysisContext()
         self.role_pos = []
         self.means_pos = []
         self.ends_pos = []
         self.using_potential_means = False
         self.using_potential_ends = False
 
-    def add_defect(self, type: str, error_message: str) -> None:
+    def add_defect(self, type: str, message, argument=None) -> None:
+        """
+        Add a defect to the found defects: a message of the error messages, or one of its message methods and the argument for it
+        """
+        self.defect_records += (Defect.get(type, message, argument),)
+
+    def has_defect(self, type: str, message=None, argument=None) -> bool:
+        """
+        Whether a defect of the type was found, from the given message and argument if there is one
+        """
+        return any(defect.type == type and (message == None or defect.is_for(message, argument)) for defect in self.defect_records)
+
+    @property
+    def defects(self) -> MappingProxyType:
         """
-        Add a defect to the dictionary of found defects
+        A read-only view of the text of the found defects, grouped by type in the order they were found
+        It is rendered from the defect records each time, so defects are only added with add_defect
         """
-        if type in self.defects:
-            errors = self.defects[type]
-            errors.append(error_message)
-            self.defects[type] = errors
-        else:
-            self.defects[type] = [error_message]
+        defects = {}
+        for defect in self.defect_records:
+            defects.setdefault(defect.type, []).append(defect.get_message())
+        return MappingProxyType({type: tuple(messages) for type, messages in defects.items()})
 
     def to_string(self) -> str:
         return f"Role: {self.role}, Means: {self.means}, Ends: {self.ends}"
\ No newline at end of file
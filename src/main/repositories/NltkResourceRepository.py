@@ -0,0 +1,26 @@
+NLTK_RESOURCE_FILE = "/main/data/nltk_resources.txt"
+
+class NltkResourceRepository():
+
+    def __init__(self, data_path) -> None:
+        self.full_path = data_path + NLTK_RESOURCE_FILE
+
+
+    def get_nltk_resources(self) -> list:
+        """
+        Get the (package id, resource path) of every NLTK package listed in the manifest
+        """
+        resources = []
+        try:
+            with open(self.full_path, 'r') as file:
+                for line in file:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        package, resource = line.split()
+                        resources.append((package, resource))
+        except FileNotFoundError:
+            print(f"The file {self.full_path} was not found.")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+        return resources
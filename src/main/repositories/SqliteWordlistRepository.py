@@ -0,0 +1,60 @@
+from main.repositories.WordlistDatabase import WordlistDatabase
+
+class SqliteWordlistRepository():
+
+    def __init__(self, wordlist_database: WordlistDatabase, wordlist: str) -> None:
+        """
+        One wordlist in the SQLite database, with the same interface as a wordlist file repository
+        """
+        self.wordlist_database = wordlist_database
+        self.wordlist = wordlist
+        self.full_path = wordlist_database.database_file
+
+
+    def get_words(self) -> list:
+        """
+        Gets a python list of all words in the list, in the order they were added
+        """
+        return self.wordlist_database.get_words(self.wordlist)
+
+
+    def get_version(self) -> int | None:
+        """
+        Returns the version column of the list, which changes with every write from any process
+        """
+        return self.wordlist_database.get_version(self.wordlist)
+
+
+    def contains(self, word: str) -> bool:
+        return self.wordlist_database.contains(self.wordlist, word)
+
+
+    def add_word(self, word: str) -> bool:
+        """
+        Add a word to the list, unless it is already in it
+        Returns whether the list changed
+        """
+        return self.wordlist_database.add_word(self.wordlist, word)
+
+
+    def replace_words(self, words: list) -> bool:
+        """
+        Replace the whole list
+        Returns whether the list changed
+        """
+        return self.wordlist_database.replace_words(self.wordlist, words)
+
+
+    def delete_word(self, word: str) -> bool:
+        """
+        Remove a word from the list
+        Returns whether the list changed
+        """
+        return self.wordlist_database.delete_word(self.wordlist, word)
+
+
+    def import_from(self, repository) -> bool:
+        """
+        Fill the list from another repository, e.g. its text file, unless it has been written before
+        """
+        return self.wordlist_database.import_words(self.wordlist, list(dict.fromkeys(repository.get_words())))
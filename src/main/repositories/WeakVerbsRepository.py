@@ -1,25 +1,15 @@
+from main.repositories.WordlistFileRepository import WordlistFileRepository
+
 WEAK_VERB_FILE = "/main/data/weak_verbs.txt"
 
-class WeakVerbsRepository():
+class WeakVerbsRepository(WordlistFileRepository):
 
     def __init__(self, data_path) -> None:
-        self.full_path = data_path + WEAK_VERB_FILE
+        super().__init__(data_path, WEAK_VERB_FILE)
 
 
     def get_weak_verbs(self) -> list:
         """
         Add all noun exceptions to the list of words from the .txt file
         """
-        words_list = []
-        try:
-            with open(self.full_path, 'r') as file:
-                for line in file:
-                    word = line.strip()
-                    if word:
-                        words_list.append(word)
-        except FileNotFoundError:
-            print(f"The file {self.full_path} was not found.")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-        
-        return words_list
\ No newline at end of file
+        return self.get_words()
@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import threading
+
+WORDLIST_DATABASE_FILE = "wordlists.sqlite3"
+BUSY_TIMEOUT = 5000 # milliseconds a process waits for another one to finish writing
+
+class WordlistDatabase():
+
+    def __init__(self, database_file: str = WORDLIST_DATABASE_FILE) -> None:
+        """
+        Every wordlist in one SQLite file, shared by every worker process
+        Each list has a version that is bumped in the same transaction as any change to it, so readers can tell when to reload
+        """
+        self.database_file = database_file
+        self.connection = None
+        self.connection_pid = None
+        self.lock = threading.Lock()
+
+
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Open the database the first time it is needed in each process
+        Transactions are started explicitly, so a change and its version bump are written together
+        """
+        if self.connection == None or self.connection_pid != os.getpid():
+            connection = sqlite3.connect(self.database_file, timeout=BUSY_TIMEOUT / 1000, check_same_thread=False, isolation_level=None)
+            connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT}")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS words (
+                    wordlist TEXT NOT NULL,
+                    word TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    PRIMARY KEY (wordlist, word)
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS words_position ON words (wordlist, position)")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS wordlists (
+                    wordlist TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                )
+            """)
+            self.connection = connection
+            self.connection_pid = os.getpid()
+        return self.connection
+
+
+    def get_words(self, wordlist: str) -> list:
+        """
+        Returns the words in a list, in the order they were added
+        """
+        with self.lock:
+            rows = self.get_connection().execute("SELECT word FROM words WHERE wordlist = ? ORDER BY position", (wordlist,)).fetchall()
+        return [word for word, in rows]
+
+
+    def get_version(self, wordlist: str) -> int | None:
+        """
+        Returns the version of a list, or None if it has never been written
+        """
+        with self.lock:
+            row = self.get_connection().execute("SELECT version FROM wordlists WHERE wordlist = ?", (wordlist,)).fetchone()
+        return row[0] if row != None else None
+
+
+    def contains(self, wordlist: str, word: str) -> bool:
+        with self.lock:
+            row = self.get_connection().execute("SELECT 1 FROM words WHERE wordlist = ? AND word = ?", (wordlist, word)).fetchone()
+        return row != None
+
+
+    def add_word(self, wordlist: str, word: str) -> bool:
+        """
+        Adds a word to the end of a list, unless it is already in it
+        Returns whether the list changed
+        """
+        def add(connection: sqlite3.Connection) -> bool:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO words (wordlist, word, position) SELECT ?, ?, COALESCE(MAX(position) + 1, 0) FROM words WHERE wordlist = ?",
+                (wordlist, word, wordlist)
+            )
+            return cursor.rowcount > 0
+        return self.write(wordlist, add)
+
+
+    def replace_words(self, wordlist: str, words: list) -> bool:
+        """
+        Replaces every word in a list, keeping the first of any duplicates
+        Returns whether the list changed
+        """
+        words = list(dict.fromkeys(words))
+        def replace(connection: sqlite3.Connection) -> bool:
+            old_words = [word for word, in connection.execute("SELECT word FROM words WHERE wordlist = ? ORDER BY position", (wordlist,))]
+            if old_words == words:
+                return False
+            connection.execute("DELETE FROM words WHERE wordlist = ?", (wordlist,))
+            connection.executemany("INSERT INTO words (wordlist, word, position) VALUES (?, ?, ?)", [(wordlist, word, position) for position, word in enumerate(words)])
+            return True
+        return self.write(wordlist, replace)
+
+
+    def delete_word(self, wordlist: str, word: str) -> bool:
+        """
+        Removes a word from a list
+        Returns whether the list changed
+        """
+        def delete(connection: sqlite3.Connection) -> bool:
+            return connection.execute("DELETE FROM words WHERE wordlist = ? AND word = ?", (wordlist, word)).rowcount > 0
+        return self.write(wordlist, delete)
+
+
+    def import_words(self, wordlist: str, words: list) -> bool:
+        """
+        Fills a list that has never been written, e.g. from its text file the first time the database is used
+        Returns whether the list was imported
+        """
+        if self.get_version(wordlist) != None:
+            return False
+        def fill(connection: sqlite3.Connection) -> bool:
+            if connection.execute("SELECT 1 FROM wordlists WHERE wordlist = ?", (wordlist,)).fetchone() != None:
+                return False
+            connection.executemany("INSERT OR IGNORE INTO words (wordlist, word, position) VALUES (?, ?, ?)", [(wordlist, word, position) for position, word in enumerate(words)])
+            return True
+        return self.write(wordlist, fill)
+
+
+    def write(self, wordlist: str, change) -> bool:
+        """
+        Runs a change in one transaction, taking the write lock up front so writers in every process are serialised
+        The version of the list is bumped if it changed
+        """
+        with self.lock:
+            connection = self.get_connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                changed = change(connection)
+                if changed:
+                    connection.execute(
+                        "INSERT INTO wordlists (wordlist, version) VALUES (?, 1) ON CONFLICT (wordlist) DO UPDATE SET version = version + 1",
+                        (wordlist,)
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return changed
+
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection != None and self.connection_pid == os.getpid():
+                self.connection.close()
+            self.connection = None
+
+
+    def __getstate__(self) -> dict:
+        """
+        Only the file name is kept when the database is sent to a worker process, which opens the file itself
+        """
+        return {"database_file": self.database_file}
+
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["database_file"])
@@ -0,0 +1,74 @@
+import os
+
+from main.repositories.WordlistFileWriter import WordlistFileWriter
+
+class WordlistFileRepository():
+
+    def __init__(self, data_path, file_name: str, required: bool = True) -> None:
+        """
+        A wordlist kept in a text file, one word or phrase per line
+        A list that isn't required, such as a tenant's additions, is empty until it is first written
+        """
+        self.full_path = data_path + file_name
+        self.required = required
+        self.file_writer = WordlistFileWriter(self.full_path)
+
+
+    def get_words(self) -> list:
+        """
+        Gets a python list of all words from the text file, in file order
+        """
+        words_list = []
+        try:
+            with open(self.full_path, 'r') as file:
+                for line in file:
+                    word = line.strip()
+                    if word:
+                        words_list.append(word)
+        except FileNotFoundError:
+            if self.required:
+                print(f"The file {self.full_path} was not found.")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+        return words_list
+
+
+    def get_version(self) -> tuple | None:
+        """
+        Returns the inode, modification time and size of the file, or None if it doesn't exist
+        Writers replace the file with a new one, so every process notices a write through the inode, even within the same clock tick
+        """
+        try:
+            stat = os.stat(self.full_path)
+            return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+
+    def contains(self, word: str) -> bool:
+        return word in self.get_words()
+
+
+    def add_word(self, word: str) -> bool:
+        """
+        Add a word to the list, unless it is already in it
+        Returns whether the list changed
+        """
+        return self.file_writer.add_word(word)
+
+
+    def replace_words(self, words: list) -> bool:
+        """
+        Replace the whole list
+        Returns whether the list changed
+        """
+        return self.file_writer.replace_words(words)
+
+
+    def delete_word(self, word: str) -> bool:
+        """
+        Remove a word from the list
+        Returns whether the list changed
+        """
+        return self.file_writer.delete_word(word)
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError: # not on Windows, where writers are only serialised within a process
+    fcntl = None
+
+class WordlistFileWriter():
+
+    def __init__(self, path: str) -> None:
+        """
+        Serialises changes to a wordlist file between threads and between processes
+        The file is never written in place: a new copy is written next to it and renamed over it, so readers see the old list or the new one, never part of a write
+        """
+        self.path = path
+        self.lock_path = os.path.join(os.path.dirname(path), "." + os.path.basename(path) + ".lock")
+        self.lock = threading.Lock()
+
+
+    def add_word(self, word: str) -> bool:
+        """
+        Adds a word to the file unless it is already there, dropping any duplicates the file had
+        Returns whether the file changed
+        """
+        return self.update(lambda words: words + [word])
+
+
+    def replace_words(self, words: list) -> bool:
+        """
+        Replaces every word in the file, keeping the first of any duplicates
+        Returns whether the file changed
+        """
+        return self.update(lambda old_words: list(words))
+
+
+    def delete_word(self, word: str) -> bool:
+        """
+        Removes a word from the file
+        Returns whether the file changed
+        """
+        return self.update(lambda words: [old_word for old_word in words if old_word != word])
+
+
+    def update(self, change) -> bool:
+        """
+        Applies a change to the words in the file and writes the result without duplicates, if it differs
+        The file is read again once the lock is held, so a word written by another writer isn't lost
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock, self.file_lock():
+            words = self.read_words()
+            new_words = list(dict.fromkeys(change(list(words))))
+            if new_words == words:
+                return False
+            self.write_words(new_words)
+            return True
+
+
+    def read_words(self) -> list:
+        """
+        Reads the words in the file. Unlike the repositories, errors other than a missing file are raised, so a failed read can't wipe the list
+        """
+        try:
+            with open(self.path, 'r') as file:
+                return [line.strip() for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+
+    def write_words(self, words: list) -> None:
+        """
+        Writes the words to a temporary file in the same directory, then renames it over the wordlist in one step
+        """
+        file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix="." + os.path.basename(self.path) + ".")
+        try:
+            os.chmod(temp_path, self.get_file_mode())
+            with os.fdopen(file_descriptor, 'w') as file:
+                file.write("\n".join(words))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+    def get_file_mode(self) -> int:
+        """
+        Keep the permissions of the file being replaced, rather than the private ones of a new temporary file
+        """
+        try:
+            return os.stat(self.path).st_mode & 0o777
+        except OSError:
+            return 0o644
+
+
+    def file_lock(self):
+        """
+        An exclusive lock on a file next to the wordlist, held by one process at a time
+        """
+        return FileLock(self.lock_path)
+
+
+class FileLock():
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = None
+
+
+    def __enter__(self) -> "FileLock":
+        if fcntl != None:
+            self.file = open(self.path, 'a')
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        if self.file != None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
@@ -11,6 +11,7 @@ class AcceptanceCriteriaBP():
 
     def register_routes(self) -> None:
         self.acceptance_criteria_bp.route('', methods=['POST'])(self.acceptance_criteria_controller.check_acceptance_criteria)
+        self.acceptance_criteria_bp.route('/session', methods=['POST'])(self.acceptance_criteria_controller.check_acceptance_criteria_session)
 
     def acceptance_criteria_bp(self) -> Blueprint:
         return self.acceptance_criteria_bp
\ No newline at end of file
@@ -0,0 +1,16 @@
+from flask import Blueprint
+
+from main.controllers.HealthController import HealthController
+
+class HealthBP():
+
+    def __init__(self, health_controller: HealthController) -> None:
+        self.health_controller = health_controller
+        self.health_bp = Blueprint('health_bp', __name__)
+        self.register_routes()
+
+    def register_routes(self) -> None:
+        self.health_bp.route('', methods=['GET'])(self.health_controller.get_readiness)
+
+    def health_bp(self) -> Blueprint:
+        return self.health_bp
@@ -0,0 +1,16 @@
+from flask import Blueprint
+
+from main.controllers.MetricsController import MetricsController
+
+class MetricsBP():
+
+    def __init__(self, metrics_controller: MetricsController) -> None:
+        self.metrics_controller = metrics_controller
+        self.metrics_bp = Blueprint('metrics_bp', __name__)
+        self.register_routes()
+
+    def register_routes(self) -> None:
+        self.metrics_bp.route('', methods=['GET'])(self.metrics_controller.get_metrics)
+
+    def metrics_bp(self) -> Blueprint:
+        return self.metrics_bp
@@ -11,6 +11,8 @@ class UserStoryBP():
 
     def register_routes(self) -> None:
         self.user_story_bp.route('', methods=['POST'])(self.user_story_controller.check_user_story)
+        self.user_story_bp.route('/batch', methods=['POST'])(self.user_story_controller.check_user_story_batch)
+        self.user_story_bp.route('/stream', methods=['POST'])(self.user_story_controller.check_user_story_stream)
 
     def user_story_bp(self) -> Blueprint:
         return self.user_story_bp
\ No newline at end of file
@@ -13,6 +13,10 @@ class WordlistsBP():
         self.word_list_bp.route('/noun', methods=['POST'])(self.word_controller.add_noun_exception)
         self.word_list_bp.route('/nounverb', methods=['POST'])(self.word_controller.add_noun_verb_exception)
         self.word_list_bp.route('/verb', methods=['POST'])(self.word_controller.add_verb_exception)
+        self.word_list_bp.route('/<wordlist>', methods=['GET'])(self.word_controller.get_words)
+        self.word_list_bp.route('/<wordlist>', methods=['PUT'])(self.word_controller.replace_words)
+        self.word_list_bp.route('/<wordlist>/<path:word>', methods=['GET'])(self.word_controller.has_word)
+        self.word_list_bp.route('/<wordlist>/<path:word>', methods=['DELETE'])(self.word_controller.delete_word)
 
     def word_list_bp(self) -> Blueprint:
         return self.word_list_bp
\ No newline at end of file
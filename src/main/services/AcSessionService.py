@@ -0,0 +1,180 @@
+import hashlib
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from main.services.WordlistService import WordlistService, get_current_tenant
+from main.services.acceptancecriteria.AcceptanceCriteriaAnalyser import Unique
+
+MAX_SESSIONS = 1000
+SESSION_TTL = 1800.0 # seconds a session is kept after its last request
+SESSION_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+def get_content_hash(text: str) -> str:
+    """
+    The content hash clients send for each AC: the SHA-256 hex digest of its UTF-8 text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class AcSession():
+
+    def __init__(self, session_id: str) -> None:
+        """
+        The ACs of one story as last sent by a client, with their defects and an index of duplicate texts
+        """
+        self.session_id = session_id
+        self.content_hashes = {}
+        self.text_hashes = {}
+        self.defects = {}
+        self.positions = {}
+        self.duplicate_index = {}
+        self.duplicate_text_hashes = set()
+        self.uniqueness_defects = []
+        self.wordlist_version = None
+        self.tenant = None
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+
+    def get_changed_ids(self, items: list) -> list:
+        """
+        Takes (id, content hash) tuples and returns the ids of every AC that is new or has changed since the last request
+        """
+        return [ac_id for ac_id, content_hash in items if self.content_hashes.get(ac_id) != content_hash]
+
+
+    def check_wordlists(self, wordlist_version: int | None, tenant: str | None) -> None:
+        """
+        Forget the content hashes if the wordlists or the tenant changed since the session was last checked,
+        so every AC counts as changed and is analysed again rather than keeping defects found with other wordlists
+        """
+        if (wordlist_version, tenant) != (self.wordlist_version, self.tenant):
+            self.content_hashes.clear()
+            self.wordlist_version = wordlist_version
+            self.tenant = tenant
+
+
+    def index_text(self, ac_id, text_hash: str) -> None:
+        ids = self.duplicate_index.setdefault(text_hash, set())
+        ids.add(ac_id)
+        if len(ids) > 1:
+            self.duplicate_text_hashes.add(text_hash)
+        self.text_hashes[ac_id] = text_hash
+
+
+    def unindex_text(self, ac_id) -> None:
+        text_hash = self.text_hashes.pop(ac_id, None)
+        if text_hash == None:
+            return
+        ids = self.duplicate_index[text_hash]
+        ids.discard(ac_id)
+        if len(ids) < 2:
+            self.duplicate_text_hashes.discard(text_hash)
+        if len(ids) == 0:
+            del self.duplicate_index[text_hash]
+
+
+    def remove(self, ac_id) -> None:
+        """
+        Forget an AC that is no longer in the list
+        """
+        self.unindex_text(ac_id)
+        self.content_hashes.pop(ac_id, None)
+        self.defects.pop(ac_id, None)
+        self.positions.pop(ac_id, None)
+
+
+    def update(self, items: list, analysed_defects: dict, unique_analyser: Unique) -> dict:
+        """
+        Takes (id, content hash) tuples for the whole list of ACs in order, and id to (lowercased text, defects) for every AC that was re-analysed
+        Only the re-analysed ACs are re-indexed, and duplicates are only looked for among texts already known to be shared
+        Returns the delta: ACs whose title or defects changed, ids that were removed, and the uniqueness defects if they changed
+        """
+        ids = [ac_id for ac_id, content_hash in items]
+        current_ids = set(ids)
+        removed_ids = [ac_id for ac_id in self.content_hashes if ac_id not in current_ids]
+        for ac_id in removed_ids:
+            self.remove(ac_id)
+
+        changed_ids = set()
+        for ac_id, content_hash in items:
+            if ac_id not in analysed_defects:
+                continue
+            lower_text, defects = analysed_defects[ac_id]
+            if self.defects.get(ac_id) != defects:
+                changed_ids.add(ac_id)
+            self.content_hashes[ac_id] = content_hash
+            self.defects[ac_id] = defects
+            self.unindex_text(ac_id)
+            self.index_text(ac_id, hashlib.sha256(lower_text.encode("utf-8")).hexdigest())
+
+        updated = []
+        for position, ac_id in enumerate(ids):
+            if ac_id in changed_ids or self.positions.get(ac_id) != position:
+                updated.append({"id": ac_id, "title": f"AC {position + 1}", "defects": self.defects[ac_id]})
+            self.positions[ac_id] = position
+
+        duplicate_groups = sorted(sorted(self.positions[ac_id] for ac_id in self.duplicate_index[text_hash]) for text_hash in self.duplicate_text_hashes)
+        uniqueness_defects = unique_analyser.describe_full_duplicates(duplicate_groups)
+        delta = {"session_id": self.session_id, "updated": updated, "removed": removed_ids}
+        if uniqueness_defects != self.uniqueness_defects:
+            delta["uniqueness"] = uniqueness_defects
+            self.uniqueness_defects = uniqueness_defects
+        return delta
+
+
+class AcSessionService():
+
+    def __init__(self, unique_analyser: Unique, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL, word_list_service: WordlistService | None = None) -> None:
+        self.unique_analyser = unique_analyser
+        self.word_list_service = word_list_service
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+
+    def get_session(self, session_id: str | None) -> AcSession:
+        """
+        Returns the session with the given id, or a new one if there is no id or the session has expired
+        A new session keeps the id it was asked for, so a session made by another worker process, which this one has never seen,
+        carries on under the same id once its texts have been sent again, whichever process gets the next request
+        The least recently used sessions are dropped once there are too many
+        """
+        now = time.monotonic()
+        with self.lock:
+            session = self.sessions.get(session_id) if session_id != None else None
+            if session != None and now - session.last_used >= self.ttl:
+                del self.sessions[session_id]
+                session = None
+            if session == None:
+                session = AcSession(session_id if session_id != None and SESSION_ID_PATTERN.fullmatch(session_id) != None else uuid.uuid4().hex)
+                self.sessions[session.session_id] = session
+            session.last_used = now
+            self.sessions.move_to_end(session.session_id)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+            return session
+
+
+    def get_changed_ids(self, session: AcSession, items: list) -> list:
+        """
+        Takes (id, content hash) tuples and returns the ids of every AC that is new or has changed since the last request in the session
+        Every AC counts as changed once the wordlists have changed, or when the session is used by another tenant
+        """
+        wordlist_version = None
+        if self.word_list_service != None:
+            self.word_list_service.check_for_changes()
+            wordlist_version = self.word_list_service.version
+        session.check_wordlists(wordlist_version, get_current_tenant())
+        return session.get_changed_ids(items)
+
+
+    def update_session(self, session: AcSession, items: list, analysed_defects: dict) -> dict:
+        """
+        Records the latest list of ACs in a session, returning the delta of defects since its last request
+        """
+        return session.update(items, analysed_defects, self.unique_analyser)
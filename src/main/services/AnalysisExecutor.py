@@ -0,0 +1,230 @@
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+
+from main.repositories.WordlistDatabase import WordlistDatabase
+from main.services.AnalysisPipeline import AnalysisPipeline
+from main.services.AnalysisServices import AnalysisServices
+from main.services.InstrumentationService import InstrumentationService
+from main.services.TaggingCacheService import TaggingCacheService
+from main.services.WordlistService import get_current_tenant, set_current_tenant
+
+CHUNK_SIZE = 25
+MIN_PARALLEL_ITEMS = 50
+
+# what map_stream waits for while it streams through the process pool
+CHUNK_READ = "read"
+CHUNK_DONE = "done"
+READ_DONE = "end"
+READ_FAILED = "failed"
+
+worker_analysis_services = None
+worker_instrumentation_service = None
+
+
+def start_worker(base_path: str, tagging_cache_service: TaggingCacheService | None = None, wordlist_database: WordlistDatabase | None = None) -> None:
+    """
+    Runs once in each worker process: builds the services and loads the tagger and wordlists before any work arrives
+    """
+    global worker_analysis_services, worker_instrumentation_service
+    worker_analysis_services = AnalysisServices(base_path, tagging_cache_service, wordlist_database)
+    worker_analysis_services.warm_up()
+    worker_instrumentation_service = InstrumentationService()
+
+
+def analyse_in_worker(method_name: str, items: list, collect_stats: bool = False, tenant: str | None = None) -> list | tuple:
+    """
+    Runs one chunk of items through the worker's analysis pipeline, with the wordlists of the tenant that sent them
+    When collecting stats, returns (results, rule timings for this chunk) so they can be added up in the parent process
+    """
+    set_current_tenant(tenant)
+    if not collect_stats:
+        return getattr(worker_analysis_services.analysis_pipeline, method_name)(items)
+    worker_instrumentation_service.enable(worker_analysis_services)
+    worker_instrumentation_service.reset()
+    results = getattr(worker_analysis_services.analysis_pipeline, method_name)(items)
+    return results, worker_instrumentation_service.get_stats()
+
+
+class AnalysisExecutor():
+
+    def __init__(self, analysis_pipeline: AnalysisPipeline, base_path: str, use_process_pool: bool = False, workers: int | None = None,
+                 chunk_size: int = CHUNK_SIZE, min_parallel_items: int = MIN_PARALLEL_ITEMS, instrumentation_service: InstrumentationService | None = None,
+                 tagging_cache_service: TaggingCacheService | None = None, wordlist_database: WordlistDatabase | None = None) -> None:
+        self.analysis_pipeline = analysis_pipeline
+        self.base_path = base_path
+        self.use_process_pool = use_process_pool
+        self.workers = workers if workers else os.cpu_count()
+        self.chunk_size = chunk_size
+        self.min_parallel_items = min_parallel_items
+        self.instrumentation_service = instrumentation_service
+        self.tagging_cache_service = tagging_cache_service
+        self.wordlist_database = wordlist_database
+        self.pool = None
+
+
+    def should_use_process_pool(self, num_items: int) -> bool:
+        """
+        Small inputs are analysed in-process, as sending them to another process costs more than it saves
+        """
+        return self.use_process_pool and self.workers > 1 and num_items >= self.min_parallel_items
+
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        """
+        Start the worker processes the first time they are needed
+        Workers are spawned rather than forked, so they don't inherit the threads of a running server
+        Each worker opens the persistent tagging cache and the wordlist database itself, if there are any
+        """
+        if self.pool == None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=start_worker,
+                initargs=(self.base_path, self.tagging_cache_service, self.wordlist_database)
+            )
+        return self.pool
+
+
+    def map_chunks(self, method_name: str, items: list, in_completion_order: bool = False):
+        """
+        Splits the items into chunks and runs each chunk through the named AnalysisPipeline method
+        Yields (index of the first item in the chunk, results for the chunk) in input order
+        or, if asked for, in the order the chunks finish
+        Rule timings from worker processes are added to the instrumentation service while it is enabled
+        """
+        chunk_starts = range(0, len(items), self.chunk_size)
+        if not self.should_use_process_pool(len(items)):
+            method = getattr(self.analysis_pipeline, method_name)
+            for start in chunk_starts:
+                yield start, method(items[start:start + self.chunk_size])
+            return
+
+        pool = self.get_pool()
+        collect_stats = self.instrumentation_service != None and self.instrumentation_service.enabled
+        futures = {pool.submit(analyse_in_worker, method_name, items[start:start + self.chunk_size], collect_stats, get_current_tenant()): start for start in chunk_starts}
+        try:
+            finished_futures = as_completed(futures) if in_completion_order else futures
+            for future in finished_futures:
+                yield futures[future], self.get_chunk_results(future, collect_stats)
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+    def map_stream(self, method_name: str, items, max_pending_chunks: int | None = None):
+        """
+        Runs items from an iterator through the named AnalysisPipeline method as they arrive, yielding (chunk of items, results for the chunk) in input order
+        Chunks start at one item and double up to the chunk size, so the first results don't wait for a full chunk to arrive
+        With the process pool, the items are read in another thread, so finished results are yielded while the next item is still arriving.
+        At most max_pending_chunks chunks (twice the workers by default) are read ahead of the results,
+        so the next item isn't read until there is room for it and memory doesn't grow with the number of items
+        """
+        chunks = self.get_chunks(items)
+        if not self.use_process_pool or self.workers <= 1:
+            method = getattr(self.analysis_pipeline, method_name)
+            for chunk in chunks:
+                yield chunk, method(chunk)
+            return
+
+        pool = self.get_pool()
+        collect_stats = self.instrumentation_service != None and self.instrumentation_service.enabled
+        max_pending_chunks = max_pending_chunks if max_pending_chunks != None else self.workers * 2
+        events = queue.Queue()
+        room = threading.Semaphore(max_pending_chunks)
+        stopped = threading.Event()
+        threading.Thread(target=self.read_chunks, args=(chunks, events, room, stopped), daemon=True).start()
+        pending = deque()
+        reading = True
+        try:
+            while reading or len(pending) > 0:
+                if len(pending) > 0 and (not reading or len(pending) >= max_pending_chunks or pending[0][1].done()):
+                    chunk, future = pending.popleft()
+                    yield chunk, self.get_chunk_results(future, collect_stats)
+                    room.release()
+                    continue
+                # wait for the next chunk to be read or for a chunk to finish, whichever comes first
+                event, value = events.get()
+                if event == CHUNK_READ:
+                    future = pool.submit(analyse_in_worker, method_name, value, collect_stats, get_current_tenant())
+                    future.add_done_callback(lambda future: events.put((CHUNK_DONE, None)))
+                    pending.append((value, future))
+                elif event == READ_FAILED:
+                    raise value
+                elif event == READ_DONE:
+                    reading = False
+        finally:
+            stopped.set()
+            room.release()
+            for chunk, future in pending:
+                future.cancel()
+
+
+    def read_chunks(self, chunks, events: queue.Queue, room: threading.Semaphore, stopped: threading.Event) -> None:
+        """
+        Runs in its own thread for map_stream: reads the next chunk whenever there is room for it, and sends it to events
+        """
+        try:
+            while True:
+                room.acquire()
+                if stopped.is_set():
+                    return
+                chunk = next(chunks, None)
+                if chunk == None:
+                    events.put((READ_DONE, None))
+                    return
+                events.put((CHUNK_READ, chunk))
+        except Exception as error:
+            events.put((READ_FAILED, error))
+
+
+    def get_chunks(self, items):
+        """
+        Groups items from an iterator into lists, starting with one item and doubling up to the chunk size
+        """
+        chunk = []
+        chunk_size = 1
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+                chunk_size = min(chunk_size * 2, self.chunk_size)
+        if len(chunk) > 0:
+            yield chunk
+
+
+    def get_chunk_results(self, future: Future, collect_stats: bool) -> list:
+        """
+        Waits for a chunk sent to a worker, adding its rule timings to the instrumentation service if they were collected
+        """
+        results = future.result()
+        if collect_stats:
+            results, stats = results
+            self.instrumentation_service.merge_stats(stats)
+        return results
+
+
+    def map(self, method_name: str, items: list) -> list:
+        """
+        Runs every item through the named AnalysisPipeline method, returning the results in input order
+        When analysed in-process, the items are kept together as one chunk
+        """
+        if not self.should_use_process_pool(len(items)):
+            return getattr(self.analysis_pipeline, method_name)(items)
+        results = []
+        for start, chunk_results in self.map_chunks(method_name, items):
+            results += chunk_results
+        return results
+
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes
+        """
+        if self.pool != None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
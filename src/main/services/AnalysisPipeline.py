@@ -0,0 +1,130 @@
+from main.models.AcceptanceCriteria import AcceptanceCriteria
+from main.models.AnalysisContext import AnalysisContext
+from main.models.UserStory import UserStory
+from main.services.CorpusRuleService import CorpusRuleService
+from main.services.acceptancecriteria.AcceptanceCriteriaAnalyser import AcceptanceCriteriaAnalyser
+from main.services.acceptancecriteria.AcceptanceCriteriaPreprocessor import AcceptanceCriteriaPreprocessor
+from main.services.ambiguity.AmbiguityAnalyser import AmbiguityAnalyser
+from main.services.userstories.UserStoryAnalyser import UserStoryAnalyser
+from main.services.userstories.UserStoryPreprocessor import UserStoryPreprocessor
+
+class AnalysisPipeline():
+
+    def __init__(self, user_story_preprocessor: UserStoryPreprocessor, user_story_analyser: UserStoryAnalyser, acceptance_criteria_preprocessor: AcceptanceCriteriaPreprocessor,
+                 acceptance_criteria_analyser: AcceptanceCriteriaAnalyser, ambiguity_analyser: AmbiguityAnalyser, corpus_rule_service: CorpusRuleService | None = None) -> None:
+        self.user_story_preprocessor = user_story_preprocessor
+        self.user_story_analyser = user_story_analyser
+        self.acceptance_criteria_preprocessor = acceptance_criteria_preprocessor
+        self.acceptance_criteria_analyser = acceptance_criteria_analyser
+        self.ambiguity_analyser = ambiguity_analyser
+        self.corpus_rule_service = corpus_rule_service
+
+
+    def analyse_story(self, story_text: str) -> UserStory:
+        """
+        Runs a user story through the preprocessor, the user story analyser and the ambiguity analyser
+        """
+        user_story, can_be_processed = self.user_story_preprocessor.pre_process_story_text(story_text)
+        if can_be_processed:
+            user_story = self.user_story_analyser.analyse_user_story(user_story)
+            user_story = self.ambiguity_analyser.is_unambiguous(user_story)
+        return user_story
+
+
+    def analyse_stories(self, story_texts: list, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Runs a list of user stories through the pipeline, POS tagging all of them together
+        Returns the analysed user stories in the same order
+        """
+        analysis_context = analysis_context if analysis_context != None else AnalysisContext()
+        processed_stories = self.user_story_preprocessor.pre_process_story_texts(story_texts, analysis_context)
+        self.ambiguity_analyser.tokenise_and_pos_tag_texts([story for story, can_be_processed in processed_stories if can_be_processed], analysis_context)
+        return self.analyse_processed_stories(processed_stories)
+
+
+    def analyse_stories_corpus(self, story_texts: list, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Runs a list of user stories through the pipeline in the same way as analyse_stories, for offline audits of large corpora
+        The count-based rules are worked out for every story at once before the stories are analysed one by one, which use the shared results
+        Returns the same user stories as analyse_stories
+        """
+        if self.corpus_rule_service == None:
+            return self.analyse_stories(story_texts, analysis_context)
+        analysis_context = analysis_context if analysis_context != None else AnalysisContext()
+        self.corpus_rule_service.count_words([story_text.lower() for story_text in story_texts], " ", analysis_context)
+        processed_stories = self.user_story_preprocessor.pre_process_story_texts(story_texts, analysis_context)
+        user_stories = [story for story, can_be_processed in processed_stories if can_be_processed]
+        self.ambiguity_analyser.tokenise_and_pos_tag_texts(user_stories, analysis_context)
+        self.corpus_rule_service.has_required_number_verb_and_noun([story.means_pos for story in user_stories], 1, 2, True, analysis_context)
+        self.corpus_rule_service.count_words([story.ends for story in user_stories if story.ends != None], None, analysis_context)
+        return self.analyse_processed_stories(processed_stories)
+
+
+    def analyse_processed_stories(self, processed_stories: list) -> list:
+        """
+        Runs a list of (user story, can be processed) tuples from the preprocessor through the user story analyser and the ambiguity analyser
+        """
+        user_stories = []
+        for user_story, can_be_processed in processed_stories:
+            if can_be_processed:
+                user_story = self.user_story_analyser.analyse_user_story(user_story)
+                user_story = self.ambiguity_analyser.is_unambiguous(user_story)
+            user_stories.append(user_story)
+        return user_stories
+
+
+    def analyse_acceptance_criteria(self, acs: list, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Runs a list of (AC text, AC number) tuples through the preprocessor, the AC analyser and the ambiguity analyser
+        Every AC is POS tagged together. Uniqueness is not checked as it needs the whole list of ACs
+        Returns the analysed ACs in the same order
+        """
+        analysis_context = analysis_context if analysis_context != None else AnalysisContext()
+        processed_criteria = self.acceptance_criteria_preprocessor.pre_process_ac_texts(acs, analysis_context)
+        self.ambiguity_analyser.tokenise_and_pos_tag_texts([ac for ac, can_be_processed in processed_criteria], analysis_context)
+        analysed_criteria = list(map(self.process_ac, processed_criteria))
+        return list(map(self.ambiguity_analyser.is_unambiguous, analysed_criteria))
+
+
+    def analyse_acceptance_criteria_corpus(self, acs: list, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Runs a list of (AC text, AC number) tuples through the pipeline in the same way as analyse_acceptance_criteria, for offline audits of large corpora
+        The noun and verb counts of every chunk are checked at once before the ACs are analysed one by one, which use the shared results
+        Returns the same ACs as analyse_acceptance_criteria
+        """
+        if self.corpus_rule_service == None:
+            return self.analyse_acceptance_criteria(acs, analysis_context)
+        analysis_context = analysis_context if analysis_context != None else AnalysisContext()
+        processed_criteria = self.acceptance_criteria_preprocessor.pre_process_ac_texts(acs, analysis_context)
+        self.ambiguity_analyser.tokenise_and_pos_tag_texts([ac for ac, can_be_processed in processed_criteria], analysis_context)
+        criteria = [ac for ac, can_be_processed in processed_criteria if can_be_processed]
+        self.corpus_rule_service.has_required_number_verb_and_noun([ac.context_pos for ac in criteria], 1, 2, analysis_context=analysis_context)
+        self.corpus_rule_service.has_required_number_verb_and_noun([ac.event_pos for ac in criteria] + [ac.outcome_pos for ac in criteria], 1, 1, analysis_context=analysis_context)
+        analysed_criteria = list(map(self.process_ac, processed_criteria))
+        return list(map(self.ambiguity_analyser.is_unambiguous, analysed_criteria))
+
+
+    def process_ac(self, ac_tuple) -> AcceptanceCriteria:
+        """
+        Process an AC if it is able to be processed
+        """
+        ac, flag = ac_tuple
+        if flag:
+            return self.acceptance_criteria_analyser.analyse_acceptance_criteria(ac)
+        else:
+            return ac
+
+
+    def find_uniqueness_defects(self, acs: list) -> list:
+        """
+        Checks a whole list of analysed ACs for duplicates
+        """
+        return self.acceptance_criteria_analyser.unique_analyser.are_unique(acs)
+
+
+    def count_tagger_calls(self, objs: list) -> int:
+        """
+        Counts the calls made to the tagger for a list of user stories or ACs, counting each shared analysis context once
+        """
+        analysis_contexts = {id(obj.analysis_context): obj.analysis_context for obj in objs if obj.analysis_context != None}
+        return sum(analysis_context.tagger_calls for analysis_context in analysis_contexts.values())
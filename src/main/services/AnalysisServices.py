@@ -0,0 +1,143 @@
+import os
+import time
+
+from main.repositories.EscapeClauseRepository import EscapeClauseRepository
+from main.repositories.NltkResourceRepository import NltkResourceRepository
+from main.repositories.NounExceptionRepository import NounExceptionRepository
+from main.repositories.QuantifiersRespository import QuantifiersRepository
+from main.repositories.SqliteWordlistRepository import SqliteWordlistRepository
+from main.repositories.VagueTermsRepository import VagueTermsRepository
+from main.repositories.VerbExceptionRepository import VerbExceptionRepository
+from main.repositories.VerbNounExceptionRepository import VerbNounExceptionRepository
+from main.repositories.WeakVerbsRepository import WeakVerbsRepository
+from main.repositories.WordlistDatabase import WordlistDatabase
+from main.repositories.WordlistFileRepository import WordlistFileRepository
+from main.services.AnalysisPipeline import AnalysisPipeline
+from main.services.CorpusRuleService import CorpusRuleService
+from main.services.NLPService import NLPService
+from main.services.NltkDataService import NltkDataService, get_nltk_data_dir
+from main.services.TaggingCacheService import TaggingCacheService
+from main.services.WordlistService import WordlistService
+from main.services.acceptancecriteria.AcceptanceCriteriaAnalyser import AcceptanceCriteriaAnalyser
+from main.services.acceptancecriteria.AcceptanceCriteriaPreprocessor import AcceptanceCriteriaPreprocessor
+from main.services.ambiguity.AmbiguityAnalyser import AmbiguityAnalyser
+from main.services.userstories.UserStoryAnalyser import UserStoryAnalyser
+from main.services.userstories.UserStoryPreprocessor import UserStoryPreprocessor
+
+TENANT_DATA_DIR = "/main/data/tenants"
+
+class AnalysisServices():
+
+    def __init__(self, base_path: str, tagging_cache_service: TaggingCacheService | None = None, wordlist_database: WordlistDatabase | None = None) -> None:
+        """
+        Registers the repositories and services needed to analyse user stories and ACs
+        Used by the Flask app and by anything that analyses text without it, such as worker processes
+        With a wordlist database, the wordlists are read from it instead of the text files, which fill it the first time it is used
+        """
+        self.base_path = base_path
+        self.tagging_cache_service = tagging_cache_service
+        self.wordlist_database = wordlist_database
+        self.warm_up_timings = {}
+
+        # register repositories
+        self.verb_noun_exception_repository = VerbNounExceptionRepository(base_path)
+        self.noun_exception_repository = NounExceptionRepository(base_path)
+        self.verb_exception_repository = VerbExceptionRepository(base_path)
+        self.vague_terms_repository = VagueTermsRepository(base_path)
+        self.escape_clause_repository = EscapeClauseRepository(base_path)
+        self.quantifiers_repository = QuantifiersRepository(base_path)
+        self.weak_verbs_repository = WeakVerbsRepository(base_path)
+        self.nltk_resource_repository = NltkResourceRepository(base_path)
+
+        # register services
+        self.nltk_data_service = NltkDataService(self.nltk_resource_repository, get_nltk_data_dir(base_path))
+        self.nltk_data_service.use_data_dir()
+        wordlist_repositories = [
+            self.verb_noun_exception_repository,
+            self.noun_exception_repository,
+            self.verb_exception_repository,
+            self.vague_terms_repository,
+            self.escape_clause_repository,
+            self.quantifiers_repository,
+            self.weak_verbs_repository
+        ]
+        if wordlist_database != None:
+            wordlist_repositories = [self.get_database_repository(repository) for repository in wordlist_repositories]
+        self.word_list_service = WordlistService(*wordlist_repositories, self.get_tenant_repository)
+        self.nlp_service = NLPService(self.word_list_service, tagging_cache_service)
+        self.user_story_preprocessor = UserStoryPreprocessor(self.nlp_service)
+        self.user_story_analyser = UserStoryAnalyser(self.nlp_service, self.word_list_service)
+        self.acceptance_criteria_preprocessor = AcceptanceCriteriaPreprocessor(self.nlp_service)
+        self.acceptance_criteria_analyser = AcceptanceCriteriaAnalyser(self.nlp_service, self.word_list_service)
+        self.ambiguity_analyser = AmbiguityAnalyser(self.nlp_service, self.word_list_service)
+        self.corpus_rule_service = CorpusRuleService(self.nlp_service.pos_service)
+        self.analysis_pipeline = AnalysisPipeline(
+            self.user_story_preprocessor,
+            self.user_story_analyser,
+            self.acceptance_criteria_preprocessor,
+            self.acceptance_criteria_analyser,
+            self.ambiguity_analyser,
+            self.corpus_rule_service
+        )
+
+
+    def get_database_repository(self, file_repository) -> SqliteWordlistRepository:
+        """
+        The database version of a wordlist file, filled from the file if the list isn't in the database yet
+        """
+        file_name = os.path.splitext(os.path.basename(file_repository.full_path))[0]
+        repository = SqliteWordlistRepository(self.wordlist_database, file_name)
+        repository.import_from(file_repository)
+        return repository
+
+
+    def get_tenant_repository(self, tenant: str, repository):
+        """
+        The repository of a tenant's additions to a shared wordlist, kept next to the shared list
+        In the database it is the list named <wordlist>@<tenant>, otherwise the file with the same name in main/data/tenants/<tenant>
+        """
+        if isinstance(repository, SqliteWordlistRepository):
+            return SqliteWordlistRepository(self.wordlist_database, f"{repository.wordlist}@{tenant}")
+        return WordlistFileRepository(self.base_path, f"{TENANT_DATA_DIR}/{tenant}/{os.path.basename(repository.full_path)}", required=False)
+
+
+    def warm_up(self) -> dict:
+        """
+        Load the tokeniser and tagger models and every wordlist, so the first analysis doesn't pay for loading them
+        Only what the pipeline uses is loaded. Returns the seconds taken to load each of them
+        """
+        self.warm_up_timings = {
+            "punkt_tokeniser": self.time_load(self.nlp_service.load_tokeniser),
+            "pos_tagger": self.time_load(self.nlp_service.pos_service.load_tagger),
+            "wordlists": self.time_load(self.load_wordlists)
+        }
+        return self.warm_up_timings
+
+
+    def time_load(self, load) -> float:
+        """
+        Returns the seconds a load took
+        """
+        start = time.perf_counter()
+        load()
+        return time.perf_counter() - start
+
+
+    def load_wordlists(self) -> None:
+        """
+        Read every wordlist from its repository
+        """
+        self.word_list_service.get_noun_exceptions()
+        self.word_list_service.get_verb_exceptions()
+        self.word_list_service.get_verb_noun_exceptions()
+        self.word_list_service.get_vague_terms_list()
+        self.word_list_service.get_escape_clause_list()
+        self.word_list_service.get_quantifiers_list()
+        self.word_list_service.get_weak_verbs_list()
+
+
+    def is_warm(self) -> bool:
+        """
+        Checks if the tagger model has been loaded, so analysing text won't have to wait for it
+        """
+        return self.nlp_service.pos_service.tagger != None
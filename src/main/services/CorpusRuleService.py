@@ -0,0 +1,97 @@
+import numpy as np
+
+from main.models.AnalysisContext import AnalysisContext
+from main.services.NLPService import POS
+
+NOUN = 1
+NOUN_IGNORING_I = 2
+VERB = 4
+POTENTIAL_NOUN_OR_VERB = 8
+
+class CorpusRuleService():
+
+    def __init__(self, pos_service: POS) -> None:
+        """
+        Evaluates the count-based rules for a whole corpus at once with NumPy, rather than one story or AC at a time
+        The results are memoised in the analysis context the corpus shares, where the rules look for them before working them out themselves
+        """
+        self.pos_service = pos_service
+
+
+    def pack_tokens(self, chunks: list) -> tuple:
+        """
+        Packs the POS tags of every chunk into one array of word class bit flags, with the offset each chunk starts at
+        Each distinct (word, tag) token is classified once, with the same rules as the per-chunk token features
+        Returns the (flags, offsets) arrays, with one more offset than there are chunks
+        """
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(pos) for pos in chunks], out=offsets[1:])
+        vocabulary = {}
+        token_ids = np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for pos in chunks for token in pos), dtype=np.int64, count=offsets[-1])
+
+        features = self.pos_service.get_token_features(list(vocabulary))
+        classes = np.frombuffer(features.is_noun, dtype=np.uint8) * NOUN \
+            | np.frombuffer(features.is_noun_ignoring_i, dtype=np.uint8) * NOUN_IGNORING_I \
+            | np.frombuffer(features.is_verb, dtype=np.uint8) * VERB \
+            | np.frombuffer(features.is_potential_noun_or_verb, dtype=np.uint8) * POTENTIAL_NOUN_OR_VERB
+        return classes[token_ids], offsets
+
+
+    def count_flags(self, flags: np.ndarray, offsets: np.ndarray, flag: int) -> np.ndarray:
+        """
+        Counts the tokens in each chunk that have every bit of flag set
+        """
+        totals = np.zeros(len(flags) + 1, dtype=np.int64)
+        np.cumsum((flags & flag) == flag, out=totals[1:])
+        return totals[offsets[1:]] - totals[offsets[:-1]]
+
+
+    def has_required_number_verb_and_noun(self, chunks: list, required_nouns: int, required_verbs: int, ignore_i_as_noun: bool = False,
+                                          analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Checks every list of POS tokens for the number of required nouns and verbs, as POS.has_required_number_verb_and_noun does for one
+        If an analysis context is given, each result is memoised in it for the per-chunk check to find
+        Returns a (found verbs, found nouns) tuple for each chunk
+        """
+        version = self.pos_service.get_wordlist_version()
+        tagged_chunks = [pos for pos in chunks if pos != None]
+        flags, offsets = self.pack_tokens(tagged_chunks)
+        noun_flag = NOUN_IGNORING_I if ignore_i_as_noun else NOUN
+        nouns = self.count_flags(flags, offsets, noun_flag)
+        verbs = self.count_flags(flags, offsets, VERB)
+
+        found_verbs = verbs >= required_verbs
+        found_nouns = nouns >= required_nouns
+        # a chunk with enough of one but not the other can make up the difference from its spare verb/noun exceptions
+        missing_nouns = required_nouns - nouns
+        spare_verbs = verbs - required_verbs
+        potential_nouns = self.count_flags(flags, offsets, VERB | POTENTIAL_NOUN_OR_VERB)
+        missing_verbs = required_verbs - verbs
+        spare_nouns = nouns - required_nouns
+        potential_verbs = self.count_flags(flags, offsets, noun_flag | POTENTIAL_NOUN_OR_VERB)
+        found_nouns, found_verbs = (
+            found_nouns | (found_verbs & (missing_nouns <= spare_verbs) & (potential_nouns >= missing_nouns)),
+            found_verbs | (found_nouns & (missing_verbs <= spare_nouns) & (potential_verbs >= missing_verbs))
+        )
+
+        results = iter(zip(found_verbs.tolist(), found_nouns.tolist()))
+        all_results = []
+        for pos in chunks:
+            result = next(results) if pos != None else (True, True)
+            if pos != None and analysis_context != None:
+                analysis_context.add_verb_noun_result(pos, required_nouns, required_verbs, ignore_i_as_noun, version, result)
+            all_results.append(result)
+        return all_results
+
+
+    def count_words(self, texts: list, separator: str | None = None, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Counts the words each text splits into on the separator, or on whitespace
+        str.split is faster than laying the texts out in a NumPy array, so only the memoising is done for the whole corpus
+        If an analysis context is given, each count is memoised in it
+        """
+        counts = [len(text.split(separator)) for text in texts]
+        if analysis_context != None:
+            for text, count in zip(texts, counts):
+                analysis_context.add_word_count(text, separator, count)
+        return counts
@@ -0,0 +1,129 @@
+import threading
+import time
+from functools import wraps
+
+# (path to the service from AnalysisServices, method name) for every rule that gets timed
+INSTRUMENTED_RULES = [
+    ("user_story_analyser", "analyse_user_story"),
+    ("acceptance_criteria_analyser", "analyse_acceptance_criteria"),
+    ("ambiguity_analyser", "is_unambiguous"),
+    ("user_story_preprocessor", "pre_process_story_text"),
+    ("user_story_preprocessor", "pre_process_story_texts"),
+    ("user_story_analyser.well_formed_analyser", "is_well_formed"),
+    ("user_story_analyser.atomic_analyser", "is_atomic"),
+    ("user_story_analyser.atomic_analyser", "has_conjunctions_with_valid_chunks_either_side"),
+    ("user_story_analyser.minimal_analyser", "is_minimal"),
+    ("user_story_analyser.full_sentence_analyser", "is_full_sentence"),
+    ("user_story_analyser.uniform_analyser", "is_uniform"),
+    ("acceptance_criteria_preprocessor", "pre_process_ac_texts"),
+    ("acceptance_criteria_analyser.integrous_analyser", "is_integrous"),
+    ("acceptance_criteria_analyser.essential_analyser", "is_essential"),
+    ("acceptance_criteria_analyser.singular_analyser", "is_singular"),
+    ("acceptance_criteria_analyser.unique_analyser", "are_unique"),
+    ("ambiguity_analyser.subjectivity_analyser", "is_subjective"),
+    ("ambiguity_analyser.vagueness_analyser", "is_vague"),
+    ("ambiguity_analyser.non_commitment_analyser", "is_non_commital"),
+    ("ambiguity_analyser.anaphora_analyser", "has_anaphora"),
+    ("ambiguity_analyser.quantifier_analyser", "has_quantifiers"),
+    ("ambiguity_analyser.weakness_analyser", "is_weak"),
+]
+RULE = "rule"
+
+# (path to the service from AnalysisServices, method name, kind of work) for every NLPService primitive that gets timed
+INSTRUMENTED_PRIMITIVES = [
+    ("nlp_service.pos_service", "tag_sentences", "tagging"),
+    ("nlp_service.pos_service", "extract_noun_phrases", "chunk_parsing"),
+    ("nlp_service.pos_service", "extract_noun_phrase_spans", "chunk_parsing"),
+    ("nlp_service.list_service", "find_lists", "chunk_parsing"),
+    ("nlp_service.list_service", "has_list_of_verbs", "chunk_parsing"),
+    ("nlp_service.punctuation_service", "split_on_punctuation", "regex"),
+    ("nlp_service.punctuation_service", "get_string_without_punctuation", "regex"),
+    ("nlp_service.punctuation_service", "remove_all_quotes_from_string", "regex"),
+    ("nlp_service.brackets_service", "remove_references", "regex"),
+    ("nlp_service.brackets_service", "has_brackets_containing_information", "regex"),
+    ("nlp_service.phrase_matcher", "find_phrases", "phrase_matching"),
+]
+
+class InstrumentationService():
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.kinds = {}
+        self.calls = {}
+        self.seconds = {}
+        self.lock = threading.Lock()
+
+
+    def enable(self, analysis_services) -> None:
+        """
+        Start timing every instrumented rule and NLPService primitive of the given services
+        Methods are only wrapped once instrumentation is enabled, so it costs nothing while disabled
+        """
+        if self.enabled:
+            return
+        instrumented_methods = [(service_path, method_name, RULE) for service_path, method_name in INSTRUMENTED_RULES] + INSTRUMENTED_PRIMITIVES
+        for service_path, method_name, kind in instrumented_methods:
+            service = analysis_services
+            for attribute in service_path.split("."):
+                service = getattr(service, attribute)
+            self.wrap(service, method_name, f"{type(service).__name__}.{method_name}", kind)
+        self.enabled = True
+
+
+    def wrap(self, service, method_name: str, metric_name: str, kind: str = RULE) -> None:
+        """
+        Replace a method on a service instance with one that records its wall time and call count
+        """
+        method = getattr(service, method_name)
+        self.kinds[metric_name] = kind
+
+        @wraps(method)
+        def timed_method(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(metric_name, time.perf_counter() - start)
+
+        setattr(service, method_name, timed_method)
+
+
+    def record(self, metric_name: str, seconds: float, calls: int = 1) -> None:
+        """
+        Add to the call count and total time of a metric
+        """
+        with self.lock:
+            self.calls[metric_name] = self.calls.get(metric_name, 0) + calls
+            self.seconds[metric_name] = self.seconds.get(metric_name, 0.0) + seconds
+
+
+    def get_stats(self) -> dict:
+        """
+        Returns the call count and total seconds of every metric recorded so far
+        """
+        with self.lock:
+            return {name: {"calls": self.calls[name], "seconds": self.seconds[name]} for name in self.calls}
+
+
+    def get_kind(self, metric_name: str) -> str:
+        """
+        Returns the kind of work a metric measures, such as a rule or POS tagging
+        """
+        return self.kinds.get(metric_name, RULE)
+
+
+    def merge_stats(self, stats: dict) -> None:
+        """
+        Add stats recorded somewhere else, such as in a worker process
+        """
+        for name, stat in stats.items():
+            self.record(name, stat["seconds"], stat["calls"])
+
+
+    def reset(self) -> None:
+        """
+        Clear every recorded metric
+        """
+        with self.lock:
+            self.calls = {}
+            self.seconds = {}
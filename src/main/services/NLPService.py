@@ -1,28 +1,88 @@
+import hashlib
+import json
 import nltk
 import re
+import threading
 
 from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk import pos_tag
-from nltk.corpus import wordnet as wn
 from nltk.chunk import RegexpParser
-from main.services.WordlistService import WordlistService
+from nltk.tag.perceptron import PerceptronTagger
+from main.models.AnalysisContext import AnalysisContext
+from main.models.TokenFeatures import IS_NOUN, IS_NOUN_IGNORING_I, IS_POTENTIAL_NOUN_OR_VERB, IS_VERB, TokenFeatures
+from main.services.TaggingCacheService import NOUN_PHRASES, SENTENCE_TAGS, WORD_TAGS, TaggingCacheService
+from collections import OrderedDict
+from main.services.WordlistService import MAX_TENANTS, WordlistOverlay, WordlistService, get_current_tenant
+
+VAGUE_TERMS = "vague_terms"
+ESCAPE_CLAUSES = "escape_clauses"
+QUANTIFIERS = "quantifiers"
+PHRASE_WORDLISTS = {
+    VAGUE_TERMS: "get_vague_terms_list",
+    ESCAPE_CLAUSES: "get_escape_clause_list",
+    QUANTIFIERS: "get_quantifiers_list",
+}
+PHRASE_SEPARATOR = " "
+REFERENCE_PATTERN = r'\[\d+\]'
+NON_LETTER_PATTERN = r'[^a-zA-Z\s]'
+QUOTED_TEXT_PATTERN = r'[\"“‘\'][^\"“”‘’\']+[\"”’\']'
+CONJUNCTIONS_PATTERN_PREFIX = r'(?<!\w)(?:'
+CONJUNCTIONS_PATTERN_SUFFIX = r')(?!\w)'
+MIN_LIST_ITEM_GAP = -5 # characters allowed between noun phrases for them to be items of the same list
+MAX_LIST_ITEM_GAP = 9
 
 class NLPService():
 
-    def __init__(self, wordlist_service: WordlistService) -> None:
+    def __init__(self, wordlist_service: WordlistService, tagging_cache_service: TaggingCacheService | None = None) -> None:
         self.wordlist_service = wordlist_service
-        self.pos_service = POS(wordlist_service)
-        self.brackets_service = Brackets()
-        self.punctuation_service = Punctuation()
+        self.pattern_registry = PatternRegistry()
+        self.pos_service = POS(wordlist_service, self.pattern_registry, tagging_cache_service)
+        self.brackets_service = Brackets(self.pattern_registry)
+        self.punctuation_service = Punctuation(self.pattern_registry)
         self.list_service = Lists(self.pos_service, self.wordlist_service, self.punctuation_service)
         self.ambiguity_service = Ambiguity(self.pos_service)
+        self.phrase_matcher = PhraseMatcher(wordlist_service)
+        self.compile_patterns()
+
+
+    def compile_patterns(self) -> None:
+        """
+        Compile the chunk parser and every regex up front, so no request pays for compiling them
+        """
+        self.pos_service.get_noun_phrase_parser()
+        self.brackets_service.get_reference_pattern()
+        self.punctuation_service.get_ignore_punctuation_pattern()
+        self.punctuation_service.get_separating_punctuation_pattern()
+        self.punctuation_service.get_non_letter_pattern()
+        self.punctuation_service.get_quoted_text_pattern()
+        self.get_conjunctions_pattern()
+
+
+    def load_tokeniser(self) -> None:
+        """
+        Load the punkt sentence tokeniser model, which NLTK otherwise loads the first time text is tokenised
+        """
+        word_tokenize(sent_tokenize("Warm up the tokeniser.")[0])
+
+
+    def get_conjunctions_pattern(self) -> re.Pattern:
+        """
+        Returns the compiled pattern matching any conjunction as a whole word
+        """
+        return self.pattern_registry.get_alternation_pattern("conjunctions", self.wordlist_service.conjunctions, CONJUNCTIONS_PATTERN_PREFIX, CONJUNCTIONS_PATTERN_SUFFIX)
         
 
-    def tokenise_words(self, text: str) -> list:
+    def tokenise_words(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
         """
         Take some text and return a list of tokens with their associated POS tag
         """
-        return self.pos_service.tokenise_words(text)
+        return self.pos_service.tokenise_words(text, analysis_context)
+    
+    def tokenise_words_batch(self, texts: list, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Take many texts and return a list of tokens with their associated POS tag for each one
+        All the texts are tagged together in a single call to the tagger
+        """
+        return self.pos_service.tokenise_words_batch(texts, analysis_context)
     
     def is_noun(self, token: tuple, ignore_i_as_noun: bool = False) -> bool:
         """
@@ -54,18 +114,24 @@ class NLPService():
         """
         return self.pos_service.is_potential_noun_or_verb(token)
     
-    def extract_noun_phrases(self, text: str) -> list:
+    def extract_noun_phrases(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
         """
         Extract a list of noun phrases from the given 
         Returns the list of noun phrases
         """
-        return self.pos_service.extract_noun_phrases(text)
+        return self.pos_service.extract_noun_phrases(text, analysis_context)
     
-    def has_required_number_verb_and_noun(self, pos: str | None, required_nouns: int, required_verbs: int, ignore_i_as_noun: bool = False) -> tuple:
+    def get_token_features(self, pos: list, analysis_context: AnalysisContext | None = None) -> TokenFeatures:
+        """
+        Work out the word class of every token in a list of POS tokens in one pass
+        """
+        return self.pos_service.get_token_features(pos, analysis_context)
+
+    def has_required_number_verb_and_noun(self, pos: str | None, required_nouns: int, required_verbs: int, ignore_i_as_noun: bool = False, analysis_context: AnalysisContext | None = None) -> tuple:
         """
         Checks that a given list of POS tokens has the number of required nouns and number of required verbs
         """
-        return self.pos_service.has_required_number_verb_and_noun(pos, required_nouns, required_verbs, ignore_i_as_noun)
+        return self.pos_service.has_required_number_verb_and_noun(pos, required_nouns, required_verbs, ignore_i_as_noun, analysis_context)
 
     def get_string_without_punctuation(self, text: str) -> str:
         """
@@ -100,34 +166,193 @@ class NLPService():
         """
         return self.brackets_service.has_brackets_containing_information(text)
     
-    def check_for_lists(self, chunk: str | None) -> bool:
+    def check_for_lists(self, chunk: str | None, analysis_context: AnalysisContext | None = None, pos_tags: list | None = None) -> bool:
         """
         Determines whether or not there is a list of items in a string
         True if there is a list
         """
-        return self.list_service.check_for_lists(chunk)
+        return self.list_service.check_for_lists(chunk, analysis_context, pos_tags)
+    
+
+    def find_lists(self, chunk: str | None, analysis_context: AnalysisContext | None = None, pos_tags: list | None = None) -> list:
+        """
+        Finds every list of items in a string
+        Returns a list of (start offset, end offset) tuples for each list
+        """
+        return self.list_service.find_lists(chunk, analysis_context, pos_tags)
     
 
+    def find_phrases(self, text: str, analysis_context: AnalysisContext | None = None) -> dict:
+        """
+        Finds every vague term, escape clause and quantifier in a text, with their positions
+        """
+        return self.phrase_matcher.find_phrases(text, analysis_context)
+    
+
+class PatternRegistry():
+
+    def __init__(self) -> None:
+        self.patterns = {}
+        self.alternation_patterns = {}
+        self.chunk_parsers = {}
+
+
+    def get_pattern(self, pattern: str) -> re.Pattern:
+        """
+        Returns a compiled regex, compiling it the first time it is asked for
+        """
+        compiled_pattern = self.patterns.get(pattern)
+        if compiled_pattern == None:
+            compiled_pattern = re.compile(pattern)
+            self.patterns[pattern] = compiled_pattern
+        return compiled_pattern
+
+
+    def get_alternation_pattern(self, name: str, items: list, prefix: str = "", suffix: str = "") -> re.Pattern:
+        """
+        Returns a compiled regex matching any of the items literally
+        It is only compiled again if the items it was built from change
+        """
+        source = (tuple(items), prefix, suffix)
+        registered = self.alternation_patterns.get(name)
+        if registered == None or registered[0] != source:
+            registered = (source, re.compile(prefix + '|'.join(map(re.escape, items)) + suffix))
+            self.alternation_patterns[name] = registered
+        return registered[1]
+
+
+    def get_chunk_parser(self, grammar: str) -> RegexpParser:
+        """
+        Returns a chunk parser for a grammar, building it the first time it is asked for
+        """
+        chunk_parser = self.chunk_parsers.get(grammar)
+        if chunk_parser == None:
+            chunk_parser = RegexpParser(grammar)
+            self.chunk_parsers[grammar] = chunk_parser
+        return chunk_parser
+
+
 class POS():
 
-    def __init__(self, wordlist_service: WordlistService) -> None:
+    def __init__(self, wordlist_service: WordlistService, pattern_registry: PatternRegistry | None = None, tagging_cache_service: TaggingCacheService | None = None) -> None:
         self.wordlist_service = wordlist_service
+        self.pattern_registry = pattern_registry if pattern_registry != None else PatternRegistry()
+        self.tagging_cache_service = tagging_cache_service
         self.noun = ['NN', 'NNS', 'NNP', 'NNPS']
         self.verb = ['VB', 'VBD', 'VBG', 'VBN', 'VBP', 'VBZ']
         self.proper_noun = "NNP"
         self.modal = "MD"
         self.noun_phrase_grammar = "NP: {<DT>?<JJ>*<NN.*>+}"
+        self.tagger = None
+        self.tagger_lock = threading.Lock()
+
 
+    def get_noun_phrase_parser(self) -> RegexpParser:
+        return self.pattern_registry.get_chunk_parser(self.noun_phrase_grammar)
 
-    def tokenise_words(self, text: str) -> list:
+
+    def load_tagger(self) -> PerceptronTagger:
         """
-        Take some text and return a list of tokens with their associated POS tag
+        Load the POS tagger model once and keep it for every call after
+        Threads that ask for it while it is loading wait for it rather than loading another copy
+        """
+        if self.tagger == None:
+            with self.tagger_lock:
+                if self.tagger == None:
+                    tagger = PerceptronTagger()
+                    if self.tagging_cache_service != None:
+                        self.tagging_cache_service.set_model_identity(self.get_model_identity(tagger))
+                    self.tagger = tagger
+        return self.tagger
+
+
+    def get_model_identity(self, tagger: PerceptronTagger) -> str:
+        """
+        Fingerprints the tagger model, along with the NLTK version and the chunk grammar, so a persistent cache never serves results from a different one
         """
-        pos = []
-        for sent in sent_tokenize(text):
-            wordtokens = word_tokenize(sent)
-            pos += nltk.pos_tag(wordtokens)
-        return pos
+        fingerprint = hashlib.sha256()
+        fingerprint.update(json.dumps([nltk.__version__, tagger.lang, self.noun_phrase_grammar, sorted(tagger.classes), len(tagger.model.weights)]).encode("utf-8"))
+        fingerprint.update(json.dumps(sorted(tagger.tagdict.items())).encode("utf-8"))
+        return fingerprint.hexdigest()
+
+
+    def get_cached_tags(self, kind: str, texts: list) -> dict:
+        """
+        Looks texts up in the persistent tagging cache, if there is one
+        Returns a dictionary of text to its tagged sentences for every text found
+        """
+        if self.tagging_cache_service == None or len(texts) == 0:
+            return {}
+        self.load_tagger()
+        cached_tags = self.tagging_cache_service.get_many(kind, texts)
+        return {text: [[tuple(token) for token in sentence] for sentence in sentences] for text, sentences in cached_tags.items()}
+
+
+    def cache_tags(self, kind: str, tagged_texts: dict) -> None:
+        """
+        Stores a dictionary of text to its tagged sentences in the persistent tagging cache, if there is one
+        """
+        if self.tagging_cache_service != None:
+            self.tagging_cache_service.put_many(kind, tagged_texts)
+
+
+    def tag_sentences(self, sentences: list) -> list:
+        """
+        Tag a list of tokenised sentences with POS tags in one call to the tagger
+        Gives the same tags as nltk.pos_tag_sents, without reloading the tagger model
+        """
+        return self.load_tagger().tag_sents(sentences)
+
+
+    def tokenise_words(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Take some text and return a list of tokens with their associated POS tag
+        If an analysis context is given, the tags are memoised in it so the same text is only tagged once
+        """
+        return self.tokenise_words_batch([text], analysis_context)[0]
+
+
+    def tokenise_words_batch(self, texts: list, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Take many texts and return a list of tokens with their associated POS tag for each one
+        Every sentence that hasn't already been tagged in the analysis context is tagged in a single call to the tagger
+        """
+        tagged_texts = {}
+        untagged_texts = {}
+        for text in texts:
+            pos = analysis_context.get_sentence_tags(text) if analysis_context != None else None
+            if pos != None:
+                tagged_texts[text] = pos
+            else:
+                untagged_texts[text] = None
+
+        sentence_tags = self.get_cached_tags(SENTENCE_TAGS, list(untagged_texts))
+        texts_to_tag = {text: [word_tokenize(sent) for sent in sent_tokenize(text)] for text in untagged_texts if text not in sentence_tags}
+        sentences = [sentence for text_sentences in texts_to_tag.values() for sentence in text_sentences]
+        tagged_sentences = self.tag_sentences(sentences) if sentences else []
+        if sentences and analysis_context != None:
+            analysis_context.record_tagger_call()
+
+        newly_tagged_texts = {}
+        position = 0
+        for text, text_sentences in texts_to_tag.items():
+            newly_tagged_texts[text] = tagged_sentences[position:position + len(text_sentences)]
+            position += len(text_sentences)
+        self.cache_tags(SENTENCE_TAGS, newly_tagged_texts)
+        sentence_tags.update(newly_tagged_texts)
+
+        for text in untagged_texts:
+            pos = []
+            for tagged_sentence in sentence_tags[text]:
+                pos += tagged_sentence
+            tagged_texts[text] = pos
+            if analysis_context != None:
+                analysis_context.add_sentence_tags(text, pos)
+                # a single sentence is tagged the same way as one run of words, so the tags can also be used for chunking
+                if len(sentence_tags[text]) == 1:
+                    analysis_context.add_word_tags(text, pos)
+
+        return [tagged_texts[text] for text in texts]
 
 
     def is_noun(self, token: tuple, ignore_i_as_noun: bool = False) -> bool:
@@ -169,84 +394,215 @@ class POS():
         return token[0] in self.wordlist_service.get_verb_noun_exceptions() and (self.is_noun(token) or self.is_verb(token))
     
 
-    def extract_noun_phrases(self, text: str) -> list:
+    def get_token_features(self, pos: list, analysis_context: AnalysisContext | None = None) -> TokenFeatures:
+        """
+        Work out the word class of every token in a list of POS tokens in one pass, with the same rules as is_noun, is_verb etc.
+        Each wordlist is fetched once for the whole list rather than once per token and rule
+        If an analysis context is given, the features are memoised in it against the list and the version of the wordlists
+        """
+        version = self.get_wordlist_version()
+        features = analysis_context.get_token_features(version, pos) if analysis_context != None else None
+        if features != None:
+            return features
+
+        noun_exceptions = self.wordlist_service.get_noun_exceptions()
+        verb_exceptions = self.wordlist_service.get_verb_exceptions()
+        verb_noun_exceptions = self.wordlist_service.get_verb_noun_exceptions()
+        weak_verbs = self.wordlist_service.get_weak_verbs_list()
+
+        features = TokenFeatures(tuple(token[0] for token in pos))
+        for i, (word, tag) in enumerate(pos):
+            is_verb_exception = word in verb_exceptions
+            is_noun = tag in self.noun or is_verb_exception
+            is_verb = tag in self.verb and not is_verb_exception
+            is_modal = tag == self.modal
+            features.is_noun[i] = is_noun
+            features.is_noun_ignoring_i[i] = (is_noun and word not in noun_exceptions) or is_verb_exception
+            features.is_verb[i] = is_verb
+            features.is_modal[i] = is_modal
+            features.is_verb_noun_exception[i] = word in verb_noun_exceptions
+            features.is_potential_noun_or_verb[i] = features.is_verb_noun_exception[i] and (is_noun or is_verb)
+            features.is_weak_verb[i] = (is_verb or is_modal) and word in weak_verbs
+        if analysis_context != None:
+            analysis_context.add_token_features(version, pos, features)
+        return features
+    
+
+    def get_wordlist_version(self) -> tuple:
+        """
+        Identifies the wordlists the word classes are worked out with, for the current tenant
+        The lists are fetched first, so one changed outside this process has already been reloaded and bumped the version
+        """
+        self.wordlist_service.get_noun_exceptions()
+        self.wordlist_service.get_verb_exceptions()
+        self.wordlist_service.get_verb_noun_exceptions()
+        self.wordlist_service.get_weak_verbs_list()
+        return (self.wordlist_service.version, get_current_tenant())
+
+
+    def extract_noun_phrases(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
         """
         Extract a list of noun phrases from the given 
         Returns the list of noun phrases
         """
-        words = word_tokenize(text)
-        pos_tags = pos_tag(words)
-        chunk_parser = RegexpParser(self.noun_phrase_grammar)
-        tree = chunk_parser.parse(pos_tags)
+        return self.extract_noun_phrases_from_tags(self.tag_words(text, analysis_context))
+
+
+    def tag_words(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        POS tag text as one run of words, as used for chunking
+        If an analysis context is given, the tags are memoised in it so the same text is only tagged once
+        """
+        pos_tags = analysis_context.get_word_tags(text) if analysis_context != None else None
+        if pos_tags != None:
+            return pos_tags
+        cached_tags = self.get_cached_tags(WORD_TAGS, [text])
+        if text in cached_tags:
+            pos_tags = cached_tags[text][0]
+        else:
+            words = word_tokenize(text)
+            pos_tags = self.tag_sentences([words])[0]
+            self.cache_tags(WORD_TAGS, {text: [pos_tags]})
+            if analysis_context != None:
+                analysis_context.record_tagger_call()
+        if analysis_context != None:
+            analysis_context.add_word_tags(text, pos_tags)
+        return pos_tags
+
+
+    def extract_noun_phrases_from_tags(self, pos_tags: list) -> list:
+        """
+        Extract a list of noun phrases from text that has already been POS tagged
+        Returns the list of noun phrases
+        """
+        tree = self.get_noun_phrase_parser().parse(pos_tags)
         noun_phrases = []
         for subtree in tree:
             if type(subtree) == nltk.Tree and subtree.label() == 'NP':
                 noun_phrases.append(" ".join([word for word, pos in subtree.leaves()]))
         return noun_phrases
+
+
+    def get_noun_phrase_spans(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        POS tag text as one run of words and extract its noun phrases along with where they are in the text
+        The noun phrases are kept in the persistent tagging cache, if there is one
+        """
+        pos_tags = None
+        if self.tagging_cache_service != None:
+            self.load_tagger()
+            # the word tags are looked up along with the noun phrases, so a text without them cached isn't looked up twice
+            cached = self.tagging_cache_service.get_kinds([NOUN_PHRASES, WORD_TAGS], text)
+            if NOUN_PHRASES in cached:
+                return [tuple(span) for span in cached[NOUN_PHRASES]]
+            if WORD_TAGS in cached:
+                pos_tags = [tuple(token) for token in cached[WORD_TAGS][0]]
+                if analysis_context != None and analysis_context.get_word_tags(text) == None:
+                    analysis_context.add_word_tags(text, pos_tags)
+        if pos_tags == None:
+            pos_tags = self.tag_words(text, analysis_context)
+        noun_phrase_spans = self.extract_noun_phrase_spans(text, pos_tags)
+        if self.tagging_cache_service != None:
+            self.tagging_cache_service.put_many(NOUN_PHRASES, {text: noun_phrase_spans})
+        return noun_phrase_spans
+
+
+    def extract_noun_phrase_spans(self, text: str, pos_tags: list) -> list:
+        """
+        Extract the noun phrases from POS tagged text along with where they are in the text
+        Tokens are lined up with the text from left to right, so a phrase that appears more than once gets the right position each time
+        Phrases whose words aren't separated by single spaces in the text are left out, as the phrase can't be found in it
+        Returns a list of (noun phrase, start offset, end offset) tuples in the order they appear
+        """
+        tree = self.get_noun_phrase_parser().parse(pos_tags)
+        noun_phrase_spans = []
+        position = 0
+        for subtree in tree:
+            leaves = subtree.leaves() if type(subtree) == nltk.Tree else [subtree]
+            start = None
+            for word, pos in leaves:
+                word_start = text.find(word, position)
+                if word_start == -1:
+                    start = None
+                    break
+                start = word_start if start == None else start
+                position = word_start + len(word)
+            if start == None or type(subtree) != nltk.Tree or subtree.label() != 'NP':
+                continue
+            noun_phrase = " ".join([word for word, pos in leaves])
+            if text[start:position] == noun_phrase:
+                noun_phrase_spans.append((noun_phrase, start, position))
+        return noun_phrase_spans
     
 
-    def has_required_number_verb_and_noun(self, pos: str | None, required_nouns: int, required_verbs: int, ignore_i_as_noun: bool = False) -> tuple:
+    def has_required_number_verb_and_noun(self, pos: str | None, required_nouns: int, required_verbs: int, ignore_i_as_noun: bool = False, analysis_context: AnalysisContext | None = None) -> tuple:
         """
         Checks that a given list of POS tokens has the number of required nouns and number of required verbs
         """
         if pos == None:
             return (True, True)
         
-        verbs = []
-        nouns = []
-        for token in pos:
-            if self.is_noun(token, ignore_i_as_noun):
-                nouns.append(token)
-            elif self.is_verb(token):
-                verbs.append(token)
-        found_verbs = len(verbs) >= required_verbs 
-        found_noun = len(nouns) >= required_nouns
+        if analysis_context != None:
+            memoised = analysis_context.get_verb_noun_result(pos, required_nouns, required_verbs, ignore_i_as_noun)
+            if memoised != None and memoised[0] == self.get_wordlist_version():
+                return memoised[1]
+
+        features = self.get_token_features(pos, analysis_context)
+        noun_flag = IS_NOUN_IGNORING_I if ignore_i_as_noun else IS_NOUN
+        # a token is never both a noun and a verb, so they can be counted separately
+        nouns = features.count(noun_flag)
+        verbs = features.count(IS_VERB)
+        found_verbs = verbs >= required_verbs 
+        found_noun = nouns >= required_nouns
         if not found_verbs or not found_noun:
             if found_noun != found_verbs:
-                found_verbs, found_noun = self.get_potential_verbs_nouns(found_noun, found_verbs, verbs, nouns, required_verbs, required_nouns)
+                found_verbs, found_noun = self.get_potential_verbs_nouns(found_noun, found_verbs, features, noun_flag, required_verbs, required_nouns)
         return (found_verbs, found_noun)
     
 
-    def get_potential_verbs_nouns(self, found_noun, found_verbs, verbs, nouns, min_verbs, min_nouns) -> tuple:
+    def get_potential_verbs_nouns(self, found_noun: bool, found_verbs: bool, features: TokenFeatures, noun_flag: str, min_verbs: int, min_nouns: int) -> tuple:
         """
         Make calls to get potential verbs and nouns if necessary
         """
         if not found_noun and found_verbs:
-            found_noun = self.check_potential_verbs_or_nouns(verbs, nouns, min_nouns, min_verbs)
+            found_noun = self.check_potential_verbs_or_nouns(features, IS_VERB, noun_flag, min_nouns, min_verbs)
         elif not found_verbs and found_noun:
-            found_verbs = self.check_potential_verbs_or_nouns(nouns, verbs, min_verbs, min_nouns)
+            found_verbs = self.check_potential_verbs_or_nouns(features, noun_flag, IS_VERB, min_verbs, min_nouns)
 
         return found_verbs, found_noun
     
 
-    def check_potential_verbs_or_nouns(self, found: list, not_found: list, min_not_found: int, min_found: int) -> bool:
+    def check_potential_verbs_or_nouns(self, features: TokenFeatures, found: str, not_found: str, min_not_found: int, min_found: int) -> bool:
         """
-        Given a list that has enough of either verbs or nouns found and another list that doesn't have enough of the other
-        Returns true if there are enough found in the opposite list that could be changed between verb/noun based on exceptions list
+        Given a word class that has enough tokens found and another that doesn't have enough
+        Returns true if there are enough found in the opposite class that could be changed between verb/noun based on exceptions list
         """
-        num_missing = min_not_found - len(not_found)
-        num_spare = len(found) - min_found
+        num_missing = min_not_found - features.count(not_found)
+        num_spare = features.count(found) - min_found
         if num_missing > num_spare:
             return False
 
-        extras_found = 0
-        for token in found:
-            extras_found += 1 if self.is_potential_noun_or_verb(token) else 0
+        extras_found = features.count_both(found, IS_POTENTIAL_NOUN_OR_VERB)
 
         return extras_found >= num_missing
 
-    
+
+
 class Brackets():
 
-    def __init__(self) -> None:
+    def __init__(self, pattern_registry: PatternRegistry | None = None) -> None:
         self.matching_brackets = {')': '(', '}': '{', ']': '['}
+        self.pattern_registry = pattern_registry if pattern_registry != None else PatternRegistry()
+
+    def get_reference_pattern(self) -> re.Pattern:
+        return self.pattern_registry.get_pattern(REFERENCE_PATTERN)
 
     def remove_references(self, text: str) -> str:
         """
         Removes indicators of references from text
         For use when checking for brackets containing information: should remove things like [1], [2] from strings
         """
-        cleaned_text = re.sub(r'\[\d+\]', '', text)
+        cleaned_text = self.get_reference_pattern().sub('', text)
         return cleaned_text
 
 
@@ -281,9 +637,22 @@ class Brackets():
 
 class Punctuation():
 
-    def __init__(self) -> None:
+    def __init__(self, pattern_registry: PatternRegistry | None = None) -> None:
         self.separating_punctuation = [". ", "- ", "; ", "? ", "* ", "! "]
         self.ignore_punctuation = ["e.g.", "e.g", "eg.", "i.e.", "i.e", "ie.", "a.k.a.", "a.k.a", "dr.", "miss.", "ms.", "mrs.", "mr."]
+        self.pattern_registry = pattern_registry if pattern_registry != None else PatternRegistry()
+
+    def get_ignore_punctuation_pattern(self) -> re.Pattern:
+        return self.pattern_registry.get_alternation_pattern("ignore_punctuation", self.ignore_punctuation)
+
+    def get_separating_punctuation_pattern(self) -> re.Pattern:
+        return self.pattern_registry.get_alternation_pattern("separating_punctuation", self.separating_punctuation)
+
+    def get_non_letter_pattern(self) -> re.Pattern:
+        return self.pattern_registry.get_pattern(NON_LETTER_PATTERN)
+
+    def get_quoted_text_pattern(self) -> re.Pattern:
+        return self.pattern_registry.get_pattern(QUOTED_TEXT_PATTERN)
 
     def has_separating_punctuation_with_following_text(self, text: str) -> bool:
         """
@@ -301,10 +670,8 @@ class Punctuation():
         """
         Splits a piece of text into a list of pieces with the separating punctuation gone
         """
-        ignore_punctuation_pattern = re.compile('|'.join(re.escape(punct) for punct in self.ignore_punctuation))
-        text = ignore_punctuation_pattern.sub("", text)
-        pattern = '|'.join(map(re.escape, self.separating_punctuation))
-        split_list = re.split(pattern, text)
+        text = self.get_ignore_punctuation_pattern().sub("", text)
+        split_list = self.get_separating_punctuation_pattern().split(text)
         split_list = [substr for substr in split_list if substr]
         return split_list
     
@@ -314,15 +681,14 @@ class Punctuation():
         Removes punctuation from a string
         Useful for some parts of analysing chunks of text where punctuation doesn't matter
         """
-        return re.sub(r'[^a-zA-Z\s]', '', text)
+        return self.get_non_letter_pattern().sub('', text)
     
 
     def remove_all_quotes_from_string(self, input_string):
         """
         Removes all text inside quote marks, including the quote marks, from a string
         """
-        pattern = r'[\"“‘\'][^\"“”‘’\']+[\"”’\']'
-        result = re.sub(pattern, '', input_string)
+        result = self.get_quoted_text_pattern().sub('', input_string)
         return result.replace("  ", " ").strip()
     
 
@@ -336,84 +702,78 @@ class Lists():
         self.punctuation_service = punctuation_service
 
 
-    def check_for_lists(self, chunk: str | None) -> bool:
+    def check_for_lists(self, chunk: str | None, analysis_context: AnalysisContext | None = None, pos_tags: list | None = None) -> bool:
         """
         Determines whether or not there is a list of items in a string
+        POS tags for the chunk with its quotes removed can be passed in, so it doesn't need tagging again
         True if there is a list
         """
-        if chunk != None:
-            text = self.punctuation_service.remove_all_quotes_from_string(chunk)
-            noun_phrases = self.pos_service.extract_noun_phrases(text)
-            potential_lists = self.get_potential_lists(text, noun_phrases)
-            return self.has_list(text, potential_lists)
+        return len(self.find_lists(chunk, analysis_context, pos_tags)) > 0
+
+
+    def find_lists(self, chunk: str | None, analysis_context: AnalysisContext | None = None, pos_tags: list | None = None) -> list:
+        """
+        Finds every list of items in a string
+        Returns a list of (start offset, end offset) tuples for each list, in the chunk with its quotes removed
+        """
+        if chunk == None:
+            return []
+        text = self.punctuation_service.remove_all_quotes_from_string(chunk)
+        if pos_tags != None:
+            noun_phrase_spans = self.pos_service.extract_noun_phrase_spans(text, pos_tags)
         else:
-            return False
+            noun_phrase_spans = self.pos_service.get_noun_phrase_spans(text, analysis_context)
+        potential_lists = self.get_potential_lists(noun_phrase_spans)
+        return self.get_list_spans(text, potential_lists)
 
 
-    def get_potential_lists(self, text: str, noun_phrases: list) -> dict: 
-        """
-        Takes list of noun phrases from the sentence
-        Returns a dictionary where each item is a list of noun phrases that are close together in the original text
-        """
-        list_items = {}
-        list_counter = 0
-        for phrase in noun_phrases:
-            try:
-                curr = text.index(phrase)
-                next_phrase = noun_phrases[noun_phrases.index(phrase)+1]
-                next = text.index(next_phrase)
-                diff = next - (curr + len(phrase))
-                if diff in range(-5, 10):
-                    if list_counter in list_items:
-                        if phrase not in list_items[list_counter]:
-                            list_items[list_counter].append(phrase)
-                        if next_phrase not in list_items[list_counter]:
-                            list_items[list_counter].append(next_phrase)
-                    else:
-                        list_items[list_counter] = [phrase]
-                        if next_phrase not in list_items[list_counter]:
-                            list_items[list_counter].append(next_phrase)
-                elif list_counter in list_items:
-                    list_counter += 1
-            except:
-                continue
-        return list_items
+    def get_potential_lists(self, noun_phrase_spans: list) -> list: 
+        """
+        Takes the (noun phrase, start offset, end offset) spans from the sentence in the order they appear
+        Returns a list of groups of noun phrase spans that are close together in the original text, in one pass over the spans
+        """
+        potential_lists = []
+        current_list = None
+        for current_span, next_span in zip(noun_phrase_spans, noun_phrase_spans[1:]):
+            gap = next_span[1] - current_span[2]
+            if MIN_LIST_ITEM_GAP <= gap <= MAX_LIST_ITEM_GAP:
+                if current_list == None:
+                    current_list = [current_span]
+                    potential_lists.append(current_list)
+                current_list.append(next_span)
+            else:
+                current_list = None
+        return potential_lists
 
 
-    def has_list(self, text: str, potential_lists: dict) -> bool:
+    def get_list_spans(self, text: str, potential_lists: list) -> list:
         """
-        Given a dictionary of close noun phrases, check if a comma, 'or', or 'and' show uo between them
+        Given groups of close noun phrases, check if a comma, 'or', or 'and' shows up between any two of them
         If this occurs, then there is a potential list in the string
-        Returns true if there is a potential list
-        """
-        has_list = False
-        for list_num in potential_lists:
-            list_items = potential_lists[list_num]
-            if len(list_items) >= 2:
-                for item in list_items:
-                    try:
-                        end_of_curr = text.index(item) + len(item)
-                        start_of_next = text.index(list_items[list_items.index(item)+1])
-                        between_items = text[end_of_curr:start_of_next]
-                        if not has_list:
-                            has_list = bool([ele for ele in self.list_indicators if(ele in between_items)])
-                    except:
-                        continue
-
-        return has_list
+        Returns a (start offset, end offset) tuple for each group that is a list
+        """
+        list_spans = []
+        for list_items in potential_lists:
+            for current_item, next_item in zip(list_items, list_items[1:]):
+                between_items = text[current_item[2]:next_item[1]]
+                if any(indicator in between_items for indicator in self.list_indicators):
+                    list_spans.append((list_items[0][1], list_items[-1][2]))
+                    break
+        return list_spans
     
 
-    def has_list_of_verbs(self, text: str) -> bool:
+    def has_list_of_verbs(self, text: str, analysis_context: AnalysisContext | None = None) -> bool:
         """
         Checks for the pattern: <verb> and/or <verb> indicating a list of actions
         """
         if text == None:
             return False
-        tokens = self.pos_service.tokenise_words(text)
-        for i in range(len(tokens)):
-            if self.pos_service.is_verb(tokens[i]) or tokens[i][0] in self.wordlist_service.get_verb_noun_exceptions():
-                if i+2 < len(tokens) and tokens[i+1][0] in self.list_conjuctions and self.pos_service.is_verb(tokens[i+2]):
-                    return True
+        tokens = self.pos_service.tokenise_words(text, analysis_context)
+        features = self.pos_service.get_token_features(tokens, analysis_context)
+        # only the verbs two tokens after a conjunction can end a list of verbs
+        for i in features.positions(IS_VERB):
+            if i >= 2 and features.words[i-1] in self.list_conjuctions and (features.is_verb[i-2] or features.is_verb_noun_exception[i-2]):
+                return True
         return False
 
 
@@ -431,12 +791,12 @@ class Ambiguity():
         self.pos_service = pos_service
 
 
-    def find_comparatives_superlatives(self, sentence: str) -> tuple:
+    def find_comparatives_superlatives(self, sentence: str, analysis_context: AnalysisContext | None = None) -> tuple:
         """
         Finds all superlatives and comparative adverbs and adjectives in a sentence
         Returns two separate lists, one of all comparative words and one of all superlative words
         """
-        tagged_words = self.pos_service.tokenise_words(sentence)
+        tagged_words = self.pos_service.tokenise_words(sentence, analysis_context)
         
         comparatives = []
         superlatives = []
@@ -451,7 +811,7 @@ class Ambiguity():
         return comparatives, superlatives
     
 
-    def find_anaphora_indicators(self, sentence: str | None) -> list:
+    def find_anaphora_indicators(self, sentence: str | None, analysis_context: AnalysisContext | None = None) -> list:
         """
         Finds instances of anaphora in a sentence (using words without explicitly knowing what is being referenced)
         Returns list of words indicating anaphora
@@ -459,7 +819,7 @@ class Ambiguity():
         if not sentence:
             return []
         
-        tagged_words = self.pos_service.tokenise_words(sentence)
+        tagged_words = self.pos_service.tokenise_words(sentence, analysis_context)
 
         anaphora_words = []
         for word, tag in tagged_words:
@@ -469,3 +829,165 @@ class Ambiguity():
         return anaphora_words
         
 
+
+
+class PhraseTrieNode():
+
+    __slots__ = ("children", "terms")
+
+    def __init__(self) -> None:
+        self.children = {}
+        self.terms = {} # (tenant, wordlist name) -> term ending at this node, the tenant is None for the shared lists
+
+
+class PhraseMatcher():
+
+    def __init__(self, wordlist_service: WordlistService) -> None:
+        """
+        One trie of every wordlist term, shared by all tenants. A tenant's additions are stored in the same trie under its id,
+        so matching is still one pass and memory grows with the additions rather than with the number of tenants
+        Only tenants with additions are stored, and only the MAX_TENANTS most recently used of them
+        """
+        self.wordlist_service = wordlist_service
+        self.root = PhraseTrieNode()
+        self.wordlists = {}
+        self.term_order = {}
+        self.tenants = OrderedDict()
+        self.version = 0
+        self.lock = threading.Lock()
+
+
+    def refresh(self) -> None:
+        """
+        Brings the trie up to date with the ambiguity wordlists, and the current tenant's additions to them
+        Only the terms that were added to or removed from a changed list are touched
+        """
+        tenant = get_current_tenant()
+        for wordlist_name, getter_name in PHRASE_WORDLISTS.items():
+            words = getattr(self.wordlist_service, getter_name)()
+            added = ()
+            if isinstance(words, WordlistOverlay):
+                words, added = words.base.words, words.added
+            self.refresh_wordlist((None, wordlist_name), words)
+            if tenant != None and (len(added) > 0 or (tenant, wordlist_name) in self.wordlists):
+                self.refresh_wordlist((tenant, wordlist_name), added)
+        if tenant != None and tenant in self.tenants:
+            with self.lock:
+                if tenant in self.tenants:
+                    self.tenants.move_to_end(tenant)
+
+
+    def refresh_wordlist(self, key: tuple, words) -> None:
+        if words is not self.wordlists.get(key):
+            with self.lock:
+                if words is not self.wordlists.get(key):
+                    self.update_wordlist(key, words)
+
+
+    def update_wordlist(self, key: tuple, words) -> None:
+        old_terms = set(self.wordlists.get(key, ()))
+        new_terms = set(words)
+        for term in old_terms - new_terms:
+            self.remove_term(key, term)
+        for term in new_terms - old_terms:
+            self.add_term(key, term)
+        self.term_order[key] = {term: i for i, term in reversed(list(enumerate(words)))}
+        self.wordlists[key] = words
+        self.version += 1
+        tenant = key[0]
+        if tenant == None:
+            return
+        if len(words) == 0:
+            del self.wordlists[key]
+            del self.term_order[key]
+            if not any((tenant, wordlist_name) in self.wordlists for wordlist_name in PHRASE_WORDLISTS):
+                self.tenants.pop(tenant, None)
+            return
+        self.tenants[tenant] = None
+        self.tenants.move_to_end(tenant)
+        while len(self.tenants) > MAX_TENANTS:
+            self.remove_tenant(next(iter(self.tenants)))
+
+
+    def remove_tenant(self, tenant: str) -> None:
+        """
+        Drops every term of a tenant's additions from the trie
+        Must be called while holding the lock
+        """
+        for wordlist_name in PHRASE_WORDLISTS:
+            if (tenant, wordlist_name) in self.wordlists:
+                self.update_wordlist((tenant, wordlist_name), ())
+        self.tenants.pop(tenant, None)
+
+
+    def add_term(self, key: tuple, term: str) -> None:
+        node = self.root
+        for token in term.split(PHRASE_SEPARATOR):
+            if token not in node.children:
+                node.children[token] = PhraseTrieNode()
+            node = node.children[token]
+        # replaced rather than changed, so a match running in another thread never sees it mid-update
+        node.terms = {**node.terms, key: term}
+
+
+    def remove_term(self, key: tuple, term: str) -> None:
+        path = [self.root]
+        for token in term.split(PHRASE_SEPARATOR):
+            node = path[-1].children.get(token)
+            if node == None:
+                return
+            path.append(node)
+        path[-1].terms = {term_key: found_term for term_key, found_term in path[-1].terms.items() if term_key != key}
+        tokens = term.split(PHRASE_SEPARATOR)
+        for i in range(len(tokens), 0, -1):
+            node = path[i]
+            if node.children or node.terms:
+                break
+            del path[i - 1].children[tokens[i - 1]]
+
+
+    def find_phrases(self, text: str, analysis_context: AnalysisContext | None = None) -> dict:
+        """
+        Finds every vague term, escape clause and quantifier in a text in one pass over its tokens
+        A term matches when it is a whole run of space separated tokens, including at the start or end of the text
+        Returns a dictionary of wordlist name to a list of (term, start offset, end offset) tuples in the order they appear
+        """
+        self.refresh()
+        tenant = get_current_tenant()
+        if analysis_context != None:
+            matches = analysis_context.get_phrase_matches(self.version, text)
+            if matches != None:
+                return matches
+
+        tokens = text.split(PHRASE_SEPARATOR)
+        offsets = []
+        offset = 0
+        for token in tokens:
+            offsets.append(offset)
+            offset += len(token) + 1
+
+        matches = {wordlist_name: [] for wordlist_name in PHRASE_WORDLISTS}
+        for start in range(len(tokens)):
+            node = self.root
+            for end in range(start, len(tokens)):
+                node = node.children.get(tokens[end])
+                if node == None:
+                    break
+                for (term_tenant, wordlist_name), term in node.terms.items():
+                    if term_tenant == None or term_tenant == tenant:
+                        matches[wordlist_name].append((term, offsets[start], offsets[end] + len(tokens[end])))
+
+        if analysis_context != None:
+            analysis_context.add_phrase_matches(self.version, text, matches)
+        return matches
+
+
+    def find_terms(self, text: str, wordlist_name: str, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Finds the distinct terms from one wordlist in a text, in the same order as the wordlist, with the current tenant's additions last
+        """
+        matches = self.find_phrases(text, analysis_context)[wordlist_name]
+        found_terms = {term for term, start, end in matches}
+        term_order = self.term_order[(None, wordlist_name)]
+        tenant_term_order = self.term_order.get((get_current_tenant(), wordlist_name), {})
+        return sorted(found_terms, key=lambda term: term_order[term] if term in term_order else len(term_order) + tenant_term_order.get(term, 0))
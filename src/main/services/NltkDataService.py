@@ -0,0 +1,98 @@
+import os
+import shutil
+
+import nltk
+
+from main.repositories.NltkResourceRepository import NltkResourceRepository
+
+NLTK_DATA_DIR = "nltk_data"
+NLTK_DATA_DIR_VARIABLE = "NLTK_DATA_DIR"
+
+def get_nltk_data_dir(base_path: str) -> str:
+    """
+    The project-local NLTK data directory: NLTK_DATA_DIR if it is set, otherwise nltk_data next to src
+    """
+    return os.environ.get(NLTK_DATA_DIR_VARIABLE) or os.path.join(os.path.dirname(os.path.abspath(base_path)), NLTK_DATA_DIR)
+
+
+class NltkDataService():
+
+    def __init__(self, nltk_resource_repository: NltkResourceRepository, nltk_data_dir: str) -> None:
+        """
+        Installs and finds the NLTK packages listed in the manifest, and nothing else
+        """
+        self.nltk_resource_repository = nltk_resource_repository
+        self.nltk_data_dir = nltk_data_dir
+
+
+    def use_data_dir(self) -> None:
+        """
+        Look in the project-local directory before any of NLTK's default locations
+        """
+        if nltk.data.path[:1] != [self.nltk_data_dir]:
+            if self.nltk_data_dir in nltk.data.path:
+                nltk.data.path.remove(self.nltk_data_dir)
+            nltk.data.path.insert(0, self.nltk_data_dir)
+
+
+    def find_missing_resources(self) -> list:
+        """
+        Returns the package ids of every resource in the manifest that NLTK can't find
+        Only looks for the files, the models aren't loaded
+        """
+        self.use_data_dir()
+        missing = []
+        for package, resource in self.nltk_resource_repository.get_nltk_resources():
+            try:
+                nltk.data.find(resource)
+            except LookupError:
+                missing.append(package)
+        return missing
+
+
+    def get_missing_message(self, missing: list) -> str:
+        return f"Missing NLTK data {', '.join(missing)} in {self.nltk_data_dir}. Install it with: python3 download_nltk_data.py"
+
+
+    def verify(self) -> None:
+        """
+        Raises a LookupError naming every missing package, rather than failing on the first request that needs one
+        """
+        missing = self.find_missing_resources()
+        if len(missing) > 0:
+            raise LookupError(self.get_missing_message(missing))
+
+
+    def download(self) -> None:
+        """
+        Download only the packages in the manifest into the data directory
+        The zip archives are removed once they have been unpacked, as NLTK reads the unpacked files
+        """
+        for package, resource in self.nltk_resource_repository.get_nltk_resources():
+            if not nltk.download(package, download_dir=self.nltk_data_dir, quiet=True, raise_on_error=True):
+                raise LookupError(f"Failed to download the NLTK package {package}")
+            self.remove_archive(package, resource)
+
+
+    def install_from_source(self, source_dir: str) -> None:
+        """
+        Copy only the packages in the manifest from another NLTK data directory, e.g. one vendored into the build, without using the network
+        A package can be unpacked or a zip archive
+        """
+        for package, resource in self.nltk_resource_repository.get_nltk_resources():
+            category = resource.split("/")[0]
+            source = os.path.join(source_dir, category, package)
+            target = os.path.join(self.nltk_data_dir, category, package)
+            if os.path.isdir(source):
+                shutil.copytree(source, target, dirs_exist_ok=True)
+            elif os.path.isfile(source + ".zip"):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.unpack_archive(source + ".zip", os.path.dirname(target), "zip")
+            else:
+                raise LookupError(f"The NLTK package {package} was not found in {source_dir}")
+
+
+    def remove_archive(self, package: str, resource: str) -> None:
+        archive = os.path.join(self.nltk_data_dir, resource.split("/")[0], package + ".zip")
+        if os.path.isfile(archive) and os.path.isdir(archive[:-len(".zip")]):
+            os.remove(archive)
@@ -0,0 +1,151 @@
+import atexit
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+from main.repositories.WordlistFileWriter import FileLock
+
+PREDICTION_LOG_FILE = "prediction_log.jsonl"
+LEGACY_PREDICTION_LOG_FILE = "prediction_log.json"
+MAX_BUFFERED_RECORDS = 1000
+FLUSH_BATCH_SIZE = 100
+FLUSH_INTERVAL = 1.0 # seconds the writer waits for more records before flushing a partial batch
+MAX_LOG_BYTES = 10 * 1024 * 1024
+MAX_ROTATED_LOGS = 5
+
+class PredictionLogService():
+
+    def __init__(self, log_file: str = PREDICTION_LOG_FILE, max_buffered_records: int = MAX_BUFFERED_RECORDS,
+                 max_log_bytes: int = MAX_LOG_BYTES, max_rotated_logs: int = MAX_ROTATED_LOGS) -> None:
+        self.log_file = log_file
+        self.lock_file = os.path.join(os.path.dirname(log_file), "." + os.path.basename(log_file) + ".lock")
+        self.max_log_bytes = max_log_bytes
+        self.max_rotated_logs = max_rotated_logs
+        self.records = queue.Queue(maxsize=max_buffered_records)
+        self.dropped_records = 0
+        self.written_records = 0
+        self.writer = None
+        self.writer_lock = threading.Lock()
+        atexit.register(self.flush)
+
+
+    def log_attempt(self, type: str, us_number: str, input, output) -> None:
+        """
+        Queue an attempt to be appended to the prediction log by the background writer
+        Never blocks the request: if the buffer is full the record is dropped and counted
+        """
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "type": type,
+            "us_number": us_number,
+            "input": input,
+            "output": output
+        }
+        self.start_writer()
+        try:
+            self.records.put_nowait(record)
+        except queue.Full:
+            self.dropped_records += 1
+
+
+    def start_writer(self) -> None:
+        """
+        Start the background writer thread if it isn't running
+        Started lazily so each worker process gets its own writer after forking
+        """
+        if self.writer != None and self.writer.is_alive():
+            return
+        with self.writer_lock:
+            if self.writer == None or not self.writer.is_alive():
+                self.writer = threading.Thread(target=self.write_records_forever, name="prediction-log-writer", daemon=True)
+                self.writer.start()
+
+
+    def write_records_forever(self) -> None:
+        """
+        Take records off the queue and append them to the log in batches
+        """
+        while True:
+            batch = [self.records.get()]
+            while len(batch) < FLUSH_BATCH_SIZE:
+                try:
+                    batch.append(self.records.get(timeout=FLUSH_INTERVAL))
+                except queue.Empty:
+                    break
+            try:
+                self.write_records(batch)
+            except OSError as e:
+                self.dropped_records += len(batch)
+                print(f"An error occurred writing the prediction log: {e}")
+            finally:
+                for _ in batch:
+                    self.records.task_done()
+
+
+    def write_records(self, records: list) -> None:
+        """
+        Append records to the log file as JSON Lines, rotating the file first if it has grown too big
+        A record that can't be serialised is dropped and counted, without losing the rest of the batch
+        The file is locked while it is rotated and written, so worker processes sharing the log never rotate it twice
+        """
+        lines = []
+        for record in records:
+            try:
+                lines.append(json.dumps(record) + "\n")
+            except (TypeError, ValueError) as e:
+                self.dropped_records += 1
+                print(f"A prediction log record could not be written: {e}")
+        if len(lines) == 0:
+            return
+        with FileLock(self.lock_file):
+            self.rotate_if_needed()
+            with open(self.log_file, "a") as file:
+                file.write("".join(lines))
+        self.written_records += len(lines)
+
+
+    def rotate_if_needed(self) -> None:
+        """
+        Rotate the log when it reaches the size limit: log -> log.1 -> log.2 and so on, dropping the oldest
+        Must be called with the log file locked, as the size is checked again by every process after another has rotated it
+        """
+        try:
+            if os.path.getsize(self.log_file) < self.max_log_bytes:
+                return
+        except OSError:
+            return
+        for i in range(self.max_rotated_logs - 1, 0, -1):
+            rotated_file = f"{self.log_file}.{i}"
+            if os.path.exists(rotated_file):
+                os.replace(rotated_file, f"{self.log_file}.{i + 1}")
+        if self.max_rotated_logs > 0:
+            os.replace(self.log_file, f"{self.log_file}.1")
+        else:
+            os.remove(self.log_file)
+
+
+    def flush(self) -> None:
+        """
+        Block until every queued record has been written
+        """
+        if self.writer != None and self.writer.is_alive():
+            self.records.join()
+
+
+def convert_legacy_log(legacy_log_file: str = LEGACY_PREDICTION_LOG_FILE, log_file: str = PREDICTION_LOG_FILE) -> int:
+    """
+    Convert a prediction log written as one JSON object keyed by timestamp into JSON Lines records
+    The records are appended to the new log in timestamp order
+    Returns the number of records converted
+    """
+    with open(legacy_log_file, "r") as file:
+        legacy_log = json.load(file)
+
+    with open(log_file, "a") as file:
+        for timestamp in sorted(legacy_log):
+            record = {"timestamp": timestamp, **legacy_log[timestamp]}
+            file.write(json.dumps(record) + "\n")
+
+    return len(legacy_log)
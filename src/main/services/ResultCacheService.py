@@ -0,0 +1,94 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from main.services.WordlistService import WordlistService, get_current_tenant
+
+MAX_CACHED_RESULTS = 10000
+RESULT_TTL = 3600.0 # seconds a cached result is served for before it is analysed again
+STORY_RESULT = "story"
+AC_RESULT = "ac"
+
+class ResultCacheService():
+
+    def __init__(self, word_list_service: WordlistService, max_size: int = MAX_CACHED_RESULTS, ttl: float = RESULT_TTL) -> None:
+        self.word_list_service = word_list_service
+        self.max_size = max_size
+        self.ttl = ttl
+        self.results = OrderedDict()
+        self.version = word_list_service.version
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+
+    def get_key(self, kind: str, text: str) -> tuple:
+        """
+        Keys a result by what was analysed, the tenant whose wordlists it was analysed with and a hash of its text, lowercased the same way the preprocessors do
+        The rules only look at the lowercased text, so stories differing only in case get the same defects
+        """
+        return (kind, get_current_tenant(), hashlib.sha256(text.lower().encode("utf-8")).hexdigest())
+
+
+    def check_version(self) -> None:
+        """
+        Drop every cached result once a wordlist has changed, as the results may depend on it
+        Must be called while holding the lock, after checking the wordlists for changes
+        """
+        if self.word_list_service.version != self.version:
+            self.results.clear()
+            self.version = self.word_list_service.version
+
+
+    def get(self, kind: str, text: str) -> tuple | None:
+        """
+        Returns the cached defect records for the text, or None if it hasn't been analysed recently with the current wordlists
+        """
+        if self.max_size <= 0:
+            return None
+        key = self.get_key(kind, text)
+        # serving a cached result never reads the wordlists, so look for changes written by other processes first
+        self.word_list_service.check_for_changes()
+        with self.lock:
+            self.check_version()
+            entry = self.results.get(key)
+            if entry != None and time.monotonic() - entry[0] >= self.ttl:
+                del self.results[key]
+                entry = None
+            if entry == None:
+                self.misses += 1
+                return None
+            self.results.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+
+    def put(self, kind: str, text: str, defect_records: tuple) -> None:
+        """
+        Cache the defect records found in the text, evicting the least recently used results when full
+        The records can't be changed, so they are shared with the analysed object rather than copied
+        """
+        if self.max_size <= 0:
+            return
+        key = self.get_key(kind, text)
+        # serving a cached result never reads the wordlists, so look for changes written by other processes first
+        self.word_list_service.check_for_changes()
+        with self.lock:
+            self.check_version()
+            self.results[key] = (time.monotonic(), defect_records)
+            self.results.move_to_end(key)
+            while len(self.results) > self.max_size:
+                self.results.popitem(last=False)
+
+
+    def clear(self) -> None:
+        """
+        Drop every cached result
+        """
+        with self.lock:
+            self.results.clear()
+
+
+    def __len__(self) -> int:
+        return len(self.results)
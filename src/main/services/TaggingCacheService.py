@@ -0,0 +1,224 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+TAGGING_CACHE_FILE = "tagging_cache.sqlite3"
+MAX_CACHED_TAGS = 100000
+BUSY_TIMEOUT = 5000 # milliseconds a process waits for another one to finish writing
+MAX_QUERY_TEXTS = 500 # texts looked up per query, well under SQLite's limit on the number of parameters in one statement
+WRITE_BATCH_SIZE = 200 # entries held in memory before they are written in one transaction
+WRITE_INTERVAL = 1.0 # most seconds an entry is held before the next lookup or store writes it
+COUNT_INTERVAL = 1000 # entries written between counts of the whole cache, which other processes add to as well
+SENTENCE_TAGS = "sentence_tags"
+WORD_TAGS = "word_tags"
+NOUN_PHRASES = "noun_phrases"
+
+class TaggingCacheService():
+
+    def __init__(self, cache_file: str = TAGGING_CACHE_FILE, max_entries: int = MAX_CACHED_TAGS) -> None:
+        """
+        A cache of POS tags and noun phrases kept in a SQLite file, so they survive restarts and are shared by every worker process
+        Entries are keyed by the identity of the tagger model, so tags from a different model are never served
+        """
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.model_identity = None
+        self.other_models_removed = False
+        self.connection = None
+        self.connection_pid = None
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.pending_since = None
+        self.entries = None
+        self.entries_since_count = 0
+        atexit.register(self.flush)
+
+
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Open the cache file the first time it is needed in each process
+        Write-ahead logging lets worker processes read while another one writes
+        """
+        if self.connection == None or self.connection_pid != os.getpid():
+            connection = sqlite3.connect(self.cache_file, timeout=BUSY_TIMEOUT / 1000, check_same_thread=False)
+            connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT}")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS tags (
+                    model TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (model, kind, text)
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS tags_created ON tags (created)")
+            connection.commit()
+            self.connection = connection
+            self.connection_pid = os.getpid()
+        return self.connection
+
+
+    def set_model_identity(self, model_identity: str) -> None:
+        """
+        Set the identity of the loaded tagger model, which every entry is stored and looked up under
+        """
+        self.model_identity = model_identity
+        self.other_models_removed = False
+
+
+    def get_many(self, kind: str, texts: list) -> dict:
+        """
+        Returns a dictionary of text to cached value for every one of the texts found in the cache, including values not written yet
+        Nothing is found until the model identity has been set
+        """
+        texts = list(dict.fromkeys(texts))
+        if self.model_identity == None or len(texts) == 0:
+            return {}
+        values = {}
+        with self.lock:
+            self.flush_if_due()
+            for text in texts:
+                row = self.pending.get((kind, text))
+                if row != None:
+                    values[text] = json.loads(row[3])
+            texts = [text for text in texts if text not in values]
+            connection = self.get_connection() if len(texts) > 0 else None
+            for start in range(0, len(texts), MAX_QUERY_TEXTS):
+                batch = texts[start:start + MAX_QUERY_TEXTS]
+                rows = connection.execute(
+                    f"SELECT text, value FROM tags WHERE model = ? AND kind = ? AND text IN ({','.join('?' * len(batch))})",
+                    [self.model_identity, kind] + batch
+                ).fetchall()
+                for text, value in rows:
+                    values[text] = json.loads(value)
+        return values
+
+
+    def get_kinds(self, kinds: list, text: str) -> dict:
+        """
+        Returns a dictionary of kind to cached value for every one of the kinds cached for the text, in one lookup
+        """
+        if self.model_identity == None:
+            return {}
+        values = {}
+        with self.lock:
+            self.flush_if_due()
+            for kind in kinds:
+                row = self.pending.get((kind, text))
+                if row != None:
+                    values[kind] = json.loads(row[3])
+            kinds = [kind for kind in kinds if kind not in values]
+            if len(kinds) > 0:
+                rows = self.get_connection().execute(
+                    f"SELECT kind, value FROM tags WHERE model = ? AND text = ? AND kind IN ({','.join('?' * len(kinds))})",
+                    [self.model_identity, text] + kinds
+                ).fetchall()
+                for kind, value in rows:
+                    values[kind] = json.loads(value)
+        return values
+
+
+    def put_many(self, kind: str, values: dict) -> None:
+        """
+        Store a dictionary of text to value
+        Entries are held in memory and written in batches, once WRITE_BATCH_SIZE have built up or the oldest has waited WRITE_INTERVAL
+        """
+        if self.model_identity == None or len(values) == 0:
+            return
+        now = time.time()
+        with self.lock:
+            for text, value in values.items():
+                self.pending[(kind, text)] = (self.model_identity, kind, text, json.dumps(value), now)
+            if self.pending_since == None:
+                self.pending_since = now
+            if len(self.pending) >= WRITE_BATCH_SIZE:
+                self.write_pending()
+            else:
+                self.flush_if_due()
+
+
+    def flush(self) -> None:
+        """
+        Write every entry still held in memory
+        """
+        with self.lock:
+            self.write_pending()
+
+
+    def flush_if_due(self) -> None:
+        if self.pending_since != None and time.time() - self.pending_since >= WRITE_INTERVAL:
+            self.write_pending()
+
+
+    def write_pending(self) -> None:
+        """
+        Write the held entries in one transaction, evicting the oldest entries if the cache may have grown past its size cap
+        Must be called with the lock held
+        """
+        if len(self.pending) == 0:
+            return
+        rows = list(self.pending.values())
+        self.pending = {}
+        self.pending_since = None
+        connection = self.get_connection()
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO tags (model, kind, text, value, created) VALUES (?, ?, ?, ?, ?)", rows)
+            self.entries_since_count += len(rows)
+            if self.entries != None:
+                self.entries += len(rows)
+            if self.entries == None or self.entries > self.max_entries or self.entries_since_count >= COUNT_INTERVAL:
+                self.evict(connection)
+
+
+    def evict(self, connection: sqlite3.Connection) -> None:
+        """
+        Count the entries and delete the oldest until the cache is back under its size cap
+        Between counts, the number of entries is kept up to date with this process's writes, so eviction doesn't count the table on every write
+        Entries left by any other tagger model can never be served, so they are deleted the first time this process writes
+        """
+        if not self.other_models_removed:
+            connection.execute("DELETE FROM tags WHERE model != ?", (self.model_identity,))
+            self.other_models_removed = True
+        self.entries = connection.execute("SELECT COUNT(*) FROM tags").fetchone()[0]
+        self.entries_since_count = 0
+        excess_entries = self.entries - self.max_entries
+        if excess_entries > 0:
+            connection.execute("DELETE FROM tags WHERE rowid IN (SELECT rowid FROM tags ORDER BY created LIMIT ?)", (excess_entries,))
+            self.entries = self.max_entries
+
+
+    def count(self) -> int:
+        """
+        Returns the number of entries in the cache
+        """
+        with self.lock:
+            self.write_pending()
+            return self.get_connection().execute("SELECT COUNT(*) FROM tags").fetchone()[0]
+
+
+    def close(self) -> None:
+        """
+        Write the held entries and close the cache file
+        """
+        with self.lock:
+            self.write_pending()
+            if self.connection != None and self.connection_pid == os.getpid():
+                self.connection.close()
+            self.connection = None
+
+
+    def __getstate__(self) -> dict:
+        """
+        Only the settings are kept when the cache is sent to a worker process, which opens the file itself
+        """
+        return {"cache_file": self.cache_file, "max_entries": self.max_entries}
+
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["cache_file"], state["max_entries"])
@@ -1,3 +1,10 @@
+import contextvars
+import itertools
+import re
+import threading
+import time
+from collections import OrderedDict
+
 from main.repositories.EscapeClauseRepository import EscapeClauseRepository
 from main.repositories.NounExceptionRepository import NounExceptionRepository
 from main.repositories.QuantifiersRespository import QuantifiersRepository
@@ -6,6 +13,154 @@ from main.repositories.VerbExceptionRepository import VerbExceptionRepository
 from main.repositories.VerbNounExceptionRepository import VerbNounExceptionRepository
 from main.repositories.WeakVerbsRepository import WeakVerbsRepository
 
+WORDLIST_CHECK_INTERVAL = 1.0 # seconds between checks of a wordlist's version for outside changes
+MAX_TENANTS = 1000 # tenants whose additions are kept in memory, the least recently used are dropped first
+# wordlist names used by the /word endpoints, and the attribute holding each cached list
+WORDLISTS = {
+    "noun": "noun_exceptions",
+    "nounverb": "verb_noun_exceptions",
+    "verb": "verb_exceptions",
+    "vague": "vague_terms",
+    "escape": "escape_clauses",
+    "quantifier": "quantifiers",
+    "weakverb": "weak_verbs"
+}
+TENANT_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+# the tenant whose wordlist additions are used, set for each request. Every thread or task has its own
+current_tenant = contextvars.ContextVar("current_tenant", default=None)
+
+
+def set_current_tenant(tenant: str | None) -> None:
+    """
+    Selects the tenant whose additions are layered over the shared wordlists, or None for the shared lists alone
+    Raises a ValueError for an id that isn't 1 to 64 letters, digits, dashes or underscores
+    """
+    if tenant != None and TENANT_PATTERN.fullmatch(tenant) == None:
+        raise ValueError("A tenant id must be 1 to 64 letters, digits, dashes or underscores")
+    current_tenant.set(tenant)
+
+
+def get_current_tenant() -> str | None:
+    return current_tenant.get()
+
+
+def normalise_word(word: str) -> str:
+    """
+    Collapses the whitespace in a word or phrase, raising a ValueError if it isn't a non-empty string
+    """
+    if not isinstance(word, str) or word.strip() == "":
+        raise ValueError("Every word must be a non-empty string")
+    return " ".join(word.split())
+
+
+class WordlistSnapshot():
+
+    def __init__(self, words: tuple, version) -> None:
+        """
+        One version of a wordlist. It is never changed once made, a reload replaces it with a new snapshot, so readers need no lock
+        """
+        self.words = words
+        self.lookup = frozenset(words)
+        self.version = version
+
+
+class WordlistOverlay():
+
+    def __init__(self, tenant: str, base: WordlistSnapshot, additions: WordlistSnapshot) -> None:
+        """
+        A tenant's view of a wordlist: the shared snapshot with the tenant's additions on top
+        Nothing is copied from the shared list, so memory grows with the additions rather than with the number of tenants
+        Used both as the ordered words and as the set of them, lookups check the shared set and then the additions
+        """
+        self.tenant = tenant
+        self.base = base
+        self.additions = additions
+        self.added = tuple(word for word in additions.words if word not in base.lookup)
+
+
+    @property
+    def words(self) -> "WordlistOverlay":
+        return self
+
+
+    @property
+    def lookup(self) -> "WordlistOverlay":
+        return self
+
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.base.lookup or word in self.additions.lookup
+
+
+    def __iter__(self):
+        yield from self.base.words
+        yield from self.added
+
+
+    def __len__(self) -> int:
+        return len(self.base.words) + len(self.added)
+
+
+class CachedWordlist():
+
+    def __init__(self, repository) -> None:
+        """
+        A wordlist from a file or database repository, kept in memory until the repository's version of it changes
+        """
+        self.repository = repository
+        self.load = repository.get_words
+        self.path = repository.full_path
+        self.snapshot = None
+        self.last_checked = None
+        self.lock = threading.RLock()
+
+
+    @property
+    def words(self) -> tuple:
+        return self.snapshot.words if self.snapshot != None else ()
+
+
+    @property
+    def lookup(self) -> frozenset:
+        return self.snapshot.lookup if self.snapshot != None else frozenset()
+
+
+    def is_stale(self, now: float) -> bool:
+        """
+        Checks if the wordlist has changed in its repository since it was last loaded
+        The repository is only asked once every check interval, so repeated lookups do no I/O
+        """
+        if self.last_checked != None and now - self.last_checked < WORDLIST_CHECK_INTERVAL:
+            return False
+        self.last_checked = now
+        return self.has_changed()
+
+
+    def has_changed(self) -> bool:
+        return self.snapshot == None or self.repository.get_version() != self.snapshot.version
+
+
+    def reload(self) -> None:
+        """
+        Reads the wordlist from its repository into a new snapshot, keeping both the file ordering and a frozenset for lookups
+        The version is read first, so a write made during the read is picked up by the next check
+        """
+        version = self.repository.get_version()
+        self.snapshot = WordlistSnapshot(tuple(self.load()), version)
+
+
+class TenantWordlists():
+
+    def __init__(self) -> None:
+        """
+        What is kept in memory for one tenant: the additions it has made to each shared list, the overlays made from them,
+        and when each list without additions was last checked for them
+        """
+        self.additions = {}
+        self.overlays = {}
+        self.checked = {}
+
+
 class WordlistService():
 
     def __init__(self, 
@@ -15,8 +170,13 @@ class WordlistService():
                 vague_terms_repository: VagueTermsRepository,
                 escape_clause_repository: EscapeClauseRepository,
                 quantifiers_repository: QuantifiersRepository,
-                weak_verbs_repository: WeakVerbsRepository
+                weak_verbs_repository: WeakVerbsRepository,
+                tenant_repository_factory = None
             ) -> None:
+        """
+        Caches every wordlist in memory. Given a tenant_repository_factory, which takes a tenant id and the repository of a shared list
+        and returns the repository of that tenant's additions to it, each tenant gets its own additions on top of the shared lists
+        """
         self.conjunctions = ["and", "or", "&", "+", "/", "<", ">"]
         self.verb_noun_exception_repository = verb_noun_exceptions_repository
         self.noun_exception_repository = noun_exception_repository
@@ -25,27 +185,219 @@ class WordlistService():
         self.escape_clause_repository = escape_clause_repository
         self.quantifiers_repository = quantifiers_repository
         self.weak_verbs_repository = weak_verbs_repository
+        self.versions = itertools.count(1)
+        self.version = 0
+        self.noun_exceptions = CachedWordlist(noun_exception_repository)
+        self.verb_exceptions = CachedWordlist(verb_exception_repository)
+        self.verb_noun_exceptions = CachedWordlist(verb_noun_exceptions_repository)
+        self.vague_terms = CachedWordlist(vague_terms_repository)
+        self.escape_clauses = CachedWordlist(escape_clause_repository)
+        self.quantifiers = CachedWordlist(quantifiers_repository)
+        self.weak_verbs = CachedWordlist(weak_verbs_repository)
+        self.tenant_repository_factory = tenant_repository_factory
+        self.tenant_wordlists = OrderedDict()
+        self.tenant_lock = threading.Lock()
+
 
+    def get_wordlist(self, wordlist: CachedWordlist) -> WordlistSnapshot:
+        """
+        Returns the latest snapshot of the wordlist, reloading it first if its version has changed
+        Only one thread reloads a changed list, the others keep reading the snapshot they have
+        """
+        if wordlist.is_stale(time.monotonic()):
+            with wordlist.lock:
+                if wordlist.has_changed():
+                    self.reload_wordlist(wordlist)
+        return wordlist.snapshot
+    
+
+    def reload_wordlist(self, wordlist: CachedWordlist) -> None:
+        """
+        Reloads a wordlist from its repository and bumps the version if it changed, so anything derived from the lists knows to update
+        """
+        with wordlist.lock:
+            old_snapshot = wordlist.snapshot
+            wordlist.reload()
+            wordlist.last_checked = time.monotonic()
+            if wordlist.snapshot.words != (old_snapshot.words if old_snapshot != None else ()):
+                self.version = next(self.versions)
+
+
+    def sync_wordlist(self, wordlist: CachedWordlist) -> None:
+        """
+        Reloads a wordlist straight away if its repository has a new version, whether from this process's write or another's
+        """
+        with wordlist.lock:
+            if wordlist.has_changed():
+                self.reload_wordlist(wordlist)
+
+
+    def get_tenant_wordlists(self, tenant: str) -> TenantWordlists:
+        """
+        Returns what is kept for a tenant, dropping the least recently used tenant once more than MAX_TENANTS are kept
+        The tenant id comes from a request header, so this keeps the memory used by tenants bounded
+        Must be called while holding the tenant lock
+        """
+        tenant_wordlists = self.tenant_wordlists.get(tenant)
+        if tenant_wordlists == None:
+            tenant_wordlists = TenantWordlists()
+            self.tenant_wordlists[tenant] = tenant_wordlists
+            while len(self.tenant_wordlists) > MAX_TENANTS:
+                self.tenant_wordlists.popitem(last=False)
+        else:
+            self.tenant_wordlists.move_to_end(tenant)
+        return tenant_wordlists
+
+
+    def get_tenant_additions(self, tenant: str, wordlist: CachedWordlist, create: bool = False) -> CachedWordlist | None:
+        """
+        Returns a tenant's additions to a shared wordlist, or None if the tenant has none and create is False
+        A list the tenant has no additions to is only checked for them once every check interval, and nothing is cached for it until it has some
+        """
+        with self.tenant_lock:
+            tenant_wordlists = self.get_tenant_wordlists(tenant)
+            additions = tenant_wordlists.additions.get(wordlist)
+            if additions != None:
+                return additions
+            now = time.monotonic()
+            last_checked = tenant_wordlists.checked.get(wordlist)
+            if not create and last_checked != None and now - last_checked < WORDLIST_CHECK_INTERVAL:
+                return None
+            repository = self.tenant_repository_factory(tenant, wordlist.repository)
+            if not create and repository.get_version() == None:
+                tenant_wordlists.checked[wordlist] = now
+                return None
+            additions = CachedWordlist(repository)
+            tenant_wordlists.additions[wordlist] = additions
+            tenant_wordlists.checked.pop(wordlist, None)
+            return additions
+
+
+    def get_view(self, wordlist: CachedWordlist) -> WordlistSnapshot | WordlistOverlay:
+        """
+        Returns the wordlist as the current tenant sees it: the shared snapshot, or an overlay of the tenant's additions on it
+        An overlay is only made again when the shared list or the additions change, so requests never merge lists
+        """
+        snapshot = self.get_wordlist(wordlist)
+        tenant = get_current_tenant()
+        if tenant == None or self.tenant_repository_factory == None:
+            return snapshot
+        tenant_additions = self.get_tenant_additions(tenant, wordlist)
+        if tenant_additions == None:
+            return snapshot
+        additions = self.get_wordlist(tenant_additions)
+        tenant_wordlists = self.tenant_wordlists.get(tenant)
+        if len(additions.words) == 0 or tenant_wordlists == None:
+            return snapshot
+        overlay = tenant_wordlists.overlays.get(wordlist)
+        if overlay == None or overlay.base is not snapshot or overlay.additions is not additions:
+            overlay = WordlistOverlay(tenant, snapshot, additions)
+            tenant_wordlists.overlays[wordlist] = overlay
+        return overlay
+
+
+    def check_for_changes(self) -> None:
+        """
+        Reloads any wordlist, or any of the current tenant's additions, changed in its repository since it was last checked, e.g. by another worker
+        Each list's version is only read once every check interval, so this is cheap enough to do before serving a cached result
+        """
+        for name in WORDLISTS.values():
+            self.get_view(getattr(self, name))
+
+
+    def get_write_target(self, wordlist: CachedWordlist) -> CachedWordlist:
+        """
+        Returns the list a change should be written to: the current tenant's additions, or the shared list when there is no tenant
+        """
+        tenant = get_current_tenant()
+        if tenant == None or self.tenant_repository_factory == None:
+            return wordlist
+        return self.get_tenant_additions(tenant, wordlist, True)
+
+
+    def get_named_wordlist(self, name: str) -> CachedWordlist:
+        """
+        Returns the wordlist with the given /word name, raising a KeyError if there isn't one
+        """
+        return getattr(self, WORDLISTS[name])
+
+
+    def get_words(self, name: str) -> list:
+        """
+        Returns every word in a wordlist as the current tenant sees it, in order
+        """
+        return list(self.get_view(self.get_named_wordlist(name)).words)
+
+
+    def has_word(self, name: str, word: str) -> bool:
+        """
+        Checks if a word is in a wordlist as the current tenant sees it, using the in-memory sets
+        """
+        return normalise_word(word) in self.get_view(self.get_named_wordlist(name)).lookup
 
-    def get_noun_exceptions(self) -> list:
+
+    def add_word(self, name: str, word: str) -> list:
+        """
+        Adds a word to a wordlist through its repository, which skips duplicates
+        With a tenant, the word is added to the tenant's additions unless the shared list already has it
+        Returns the updated list
+        """
+        word = normalise_word(word)
+        wordlist = self.get_named_wordlist(name)
+        target = self.get_write_target(wordlist)
+        if target is wordlist or word not in self.get_wordlist(wordlist).lookup:
+            target.repository.add_word(word)
+        self.sync_wordlist(target)
+        return self.get_words(name)
+
+
+    def replace_words(self, name: str, words: list) -> list:
+        """
+        Replaces a whole wordlist, dropping duplicates
+        With a tenant, only the tenant's additions are replaced, by the words the shared list doesn't have
+        Returns the updated list
+        """
+        words = list(dict.fromkeys(normalise_word(word) for word in words))
+        wordlist = self.get_named_wordlist(name)
+        target = self.get_write_target(wordlist)
+        if target is not wordlist:
+            shared_words = self.get_wordlist(wordlist).lookup
+            words = [word for word in words if word not in shared_words]
+        target.repository.replace_words(words)
+        self.sync_wordlist(target)
+        return self.get_words(name)
+
+
+    def delete_word(self, name: str, word: str) -> bool:
         """
-        Returns a list of noun exceptions from the repository
+        Removes a word from a wordlist. With a tenant, only the tenant's additions can be removed
+        Returns whether it was in the list
         """
-        return self.noun_exception_repository.get_noun_exceptions()
+        target = self.get_write_target(self.get_named_wordlist(name))
+        deleted = target.repository.delete_word(normalise_word(word))
+        self.sync_wordlist(target)
+        return deleted
+
+
+    def get_noun_exceptions(self) -> frozenset | WordlistOverlay:
+        """
+        Returns a set of noun exceptions from the repository
+        """
+        return self.get_view(self.noun_exceptions).lookup
     
 
-    def get_verb_exceptions(self) -> list:
+    def get_verb_exceptions(self) -> frozenset | WordlistOverlay:
         """
-        Returns a list of verb exceptions from the repository
+        Returns a set of verb exceptions from the repository
         """
-        return self.verb_exception_repository.get_verb_exceptions()
+        return self.get_view(self.verb_exceptions).lookup
     
 
-    def get_verb_noun_exceptions(self) -> list:
+    def get_verb_noun_exceptions(self) -> frozenset | WordlistOverlay:
         """
-        Returns a list of verb/noun exceptions from the repository
+        Returns a set of verb/noun exceptions from the repository
         """
-        return self.verb_noun_exception_repository.get_verb_noun_exceptions()
+        return self.get_view(self.verb_noun_exceptions).lookup
     
 
     def add_noun_exception(self, word: str) -> list:
@@ -54,8 +406,7 @@ class WordlistService():
         These are words that should not be considered nouns in any case
         Returns the updated list of nouns
         """
-        self.noun_exception_repository.add_noun_exception(word)
-        return self.noun_exception_repository.get_noun_exceptions()
+        return self.add_word("noun", word)
     
 
     def add_verb_exception(self, word: str) -> list:
@@ -64,8 +415,7 @@ class WordlistService():
         These are words that should not be considered nouns in any case
         Returns the updated list of nouns
         """
-        self.verb_exception_repository.add_verb_exception(word)
-        return self.verb_exception_repository.get_verb_exceptions()
+        return self.add_word("verb", word)
     
 
     def add_verb_noun_exception(self, word: str) -> list:
@@ -74,34 +424,33 @@ class WordlistService():
         These words are any domain specific words that could be considered either a noun or verb
         Returns the updated list of verb/noun exceptions
         """
-        self.verb_noun_exception_repository.add_verb_noun_exception(word)
-        return self.verb_noun_exception_repository.get_verb_noun_exceptions()
+        return self.add_word("nounverb", word)
     
 
-    def get_vague_terms_list(self) -> list:
+    def get_vague_terms_list(self) -> tuple | WordlistOverlay:
         """
         Gets a list of vague terms from the repository
-        Returns a python list of those words
+        Returns a tuple of those words in file order
         """
-        return self.vague_terms_repository.get_vague_terms()
+        return self.get_view(self.vague_terms).words
     
-    def get_escape_clause_list(self) -> list:
+    def get_escape_clause_list(self) -> tuple | WordlistOverlay:
         """
         Gets a list of escape clauses from the repository
-        Returns a python list of those words/phrases
+        Returns a tuple of those words/phrases in file order
         """
-        return self.escape_clause_repository.get_escape_clauses()
+        return self.get_view(self.escape_clauses).words
     
-    def get_quantifiers_list(self) -> list:
+    def get_quantifiers_list(self) -> tuple | WordlistOverlay:
         """
-        Gets a list of escape clauses from the repository
-        Returns a python list of those words/phrases
+        Gets a list of quantifiers from the repository
+        Returns a tuple of those words/phrases in file order
         """
-        return self.quantifiers_repository.get_quantifiers()
+        return self.get_view(self.quantifiers).words
     
-    def get_weak_verbs_list(self) -> list:
+    def get_weak_verbs_list(self) -> frozenset | WordlistOverlay:
         """
         Gets a list of weak verbs from the repository
-        Returns a python list of those verbs
+        Returns a set of those verbs
         """
-        return self.weak_verbs_repository.get_weak_verbs()
\ No newline at end of file
+        return self.get_view(self.weak_verbs).lookup
\ No newline at end of file
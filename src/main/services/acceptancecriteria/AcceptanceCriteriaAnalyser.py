@@ -46,9 +46,9 @@ class Integrous():
         Checks if an AC is integrous
         - All chunks need to have 1 noun and 1 verb each
         """
-        context_verbs, context_nouns = self.nlp_service.has_required_number_verb_and_noun(ac.context_pos, 1, 2) # two required verbs because 'given' is considered a verb
-        event_verbs, event_nouns = self.nlp_service.has_required_number_verb_and_noun(ac.event_pos, 1, 1)
-        outcome_verbs, outcome_nouns = self.nlp_service.has_required_number_verb_and_noun(ac.outcome_pos, 1, 1)
+        context_verbs, context_nouns = self.nlp_service.has_required_number_verb_and_noun(ac.context_pos, 1, 2, analysis_context=ac.analysis_context) # two required verbs because 'given' is considered a verb
+        event_verbs, event_nouns = self.nlp_service.has_required_number_verb_and_noun(ac.event_pos, 1, 1, analysis_context=ac.analysis_context)
+        outcome_verbs, outcome_nouns = self.nlp_service.has_required_number_verb_and_noun(ac.outcome_pos, 1, 1, analysis_context=ac.analysis_context)
 
         if ac.context != None and not (context_verbs and context_nouns):
             ac.add_defect(self.acceptance_criteria_defect_types.integrous, self.acceptance_criteria_error_messages.context_missing_noun_or_verb)
@@ -98,12 +98,12 @@ class Singular():
         Checks that an AC is singular
         - Does not have more AND clauses in a chunk than the given threshold (defined as constant in this file)
         """
-        context_has_lists = (any(self.nlp_service.check_for_lists(part) for part in ac.context_and_clauses) or 
-                             self.nlp_service.list_service.has_list_of_verbs(ac.context))
-        event_has_lists = (any(self.nlp_service.check_for_lists(part) for part in ac.event_and_clauses) or 
-                           self.nlp_service.list_service.has_list_of_verbs(ac.event))
-        outcome_has_lists = (any(self.nlp_service.check_for_lists(part) for part in ac.outcome_and_clauses) or 
-                             self.nlp_service.list_service.has_list_of_verbs(ac.outcome))
+        context_has_lists = (any(self.nlp_service.check_for_lists(part, ac.analysis_context) for part in ac.context_and_clauses) or 
+                             self.nlp_service.list_service.has_list_of_verbs(ac.context, ac.analysis_context))
+        event_has_lists = (any(self.nlp_service.check_for_lists(part, ac.analysis_context) for part in ac.event_and_clauses) or 
+                           self.nlp_service.list_service.has_list_of_verbs(ac.event, ac.analysis_context))
+        outcome_has_lists = (any(self.nlp_service.check_for_lists(part, ac.analysis_context) for part in ac.outcome_and_clauses) or 
+                             self.nlp_service.list_service.has_list_of_verbs(ac.outcome, ac.analysis_context))
 
         if event_has_lists or context_has_lists or outcome_has_lists:
             ac.add_defect(self.acceptance_criteria_defect_types.singularity, self.acceptance_criteria_error_messages.list_in_ac)
@@ -123,15 +123,15 @@ class Unique():
         """
         acs_text_only = list(map(lambda ac: ac.original_lower_text, acs))
         full_duplicates = self.has_full_duplicates(acs_text_only)
+        return self.describe_full_duplicates(list(full_duplicates.values()))
 
-        uniqueness_defects = []
-        
-        for item in full_duplicates.items():
-            duplicate_indices = item[1]
-            error = self.acceptance_criteria_error_messages.full_duplicates(duplicate_indices)
-            uniqueness_defects.append(error)
 
-        return uniqueness_defects
+    def describe_full_duplicates(self, duplicate_indices: list) -> list:
+        """
+        Takes a list of the indices of each group of duplicate ACs
+        Returns a uniqueness defect for each group
+        """
+        return [self.acceptance_criteria_error_messages.full_duplicates(indices) for indices in duplicate_indices]
     
     
     def has_full_duplicates(self, acs: list):
@@ -1,4 +1,5 @@
 from main.models.AcceptanceCriteria import AcceptanceCriteria
+from main.models.AnalysisContext import AnalysisContext
 from main.resources.ACErrorMessages import ACErrorMessages
 from main.resources.ACErrorTypes import ACErrorTypes
 from main.resources.USErrorMessages import USErrorMessages
@@ -42,6 +43,59 @@ class AcceptanceCriteriaPreprocessor():
         return acceptance_criteria, can_be_processed
     
 
+    def pre_process_ac_texts(self, acs: list, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Preprocess a whole list of (AC text, AC number) tuples in the same way as pre_process_ac_text
+        All the chunks of every AC are POS tagged together in one call to the tagger, then all the AND clauses in another,
+        and the ACs share one analysis context
+        Returns a list of (acceptance criteria, can be processed) tuples in the same order as the given list
+        """
+        analysis_context = analysis_context if analysis_context != None else AnalysisContext()
+        processed_criteria = []
+        for ac_text, ac_number in acs:
+            acceptance_criteria = AcceptanceCriteria(ac_text.lower(), ac_text)
+            acceptance_criteria.ac_number = ac_number
+            acceptance_criteria.analysis_context = analysis_context
+            in_order = self.check_context_event_outcome_ordering(acceptance_criteria)
+            max_one_of_each_indicator = self.check_only_one_context_event_outcome(acceptance_criteria)
+            can_be_processed = in_order and max_one_of_each_indicator
+            if can_be_processed:
+                self.split_story_into_chunks(acceptance_criteria)
+            processed_criteria.append((acceptance_criteria, can_be_processed))
+
+        chunks = [chunk for ac, can_be_processed in processed_criteria if can_be_processed for chunk in self.get_chunks_to_tag(ac)]
+        self.nlp_service.tokenise_words_batch(chunks, analysis_context)
+
+        for ac, can_be_processed in processed_criteria:
+            if can_be_processed:
+                self.tokenise_and_pos_tag_chunks(ac)
+                self.add_and_clauses_to_ac(ac)
+
+        and_clauses = [clause for ac, can_be_processed in processed_criteria if can_be_processed for clause in self.get_and_clauses_to_tag(ac)]
+        self.nlp_service.tokenise_words_batch(and_clauses, analysis_context)
+        return processed_criteria
+
+
+    def get_chunks_to_tag(self, ac: AcceptanceCriteria) -> list:
+        """
+        Get the text of every chunk and AND clause part of an AC that will need to be POS tagged
+        """
+        chunks = []
+        for chunk in [ac.context, ac.event, ac.outcome]:
+            if chunk != None:
+                chunks.append(self.nlp_service.get_string_without_punctuation(chunk))
+                chunks += [self.nlp_service.get_string_without_punctuation(part) for part in chunk.split(AND_INDICATOR)]
+        return chunks
+
+
+    def get_and_clauses_to_tag(self, ac: AcceptanceCriteria) -> list:
+        """
+        Get the text of every AND clause of an AC that will be POS tagged when checking it for lists
+        """
+        and_clauses = ac.context_and_clauses + ac.event_and_clauses + ac.outcome_and_clauses
+        return [self.nlp_service.remove_all_quotes_from_string(clause) for clause in and_clauses]
+
+
     def check_only_one_context_event_outcome(self, ac: AcceptanceCriteria) -> bool:
         """
         Checks that there is only one role, one event, and one outcome
@@ -158,17 +212,17 @@ class AcceptanceCriteriaPreprocessor():
         """
         Splits the chunks of an AC into tokens and tag each token with a POS tag
         """
-        ac.context_pos = self.tokenise_and_pos_tag_chunk(ac.context)
-        ac.event_pos = self.tokenise_and_pos_tag_chunk(ac.event)
-        ac.outcome_pos = self.tokenise_and_pos_tag_chunk(ac.outcome)
+        ac.context_pos = self.tokenise_and_pos_tag_chunk(ac.context, ac.analysis_context)
+        ac.event_pos = self.tokenise_and_pos_tag_chunk(ac.event, ac.analysis_context)
+        ac.outcome_pos = self.tokenise_and_pos_tag_chunk(ac.outcome, ac.analysis_context)
 
 
-    def tokenise_and_pos_tag_chunk(self, chunk: str | None) -> None:
+    def tokenise_and_pos_tag_chunk(self, chunk: str | None, analysis_context: AnalysisContext | None = None) -> None:
         """
         Take the role of an AC and split it into tokens and tag each token with a POS tag
         """
         if chunk != None:
-            return self.nlp_service.tokenise_words(self.nlp_service.get_string_without_punctuation(chunk))
+            return self.nlp_service.tokenise_words(self.nlp_service.get_string_without_punctuation(chunk), analysis_context)
         return None
     
 
@@ -176,12 +230,12 @@ class AcceptanceCriteriaPreprocessor():
         """
         Adds and clauses to the AC for all parts
         """
-        ac.context_and_clauses = self.extract_and_clauses(ac.context)
-        ac.event_and_clauses = self.extract_and_clauses(ac.event)
-        ac.outcome_and_clauses = self.extract_and_clauses(ac.outcome)
+        ac.context_and_clauses = self.extract_and_clauses(ac.context, ac.analysis_context)
+        ac.event_and_clauses = self.extract_and_clauses(ac.event, ac.analysis_context)
+        ac.outcome_and_clauses = self.extract_and_clauses(ac.outcome, ac.analysis_context)
     
 
-    def extract_and_clauses(self, chunk: str | None) -> list:
+    def extract_and_clauses(self, chunk: str | None, analysis_context: AnalysisContext | None = None) -> list:
         """
         Extract all AND clauses from the AC and return a list of them
         """
@@ -190,8 +244,8 @@ class AcceptanceCriteriaPreprocessor():
             parts = chunk.split(AND_INDICATOR)
             prev_part = (parts[0], False)
             for part in parts:
-                part_tokens = self.tokenise_and_pos_tag_chunk(part)
-                verbs, nouns = self.nlp_service.has_required_number_verb_and_noun(part_tokens, 1, 1)
+                part_tokens = self.tokenise_and_pos_tag_chunk(part, analysis_context)
+                verbs, nouns = self.nlp_service.has_required_number_verb_and_noun(part_tokens, 1, 1, analysis_context=analysis_context)
                 is_clause = True if verbs and nouns else False
                 if is_clause:
                     if not prev_part[1] and prev_part[0] != part:
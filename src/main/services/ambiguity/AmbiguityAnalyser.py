@@ -1,8 +1,10 @@
+from main.models.AnalysisContext import AnalysisContext
+from main.models.TokenFeatures import IS_WEAK_VERB
 from main.models.UserStory import UserStory
 from main.models.AcceptanceCriteria import AcceptanceCriteria
 from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
 from main.resources.AmbiguityErrorTypes import AmbiguityErrorTypes
-from main.services.NLPService import NLPService
+from main.services.NLPService import ESCAPE_CLAUSES, QUANTIFIERS, VAGUE_TERMS, NLPService, PhraseMatcher
 from main.services.WordlistService import WordlistService
 
 
@@ -14,10 +16,10 @@ class AmbiguityAnalyser():
         self.ambiguity_types = AmbiguityErrorTypes()
         self.ambiguity_messages = AmbiguityErrorMessages()
         self.subjectivity_analyser = Subjectivity(self.nlp_service, self.ambiguity_types, self.ambiguity_messages)
-        self.vagueness_analyser = Vagueness(self.word_list_service, self.nlp_service, self.ambiguity_types, self.ambiguity_messages)
-        self.non_commitment_analyser = NonCommitment(self.word_list_service, self.nlp_service, self.ambiguity_types, self.ambiguity_messages)
+        self.vagueness_analyser = Vagueness(self.word_list_service, self.nlp_service, self.ambiguity_types, self.ambiguity_messages, self.nlp_service.phrase_matcher)
+        self.non_commitment_analyser = NonCommitment(self.word_list_service, self.nlp_service, self.ambiguity_types, self.ambiguity_messages, self.nlp_service.phrase_matcher)
         self.anaphora_analyser = Anaphora(self.nlp_service, self.ambiguity_types, self.ambiguity_messages)
-        self.quantifier_analyser = Quantifiers(self.word_list_service, self.nlp_service, self.ambiguity_types, self.ambiguity_messages)
+        self.quantifier_analyser = Quantifiers(self.word_list_service, self.nlp_service, self.ambiguity_types, self.ambiguity_messages, self.nlp_service.phrase_matcher)
         self.weakness_analyser = Weakness(self.word_list_service, self.nlp_service, self.ambiguity_types, self.ambiguity_messages)
 
 
@@ -32,6 +34,15 @@ class AmbiguityAnalyser():
         self.quantifier_analyser.has_quantifiers(obj)
         self.weakness_analyser.is_weak(obj)
         return obj
+    
+
+    def tokenise_and_pos_tag_texts(self, objs: list, analysis_context: AnalysisContext) -> None:
+        """
+        POS tag the text the ambiguity checks look at for a list of user stories or ACs in one call to the tagger
+        The tags are memoised in the analysis context for when each object is checked
+        """
+        texts = [self.nlp_service.remove_all_quotes_from_string(obj.original_lower_text) for obj in objs]
+        self.nlp_service.tokenise_words_batch(texts, analysis_context)
 
 
 class Subjectivity():
@@ -47,30 +58,32 @@ class Subjectivity():
         Checks that a sentence is not subjective
         """
         text_without_quotes = self.nlp_service.remove_all_quotes_from_string(obj.original_lower_text)
-        comparatives, superlative = self.has_superlatives_comparatives(text_without_quotes)
+        comparatives, superlative = self.has_superlatives_comparatives(text_without_quotes, obj.analysis_context)
 
         if len(superlative) > 0:
-            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.superlative(superlative))
+            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.superlative, superlative)
 
         if len(comparatives) > 0:
-            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.comparative(comparatives))
+            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.comparative, comparatives)
 
 
-    def has_superlatives_comparatives(self, text: str) -> tuple:
+    def has_superlatives_comparatives(self, text: str, analysis_context: AnalysisContext | None = None) -> tuple:
         """
         Checks for superlatives and comparatives in a sentence
         Returns a tuple of lists in the form (comparatives, superlatives)
         """
-        return self.nlp_service.ambiguity_service.find_comparatives_superlatives(text)
+        return self.nlp_service.ambiguity_service.find_comparatives_superlatives(text, analysis_context)
     
 
 class Vagueness():
 
-    def __init__(self, word_list_service: WordlistService, nlp_service: NLPService, ambiguity_types: AmbiguityErrorTypes, ambiguity_messages: AmbiguityErrorMessages) -> None:
+    def __init__(self, word_list_service: WordlistService, nlp_service: NLPService, ambiguity_types: AmbiguityErrorTypes, ambiguity_messages: AmbiguityErrorMessages,
+                 phrase_matcher: PhraseMatcher | None = None) -> None:
         self.word_list_service = word_list_service
         self.nlp_service = nlp_service
         self.ambiguity_types = ambiguity_types
         self.ambiguity_messages = ambiguity_messages
+        self.phrase_matcher = phrase_matcher if phrase_matcher != None else PhraseMatcher(word_list_service)
 
 
     def is_vague(self, obj: UserStory | AcceptanceCriteria) -> None:
@@ -78,33 +91,29 @@ class Vagueness():
         Checks an AC or user story for vagueness and adds corresponding defects to the object
         """
         text_without_quotes = self.nlp_service.remove_all_quotes_from_string(obj.original_lower_text)
-        vague_terms = self.contains_vague_terms(text_without_quotes)
+        vague_terms = self.contains_vague_terms(text_without_quotes, obj.analysis_context)
 
         if len(vague_terms) > 0:
-            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.vague_terms(vague_terms))
+            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.vague_terms, vague_terms)
 
 
-    def contains_vague_terms(self, text: str) -> list:
+    def contains_vague_terms(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
         """
         Checks a string for whether it contains vague terms
         Returns a list of the vague terms found in the string
         """
-        vague_terms = self.word_list_service.get_vague_terms_list()
-        vague_terms_found = []
-        for term in vague_terms:
-            if f" {term} " in text:
-                vague_terms_found.append(term)
-
-        return vague_terms_found
+        return self.phrase_matcher.find_terms(text, VAGUE_TERMS, analysis_context)
 
 
 class NonCommitment():
 
-    def __init__(self, word_list_service: WordlistService, nlp_service: NLPService, ambiguity_types: AmbiguityErrorTypes, ambiguity_messages: AmbiguityErrorMessages) -> None:
+    def __init__(self, word_list_service: WordlistService, nlp_service: NLPService, ambiguity_types: AmbiguityErrorTypes, ambiguity_messages: AmbiguityErrorMessages,
+                 phrase_matcher: PhraseMatcher | None = None) -> None:
         self.word_list_service = word_list_service
         self.nlp_service = nlp_service
         self.ambiguity_types = ambiguity_types
         self.ambiguity_messages = ambiguity_messages
+        self.phrase_matcher = phrase_matcher if phrase_matcher != None else PhraseMatcher(word_list_service)
 
     
     def is_non_commital(self, obj: UserStory | AcceptanceCriteria) -> None:
@@ -112,25 +121,18 @@ class NonCommitment():
         Checks for indications of non-commitment to a statement
         """
         text_without_quotes = self.nlp_service.remove_all_quotes_from_string(obj.original_lower_text)
-        escape_clauses = self.contains_escape_clauses(text_without_quotes)
+        escape_clauses = self.contains_escape_clauses(text_without_quotes, obj.analysis_context)
         
         if len(escape_clauses) > 0:
-            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.escape_clauses(escape_clauses))
+            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.escape_clauses, escape_clauses)
 
 
-    def contains_escape_clauses(self, text: str) -> list:
+    def contains_escape_clauses(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
         """
         Checks for escape clauses in the given text
         Returns a list of found escape clauses
         """
-        escape_clauses = self.word_list_service.get_escape_clause_list()
-        escape_clauses_found = []
-        for term in escape_clauses:
-            if f" {term} " in text:
-                escape_clauses_found.append(term)
-
-        return escape_clauses_found
-    
+        return self.phrase_matcher.find_terms(text, ESCAPE_CLAUSES, analysis_context)
 
 class Anaphora():
 
@@ -147,26 +149,28 @@ class Anaphora():
         Example: She is running --> anaphora: who is she?
         """
         text_without_quotes = self.nlp_service.remove_all_quotes_from_string(obj.original_lower_text)
-        anaphora = self.contains_anaphora_indicators(text_without_quotes)
+        anaphora = self.contains_anaphora_indicators(text_without_quotes, obj.analysis_context)
 
         if len(anaphora) > 0:
-            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.anaphora(anaphora))
+            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.anaphora, anaphora)
 
 
-    def contains_anaphora_indicators(self, text: str) -> list:
+    def contains_anaphora_indicators(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
         """
         Checks for instances of anaphora in the given text
         Returns a list of found anaphora indicators
         """
-        return self.nlp_service.ambiguity_service.find_anaphora_indicators(text)
+        return self.nlp_service.ambiguity_service.find_anaphora_indicators(text, analysis_context)
     
 class Quantifiers():
 
-    def __init__(self, word_list_service: WordlistService, nlp_service: NLPService, ambiguity_types: AmbiguityErrorTypes, ambiguity_messages: AmbiguityErrorMessages) -> None:
+    def __init__(self, word_list_service: WordlistService, nlp_service: NLPService, ambiguity_types: AmbiguityErrorTypes, ambiguity_messages: AmbiguityErrorMessages,
+                 phrase_matcher: PhraseMatcher | None = None) -> None:
         self.word_list_service = word_list_service
         self.nlp_service = nlp_service
         self.ambiguity_types = ambiguity_types
         self.ambiguity_messages = ambiguity_messages
+        self.phrase_matcher = phrase_matcher if phrase_matcher != None else PhraseMatcher(word_list_service)
 
     
     def has_quantifiers(self, obj: UserStory | AcceptanceCriteria) -> None:
@@ -174,25 +178,18 @@ class Quantifiers():
         Checks for quantifiers in a user story or AC
         """
         text_without_quotes = self.nlp_service.remove_all_quotes_from_string(obj.original_lower_text)
-        quantifiers = self.contains_quantifiers(text_without_quotes)
+        quantifiers = self.contains_quantifiers(text_without_quotes, obj.analysis_context)
 
         if len(quantifiers) > 0:
-            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.quantifiers(quantifiers))
+            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.quantifiers, quantifiers)
 
 
-    def contains_quantifiers(self, text: str) -> list:
+    def contains_quantifiers(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
         """
         Checks for instances of quantification in the given text
         Returns a list of found quantification indicators
         """
-        quantifiers = self.word_list_service.get_quantifiers_list()
-        quantifiers_found = []
-        for term in quantifiers:
-            if f" {term} " in text:
-                quantifiers_found.append(term)
-
-        return quantifiers_found
-    
+        return self.phrase_matcher.find_terms(text, QUANTIFIERS, analysis_context)
 
 class Weakness():
 
@@ -208,23 +205,17 @@ class Weakness():
         Checks for weakness in a user story or AC
         """
         text_without_quotes = self.nlp_service.remove_all_quotes_from_string(obj.original_lower_text)
-        weak_verbs = self.contains_weak_verbs(text_without_quotes)
+        weak_verbs = self.contains_weak_verbs(text_without_quotes, obj.analysis_context)
 
         if len(weak_verbs) > 0:
-            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.weakness(weak_verbs))
+            obj.add_defect(self.ambiguity_types.ambiguity, self.ambiguity_messages.weakness, weak_verbs)
 
 
-    def contains_weak_verbs(self, text: str) -> list:
+    def contains_weak_verbs(self, text: str, analysis_context: AnalysisContext | None = None) -> list:
         """
         Checks for instances of weak verbs in the given text
         Returns a list of found weak verbs
         """
-        weak_verbs = self.word_list_service.get_weak_verbs_list()
-        tokens = self.nlp_service.tokenise_words(text)
-        weak_verbs_found = []
-        for token in tokens:
-            word = token[0]
-            if (self.nlp_service.is_verb(token) or self.nlp_service.is_modal(token)) and word in weak_verbs:
-                weak_verbs_found.append(word)
-
-        return weak_verbs_found
\ No newline at end of file
+        tokens = self.nlp_service.tokenise_words(text, analysis_context)
+        features = self.nlp_service.get_token_features(tokens, analysis_context)
+        return [features.words[i] for i in features.positions(IS_WEAK_VERB)]
\ No newline at end of file
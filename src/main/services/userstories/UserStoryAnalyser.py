@@ -1,5 +1,4 @@
-import re
-
+from main.models.AnalysisContext import AnalysisContext
 from main.models.UserStory import UserStory
 from main.resources.USErrorMessages import USErrorMessages
 from main.resources.USErrorTypes import USErrorTypes
@@ -55,9 +54,9 @@ class WellFormed():
         """
         Check that the means of a story passes all associated rules
         """
-        not_well_formed_but_has_means = self.user_story_defect_types.well_formed in story.defects \
-            and self.user_story_error_messages.missing_means not in story.defects[self.user_story_defect_types.well_formed]
-        well_formed = self.user_story_defect_types.well_formed not in story.defects
+        not_well_formed_but_has_means = story.has_defect(self.user_story_defect_types.well_formed) \
+            and not story.has_defect(self.user_story_defect_types.well_formed, self.user_story_error_messages.missing_means)
+        well_formed = not story.has_defect(self.user_story_defect_types.well_formed)
 
         starts_with_i = self.check_means_starts_with_i(story.means)
 
@@ -98,11 +97,11 @@ class FullSentence():
         """
         Check the means has the correct parts of speech
         """
-        not_well_formed_but_has_means = self.user_story_defect_types.well_formed in story.defects \
-            and self.user_story_error_messages.missing_means not in story.defects[self.user_story_defect_types.well_formed]
-        well_formed = self.user_story_defect_types.well_formed not in story.defects
+        not_well_formed_but_has_means = story.has_defect(self.user_story_defect_types.well_formed) \
+            and not story.has_defect(self.user_story_defect_types.well_formed, self.user_story_error_messages.missing_means)
+        well_formed = not story.has_defect(self.user_story_defect_types.well_formed)
 
-        missing_verb, missing_noun = self.check_means_pos(story.means_pos)
+        missing_verb, missing_noun = self.check_means_pos(story.means_pos, analysis_context=story.analysis_context)
 
         if missing_verb and (not_well_formed_but_has_means or well_formed):
             story.add_defect(self.user_story_defect_types.full_sentence, self.user_story_error_messages.means_missing_second_verb)    
@@ -110,11 +109,11 @@ class FullSentence():
             story.add_defect(self.user_story_defect_types.full_sentence, self.user_story_error_messages.means_missing_noun)
 
     
-    def check_means_pos(self, pos: list, min_verbs: int = 2, min_nouns: int = 1) -> bool:
+    def check_means_pos(self, pos: list, min_verbs: int = 2, min_nouns: int = 1, analysis_context: AnalysisContext | None = None) -> bool:
         """
         Check that the means contains at least one verb and one noun
         """
-        found_verbs, found_noun = self.nlp_service.has_required_number_verb_and_noun(pos, min_nouns, min_verbs, True)
+        found_verbs, found_noun = self.nlp_service.has_required_number_verb_and_noun(pos, min_nouns, min_verbs, True, analysis_context)
         missing_verb = pos != None and not found_verbs
         missing_noun = pos != None and not found_noun
         return missing_verb, missing_noun
@@ -126,9 +125,9 @@ class FullSentence():
         """
         missing_noun = self.check_role_missing_noun(story.role_pos)
 
-        not_well_formed_and_missing_role = self.user_story_defect_types.well_formed in story.defects \
-            and self.user_story_error_messages.missing_role not in story.defects[self.user_story_defect_types.well_formed]
-        well_formed = self.user_story_defect_types.well_formed not in story.defects
+        not_well_formed_and_missing_role = story.has_defect(self.user_story_defect_types.well_formed) \
+            and not story.has_defect(self.user_story_defect_types.well_formed, self.user_story_error_messages.missing_role)
+        well_formed = not story.has_defect(self.user_story_defect_types.well_formed)
 
         if missing_noun and (not_well_formed_and_missing_role or well_formed):
             story.add_defect(self.user_story_defect_types.full_sentence, self.user_story_error_messages.role_doesnt_end_with_noun)
@@ -151,7 +150,12 @@ class FullSentence():
         Checks that the ends has some words after the indicator
         """
         ends = story.ends
-        if ends != None and len(ends.split()) < 3:
+        if ends == None:
+            return
+        num_words = story.analysis_context.get_word_count(ends)
+        if num_words == None:
+            num_words = len(ends.split())
+        if num_words < 3:
             story.add_defect(self.user_story_defect_types.full_sentence, self.user_story_error_messages.ends_missing_words)
 
 
@@ -170,9 +174,9 @@ class Atomic():
         """
         Check that a user story is atomic
         """
-        more_than_one_role = self.has_conjunctions_with_valid_chunks_either_side(story.role, self.valid_role)
-        more_than_one_means = self.has_conjunctions_with_valid_chunks_either_side(story.means, self.valid_means)
-        list_of_verbs_in_means = self.nlp_service.list_service.has_list_of_verbs(story.means)
+        more_than_one_role = self.has_conjunctions_with_valid_chunks_either_side(story.role, self.valid_role, story.analysis_context)
+        more_than_one_means = self.has_conjunctions_with_valid_chunks_either_side(story.means, self.valid_means, story.analysis_context)
+        list_of_verbs_in_means = self.nlp_service.list_service.has_list_of_verbs(story.means, story.analysis_context)
 
         if more_than_one_role:
             story.add_defect(self.user_story_defect_types.atomic, self.user_story_error_messages.more_than_one_role)
@@ -184,7 +188,7 @@ class Atomic():
             story.add_defect(self.user_story_defect_types.atomic, self.user_story_error_messages.list_of_verbs_in_means)
 
 
-    def has_conjunctions_with_valid_chunks_either_side(self, chunk: str, is_valid) -> bool:
+    def has_conjunctions_with_valid_chunks_either_side(self, chunk: str, is_valid, analysis_context: AnalysisContext | None = None) -> bool:
         """
         Check if a chunk of a user story has conjunctions
         For it to be a violation, it needs to be a valid chunk either side of the conjunction
@@ -195,7 +199,7 @@ class Atomic():
 
         for part in parts:
             if part not in self.word_list_service.conjunctions:
-                pos = self.nlp_service.tokenise_words(part)
+                pos = self.nlp_service.tokenise_words(part, analysis_context)
                 valid = is_valid(pos)
                 if valid:
                     num_valid += 1
@@ -227,8 +231,7 @@ class Atomic():
         Split a string on each conjunction, removing the conjuction and leaving the text either side of it
         """
         if chunk:
-            pattern = r'(?<!\w)(?:' + '|'.join(map(re.escape, self.word_list_service.conjunctions)) + r')(?!\w)'
-            split_text = re.split(pattern, chunk)
+            split_text = self.nlp_service.get_conjunctions_pattern().split(chunk)
             split_text = [part.strip() for part in split_text if part.strip()]
             return split_text
         return []
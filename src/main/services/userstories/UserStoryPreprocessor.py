@@ -1,3 +1,5 @@
+from main.models.AnalysisContext import AnalysisContext
+from main.models.TokenFeatures import IS_NOUN_IGNORING_I, IS_VERB
 from main.models.UserStory import UserStory
 from main.resources.USErrorMessages import USErrorMessages
 from main.resources.USErrorTypes import USErrorTypes
@@ -40,6 +42,35 @@ class UserStoryPreprocessor():
         return user_story, can_be_processed
     
 
+    def pre_process_story_texts(self, story_texts: list, analysis_context: AnalysisContext | None = None) -> list:
+        """
+        Preprocess a list of story texts in the same way as pre_process_story_text
+        The role, means and ends of every story are POS tagged together in one call to the tagger, and the stories share one analysis context
+        Returns a list of (user story, can be processed) tuples in the same order as the given list
+        """
+        analysis_context = analysis_context if analysis_context != None else AnalysisContext()
+        processed_stories = []
+        for story_text in story_texts:
+            user_story = UserStory(story_text.lower(), story_text)
+            user_story.analysis_context = analysis_context
+            right_number_of_roles_means_ends = self.check_only_one_role_means_ends(user_story)
+            correct_ordering_of_role_means_ends = self.check_role_means_ends_ordering(user_story)
+            correct_length = self.has_okay_length(user_story)
+            can_be_processed = right_number_of_roles_means_ends and correct_ordering_of_role_means_ends and correct_length
+            if can_be_processed:
+                self.split_story_into_chunks(user_story)
+            processed_stories.append((user_story, can_be_processed))
+
+        chunks = [self.nlp_service.get_string_without_punctuation(chunk) for story, can_be_processed in processed_stories if can_be_processed
+                  for chunk in [story.role, story.means, story.ends] if chunk != None]
+        self.nlp_service.tokenise_words_batch(chunks, analysis_context)
+
+        for story, can_be_processed in processed_stories:
+            if can_be_processed:
+                self.tokenise_and_pos_tag_chunks(story)
+        return processed_stories
+
+
     def check_only_one_role_means_ends(self, story: UserStory) -> bool:
         """
         Checks that there is only one role, one means, and one ends
@@ -82,8 +113,10 @@ class UserStoryPreprocessor():
         """
         Checks that the user story is in the right length range
         """
-        words = story.original_lower_text.split(" ")
-        too_big = len(words) > MAX_LENGTH
+        num_words = story.analysis_context.get_word_count(story.original_lower_text, " ")
+        if num_words == None:
+            num_words = len(story.original_lower_text.split(" "))
+        too_big = num_words > MAX_LENGTH
 
         if too_big:
             story.add_defect(self.user_story_defect_types.length, self.user_story_error_messages.too_long)
@@ -120,7 +153,7 @@ class UserStoryPreprocessor():
         Take the role of a user story and split it into tokens and tag each token with a POS tag
         """
         if chunk != None:
-            pos = self.nlp_service.tokenise_words(self.nlp_service.get_string_without_punctuation(chunk))
+            pos = self.nlp_service.tokenise_words(self.nlp_service.get_string_without_punctuation(chunk), story.analysis_context)
             self.add_pos_to_user_story(story, part, pos)
             
 
@@ -154,18 +187,18 @@ class UserStoryPreprocessor():
         elif role_pos !=-1 and means_pos == -1 and ends_pos == -1:
             role = story.original_lower_text[role_pos:].strip()
         else:
-            role = self.find_user_persona_role(story.original_lower_text)
+            role = self.find_user_persona_role(story.original_lower_text, story.analysis_context)
             if role == None:
                 story.add_defect(self.user_story_defect_types.well_formed, self.user_story_error_messages.missing_role)
         story.role = role.lower() if role else None
 
     
-    def find_user_persona_role(self, text: str) -> str:
+    def find_user_persona_role(self, text: str, analysis_context: AnalysisContext | None = None) -> str:
         """
         Finds the word "as" followed by a proper noun, and returns up to this point. 
         This is to deal with the case where user personas are used instead of user types.
         """
-        text_pos = self.nlp_service.tokenise_words(text)
+        text_pos = self.nlp_service.tokenise_words(text, analysis_context)
         for i in range(1, len(text_pos)):
             curr = text_pos[i]
             prev = text_pos[i-1][0].lower()
@@ -200,16 +233,16 @@ class UserStoryPreprocessor():
         Tags the user story with a indicator to say the means is potential, not confirmed
         """
         story_text = self.remove_ends(story)
-        pos = self.nlp_service.tokenise_words(self.nlp_service.get_string_without_punctuation(story_text))
+        pos = self.nlp_service.tokenise_words(self.nlp_service.get_string_without_punctuation(story_text), story.analysis_context)
         story_text_list = story_text.split()
         potential_means_found = False
 
         if pos and len(pos) > 0:
-            first_noun_position = self.find_position_of_end_of_noun(pos, story_text_list)
+            first_noun_position = self.find_position_of_end_of_noun(pos, story_text_list, story.analysis_context)
             story.role = ' '.join(story_text_list[:first_noun_position])
             story_text_list = story_text_list[first_noun_position:]
             pos = pos[first_noun_position:]
-            found_verbs, found_nouns = self.nlp_service.has_required_number_verb_and_noun(pos, 1, 1)
+            found_verbs, found_nouns = self.nlp_service.has_required_number_verb_and_noun(pos, 1, 1, analysis_context=story.analysis_context)
             potential_means_found = found_verbs and found_nouns
 
             if potential_means_found:
@@ -232,27 +265,23 @@ class UserStoryPreprocessor():
         return story_text.strip()
 
 
-    def find_position_of_end_of_noun(self, pos: list, story_text_list: str) -> int:
+    def find_position_of_end_of_noun(self, pos: list, story_text_list: str, analysis_context: AnalysisContext | None = None) -> int:
         """
         Given a list of tokens with their associated POS tags
         Return the position of the first noun (1-indexed not 0-indexed)
         """
-        word_position = 0
-        done = False
-
-        while not done and word_position < len(pos):
-            if self.nlp_service.is_noun(pos[word_position], True):
-                marker = word_position
-                check_ahead_done = False
-                while not check_ahead_done and marker < len(pos):
-                    if not "," in story_text_list[marker-1] and not pos[marker][0] == "i":
-                        marker += 1
-                    else:
-                        word_position = marker - 1
-                        check_ahead_done = True
-                done = True
+        word_position = self.nlp_service.get_token_features(pos, analysis_context).find(IS_NOUN_IGNORING_I)
+        if word_position == -1:
+            return len(pos) + 1
+
+        marker = word_position
+        check_ahead_done = False
+        while not check_ahead_done and marker < len(pos):
+            if not "," in story_text_list[marker-1] and not pos[marker][0] == "i":
+                marker += 1
             else:
-                word_position += 1
+                word_position = marker - 1
+                check_ahead_done = True
         
         return word_position + 1
 
@@ -285,19 +314,12 @@ class UserStoryPreprocessor():
         word_list = story.means.split()
         means_pos = story.means_pos
 
-        total_nouns = 0
-        total_verbs = 0
-
-        position = 0
+        # the means ends at the token where both the nouns and the verbs reach their minimum, or runs to the end if they don't
+        features = self.nlp_service.get_token_features(means_pos, story.analysis_context)
+        last_noun = features.find_nth(IS_NOUN_IGNORING_I, min_nouns) if min_nouns > 0 else 0
+        last_verb = features.find_nth(IS_VERB, min_verbs) if min_verbs > 0 else 0
+        position = max(last_noun, last_verb) if last_noun != -1 and last_verb != -1 else len(means_pos)
 
-        for token in means_pos:
-            if self.nlp_service.is_noun(token, True):
-                total_nouns += 1
-            if self.nlp_service.is_verb(token):
-                total_verbs += 1
-            if total_verbs >= min_verbs and total_nouns >= min_nouns:
-                break
-            position += 1
         ends_list = word_list[position+1:]
 
         try:
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Measures how long a new app process takes to become ready: importing the app, creating it and warming up each model.
+# Every run is a fresh Python process, so nothing is already imported or loaded.
+# Usage: python3 -m main.startup_benchmark [--runs N] [--output FILE] [--max-seconds SECONDS]
+# Exits with status 1 when the median cold start takes longer than --max-seconds.
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+RESULTS_FILE = "startup_results.json"
+RUNS = 3
+TOTAL_STAGE = "total"
+CHILD_FLAG = "--child"
+
+def parse_args(argv: list | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python3 -m main.startup_benchmark", description="Benchmark the cold start time of an app process")
+    parser.add_argument("--runs", type=int, default=RUNS, help="number of fresh processes to time")
+    parser.add_argument("--output", default=RESULTS_FILE, help="file to write the results to as JSON")
+    parser.add_argument("--max-seconds", type=float, help="fail if the median cold start takes longer than this")
+    return parser.parse_args(argv)
+
+
+def time_startup() -> dict:
+    """
+    Runs in a fresh process: times each stage of starting the app, in the order a worker goes through them
+    """
+    timings = {}
+    start = time.perf_counter()
+    import nltk
+    timings["import_nltk"] = time.perf_counter() - start
+    stage_start = time.perf_counter()
+    import flask
+    timings["import_flask"] = time.perf_counter() - stage_start
+    stage_start = time.perf_counter()
+    import app
+    timings["import_app"] = time.perf_counter() - stage_start
+    stage_start = time.perf_counter()
+    app.create_app('config.TestingConfig')
+    timings["create_app"] = time.perf_counter() - stage_start
+    from main.services.AnalysisServices import AnalysisServices
+    for resource, seconds in AnalysisServices(BASE_PATH).warm_up().items():
+        timings[f"load_{resource}"] = seconds
+    timings[TOTAL_STAGE] = time.perf_counter() - start
+    return timings
+
+
+def run_child() -> dict:
+    """
+    Times one cold start in a new Python process
+    """
+    result = subprocess.run([sys.executable, "-m", "main.startup_benchmark", CHILD_FLAG], cwd=BASE_PATH, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"The app failed to start:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def summarise_runs(runs: list) -> dict:
+    """
+    The median and worst seconds of each stage across the runs
+    """
+    return {stage: {"median_seconds": round(statistics.median(run[stage] for run in runs), 6), "max_seconds": round(max(run[stage] for run in runs), 6)}
+            for stage in runs[0]}
+
+
+def main(argv: list | None = None) -> None:
+    if argv == None and sys.argv[1:] == [CHILD_FLAG]:
+        print(json.dumps(time_startup()))
+        return
+    args = parse_args(argv)
+    results = {"runs": args.runs, "stages": summarise_runs([run_child() for _ in range(args.runs)])}
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    for stage, summary in results["stages"].items():
+        print(f"{stage}: median {summary['median_seconds']}s, max {summary['max_seconds']}s")
+    print(f"Results written to {args.output}")
+
+    total = results["stages"][TOTAL_STAGE]["median_seconds"]
+    if args.max_seconds != None and total > args.max_seconds:
+        print(f"REGRESSION cold start took {total}s, more than {args.max_seconds}s")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
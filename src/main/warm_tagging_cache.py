@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+
+from main.cli import read_lines
+from main.services.AnalysisServices import AnalysisServices
+from main.services.TaggingCacheService import MAX_CACHED_TAGS, TAGGING_CACHE_FILE, TaggingCacheService
+
+# Fills the persistent tagging cache by analysing a corpus of user stories and ACs, so the app doesn't start cold.
+# Usage: python3 -m main.warm_tagging_cache [--cache FILE] [--max-entries N] [--stories FILE ...] [--acs FILE ...] [--prediction-log FILE ...]
+# Analyses us-test-data.txt and ac-test-data.txt when no corpus is given.
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+DATA_PATH = os.path.dirname(BASE_PATH)
+STORY_DATA_FILE = os.path.join(DATA_PATH, "us-test-data.txt")
+AC_DATA_FILE = os.path.join(DATA_PATH, "ac-test-data.txt")
+BATCH_SIZE = 100
+STORY_LOG_TYPE = "us"
+AC_LOG_TYPE = "ac"
+
+def parse_args(argv: list | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python3 -m main.warm_tagging_cache", description="Fill the persistent tagging cache from a corpus of user stories and ACs")
+    parser.add_argument("--cache", default=TAGGING_CACHE_FILE, help="tagging cache file to fill, as set by TAGGING_CACHE_FILE")
+    parser.add_argument("--max-entries", type=int, default=MAX_CACHED_TAGS, help="most entries to keep in the cache")
+    parser.add_argument("--stories", nargs="+", default=[], help="files with one user story per line")
+    parser.add_argument("--acs", nargs="+", default=[], help="files with one AC per line")
+    parser.add_argument("--prediction-log", nargs="+", default=[], help="prediction logs exported from the app, in JSON Lines")
+    return parser.parse_args(argv)
+
+
+def read_prediction_log(file_name: str) -> tuple:
+    """
+    Returns the (story texts, AC texts) sent to the app in a prediction log
+    """
+    story_texts = []
+    ac_texts = []
+    with open(file_name, encoding="utf-8") as file:
+        for line in file:
+            if line.strip() == "":
+                continue
+            record = json.loads(line)
+            texts = record["input"] if type(record["input"]) == list else [record["input"]]
+            if record["type"] == STORY_LOG_TYPE:
+                story_texts += texts
+            elif record["type"] == AC_LOG_TYPE:
+                ac_texts += texts
+    return story_texts, ac_texts
+
+
+def read_corpus(args: argparse.Namespace) -> tuple:
+    """
+    Returns the distinct (story texts, AC texts) from every corpus given, or from the shipped test data if none were
+    """
+    story_files, ac_files = args.stories, args.acs
+    if len(story_files) == 0 and len(ac_files) == 0 and len(args.prediction_log) == 0:
+        story_files, ac_files = [STORY_DATA_FILE], [AC_DATA_FILE]
+    story_texts = [text for _, _, text in read_lines(story_files)] if len(story_files) > 0 else []
+    ac_texts = [text for _, _, text in read_lines(ac_files)] if len(ac_files) > 0 else []
+    for file_name in args.prediction_log:
+        logged_story_texts, logged_ac_texts = read_prediction_log(file_name)
+        story_texts += logged_story_texts
+        ac_texts += logged_ac_texts
+    return list(dict.fromkeys(story_texts)), list(dict.fromkeys(ac_texts))
+
+
+def warm_up(analysis_services: AnalysisServices, story_texts: list, ac_texts: list) -> None:
+    """
+    Runs the corpus through the analysis pipeline in batches, which tags and chunks every text the same way a request would
+    """
+    analysis_pipeline = analysis_services.analysis_pipeline
+    for start in range(0, len(story_texts), BATCH_SIZE):
+        analysis_pipeline.analyse_stories(story_texts[start:start + BATCH_SIZE])
+    for start in range(0, len(ac_texts), BATCH_SIZE):
+        analysis_pipeline.analyse_acceptance_criteria([(ac_text, i) for i, ac_text in enumerate(ac_texts[start:start + BATCH_SIZE])])
+
+
+def main(argv: list | None = None) -> None:
+    args = parse_args(argv)
+    tagging_cache_service = TaggingCacheService(args.cache, args.max_entries)
+    analysis_services = AnalysisServices(BASE_PATH, tagging_cache_service)
+    analysis_services.warm_up()
+    story_texts, ac_texts = read_corpus(args)
+    warm_up(analysis_services, story_texts, ac_texts)
+    print(f"Analysed {len(story_texts)} stories and {len(ac_texts)} ACs, {tagging_cache_service.count()} entries in {args.cache}")
+    tagging_cache_service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+from flask import current_app
+
+def test_testing_config_is_used(test_client):
+    assert current_app.config['TESTING']
+    assert not current_app.config['DEBUG']
+
+def test_ready_reports_warming_up_before_tagger_is_loaded(test_client):
+    response = test_client.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json() == {"status": "warming_up", "tagger_loaded": False}
@@ -0,0 +1,7 @@
+def test_metrics_are_returned_in_prometheus_format(test_client):
+    response = test_client.get('/metrics')
+    metrics = response.get_data(as_text=True).splitlines()
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert "# TYPE story_quality_analysis_calls_total counter" in metrics
+    assert "story_quality_instrumentation_enabled 0" in metrics
@@ -0,0 +1,74 @@
+import json
+import pytest
+
+STORIES = [
+    "As a user I want to login to my account so that I can access my account.",
+    "As a user and as a writer I want to login to my account so that I can access my account.",
+    "I would like to redesign the page so that it matches the new Broker design styles.",
+    "As a user, I think it would be good to be able to share user feedback so that they are aware of their contributions to making Broker a better UX."
+]
+
+def helper(response):
+    """
+    Transforms the NDJSON returned by the batch API into a list of results
+    """
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_results_match_single_story_results(test_client):
+    stories = [{"id": f"US-{i}", "story_text": story_text} for i, story_text in enumerate(STORIES)]
+    response = test_client.post('/story/batch', json={"stories": stories})
+    results = helper(response)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert [result["id"] for result in results] == [story["id"] for story in stories]
+    for story_text, result in zip(STORIES, results):
+        single_response = test_client.post('/story', json={"story_text": story_text})
+        assert result["defects"] == single_response.json
+
+
+def test_batch_results_in_completion_order_has_every_story(test_client):
+    stories = [{"id": i, "story_text": story_text} for i, story_text in enumerate(STORIES * 30)]
+    response = test_client.post('/story/batch', json={"stories": stories, "order": "completion"})
+    results = helper(response)
+    assert response.status_code == 200
+    assert sorted(result["id"] for result in results) == list(range(len(stories)))
+
+
+def test_batch_with_too_many_stories_is_rejected(test_client):
+    stories = [{"id": i, "story_text": "As a user I want to login."} for i in range(5001)]
+    response = test_client.post('/story/batch', json={"stories": stories})
+    assert response.status_code == 413
+
+
+def test_batch_that_is_too_big_is_rejected(test_client):
+    stories = [{"id": 0, "story_text": "a" * (6 * 1024 * 1024)}]
+    response = test_client.post('/story/batch', json={"stories": stories})
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("body", [{}, {"stories": "As a user I want to login."}, {"stories": {"story_text": "As a user I want to login."}}, ["As a user I want to login."]])
+def test_batch_without_a_list_of_stories_is_rejected(test_client, body):
+    response = test_client.post('/story/batch', json=body)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("story", ["As a user I want to login.", ["As a user I want to login."], None, {"id": 1}, {"story_text": 5}, {"story_text": None}])
+def test_batch_with_a_story_that_is_not_a_story_is_rejected(test_client, story):
+    stories = [{"id": 0, "story_text": "As a user I want to login."}, story]
+    response = test_client.post('/story/batch', json={"stories": stories})
+    assert response.status_code == 400
+    assert response.json["index"] == 1
+    assert "Story 1" in response.json["error"]
+
+
+def test_stream_results_match_single_story_results(test_client):
+    lines = [json.dumps({"id": f"US-{i}", "story_text": story_text}) for i, story_text in enumerate(STORIES)]
+    response = test_client.post('/story/stream', data="\n".join(lines), content_type="application/x-ndjson")
+    results = helper(response)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert [result["id"] for result in results] == [f"US-{i}" for i in range(len(STORIES))]
+    for story_text, result in zip(STORIES, results):
+        single_response = test_client.post('/story', json={"story_text": story_text})
+        assert result["defects"] == single_response.json
@@ -0,0 +1,24 @@
+import os
+import shutil
+import pytest
+
+TENANT = "int-test-tenant"
+
+@pytest.fixture
+def tenant_dir():
+    tenant_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "main", "data", "tenants", TENANT)
+    yield tenant_dir
+    shutil.rmtree(tenant_dir, ignore_errors=True)
+
+def test_tenant_header_selects_wordlist_additions(test_client, tenant_dir):
+    shared_list = test_client.get('/word/noun').get_json()
+    response = test_client.post('/word/noun', json={"word": "int test noun"}, headers={"X-Tenant": TENANT})
+    assert response.get_json() == shared_list + ["int test noun"]
+    assert os.path.isfile(os.path.join(tenant_dir, "noun_exceptions.txt"))
+    assert test_client.get('/word/noun').get_json() == shared_list
+    assert test_client.get('/word/noun/int test noun', headers={"X-Tenant": TENANT}).status_code == 200
+    assert test_client.get('/word/noun/int test noun').status_code == 404
+
+def test_invalid_tenant_header_is_rejected(test_client):
+    response = test_client.get('/word/noun', headers={"X-Tenant": "../other"})
+    assert response.status_code == 400
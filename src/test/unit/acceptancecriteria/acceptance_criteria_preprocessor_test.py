@@ -194,4 +194,27 @@ def test_text_in_brackets_returns_text_without_brackets(acceptance_criteria_prep
     text_with_no_brackets = "Text with brackets (containing more information)"
     expected = "Text with brackets ()"
     acceptance_criteria_preprocessor.nlp_service.has_brackets_containing_information = Mock(return_value=["containing more information"])
-    assert acceptance_criteria_preprocessor.remove_brackets(text_with_no_brackets) == expected
\ No newline at end of file
+    assert acceptance_criteria_preprocessor.remove_brackets(text_with_no_brackets) == expected
+
+# batch preprocessing tests
+def test_pre_process_ac_texts_tags_all_chunks_and_clauses_in_two_batches(acceptance_criteria_preprocessor, valid_ac, ac_missing_event):
+    acceptance_criteria_preprocessor.nlp_service.remove_all_quotes_from_string = Mock(side_effect=lambda text: text)
+    acceptance_criteria_preprocessor.nlp_service.has_brackets_containing_information = Mock(return_value=[])
+    acceptance_criteria_preprocessor.nlp_service.get_string_without_punctuation = Mock(side_effect=lambda text: text)
+    acceptance_criteria_preprocessor.nlp_service.has_required_number_verb_and_noun = Mock(return_value=(True, True))
+    processed = acceptance_criteria_preprocessor.pre_process_ac_texts([(valid_ac, 0), (ac_missing_event, 1)])
+    chunk_batch, and_clause_batch = [call.args[0] for call in acceptance_criteria_preprocessor.nlp_service.tokenise_words_batch.call_args_list]
+    assert acceptance_criteria_preprocessor.nlp_service.tokenise_words_batch.call_count == 2
+    assert "given address book is running," in chunk_batch
+    assert "then address book contains 1 person" in chunk_batch
+    assert and_clause_batch == [clause for ac, can_be_processed in processed for clause in ac.context_and_clauses + ac.event_and_clauses + ac.outcome_and_clauses]
+    assert len(and_clause_batch) > 0
+    assert [ac.ac_number for ac, can_be_processed in processed] == [0, 1]
+    assert processed[0][0].analysis_context is processed[1][0].analysis_context
+
+def test_pre_process_ac_texts_does_not_tag_unprocessable_acs(acceptance_criteria_preprocessor):
+    acceptance_criteria_preprocessor.nlp_service.remove_all_quotes_from_string = Mock(side_effect=lambda text: text)
+    acceptance_criteria_preprocessor.nlp_service.has_brackets_containing_information = Mock(return_value=[])
+    processed = acceptance_criteria_preprocessor.pre_process_ac_texts([("then something happens, given a thing exists", 0)])
+    assert acceptance_criteria_preprocessor.nlp_service.tokenise_words_batch.call_args.args[0] == []
+    assert not processed[0][1]
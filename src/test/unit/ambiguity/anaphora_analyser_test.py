@@ -3,11 +3,12 @@ import pytest
 from unittest.mock import Mock
 
 from main.models.UserStory import UserStory
+from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
 from main.services.ambiguity.AmbiguityAnalyser import Anaphora
 
 @pytest.fixture
 def anaphora_analyser():
-    return Anaphora(Mock(), Mock(), Mock())
+    return Anaphora(Mock(), Mock(), AmbiguityErrorMessages())
 
 @pytest.fixture
 def obj():
@@ -3,11 +3,16 @@ import pytest
 from unittest.mock import Mock
 
 from main.models.UserStory import UserStory
+from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
 from main.services.ambiguity.AmbiguityAnalyser import Quantifiers
 
 @pytest.fixture
 def quantifiers_analyser():
-    return Quantifiers(Mock(), Mock(), Mock(), Mock())
+    word_list_service = Mock()
+    word_list_service.get_vague_terms_list = Mock(return_value=[])
+    word_list_service.get_escape_clause_list = Mock(return_value=[])
+    word_list_service.get_quantifiers_list = Mock(return_value=[])
+    return Quantifiers(word_list_service, Mock(), Mock(), AmbiguityErrorMessages())
 
 @pytest.fixture
 def obj():
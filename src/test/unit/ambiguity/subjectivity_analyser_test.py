@@ -3,11 +3,12 @@ import pytest
 from unittest.mock import Mock
 
 from main.models.UserStory import UserStory
+from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
 from main.services.ambiguity.AmbiguityAnalyser import Subjectivity
 
 @pytest.fixture
 def subjectivity_analyser():
-    return Subjectivity(Mock(), Mock(), Mock())
+    return Subjectivity(Mock(), Mock(), AmbiguityErrorMessages())
 
 @pytest.fixture
 def obj():
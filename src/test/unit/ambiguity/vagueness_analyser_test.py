@@ -3,11 +3,16 @@ import pytest
 from unittest.mock import Mock
 
 from main.models.UserStory import UserStory
+from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
 from main.services.ambiguity.AmbiguityAnalyser import Vagueness
 
 @pytest.fixture
 def vagueness_analyser():
-    return Vagueness(Mock(), Mock(), Mock(), Mock())
+    word_list_service = Mock()
+    word_list_service.get_vague_terms_list = Mock(return_value=[])
+    word_list_service.get_escape_clause_list = Mock(return_value=[])
+    word_list_service.get_quantifiers_list = Mock(return_value=[])
+    return Vagueness(word_list_service, Mock(), Mock(), AmbiguityErrorMessages())
 
 @pytest.fixture
 def obj():
@@ -38,6 +43,18 @@ def test_contains_vague_terms_no_vague_terms_in_list(vagueness_analyser):
     result = vagueness_analyser.contains_vague_terms(text)
     assert result == []
 
+def test_contains_vague_terms_at_start_and_end_of_text(vagueness_analyser):
+    vagueness_analyser.word_list_service.get_vague_terms_list = Mock(return_value=['quick', 'easy', 'user friendly'])
+    text = "easy to use and user friendly"
+    result = vagueness_analyser.contains_vague_terms(text)
+    assert result == ['easy', 'user friendly']
+
+def test_contains_vague_terms_needs_whole_words(vagueness_analyser):
+    vagueness_analyser.word_list_service.get_vague_terms_list = Mock(return_value=['quick'])
+    text = "the page should load quickly"
+    result = vagueness_analyser.contains_vague_terms(text)
+    assert result == []
+
 # is vague tests
 def test_is_vague_with_vague_terms(obj, vagueness_analyser):
     vagueness_analyser.contains_vague_terms = Mock(return_value=['some', 'many'])
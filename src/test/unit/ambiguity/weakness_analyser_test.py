@@ -3,11 +3,22 @@ import pytest
 from unittest.mock import Mock
 
 from main.models.UserStory import UserStory
+from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
 from main.services.ambiguity.AmbiguityAnalyser import Weakness
+from main.services.NLPService import POS
 
 @pytest.fixture
 def weakness_analyser():
-    return Weakness(Mock(), Mock(), Mock(), Mock())
+    return Weakness(Mock(), Mock(), Mock(), AmbiguityErrorMessages())
+
+@pytest.fixture(autouse=True)
+def token_features(weakness_analyser):
+    pos_service = POS(weakness_analyser.word_list_service)
+    weakness_analyser.word_list_service.get_noun_exceptions = Mock(return_value=[])
+    weakness_analyser.word_list_service.get_verb_exceptions = Mock(return_value=[])
+    weakness_analyser.word_list_service.get_verb_noun_exceptions = Mock(return_value=[])
+    weakness_analyser.word_list_service.get_weak_verbs_list = Mock(return_value=[])
+    weakness_analyser.nlp_service.get_token_features = pos_service.get_token_features
 
 @pytest.fixture
 def obj():
@@ -35,8 +46,6 @@ def test_contains_weak_verbs_with_weak_verbs(weakness_analyser, obj):
         (',', ','), ('but', 'CC'), ('you', 'PRP'), ('might', 'MD'),
         ('not', 'RB'), ('succeed', 'VB')
     ])
-    weakness_analyser.nlp_service.is_verb = Mock(return_value=True)
-    weakness_analyser.nlp_service.is_modal = Mock(return_value=True)
     result = weakness_analyser.contains_weak_verbs(text)
     assert result == ['could', 'might']
 
@@ -49,8 +58,6 @@ def test_contains_verbs_but_not_in_list(weakness_analyser, obj):
         (',', ','), ('but', 'CC'), ('you', 'PRP'), ('might', 'MD'),
         ('not', 'RB'), ('succeed', 'VB')
     ])
-    weakness_analyser.nlp_service.is_verb = Mock(return_value=True)
-    weakness_analyser.nlp_service.is_modal = Mock(return_value=True)
     result = weakness_analyser.contains_weak_verbs(text)
     assert result == []
 
@@ -62,21 +69,17 @@ def test_contains_weak_verbs_no_weak_verbs(weakness_analyser, obj):
         ('solve', 'VB'), ('this', 'DT'), ('problem', 'NN'),
         ('effectively', 'RB')
     ])
-    weakness_analyser.nlp_service.is_verb = Mock(return_value=False)
-    weakness_analyser.nlp_service.is_modal = Mock(return_value=False)
     result = weakness_analyser.contains_weak_verbs(text)
     assert result == []
 
 def test_contains_weak_verbs_but_no_weak_verbs(weakness_analyser, obj):
     text = "You are trying to solve this problem effectively."
-    weakness_analyser.word_list_service.get_weak_verbs_list = Mock(return_value=['trying'])
+    weakness_analyser.word_list_service.get_weak_verbs_list = Mock(return_value=['problem'])
     weakness_analyser.nlp_service.tokenise_words = Mock(return_value=[
         ('You', 'PRP'), ('are', 'VBP'), ('trying', 'VBG'), ('to', 'TO'),
         ('solve', 'VB'), ('this', 'DT'), ('problem', 'NN'),
         ('effectively', 'RB')
     ])
-    weakness_analyser.nlp_service.is_verb = Mock(return_value=False)
-    weakness_analyser.nlp_service.is_modal = Mock(return_value=False)
     result = weakness_analyser.contains_weak_verbs(text)
     assert result == []
 
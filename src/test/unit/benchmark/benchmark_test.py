@@ -0,0 +1,94 @@
+import pytest
+
+from unittest.mock import Mock
+from main import benchmark
+
+def build_corpus_results(items_per_second, peak_memory_bytes, p95_ms):
+    return {"corpora": {"stories_x1": {
+        "items_per_second": items_per_second,
+        "peak_memory_bytes": peak_memory_bytes,
+        "stages": {"Atomic.is_atomic": {"p50_ms": 1.0, "p95_ms": p95_ms, "p99_ms": p95_ms}}
+    }}}
+
+@pytest.fixture
+def analysis_services():
+    analysis_services = Mock()
+    analysis_services.user_story_preprocessor.pre_process_story_text = Mock(side_effect=lambda text: (text, text != "bad"))
+    analysis_services.acceptance_criteria_preprocessor.pre_process_ac_text = Mock(side_effect=lambda ac: (ac[0], ac[0] != "bad"))
+    return analysis_services
+
+# corpus tests
+def test_scale_corpus_repeats_lines_in_the_same_order_every_time():
+    corpus = benchmark.scale_corpus(["a", "b", "c"], 3)
+    assert sorted(corpus) == ["a", "a", "a", "b", "b", "b", "c", "c", "c"]
+    assert corpus == benchmark.scale_corpus(["a", "b", "c"], 3)
+
+def test_scale_of_one_keeps_corpus():
+    assert benchmark.scale_corpus(["a", "b", "c"], 1) == ["a", "b", "c"]
+
+# summary tests
+def test_percentile_uses_nearest_rank():
+    samples = list(range(1, 101))
+    assert benchmark.percentile(samples, 50) == 50
+    assert benchmark.percentile(samples, 95) == 95
+    assert benchmark.percentile(samples, 99) == 99
+    assert benchmark.percentile([7], 99) == 7
+
+def test_summarise_samples_in_milliseconds():
+    summary = benchmark.summarise_samples([0.003, 0.001, 0.002])
+    assert summary == {"samples": 3, "p50_ms": 2.0, "p95_ms": 3.0, "p99_ms": 3.0, "mean_ms": 2.0, "total_ms": 6.0}
+
+# stage timing tests
+def test_story_rules_are_skipped_when_story_cannot_be_processed(analysis_services):
+    timings = {}
+    benchmark.analyse_stories(analysis_services, ["good", "bad"], timings)
+    assert len(timings["pre_process_story_text"]) == 2
+    assert len(timings["total"]) == 2
+    assert len(timings["WellFormed.is_well_formed"]) == 1
+    assert len(timings["Weakness.is_weak"]) == 1
+
+def test_ac_ambiguity_checks_run_when_ac_cannot_be_processed(analysis_services):
+    timings = {}
+    benchmark.analyse_acceptance_criteria(analysis_services, ["good", "bad"], timings)
+    assert len(timings["Singular.is_singular"]) == 1
+    assert len(timings["Vagueness.is_vague"]) == 2
+    assert len(timings["Unique.are_unique"]) == 1
+    analysis_services.acceptance_criteria_analyser.unique_analyser.are_unique.assert_called_once_with(["good", "bad"])
+
+def test_pipeline_stories_are_analysed_in_chunks_sharing_a_context(analysis_services):
+    analysis_services.analysis_pipeline.analyse_stories = Mock(side_effect=lambda texts, analysis_context: texts)
+    timings = {}
+    benchmark.analyse_stories_in_pipeline(analysis_services, ["story"] * (benchmark.CHUNK_SIZE + 1), timings)
+    assert [len(call.args[0]) for call in analysis_services.analysis_pipeline.analyse_stories.call_args_list] == [benchmark.CHUNK_SIZE, 1]
+    assert len(timings["AnalysisPipeline.analyse_stories"]) == 2
+    assert timings["total"] == timings["AnalysisPipeline.analyse_stories"]
+
+def test_pipeline_acs_are_numbered_and_checked_for_uniqueness_together(analysis_services):
+    analysis_services.analysis_pipeline.analyse_acceptance_criteria = Mock(side_effect=lambda acs, analysis_context: [ac_text for ac_text, ac_number in acs])
+    timings = {}
+    benchmark.analyse_acceptance_criteria_in_pipeline(analysis_services, ["a"] * benchmark.CHUNK_SIZE + ["b"], timings)
+    assert analysis_services.analysis_pipeline.analyse_acceptance_criteria.call_args_list[-1].args[0] == [("b", benchmark.CHUNK_SIZE)]
+    analysis_services.analysis_pipeline.find_uniqueness_defects.assert_called_once_with(["a"] * benchmark.CHUNK_SIZE + ["b"])
+    assert len(timings["Unique.are_unique"]) == 1
+    assert len(timings["total"]) == 2
+
+def test_benchmark_corpus_reports_throughput_and_memory(analysis_services):
+    results = benchmark.benchmark_corpus(benchmark.analyse_stories, analysis_services, ["good"] * 5)
+    assert results["items"] == 5
+    assert results["peak_memory_bytes"] >= 0
+    assert results["stages"]["total"]["samples"] == 5
+
+# regression tests
+def test_no_regressions_within_threshold():
+    assert benchmark.find_regressions(build_corpus_results(90, 110, 1.1), build_corpus_results(100, 100, 1.0)) == []
+
+def test_regressions_are_flagged():
+    regressions = benchmark.find_regressions(build_corpus_results(50, 200, 2.0), build_corpus_results(100, 100, 1.0))
+    assert len(regressions) == 4
+    assert regressions[0] == "stories_x1: items/sec fell from 100 to 50"
+
+def test_small_latency_changes_are_not_flagged():
+    assert benchmark.find_regressions(build_corpus_results(100, 100, 0.02), build_corpus_results(100, 100, 0.01)) == []
+
+def test_corpora_missing_from_baseline_are_skipped():
+    assert benchmark.find_regressions(build_corpus_results(1, 1000, 9.0), {"corpora": {}}) == []
@@ -0,0 +1,31 @@
+import json
+import pytest
+
+from main import memory_benchmark
+
+# model tests
+@pytest.mark.parametrize("compact_model, dict_model, defect_sets", [
+    (memory_benchmark.UserStory, memory_benchmark.DictUserStory, memory_benchmark.STORY_DEFECTS),
+    (memory_benchmark.AcceptanceCriteria, memory_benchmark.DictAcceptanceCriteria, memory_benchmark.AC_DEFECTS)
+])
+def test_both_layouts_have_the_same_defects(compact_model, dict_model, defect_sets):
+    corpus = [f"line {i}" for i in range(10)]
+    compact_items = memory_benchmark.build_items(compact_model, corpus, defect_sets)
+    dict_items = memory_benchmark.build_items(dict_model, corpus, defect_sets)
+    assert [{type: list(messages) for type, messages in item.defects.items()} for item in compact_items] == [item.defects for item in dict_items]
+
+def test_compact_models_use_less_memory():
+    results = memory_benchmark.run_benchmarks(20, ["As a user, I want to log in so that I can see my reports"], ["Given I am logged in when I click save then the report is saved"])
+    assert results["models"]["stories"]["items"] == 20
+    assert results["models"]["stories"]["reduction"] > 0
+    assert results["models"]["acceptance_criteria"]["reduction"] > 0
+
+# budget tests
+def test_too_small_reduction_fails(monkeypatch, tmp_path):
+    summary = {"items": 1, "compact_bytes_per_item": 90.0, "dict_bytes_per_item": 100.0, "reduction": 0.1}
+    monkeypatch.setattr(memory_benchmark, "run_benchmarks", lambda scale, story_lines, ac_lines: {"models": {"stories": summary}})
+    output = tmp_path / "memory_results.json"
+    with pytest.raises(SystemExit) as exit:
+        memory_benchmark.main(["--output", str(output), "--min-reduction", "0.2"])
+    assert exit.value.code == 1
+    assert json.loads(output.read_text())["models"]["stories"]["reduction"] == 0.1
@@ -0,0 +1,24 @@
+import json
+import pytest
+
+from main import startup_benchmark
+
+# summary tests
+def test_runs_are_summarised_by_median_and_max():
+    runs = [{"import_app": 1.0, "total": 3.0}, {"import_app": 2.0, "total": 5.0}, {"import_app": 4.0, "total": 4.0}]
+    summary = startup_benchmark.summarise_runs(runs)
+    assert summary["import_app"] == {"median_seconds": 2.0, "max_seconds": 4.0}
+    assert summary["total"] == {"median_seconds": 4.0, "max_seconds": 5.0}
+
+# budget tests
+def test_slow_cold_start_fails(monkeypatch, tmp_path):
+    monkeypatch.setattr(startup_benchmark, "run_child", lambda: {"import_app": 1.0, "total": 3.0})
+    output = tmp_path / "startup_results.json"
+    with pytest.raises(SystemExit) as exit:
+        startup_benchmark.main(["--runs", "2", "--output", str(output), "--max-seconds", "2"])
+    assert exit.value.code == 1
+    assert json.loads(output.read_text())["stages"]["total"]["median_seconds"] == 3.0
+
+def test_cold_start_within_budget_passes(monkeypatch, tmp_path):
+    monkeypatch.setattr(startup_benchmark, "run_child", lambda: {"total": 1.0})
+    startup_benchmark.main(["--runs", "1", "--output", str(tmp_path / "startup_results.json"), "--max-seconds", "2"])
@@ -0,0 +1,83 @@
+import io
+import json
+import pytest
+
+from unittest.mock import Mock
+from main import cli
+
+class Analysed():
+
+    def __init__(self, defects):
+        self.defects = defects
+
+@pytest.fixture
+def analysis_services():
+    analysis_services = Mock()
+    analysis_services.base_path = ""
+    analysis_services.analysis_pipeline.analyse_stories = Mock(side_effect=lambda texts: [Analysed({"Atomic": [text]}) for text in texts])
+    analysis_services.analysis_pipeline.analyse_acceptance_criteria = Mock(side_effect=lambda acs: [Analysed({"Essential": [f"AC {i}"]}) for text, i in acs])
+    analysis_services.analysis_pipeline.analyse_stories_corpus = Mock(side_effect=lambda texts: [Analysed({"Atomic": [text]}) for text in texts])
+    return analysis_services
+
+@pytest.fixture
+def story_file(tmp_path):
+    story_file = tmp_path / "stories.txt"
+    story_file.write_text("As a user, I want one.\n\nAs a user, I want two.\n", encoding="utf-8")
+    return str(story_file)
+
+def read_results(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+# argument tests
+def test_default_args_read_stories_from_stdin():
+    args = cli.parse_args([])
+    assert args.files == ["-"]
+    assert args.type == "story"
+    assert args.jobs == 1
+    assert not args.stats
+    assert not args.corpus
+
+# run tests
+def test_stories_are_written_as_json_lines_skipping_blank_lines(analysis_services, story_file):
+    output = io.StringIO()
+    assert cli.run(cli.parse_args([story_file]), analysis_services, output, io.StringIO()) == 2
+    results = read_results(output)
+    assert [result["line"] for result in results] == [1, 3]
+    assert results[1] == {"file": story_file, "line": 3, "text": "As a user, I want two.", "defects": [{"title": "Atomic", "description": ["As a user, I want two."]}]}
+
+def test_acs_are_numbered_in_input_order(analysis_services, story_file):
+    output = io.StringIO()
+    cli.run(cli.parse_args(["--type", "ac", story_file]), analysis_services, output, io.StringIO())
+    results = read_results(output)
+    assert [result["defects"] for result in results] == [[{"title": "Essential", "descriptions": ["AC 0"]}], [{"title": "Essential", "descriptions": ["AC 1"]}]]
+
+def test_corpus_mode_uses_the_corpus_pipeline(analysis_services, story_file):
+    output = io.StringIO()
+    cli.run(cli.parse_args(["--corpus", story_file]), analysis_services, output, io.StringIO())
+    assert [result["text"] for result in read_results(output)] == ["As a user, I want one.", "As a user, I want two."]
+    analysis_services.analysis_pipeline.analyse_stories_corpus.assert_called_once()
+    analysis_services.analysis_pipeline.analyse_stories.assert_not_called()
+
+def test_corpus_mode_analyses_large_chunks(analysis_services, tmp_path):
+    story_file = tmp_path / "stories.txt"
+    story_file.write_text("".join(f"As a user, I want {i}.\n" for i in range(100)), encoding="utf-8")
+    cli.run(cli.parse_args(["--corpus", str(story_file)]), analysis_services, io.StringIO(), io.StringIO())
+    analysis_services.analysis_pipeline.analyse_stories_corpus.assert_called_once()
+
+def test_corpus_chunks_are_split_between_jobs():
+    assert cli.get_chunk_size(cli.parse_args(["--corpus", "--jobs", "4"]), 10000) == 2500
+    assert cli.get_chunk_size(cli.parse_args(["--corpus", "--jobs", "4"]), 10) == cli.CHUNK_SIZE
+    assert cli.get_chunk_size(cli.parse_args(["--corpus"]), 100000) == cli.CORPUS_CHUNK_SIZE
+    assert cli.get_chunk_size(cli.parse_args([]), 100000) == cli.CHUNK_SIZE
+
+def test_stats_are_written_when_asked_for(analysis_services, story_file):
+    stats_output = io.StringIO()
+    cli.run(cli.parse_args(["--stats", story_file]), analysis_services, io.StringIO(), stats_output)
+    stats = json.loads(stats_output.getvalue())
+    assert stats["items"] == 2
+    assert "rules" in stats
+
+def test_stats_are_not_written_by_default(analysis_services, story_file):
+    stats_output = io.StringIO()
+    cli.run(cli.parse_args([story_file]), analysis_services, io.StringIO(), stats_output)
+    assert stats_output.getvalue() == ""
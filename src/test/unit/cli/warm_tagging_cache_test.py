@@ -0,0 +1,32 @@
+import json
+
+from unittest.mock import Mock
+from main import warm_tagging_cache
+
+# corpus tests
+def test_shipped_test_data_is_used_when_no_corpus_is_given():
+    args = warm_tagging_cache.parse_args([])
+    story_texts, ac_texts = warm_tagging_cache.read_corpus(args)
+    assert len(story_texts) > 0
+    assert len(ac_texts) > 0
+
+def test_prediction_logs_are_split_into_distinct_stories_and_acs(tmp_path):
+    log_file = tmp_path / "prediction_log.jsonl"
+    records = [
+        {"type": "us", "input": "As a user, I want one."},
+        {"type": "us", "input": ["As a user, I want one.", "As a user, I want two."]},
+        {"type": "ac", "input": ["Given a, when b, then c"]}
+    ]
+    log_file.write_text("\n".join(json.dumps(record) for record in records) + "\n", encoding="utf-8")
+    args = warm_tagging_cache.parse_args(["--prediction-log", str(log_file)])
+    story_texts, ac_texts = warm_tagging_cache.read_corpus(args)
+    assert story_texts == ["As a user, I want one.", "As a user, I want two."]
+    assert ac_texts == ["Given a, when b, then c"]
+
+# warm up tests
+def test_corpus_is_analysed_in_batches(monkeypatch):
+    monkeypatch.setattr(warm_tagging_cache, "BATCH_SIZE", 2)
+    analysis_services = Mock()
+    warm_tagging_cache.warm_up(analysis_services, ["one", "two", "three"], ["ac one"])
+    assert analysis_services.analysis_pipeline.analyse_stories.call_count == 2
+    analysis_services.analysis_pipeline.analyse_acceptance_criteria.assert_called_once_with([("ac one", 0)])
@@ -0,0 +1,113 @@
+import pytest
+
+from flask import Flask
+from unittest.mock import Mock
+from main.controllers.AcceptanceCriteriaController import AcceptanceCriteriaController
+from main.models.AcceptanceCriteria import AcceptanceCriteria
+from main.resources.ACErrorMessages import ACErrorMessages
+from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
+from main.resources.ACErrorTypes import ACErrorTypes
+from main.services.AcSessionService import AcSessionService, get_content_hash
+from main.services.ResultCacheService import ResultCacheService
+from main.services.acceptancecriteria.AcceptanceCriteriaAnalyser import Unique
+
+def analyse(method_name, acs):
+    analysed_criteria = []
+    for ac_text, ac_number in acs:
+        ac = AcceptanceCriteria(ac_text.lower(), ac_text)
+        ac.ac_number = ac_number
+        ac.add_defect("Essential", AmbiguityErrorMessages().quantifiers, [ac_text])
+        analysed_criteria.append(ac)
+    return analysed_criteria
+
+@pytest.fixture
+def analysis_executor():
+    return Mock(map=Mock(side_effect=analyse))
+
+@pytest.fixture
+def acceptance_criteria_controller(analysis_executor):
+    return AcceptanceCriteriaController(Mock(), analysis_executor, Mock(), ResultCacheService(Mock(version=0)))
+
+# result cache tests
+def test_only_uncached_acs_are_analysed(acceptance_criteria_controller, analysis_executor):
+    acceptance_criteria_controller.analyse_acceptance_criteria([("Given a", 0), ("Given b", 1)])
+    acs = acceptance_criteria_controller.analyse_acceptance_criteria([("Given c", 0), ("given a", 1), ("Given b", 2)])
+    analysis_executor.map.assert_called_with("analyse_acceptance_criteria", [("Given c", 0)])
+    assert [ac.ac_number for ac in acs] == [0, 1, 2]
+    assert [ac.original_lower_text for ac in acs] == ["given c", "given a", "given b"]
+    assert acs[1].defects == {"Essential": (AmbiguityErrorMessages().quantifiers(["Given a"]),)}
+
+def test_fully_cached_acs_are_not_sent_for_analysis(acceptance_criteria_controller, analysis_executor):
+    acceptance_criteria_controller.analyse_acceptance_criteria([("Given a", 0)])
+    acceptance_criteria_controller.analyse_acceptance_criteria([("Given a", 0)])
+    assert analysis_executor.map.call_count == 1
+
+def test_without_cache_every_ac_is_analysed(analysis_executor):
+    acceptance_criteria_controller = AcceptanceCriteriaController(Mock(), analysis_executor, Mock())
+    acceptance_criteria_controller.analyse_acceptance_criteria([("Given a", 0)])
+    acceptance_criteria_controller.analyse_acceptance_criteria([("Given a", 0)])
+    assert analysis_executor.map.call_count == 2
+
+# session tests
+@pytest.fixture
+def session_controller(analysis_executor):
+    ac_session_service = AcSessionService(Unique(Mock(), ACErrorTypes(), ACErrorMessages()))
+    return AcceptanceCriteriaController(Mock(count_tagger_calls=Mock(return_value=0)), analysis_executor, Mock(), None, ac_session_service)
+
+def check_session(controller, body):
+    with Flask(__name__).test_request_context(json=body):
+        return controller.check_acceptance_criteria_session()
+
+def test_session_only_analyses_edited_acs(session_controller, analysis_executor):
+    delta, status, headers = check_session(session_controller, {"acceptance_criteria": [{"id": "a", "text": "Given a"}, {"id": "b", "text": "Given b"}]})
+    session_id = delta["session_id"]
+    assert status == 200
+    assert [item["id"] for item in delta["updated"]] == ["a", "b"]
+    delta, status, headers = check_session(session_controller, {"session_id": session_id, "acceptance_criteria": [
+        {"id": "a", "hash": get_content_hash("Given a")},
+        {"id": "b", "text": "Given b edited"}
+    ]})
+    analysis_executor.map.assert_called_with("analyse_acceptance_criteria", [("Given b edited", 1)])
+    assert delta["session_id"] == session_id
+    assert [item["id"] for item in delta["updated"]] == ["b"]
+
+def test_session_asks_for_text_it_has_not_seen(session_controller):
+    result, status = check_session(session_controller, {"acceptance_criteria": [{"id": "a", "hash": "abc"}]})
+    assert status == 409
+    assert result["missing"] == ["a"]
+
+def test_session_moves_between_worker_processes_after_one_resend(analysis_executor):
+    def create_worker():
+        ac_session_service = AcSessionService(Unique(Mock(), ACErrorTypes(), ACErrorMessages()))
+        return AcceptanceCriteriaController(Mock(count_tagger_calls=Mock(return_value=0)), analysis_executor, Mock(), None, ac_session_service)
+    first_worker, second_worker, third_worker = create_worker(), create_worker(), create_worker()
+    acs = [{"id": "a", "text": "Given a"}, {"id": "b", "text": "Given b"}]
+    delta, status, headers = check_session(first_worker, {"acceptance_criteria": acs})
+    session_id = delta["session_id"]
+    result, status = check_session(second_worker, {"session_id": session_id, "acceptance_criteria": [{"id": "a", "hash": get_content_hash("Given a")}, {"id": "b", "text": "Given b edited"}]})
+    assert status == 409
+    assert result["session_id"] == session_id
+    assert result["missing"] == ["a"]
+    delta, status, headers = check_session(third_worker, {"session_id": session_id, "acceptance_criteria": [{"id": "a", "text": "Given a"}, {"id": "b", "text": "Given b edited"}]})
+    assert status == 200
+    assert delta["session_id"] == session_id
+    assert [item["id"] for item in delta["updated"]] == ["a", "b"]
+
+def test_session_needs_unique_ids(session_controller):
+    result, status = check_session(session_controller, {"acceptance_criteria": [{"id": "a", "text": "x"}, {"id": "a", "text": "y"}]})
+    assert status == 400
+
+def test_session_asks_for_every_text_again_after_the_wordlists_change(analysis_executor):
+    word_list_service = Mock(version=1)
+    ac_session_service = AcSessionService(Unique(Mock(), ACErrorTypes(), ACErrorMessages()), word_list_service=word_list_service)
+    controller = AcceptanceCriteriaController(Mock(count_tagger_calls=Mock(return_value=0)), analysis_executor, Mock(), None, ac_session_service)
+    delta, status, headers = check_session(controller, {"acceptance_criteria": [{"id": "a", "text": "Given a"}, {"id": "b", "text": "Given b"}]})
+    session_id = delta["session_id"]
+    word_list_service.version = 2
+    hashes = [{"id": "a", "hash": get_content_hash("Given a")}, {"id": "b", "hash": get_content_hash("Given b")}]
+    result, status = check_session(controller, {"session_id": session_id, "acceptance_criteria": hashes})
+    assert status == 409
+    assert result["missing"] == ["a", "b"]
+    delta, status, headers = check_session(controller, {"session_id": session_id, "acceptance_criteria": [{"id": "a", "text": "Given a"}, {"id": "b", "text": "Given b"}]})
+    assert status == 200
+    analysis_executor.map.assert_called_with("analyse_acceptance_criteria", [("Given a", 0), ("Given b", 1)])
@@ -0,0 +1,15 @@
+from unittest.mock import Mock
+from main.controllers.HealthController import HealthController
+
+# readiness tests
+def test_not_ready_until_tagger_is_loaded():
+    health_controller = HealthController(Mock(is_warm=Mock(return_value=False)))
+    result, status = health_controller.get_readiness()
+    assert status == 503
+    assert result["status"] == "warming_up"
+
+def test_ready_once_tagger_is_loaded():
+    health_controller = HealthController(Mock(is_warm=Mock(return_value=True), warm_up_timings={"pos_tagger": 0.5}))
+    result, status = health_controller.get_readiness()
+    assert status == 200
+    assert result == {"status": "ready", "tagger_loaded": True, "warm_up_seconds": {"pos_tagger": 0.5}}
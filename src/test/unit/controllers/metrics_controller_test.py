@@ -0,0 +1,39 @@
+import pytest
+
+from unittest.mock import Mock
+from main.controllers.MetricsController import MetricsController
+from main.services.InstrumentationService import InstrumentationService
+
+@pytest.fixture
+def instrumentation_service():
+    return InstrumentationService()
+
+@pytest.fixture
+def metrics_controller(instrumentation_service):
+    prediction_log_service = Mock(written_records=5, dropped_records=2)
+    return MetricsController(instrumentation_service, prediction_log_service)
+
+# prometheus format tests
+def test_metrics_report_disabled_instrumentation_and_log_counters(metrics_controller):
+    metrics = metrics_controller.prepare_metrics().splitlines()
+    assert "story_quality_instrumentation_enabled 0" in metrics
+    assert "# TYPE story_quality_prediction_log_dropped_records_total counter" in metrics
+    assert "story_quality_prediction_log_written_records_total 5" in metrics
+    assert "story_quality_prediction_log_dropped_records_total 2" in metrics
+
+def test_metrics_report_calls_and_seconds_with_kind_labels(metrics_controller, instrumentation_service):
+    instrumentation_service.kinds["POS.tag_sentences"] = "tagging"
+    instrumentation_service.record("POS.tag_sentences", 0.25)
+    instrumentation_service.record("Atomic.is_atomic", 0.5, 2)
+    metrics = metrics_controller.prepare_metrics().splitlines()
+    assert 'story_quality_analysis_calls_total{kind="rule",name="Atomic.is_atomic"} 2' in metrics
+    assert 'story_quality_analysis_calls_total{kind="tagging",name="POS.tag_sentences"} 1' in metrics
+    assert 'story_quality_analysis_seconds_total{kind="tagging",name="POS.tag_sentences"} 0.25' in metrics
+
+def test_metrics_report_result_cache_counters(instrumentation_service):
+    result_cache_service = Mock(hits=3, misses=4, __len__=Mock(return_value=2))
+    metrics_controller = MetricsController(instrumentation_service, Mock(written_records=0, dropped_records=0), result_cache_service)
+    metrics = metrics_controller.prepare_metrics().splitlines()
+    assert "story_quality_result_cache_hits_total 3" in metrics
+    assert "story_quality_result_cache_misses_total 4" in metrics
+    assert "story_quality_result_cache_entries 2" in metrics
@@ -0,0 +1,60 @@
+import json
+import pytest
+
+from flask import Flask
+from unittest.mock import Mock
+from main.controllers.UserStoryController import UserStoryController
+from main.models.UserStory import UserStory
+from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
+from main.services.AnalysisExecutor import AnalysisExecutor
+
+def analyse(story_texts):
+    user_stories = []
+    for story_text in story_texts:
+        user_story = UserStory(story_text.lower(), story_text)
+        user_story.add_defect("Atomic", AmbiguityErrorMessages().vague_terms, [story_text])
+        user_stories.append(user_story)
+    return user_stories
+
+@pytest.fixture
+def prediction_log_service():
+    return Mock()
+
+@pytest.fixture
+def user_story_controller(prediction_log_service):
+    analysis_executor = AnalysisExecutor(Mock(analyse_stories=Mock(side_effect=analyse)), "")
+    return UserStoryController(Mock(), analysis_executor, prediction_log_service, max_stream_line_bytes=60)
+
+def check_stream(controller, body):
+    with Flask(__name__).test_request_context(data=body, content_type="application/x-ndjson"):
+        response = controller.check_user_story_stream()
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+# streaming tests
+def test_stream_returns_defects_in_input_order(user_story_controller):
+    lines = [json.dumps({"id": f"US-{i}", "story_text": f"story {i}"}) for i in range(5)]
+    results = check_stream(user_story_controller, "\n".join(lines))
+    assert results == [{"id": f"US-{i}", "defects": [{"title": "Atomic", "description": [AmbiguityErrorMessages().vague_terms([f"story {i}"])]}]} for i in range(5)]
+
+def test_stream_ids_default_to_line_numbers(user_story_controller):
+    results = check_stream(user_story_controller, '{"story_text": "a"}\n\n{"story_text": "b"}\n')
+    assert [result["id"] for result in results] == [1, 3]
+
+def test_stream_reports_lines_that_are_not_stories(user_story_controller):
+    body = '{"story_text": "a"}\nnot json\n{"id": 1}\n["a"]\n{"story_text": 5}\n' + '{"story_text": "' + "a" * 100 + '"}\n{"story_text": "b"}'
+    results = check_stream(user_story_controller, body)
+    assert [result.get("line") for result in results if "error" in result] == [2, 3, 4, 5, 6]
+    assert [result["id"] for result in results if "defects" in result] == [1, 7]
+
+def test_stream_reports_errors_in_line_order(user_story_controller):
+    body = '{"story_text": "a"}\n{"story_text": "b"}\nnot json\n{"story_text": "c"}\nnot json'
+    results = check_stream(user_story_controller, body)
+    assert [result.get("id", result.get("line")) for result in results] == [1, 2, 3, 4, 5]
+    assert ["error" in result for result in results] == [False, False, True, False, True]
+
+def test_stream_logs_every_chunk(user_story_controller, prediction_log_service):
+    check_stream(user_story_controller, "\n".join(json.dumps({"story_text": f"story {i}"}) for i in range(4)))
+    assert [call.args[2] for call in prediction_log_service.log_attempt.call_args_list] == [["story 0"], ["story 1", "story 2"], ["story 3"]]
+
+def test_empty_stream(user_story_controller):
+    assert check_stream(user_story_controller, "") == []
@@ -0,0 +1,76 @@
+import pytest
+
+from flask import Flask
+from main.controllers.WordController import WordController
+from main.repositories.EscapeClauseRepository import EscapeClauseRepository
+from main.repositories.NounExceptionRepository import NounExceptionRepository
+from main.repositories.QuantifiersRespository import QuantifiersRepository
+from main.repositories.VagueTermsRepository import VagueTermsRepository
+from main.repositories.VerbExceptionRepository import VerbExceptionRepository
+from main.repositories.VerbNounExceptionRepository import VerbNounExceptionRepository
+from main.repositories.WeakVerbsRepository import WeakVerbsRepository
+from main.routes.WordlistsBP import WordlistsBP
+from main.services.WordlistService import WordlistService
+
+@pytest.fixture
+def client(tmp_path):
+    data_dir = tmp_path / "main" / "data"
+    data_dir.mkdir(parents=True)
+    for file in ["noun_exceptions.txt", "verb_exceptions.txt", "verb_noun_exceptions.txt", "vague_terms.txt", "escape_clauses.txt", "quantifiers.txt", "weak_verbs.txt"]:
+        (data_dir / file).write_text("first\nsecond")
+    data_path = str(tmp_path)
+    word_list_service = WordlistService(
+        VerbNounExceptionRepository(data_path),
+        NounExceptionRepository(data_path),
+        VerbExceptionRepository(data_path),
+        VagueTermsRepository(data_path),
+        EscapeClauseRepository(data_path),
+        QuantifiersRepository(data_path),
+        WeakVerbsRepository(data_path)
+    )
+    app = Flask(__name__)
+    app.register_blueprint(WordlistsBP(WordController(word_list_service)).word_list_bp, url_prefix='/word')
+    return app.test_client()
+
+# bulk wordlist tests
+def test_get_whole_list(client):
+    response = client.get('/word/vague')
+    assert response.status_code == 200
+    assert response.get_json() == ["first", "second"]
+
+def test_put_replaces_whole_list(client):
+    response = client.put('/word/noun', json={"words": ["ui", " api ", "ui"]})
+    assert response.get_json() == ["ui", "api"]
+    assert client.get('/word/noun').get_json() == ["ui", "api"]
+
+def test_put_rejects_invalid_words(client):
+    assert client.put('/word/noun', json={"words": "ui"}).status_code == 400
+    assert client.put('/word/noun', json={"words": ["ui", ""]}).status_code == 400
+    assert client.get('/word/noun').get_json() == ["first", "second"]
+
+def test_lookup_and_delete_word(client):
+    assert client.get('/word/quantifier/first').get_json() == {"word": "first"}
+    response = client.delete('/word/quantifier/first')
+    assert response.get_json() == ["second"]
+    assert client.get('/word/quantifier/first').status_code == 404
+    assert client.delete('/word/quantifier/first').status_code == 404
+
+def test_unknown_list(client):
+    assert client.get('/word/adjective').status_code == 404
+    assert client.put('/word/adjective', json={"words": []}).status_code == 404
+
+def test_single_word_post_still_appends(client):
+    assert client.post('/word/noun', json={"word": "third"}).get_json() == ["first", "second", "third"]
+
+@pytest.mark.parametrize("wordlist", ["noun", "verb", "nounverb"])
+def test_post_adds_word(client, wordlist):
+    response = client.post(f'/word/{wordlist}', json={"word": " third "})
+    assert response.status_code == 200
+    assert response.get_json() == ["first", "second", "third"]
+
+@pytest.mark.parametrize("wordlist", ["noun", "verb", "nounverb"])
+@pytest.mark.parametrize("body", [{"word": "  "}, {"word": 5}, {}])
+def test_post_rejects_invalid_word(client, wordlist, body):
+    response = client.post(f'/word/{wordlist}', json=body)
+    assert response.status_code == 400
+    assert client.get(f'/word/{wordlist}').get_json() == ["first", "second"]
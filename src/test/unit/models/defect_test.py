@@ -0,0 +1,94 @@
+import pickle
+import pytest
+
+from main.models.AcceptanceCriteria import AcceptanceCriteria
+from main.models.Defect import Defect
+from main.models.UserStory import UserStory
+from main.resources.ACErrorMessages import ACErrorMessages
+from main.resources.ACErrorTypes import ACErrorTypes
+from main.resources.AmbiguityErrorMessages import AmbiguityErrorMessages
+from main.resources.AmbiguityErrorTypes import AmbiguityErrorTypes
+from main.resources.USErrorMessages import USErrorMessages
+from main.resources.USErrorTypes import USErrorTypes
+
+@pytest.fixture
+def user_story_error_messages():
+    return USErrorMessages(70)
+
+@pytest.fixture
+def ambiguity_messages():
+    return AmbiguityErrorMessages()
+
+# defect record tests
+def test_defects_are_rendered_in_the_order_they_were_found(user_story_error_messages, ambiguity_messages):
+    story = UserStory("", "")
+    story.add_defect(USErrorTypes().well_formed, user_story_error_messages.missing_means)
+    story.add_defect(AmbiguityErrorTypes().ambiguity, ambiguity_messages.vague_terms, ["some"])
+    story.add_defect(USErrorTypes().well_formed, user_story_error_messages.too_long)
+    assert list(story.defects.items()) == [
+        ("Well-formed", (user_story_error_messages.missing_means, user_story_error_messages.too_long)),
+        ("Ambiguity", (ambiguity_messages.vague_terms(["some"]),))
+    ]
+
+def test_defects_without_an_argument_share_one_record(user_story_error_messages):
+    stories = [UserStory("", ""), UserStory("", "")]
+    for story in stories:
+        story.add_defect(USErrorTypes().atomic, user_story_error_messages.more_than_one_means)
+    assert stories[0].defect_records[0] is stories[1].defect_records[0]
+
+def test_defects_with_an_argument_are_rendered_from_it(ambiguity_messages):
+    acs = [AcceptanceCriteria("", ""), AcceptanceCriteria("", "")]
+    acs[0].add_defect(AmbiguityErrorTypes().ambiguity, ambiguity_messages.quantifiers, ["all"])
+    acs[1].add_defect(AmbiguityErrorTypes().ambiguity, ambiguity_messages.quantifiers, ["every"])
+    assert acs[0].defects["Ambiguity"] == (ambiguity_messages.quantifiers(["all"]),)
+    assert acs[1].defects["Ambiguity"] == (ambiguity_messages.quantifiers(["every"]),)
+
+def test_has_defect(user_story_error_messages):
+    story = UserStory("", "")
+    story.add_defect(USErrorTypes().well_formed, user_story_error_messages.missing_role)
+    assert story.has_defect(USErrorTypes().well_formed)
+    assert story.has_defect(USErrorTypes().well_formed, user_story_error_messages.missing_role)
+    assert not story.has_defect(USErrorTypes().well_formed, user_story_error_messages.missing_means)
+    assert not story.has_defect(USErrorTypes().atomic)
+
+def test_has_defect_with_an_argument(ambiguity_messages):
+    story = UserStory("", "")
+    story.add_defect(AmbiguityErrorTypes().ambiguity, ambiguity_messages.vague_terms, ["some"])
+    assert story.has_defect(AmbiguityErrorTypes().ambiguity, ambiguity_messages.vague_terms, ["some"])
+    assert not story.has_defect(AmbiguityErrorTypes().ambiguity, ambiguity_messages.vague_terms, ["easily"])
+    assert not story.has_defect(AmbiguityErrorTypes().ambiguity, ambiguity_messages.quantifiers, ["some"])
+
+def test_defect_with_a_message_that_does_not_fit_is_rejected(user_story_error_messages, ambiguity_messages):
+    story = UserStory("", "")
+    with pytest.raises(TypeError):
+        story.add_defect(USErrorTypes().well_formed, "missing_means", ["some"])
+    with pytest.raises(TypeError):
+        story.add_defect(AmbiguityErrorTypes().ambiguity, ambiguity_messages.vague_terms)
+    with pytest.raises(TypeError):
+        story.add_defect(AmbiguityErrorTypes().ambiguity, print, ["some"])
+    assert story.defect_records == ()
+
+def test_defects_are_read_only(user_story_error_messages):
+    story = UserStory("", "")
+    story.add_defect(USErrorTypes().well_formed, user_story_error_messages.missing_role)
+    with pytest.raises(TypeError):
+        story.defects["Atomic"] = ("message",)
+    with pytest.raises(AttributeError):
+        story.defects = {"Atomic": ["message"]}
+    assert story.defects == {"Well-formed": (user_story_error_messages.missing_role,)}
+
+def test_models_have_no_instance_dict():
+    with pytest.raises(AttributeError):
+        UserStory("", "").unknown = None
+    with pytest.raises(AttributeError):
+        AcceptanceCriteria("", "").unknown = None
+
+def test_models_with_defects_can_be_sent_to_another_process(ambiguity_messages):
+    ac = AcceptanceCriteria("given a", "Given a")
+    ac.ac_number = 3
+    ac.add_defect(ACErrorTypes().integrous, ACErrorMessages().missing_event)
+    ac.add_defect(AmbiguityErrorTypes().ambiguity, ambiguity_messages.anaphora, ["it"])
+    copy = pickle.loads(pickle.dumps(ac))
+    assert copy.ac_number == 3
+    assert copy.defects == ac.defects
+    assert isinstance(copy.defect_records[0], Defect)
@@ -0,0 +1,83 @@
+import pytest
+
+from main.repositories.SqliteWordlistRepository import SqliteWordlistRepository
+from main.repositories.WordlistDatabase import WordlistDatabase
+from main.services.WordlistService import WordlistService
+
+WORDLISTS = ["verb_noun_exceptions", "noun_exceptions", "verb_exceptions", "vague_terms", "escape_clauses", "quantifiers", "weak_verbs"]
+
+@pytest.fixture
+def wordlist_database(tmp_path):
+    wordlist_database = WordlistDatabase(str(tmp_path / "wordlists.sqlite3"))
+    yield wordlist_database
+    wordlist_database.close()
+
+def make_word_list_service(wordlist_database):
+    return WordlistService(*[SqliteWordlistRepository(wordlist_database, wordlist) for wordlist in WORDLISTS])
+
+# import tests
+def test_list_is_only_imported_once(wordlist_database):
+    assert wordlist_database.get_version("vague_terms") == None
+    assert wordlist_database.import_words("vague_terms", ["some", "many"])
+    assert not wordlist_database.import_words("vague_terms", ["other"])
+    assert wordlist_database.get_words("vague_terms") == ["some", "many"]
+    assert wordlist_database.get_version("vague_terms") == 1
+
+def test_empty_list_counts_as_imported(wordlist_database):
+    assert wordlist_database.import_words("weak_verbs", [])
+    assert not wordlist_database.import_words("weak_verbs", ["be"])
+    assert wordlist_database.get_words("weak_verbs") == []
+
+# write tests
+def test_version_only_changes_with_the_list(wordlist_database):
+    assert wordlist_database.add_word("noun_exceptions", "ui")
+    assert not wordlist_database.add_word("noun_exceptions", "ui")
+    assert wordlist_database.get_version("noun_exceptions") == 1
+    assert wordlist_database.add_word("noun_exceptions", "api")
+    assert wordlist_database.get_words("noun_exceptions") == ["ui", "api"]
+    assert wordlist_database.get_version("noun_exceptions") == 2
+    assert wordlist_database.get_version("verb_exceptions") == None
+
+def test_replace_keeps_order_and_drops_duplicates(wordlist_database):
+    wordlist_database.replace_words("quantifiers", ["all", "some", "all", "few"])
+    assert wordlist_database.get_words("quantifiers") == ["all", "some", "few"]
+    assert not wordlist_database.replace_words("quantifiers", ["all", "some", "few"])
+    assert wordlist_database.get_version("quantifiers") == 1
+
+def test_delete_and_lookup(wordlist_database):
+    wordlist_database.replace_words("escape_clauses", ["if possible", "as needed"])
+    assert wordlist_database.contains("escape_clauses", "as needed")
+    assert wordlist_database.delete_word("escape_clauses", "as needed")
+    assert not wordlist_database.delete_word("escape_clauses", "as needed")
+    assert not wordlist_database.contains("escape_clauses", "as needed")
+    assert wordlist_database.get_version("escape_clauses") == 2
+
+def test_failed_write_is_rolled_back(wordlist_database):
+    def fail(connection):
+        connection.execute("DELETE FROM words")
+        raise RuntimeError("failed")
+    wordlist_database.add_word("noun_exceptions", "ui")
+    with pytest.raises(RuntimeError):
+        wordlist_database.write("noun_exceptions", fail)
+    assert wordlist_database.get_words("noun_exceptions") == ["ui"]
+    assert wordlist_database.get_version("noun_exceptions") == 1
+
+# wordlist service tests
+def test_service_reads_lists_from_database(wordlist_database):
+    wordlist_database.import_words("noun_exceptions", ["ui"])
+    wordlist_database.import_words("vague_terms", ["some", "many"])
+    word_list_service = make_word_list_service(wordlist_database)
+    assert word_list_service.get_noun_exceptions() == frozenset(["ui"])
+    assert word_list_service.get_vague_terms_list() == ("some", "many")
+    assert word_list_service.add_noun_exception("api") == ["ui", "api"]
+
+def test_other_process_picks_up_a_new_version(wordlist_database, tmp_path):
+    word_list_service = make_word_list_service(wordlist_database)
+    other_database = WordlistDatabase(wordlist_database.database_file)
+    other_service = make_word_list_service(other_database)
+    assert other_service.get_verb_exceptions() == frozenset()
+    word_list_service.replace_words("verb", ["frontend", "backend"])
+    assert other_service.get_verb_exceptions() == frozenset()
+    other_service.verb_exceptions.last_checked = None
+    assert other_service.get_verb_exceptions() == frozenset(["frontend", "backend"])
+    other_database.close()
@@ -0,0 +1,124 @@
+import pytest
+
+from unittest.mock import Mock, patch
+from main.resources.ACErrorMessages import ACErrorMessages
+from main.resources.ACErrorTypes import ACErrorTypes
+from main.services.AcSessionService import AcSessionService, get_content_hash
+from main.services.WordlistService import set_current_tenant
+from main.services.acceptancecriteria.AcceptanceCriteriaAnalyser import Unique
+
+@pytest.fixture
+def ac_session_service():
+    return AcSessionService(Unique(Mock(), ACErrorTypes(), ACErrorMessages()), 2, 60)
+
+def analysed(texts):
+    return {ac_id: (text.lower(), [{"title": "Essential", "descriptions": [text]}]) for ac_id, text in texts.items()}
+
+def hashes(texts):
+    return [(ac_id, get_content_hash(text)) for ac_id, text in texts.items()]
+
+@pytest.fixture
+def word_list_service():
+    return Mock(version=1)
+
+@pytest.fixture
+def tenant():
+    yield
+    set_current_tenant(None)
+
+# delta tests
+def test_first_request_returns_every_ac(ac_session_service):
+    session = ac_session_service.get_session(None)
+    texts = {"a": "Given a", "b": "Given b"}
+    assert session.get_changed_ids(hashes(texts)) == ["a", "b"]
+    delta = ac_session_service.update_session(session, hashes(texts), analysed(texts))
+    assert [(item["id"], item["title"]) for item in delta["updated"]] == [("a", "AC 1"), ("b", "AC 2")]
+    assert delta["removed"] == []
+    assert "uniqueness" not in delta
+
+def test_only_edited_acs_are_changed_and_returned(ac_session_service):
+    session = ac_session_service.get_session(None)
+    texts = {"a": "Given a", "b": "Given b", "c": "Given c"}
+    ac_session_service.update_session(session, hashes(texts), analysed(texts))
+    texts["b"] = "Given b edited"
+    assert session.get_changed_ids(hashes(texts)) == ["b"]
+    delta = ac_session_service.update_session(session, hashes(texts), analysed({"b": texts["b"]}))
+    assert delta["updated"] == [{"id": "b", "title": "AC 2", "defects": [{"title": "Essential", "descriptions": ["Given b edited"]}]}]
+
+def test_removed_acs_are_reported_and_later_acs_renumbered(ac_session_service):
+    session = ac_session_service.get_session(None)
+    texts = {"a": "Given a", "b": "Given b", "c": "Given c"}
+    ac_session_service.update_session(session, hashes(texts), analysed(texts))
+    del texts["a"]
+    delta = ac_session_service.update_session(session, hashes(texts), {})
+    assert delta["removed"] == ["a"]
+    assert [(item["id"], item["title"]) for item in delta["updated"]] == [("b", "AC 1"), ("c", "AC 2")]
+
+# uniqueness tests
+def test_duplicates_are_found_and_cleared_incrementally(ac_session_service):
+    session = ac_session_service.get_session(None)
+    texts = {"a": "Given a", "b": "Given b", "c": "Given c"}
+    ac_session_service.update_session(session, hashes(texts), analysed(texts))
+    texts["c"] = "GIVEN A"
+    delta = ac_session_service.update_session(session, hashes(texts), analysed({"c": texts["c"]}))
+    assert delta["uniqueness"] == ["The following ACs are duplicates: [1, 3]"]
+    texts["a"] = "Given d"
+    delta = ac_session_service.update_session(session, hashes(texts), analysed({"a": texts["a"]}))
+    assert delta["uniqueness"] == []
+
+def test_uniqueness_matches_full_check(ac_session_service):
+    session = ac_session_service.get_session(None)
+    texts = {"a": "x", "b": "y", "c": "x", "d": "y", "e": "y"}
+    delta = ac_session_service.update_session(session, hashes(texts), analysed(texts))
+    unique_analyser = ac_session_service.unique_analyser
+    acs = [Mock(original_lower_text=text) for text in texts.values()]
+    assert delta["uniqueness"] == unique_analyser.are_unique(acs)
+
+# session tests
+def test_sessions_are_found_by_id(ac_session_service):
+    session = ac_session_service.get_session(None)
+    assert ac_session_service.get_session(session.session_id) is session
+    assert ac_session_service.get_session("unknown") is not session
+
+def test_session_from_another_process_keeps_its_id(ac_session_service):
+    session = ac_session_service.get_session("0123456789abcdef0123456789abcdef")
+    assert session.session_id == "0123456789abcdef0123456789abcdef"
+    assert session.content_hashes == {}
+    assert ac_session_service.get_session("not a session id").session_id != "not a session id"
+
+@patch("main.services.AcSessionService.time.monotonic")
+def test_expired_session_is_replaced(monotonic, ac_session_service):
+    monotonic.return_value = 100.0
+    session = ac_session_service.get_session(None)
+    monotonic.return_value = 200.0
+    assert ac_session_service.get_session(session.session_id) is not session
+
+def test_least_recently_used_session_is_dropped(ac_session_service):
+    first = ac_session_service.get_session(None)
+    ac_session_service.get_session(None)
+    ac_session_service.get_session(None)
+    assert first.session_id not in ac_session_service.sessions
+
+# wordlist tests
+def test_unchanged_acs_are_changed_after_the_wordlists_change(word_list_service):
+    ac_session_service = AcSessionService(Unique(Mock(), ACErrorTypes(), ACErrorMessages()), 2, 60, word_list_service)
+    session = ac_session_service.get_session(None)
+    texts = {"a": "Given a", "b": "Given b"}
+    assert ac_session_service.get_changed_ids(session, hashes(texts)) == ["a", "b"]
+    ac_session_service.update_session(session, hashes(texts), analysed(texts))
+    assert ac_session_service.get_changed_ids(session, hashes(texts)) == []
+    word_list_service.version = 2
+    assert ac_session_service.get_changed_ids(session, hashes(texts)) == ["a", "b"]
+    assert ac_session_service.get_changed_ids(session, hashes(texts)) == ["a", "b"]
+    word_list_service.check_for_changes.assert_called()
+
+def test_unchanged_acs_are_changed_for_another_tenant(word_list_service, tenant):
+    ac_session_service = AcSessionService(Unique(Mock(), ACErrorTypes(), ACErrorMessages()), 2, 60, word_list_service)
+    session = ac_session_service.get_session(None)
+    texts = {"a": "Given a"}
+    set_current_tenant("tenant-a")
+    ac_session_service.get_changed_ids(session, hashes(texts))
+    ac_session_service.update_session(session, hashes(texts), analysed(texts))
+    assert ac_session_service.get_changed_ids(session, hashes(texts)) == []
+    set_current_tenant("tenant-b")
+    assert ac_session_service.get_changed_ids(session, hashes(texts)) == ["a"]
@@ -0,0 +1,156 @@
+import pytest
+import threading
+
+from concurrent.futures import Future
+from unittest.mock import Mock
+from main.services.AnalysisExecutor import AnalysisExecutor
+
+@pytest.fixture
+def analysis_pipeline():
+    pipeline = Mock()
+    pipeline.analyse_stories = Mock(side_effect=lambda items: [item.upper() for item in items])
+    return pipeline
+
+@pytest.fixture
+def analysis_executor(analysis_pipeline):
+    return AnalysisExecutor(analysis_pipeline, "", True, 4, 2, 5)
+
+# process pool threshold tests
+def test_small_inputs_are_analysed_in_process(analysis_executor):
+    assert not analysis_executor.should_use_process_pool(4)
+
+def test_large_inputs_use_process_pool(analysis_executor):
+    assert analysis_executor.should_use_process_pool(5)
+
+def test_disabled_process_pool_is_never_used(analysis_executor):
+    analysis_executor.use_process_pool = False
+    assert not analysis_executor.should_use_process_pool(1000)
+
+def test_single_worker_does_not_use_process_pool(analysis_executor):
+    analysis_executor.workers = 1
+    assert not analysis_executor.should_use_process_pool(1000)
+
+# in-process analysis tests
+def test_map_chunks_in_process_yields_chunks_in_order(analysis_executor, analysis_pipeline):
+    chunks = list(analysis_executor.map_chunks("analyse_stories", ["a", "b", "c"]))
+    assert chunks == [(0, ["A", "B"]), (2, ["C"])]
+    assert analysis_executor.pool == None
+
+def test_map_in_process_keeps_items_together(analysis_executor, analysis_pipeline):
+    assert analysis_executor.map("analyse_stories", ["a", "b", "c"]) == ["A", "B", "C"]
+    assert analysis_pipeline.analyse_stories.call_count == 1
+
+def test_map_chunks_with_no_items(analysis_executor):
+    assert list(analysis_executor.map_chunks("analyse_stories", [])) == []
+
+# worker stats tests
+def test_worker_returns_rule_timings_when_collecting_stats(monkeypatch, analysis_pipeline):
+    from main.services import AnalysisExecutor as analysis_executor_module
+    instrumentation_service = Mock()
+    instrumentation_service.get_stats = Mock(return_value={"Atomic.is_atomic": {"calls": 1, "seconds": 0.1}})
+    monkeypatch.setattr(analysis_executor_module, "worker_analysis_services", Mock(analysis_pipeline=analysis_pipeline))
+    monkeypatch.setattr(analysis_executor_module, "worker_instrumentation_service", instrumentation_service)
+    assert analysis_executor_module.analyse_in_worker("analyse_stories", ["a"]) == ["A"]
+    assert analysis_executor_module.analyse_in_worker("analyse_stories", ["b"], True) == (["B"], {"Atomic.is_atomic": {"calls": 1, "seconds": 0.1}})
+    instrumentation_service.reset.assert_called_once()
+
+# streaming tests
+class PendingFuture():
+    """
+    A future that only runs when its result is asked for, like a worker that is still busy
+    """
+    def __init__(self, function, args):
+        self.function = function
+        self.args = args
+        self.cancelled = False
+
+    def done(self):
+        return False
+
+    def result(self):
+        return self.function(*self.args)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def add_done_callback(self, callback):
+        pass
+
+@pytest.fixture
+def pending_pool(monkeypatch, analysis_pipeline, analysis_executor):
+    from main.services import AnalysisExecutor as analysis_executor_module
+    monkeypatch.setattr(analysis_executor_module, "worker_analysis_services", Mock(analysis_pipeline=analysis_pipeline))
+    futures = []
+    def submit(function, *args):
+        futures.append(PendingFuture(function, args))
+        return futures[-1]
+    analysis_executor.pool = Mock(submit=Mock(side_effect=submit), futures=futures)
+    return analysis_executor.pool
+
+def test_map_stream_in_process_starts_with_small_chunks(analysis_executor):
+    analysis_executor.use_process_pool = False
+    analysis_executor.chunk_size = 4
+    chunks = list(analysis_executor.map_stream("analyse_stories", iter("abcdefghijk")))
+    assert chunks == [(["a"], ["A"]), (["b", "c"], ["B", "C"]), (["d", "e", "f", "g"], ["D", "E", "F", "G"]), (["h", "i", "j", "k"], ["H", "I", "J", "K"])]
+
+def test_map_stream_in_process_reads_one_chunk_at_a_time(analysis_executor):
+    analysis_executor.use_process_pool = False
+    read = []
+    def items():
+        for item in "abcdef":
+            read.append(item)
+            yield item
+    chunks = analysis_executor.map_stream("analyse_stories", items())
+    assert next(chunks) == (["a"], ["A"])
+    assert read == ["a"]
+
+def test_map_stream_with_pool_keeps_input_order(analysis_executor, pending_pool):
+    chunks = list(analysis_executor.map_stream("analyse_stories", iter("abcdefg")))
+    assert chunks == [(["a"], ["A"]), (["b", "c"], ["B", "C"]), (["d", "e"], ["D", "E"]), (["f", "g"], ["F", "G"])]
+
+def test_map_stream_with_pool_only_reads_ahead_of_the_pending_chunks(analysis_executor, pending_pool):
+    read = []
+    def items():
+        for item in "abcdefghijklmnop":
+            read.append(item)
+            yield item
+    chunks = analysis_executor.map_stream("analyse_stories", items(), 3)
+    assert next(chunks) == (["a"], ["A"])
+    assert read == list("abcde")
+    chunks.close()
+    assert [future.cancelled for future in pending_pool.futures] == [False, True, True]
+
+def test_map_stream_with_no_items(analysis_executor, pending_pool):
+    assert list(analysis_executor.map_stream("analyse_stories", iter([]))) == []
+
+def test_map_stream_with_pool_yields_finished_results_while_the_next_item_is_arriving(analysis_executor, pending_pool):
+    futures = []
+    first_chunk_sent = threading.Event()
+    def submit(function, method_name, chunk, *args):
+        futures.append(Future())
+        first_chunk_sent.set()
+        if len(futures) > 1:
+            futures[-1].set_result([item.upper() for item in chunk])
+        return futures[-1]
+    pending_pool.submit.side_effect = submit
+    next_item_sent = threading.Event()
+    next_item_read = threading.Event()
+    def items():
+        yield "a"
+        first_chunk_sent.wait(5)
+        futures[0].set_result(["A"])
+        next_item_sent.wait(5)
+        next_item_read.set()
+        yield "b"
+    chunks = analysis_executor.map_stream("analyse_stories", items())
+    assert next(chunks) == (["a"], ["A"])
+    assert not next_item_read.is_set()
+    next_item_sent.set()
+    assert list(chunks) == [(["b"], ["B"])]
+
+def test_map_stream_with_pool_raises_errors_from_reading_the_items(analysis_executor, pending_pool):
+    def items():
+        yield "a"
+        raise ValueError("broken stream")
+    with pytest.raises(ValueError):
+        list(analysis_executor.map_stream("analyse_stories", items()))
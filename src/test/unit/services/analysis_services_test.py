@@ -0,0 +1,36 @@
+import os
+import pytest
+
+from unittest.mock import Mock
+from main.repositories.WordlistDatabase import WordlistDatabase
+from main.services.AnalysisServices import AnalysisServices
+
+@pytest.fixture
+def analysis_services():
+    analysis_services = AnalysisServices(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+    analysis_services.nlp_service.load_tokeniser = Mock()
+    analysis_services.nlp_service.pos_service.load_tagger = Mock()
+    return analysis_services
+
+# warm up tests
+def test_warm_up_reports_how_long_each_resource_took(analysis_services):
+    timings = analysis_services.warm_up()
+    assert list(timings) == ["punkt_tokeniser", "pos_tagger", "wordlists"]
+    assert all(seconds >= 0 for seconds in timings.values())
+    assert analysis_services.warm_up_timings == timings
+    analysis_services.nlp_service.load_tokeniser.assert_called_once()
+    analysis_services.nlp_service.pos_service.load_tagger.assert_called_once()
+
+def test_not_warm_until_tagger_is_loaded(analysis_services):
+    assert not analysis_services.is_warm()
+    analysis_services.nlp_service.pos_service.tagger = Mock()
+    assert analysis_services.is_warm()
+
+# wordlist database tests
+def test_wordlist_database_is_filled_from_the_files(tmp_path):
+    base_path = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+    wordlist_database = WordlistDatabase(str(tmp_path / "wordlists.sqlite3"))
+    analysis_services = AnalysisServices(base_path, wordlist_database=wordlist_database)
+    assert analysis_services.word_list_service.get_weak_verbs_list() == frozenset(analysis_services.weak_verbs_repository.get_weak_verbs())
+    assert wordlist_database.get_words("vague_terms") == analysis_services.vague_terms_repository.get_vague_terms()
+    wordlist_database.close()
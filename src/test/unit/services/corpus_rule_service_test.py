@@ -0,0 +1,125 @@
+import os
+import random
+import pytest
+
+from unittest.mock import Mock, patch
+from main.models.AnalysisContext import AnalysisContext
+from main.services.AnalysisServices import AnalysisServices
+from main.services.CorpusRuleService import CorpusRuleService
+from main.services.NLPService import POS
+
+BASE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+DATA_PATH = os.path.join(BASE_PATH, "..")
+WORDS = ["i", "user", "list", "login", "edit", "may", "the", "report", "filter", "quickly"]
+TAGS = ["NN", "NNS", "NNP", "VB", "VBD", "VBZ", "MD", "DT", "PRP", "RB"]
+VERBS = {"want", "be", "able", "click", "view", "enter", "get", "know", "see", "use", "have", "connect", "includes", "is", "am", "are", "create", "sign", "type", "tells", "takes", "determine", "consider", "arrange", "search", "select", "save", "add", "delete", "log"}
+
+@pytest.fixture
+def pos_service():
+    wordlist_service = Mock()
+    wordlist_service.get_noun_exceptions = Mock(return_value=["i"])
+    wordlist_service.get_verb_exceptions = Mock(return_value=["login"])
+    wordlist_service.get_verb_noun_exceptions = Mock(return_value=["list", "login", "filter", "report"])
+    wordlist_service.get_weak_verbs_list = Mock(return_value=["may"])
+    wordlist_service.version = 1
+    return POS(wordlist_service)
+
+@pytest.fixture
+def corpus_rule_service(pos_service):
+    return CorpusRuleService(pos_service)
+
+def random_chunks(seed, count=300):
+    generator = random.Random(seed)
+    chunks = [[(generator.choice(WORDS), generator.choice(TAGS)) for _ in range(generator.randint(0, 6))] for _ in range(count)]
+    chunks[::17] = [None] * len(chunks[::17])
+    return chunks
+
+def tag(sentences):
+    """
+    Tags words from a small vocabulary, so the pipeline can run without the NLTK tagger
+    """
+    tags = {"i": "PRP", "it": "PRP", "me": "PRP", "a": "DT", "an": "DT", "the": "DT", "my": "PRP$", "to": "TO", "and": "CC", "or": "CC",
+            "can": "MD", "should": "MD", "will": "MD", "must": "MD", "so": "RB", "that": "IN", "when": "WRB", "then": "RB", "given": "VBN"}
+    tagged_sentences = []
+    for sentence in sentences:
+        tagged_sentence = []
+        for word in sentence:
+            lower_word = word.lower()
+            if lower_word in tags:
+                tagged_sentence.append((word, tags[lower_word]))
+            elif lower_word in VERBS:
+                tagged_sentence.append((word, "VB"))
+            elif lower_word.endswith("ing") or lower_word.endswith("ed"):
+                tagged_sentence.append((word, "VBG" if lower_word.endswith("ing") else "VBN"))
+            elif not lower_word.isalpha():
+                tagged_sentence.append((word, "."))
+            else:
+                tagged_sentence.append((word, "NNS" if lower_word.endswith("s") else "NN"))
+        tagged_sentences.append(tagged_sentence)
+    return tagged_sentences
+
+def read_lines(file_name):
+    with open(os.path.join(DATA_PATH, file_name), encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+# verb and noun tests
+@pytest.mark.parametrize("required_nouns, required_verbs, ignore_i_as_noun", [(1, 1, False), (1, 2, False), (1, 2, True), (2, 1, True), (0, 3, False)])
+def test_verbs_and_nouns_match_the_per_chunk_check(corpus_rule_service, pos_service, required_nouns, required_verbs, ignore_i_as_noun):
+    chunks = random_chunks(required_nouns * 10 + required_verbs)
+    results = corpus_rule_service.has_required_number_verb_and_noun(chunks, required_nouns, required_verbs, ignore_i_as_noun)
+    assert results == [pos_service.has_required_number_verb_and_noun(pos, required_nouns, required_verbs, ignore_i_as_noun) for pos in chunks]
+
+def test_verb_and_noun_results_are_used_by_the_per_chunk_check(corpus_rule_service, pos_service):
+    analysis_context = AnalysisContext()
+    chunks = random_chunks(1)
+    results = corpus_rule_service.has_required_number_verb_and_noun(chunks, 1, 2, True, analysis_context)
+    pos_service.get_token_features = Mock()
+    assert [pos_service.has_required_number_verb_and_noun(pos, 1, 2, True, analysis_context) for pos in chunks] == results
+    pos_service.get_token_features.assert_not_called()
+
+def test_verb_and_noun_results_are_not_used_after_the_wordlists_change(corpus_rule_service, pos_service):
+    analysis_context = AnalysisContext()
+    pos = [("login", "VB"), ("quickly", "RB")]
+    assert corpus_rule_service.has_required_number_verb_and_noun([pos], 1, 1, analysis_context=analysis_context) == [(False, True)]
+    pos_service.wordlist_service.get_verb_exceptions = Mock(return_value=[])
+    pos_service.wordlist_service.version = 2
+    assert pos_service.has_required_number_verb_and_noun(pos, 1, 1, analysis_context=analysis_context) == (True, False)
+
+def test_no_chunks(corpus_rule_service):
+    assert corpus_rule_service.has_required_number_verb_and_noun([], 1, 1) == []
+    assert corpus_rule_service.has_required_number_verb_and_noun([None, []], 1, 1) == [(True, True), (False, False)]
+
+# word count tests
+def test_word_counts_match_split(corpus_rule_service):
+    texts = ["", " ", "so that i can log in", "  two  spaces ", "tab\tand\nnew line", "non breaking　space", "null\x00inside", "ends in null \x00", "\x00", "a" * 50]
+    assert corpus_rule_service.count_words(texts) == [len(text.split()) for text in texts]
+    assert corpus_rule_service.count_words(texts, " ") == [len(text.split(" ")) for text in texts]
+
+def test_word_counts_are_memoised(corpus_rule_service):
+    analysis_context = AnalysisContext()
+    corpus_rule_service.count_words(["so that i can", "so"], None, analysis_context)
+    assert analysis_context.get_word_count("so that i can") == 4
+    assert analysis_context.get_word_count("so", " ") == None
+
+# pipeline tests
+@pytest.fixture
+def analysis_services():
+    analysis_services = AnalysisServices(BASE_PATH)
+    analysis_services.nlp_service.pos_service.tagger = Mock(tag_sents=Mock(side_effect=tag))
+    return analysis_services
+
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.replace(",", " ,").replace(".", " .").split())
+@patch('main.services.NLPService.sent_tokenize', side_effect=lambda text: [text])
+def test_corpus_stories_match_the_per_item_path(sent_tokenize, word_tokenize, analysis_services):
+    story_texts = read_lines("us-test-data.txt") + ["As a user, I want " + "more " * 70 + "so that I can", "As a user, I want to log in so that x"]
+    analysis_pipeline = analysis_services.analysis_pipeline
+    expected = [list(story.defects.items()) for story in analysis_pipeline.analyse_stories(story_texts)]
+    assert [list(story.defects.items()) for story in analysis_pipeline.analyse_stories_corpus(story_texts)] == expected
+
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.replace(",", " ,").replace(".", " .").split())
+@patch('main.services.NLPService.sent_tokenize', side_effect=lambda text: [text])
+def test_corpus_acs_match_the_per_item_path(sent_tokenize, word_tokenize, analysis_services):
+    acs = [(text, i) for i, text in enumerate(read_lines("ac-test-data.txt"))]
+    analysis_pipeline = analysis_services.analysis_pipeline
+    expected = [list(ac.defects.items()) for ac in analysis_pipeline.analyse_acceptance_criteria(acs)]
+    assert [list(ac.defects.items()) for ac in analysis_pipeline.analyse_acceptance_criteria_corpus(acs)] == expected
@@ -0,0 +1,80 @@
+import pytest
+
+from types import SimpleNamespace
+from unittest.mock import Mock
+from main.services.InstrumentationService import InstrumentationService, INSTRUMENTED_PRIMITIVES, INSTRUMENTED_RULES
+
+@pytest.fixture
+def instrumentation_service():
+    return InstrumentationService()
+
+class Rule():
+
+    def is_valid(self, value):
+        return value * 2
+
+def build_analysis_services():
+    analysis_services = SimpleNamespace()
+    instrumented_methods = INSTRUMENTED_RULES + [(service_path, method_name) for service_path, method_name, kind in INSTRUMENTED_PRIMITIVES]
+    for service_path, method_name in instrumented_methods:
+        service = analysis_services
+        for attribute in service_path.split("."):
+            if not hasattr(service, attribute):
+                setattr(service, attribute, SimpleNamespace())
+            service = getattr(service, attribute)
+        setattr(service, method_name, Mock(return_value=method_name))
+    return analysis_services
+
+# wrapping tests
+def test_wrapped_method_records_calls_and_returns_result(instrumentation_service):
+    rule = Rule()
+    instrumentation_service.wrap(rule, "is_valid", "Rule.is_valid")
+    assert rule.is_valid(2) == 4
+    assert rule.is_valid(3) == 6
+    stats = instrumentation_service.get_stats()
+    assert stats["Rule.is_valid"]["calls"] == 2
+    assert stats["Rule.is_valid"]["seconds"] >= 0
+
+def test_wrapped_method_records_when_raising(instrumentation_service):
+    rule = Rule()
+    instrumentation_service.wrap(rule, "is_valid", "Rule.is_valid")
+    with pytest.raises(TypeError):
+        rule.is_valid(None)
+    assert instrumentation_service.get_stats()["Rule.is_valid"]["calls"] == 1
+
+def test_disabled_service_leaves_methods_alone(instrumentation_service):
+    analysis_services = build_analysis_services()
+    is_atomic = analysis_services.user_story_analyser.atomic_analyser.is_atomic
+    assert not instrumentation_service.enabled
+    assert analysis_services.user_story_analyser.atomic_analyser.is_atomic is is_atomic
+
+def test_enable_wraps_every_rule_once(instrumentation_service):
+    analysis_services = build_analysis_services()
+    instrumentation_service.enable(analysis_services)
+    is_atomic = analysis_services.user_story_analyser.atomic_analyser.is_atomic
+    instrumentation_service.enable(analysis_services)
+    assert analysis_services.user_story_analyser.atomic_analyser.is_atomic is is_atomic
+    assert is_atomic("story") == "is_atomic"
+    assert instrumentation_service.get_stats()["SimpleNamespace.is_atomic"]["calls"] == 1
+
+def test_enable_wraps_nlp_primitives_with_their_kind(instrumentation_service):
+    analysis_services = build_analysis_services()
+    instrumentation_service.enable(analysis_services)
+    analysis_services.nlp_service.pos_service.tag_sentences([["a"]])
+    assert instrumentation_service.get_stats()["SimpleNamespace.tag_sentences"]["calls"] == 1
+    assert instrumentation_service.get_kind("SimpleNamespace.tag_sentences") == "tagging"
+    assert instrumentation_service.get_kind("SimpleNamespace.is_atomic") == "rule"
+
+# stats tests
+def test_merge_stats_adds_to_existing_stats(instrumentation_service):
+    instrumentation_service.record("Rule.is_valid", 0.5)
+    instrumentation_service.merge_stats({"Rule.is_valid": {"calls": 3, "seconds": 1.5}, "Rule.other": {"calls": 1, "seconds": 0.25}})
+    assert instrumentation_service.get_stats() == {
+        "Rule.is_valid": {"calls": 4, "seconds": 2.0},
+        "Rule.other": {"calls": 1, "seconds": 0.25}
+    }
+
+def test_reset_clears_stats(instrumentation_service):
+    instrumentation_service.record("Rule.is_valid", 0.5)
+    instrumentation_service.reset()
+    assert instrumentation_service.get_stats() == {}
@@ -2,7 +2,7 @@ import pytest
 
 from unittest.mock import Mock
 from main.models.AcceptanceCriteria import AcceptanceCriteria
-from main.services.NLPService import Lists
+from main.services.NLPService import POS, Lists
 
 @pytest.fixture
 def list_service():
@@ -19,85 +19,154 @@ def ac():
     ac.outcome_and_clauses = ["text"]
     return ac
 
+def build_spans(text, noun_phrases):
+    """
+    Finds each noun phrase in the text from left to right, as the chunker would report them
+    """
+    spans = []
+    position = 0
+    for phrase in noun_phrases:
+        start = text.find(phrase, position)
+        spans.append((phrase, start, start + len(phrase)))
+        position = start + len(phrase)
+    return spans
+
+def get_phrases(potential_lists):
+    return [[phrase for phrase, start, end in list_items] for list_items in potential_lists]
+
 # has lists tests
 def test_has_no_lists_returns_false(list_service, ac):
     list_service.punctuation_service.remove_all_quotes_from_string = Mock(return_value=ac.original_lower_text)
-    list_service.pos_service.extract_noun_phrases = Mock(return_value=[])
-    list_service.get_potential_lists = Mock(return_value={})
-    list_service.has_list = Mock(return_value=True)
+    list_service.pos_service.get_noun_phrase_spans = Mock(return_value=[])
+    list_service.get_potential_lists = Mock(return_value=[])
+    list_service.get_list_spans = Mock(return_value=[(0, 4)])
     assert list_service.check_for_lists(ac.original_lower_text)
 
 def test_has_lists_returns_true(list_service, ac):
     list_service.punctuation_service.remove_all_quotes_from_string = Mock(return_value=ac.original_lower_text)
-    list_service.pos_service.extract_noun_phrases = Mock(return_value=[])
-    list_service.get_potential_lists = Mock(return_value={})
-    list_service.has_list = Mock(return_value=False)
+    list_service.pos_service.get_noun_phrase_spans = Mock(return_value=[])
+    list_service.get_potential_lists = Mock(return_value=[])
+    list_service.get_list_spans = Mock(return_value=[])
     assert not list_service.check_for_lists(ac.original_lower_text)
 
+def test_no_chunk_has_no_lists(list_service):
+    assert list_service.find_lists(None) == []
+
+def test_check_for_lists_reuses_given_pos_tags(list_service, ac):
+    pos_tags = [("apples", "NNS"), (",", ","), ("pears", "NNS")]
+    list_service.punctuation_service.remove_all_quotes_from_string = Mock(return_value=ac.original_lower_text)
+    list_service.pos_service.extract_noun_phrase_spans = Mock(return_value=[])
+    list_service.check_for_lists(ac.original_lower_text, None, pos_tags)
+    list_service.pos_service.extract_noun_phrase_spans.assert_called_once_with(ac.original_lower_text, pos_tags)
+    list_service.pos_service.get_noun_phrase_spans.assert_not_called()
+
+def test_find_lists_returns_list_spans(list_service):
+    text = "i see apples, pears and plums"
+    list_service.punctuation_service.remove_all_quotes_from_string = Mock(side_effect=lambda text: text)
+    list_service.pos_service.get_noun_phrase_spans = Mock(return_value=build_spans(text, ["apples", "pears", "plums"]))
+    assert list_service.find_lists(text) == [(6, 29)]
+
 # find potential lists tests
 def test_get_potential_lists_basic(list_service):
     text = "apple, banana cherry, date"
     noun_phrases = ["apple", "banana", "cherry", "date"]
-    expected_output = {0: ["apple", "banana", "cherry", "date"]}
-    assert list_service.get_potential_lists(text, noun_phrases) == expected_output
+    expected_output = [["apple", "banana", "cherry", "date"]]
+    assert get_phrases(list_service.get_potential_lists(build_spans(text, noun_phrases))) == expected_output
 
 def test_get_potential_lists_no_adjacent(list_service):
     text = "apple banana cherry date"
     noun_phrases = ["apple", "date"]
-    expected_output = {}
-    assert list_service.get_potential_lists(text, noun_phrases) == expected_output
+    expected_output = []
+    assert get_phrases(list_service.get_potential_lists(build_spans(text, noun_phrases))) == expected_output
 
 def test_get_potential_lists_complex(list_service):
     text = "apple and banana cherry date, eggplant, fig grape"
     noun_phrases = ["apple", "banana", "date", "eggplant", "fig"]
-    expected_output = {0: ["apple", "banana", "date", "eggplant", "fig"]}
-    assert list_service.get_potential_lists(text, noun_phrases) == expected_output
+    expected_output = [["apple", "banana", "date", "eggplant", "fig"]]
+    assert get_phrases(list_service.get_potential_lists(build_spans(text, noun_phrases))) == expected_output
 
 def test_get_potential_lists_overlap(list_service):
     text = "apple, banana apple, cherry, banana, apple"
     noun_phrases = ["apple", "banana", "cherry"]
-    expected_output = {0: ["apple", "banana", "cherry"]}
-    assert list_service.get_potential_lists(text, noun_phrases) == expected_output
+    expected_output = [["apple", "banana", "cherry"]]
+    assert get_phrases(list_service.get_potential_lists(build_spans(text, noun_phrases))) == expected_output
 
 def test_get_potential_lists_edge_cases(list_service):
     text = "apple banana cherry"
     noun_phrases = ["apple", "banana", "cherry"]
-    expected_output = {0: ["apple", "banana", "cherry"]}
-    assert list_service.get_potential_lists(text, noun_phrases) == expected_output
+    expected_output = [["apple", "banana", "cherry"]]
+    assert get_phrases(list_service.get_potential_lists(build_spans(text, noun_phrases))) == expected_output
+
+def test_get_potential_lists_repeated_phrase(list_service):
+    text = "the report was sent to the team and the report was filed by the manager, the lead and the team"
+    noun_phrases = ["the report", "the team", "the report", "the manager", "the lead", "the team"]
+    spans = build_spans(text, noun_phrases)
+    assert list_service.get_potential_lists(spans) == [spans[1:3], spans[3:6]]
+
+def test_get_potential_lists_separate_groups(list_service):
+    text = "apple, banana then a long gap before cherry, date"
+    noun_phrases = ["apple", "banana", "cherry", "date"]
+    expected_output = [["apple", "banana"], ["cherry", "date"]]
+    assert get_phrases(list_service.get_potential_lists(build_spans(text, noun_phrases))) == expected_output
 
 # has lists tests
 def test_has_list_basic(list_service): #
     text = "apple, banana and cherry"
-    potential_lists = {0: ["apple", "banana", "cherry"]}
+    potential_lists = [build_spans(text, ["apple", "banana", "cherry"])]
     list_service.list_indicators = [",", "and", "or"]
-    assert list_service.has_list(text, potential_lists)
+    assert list_service.get_list_spans(text, potential_lists) == [(0, 24)]
 
 def test_has_list_no_indicators(list_service):
     text = "apple banana cherry"
-    potential_lists = {0: ["apple", "banana", "cherry"]}
+    potential_lists = [build_spans(text, ["apple", "banana", "cherry"])]
     list_service.list_indicators = [",", "and", "or"]
-    assert not list_service.has_list(text, potential_lists)
+    assert list_service.get_list_spans(text, potential_lists) == []
 
 def test_has_list_single_item(list_service):
     text = "apple banana cherry"
-    potential_lists = {0: ["apple"]}
+    potential_lists = [build_spans(text, ["apple"])]
     list_service.list_indicators = [",", "and", "or"]
-    assert not list_service.has_list(text, potential_lists)
+    assert list_service.get_list_spans(text, potential_lists) == []
 
 def test_has_list_multiple_lists(list_service): #
     text = "apple, banana and cherry; date or fig"
-    potential_lists = {0: ["apple", "banana", "cherry"], 1: ["date", "fig"]}
+    potential_lists = [build_spans(text, ["apple", "banana", "cherry"]), build_spans(text, ["date", "fig"])]
     list_service.list_indicators = [",", "and", "or"]
-    assert list_service.has_list(text, potential_lists)
+    assert list_service.get_list_spans(text, potential_lists) == [(0, 24), (26, 37)]
 
 def test_has_list_edge_cases(list_service): #
     text = "apple , banana or cherry"
-    potential_lists = {0: ["apple", "banana", "cherry"]}
+    potential_lists = [build_spans(text, ["apple", "banana", "cherry"])]
     list_service.list_indicators = [",", "and", "or"]
-    assert list_service.has_list(text, potential_lists)
+    assert list_service.get_list_spans(text, potential_lists) == [(0, 24)]
 
 def test_has_list_no_list_items(list_service):
     text = "apple banana cherry"
-    potential_lists = {}
+    potential_lists = []
     list_service.list_indicators = [",", "and", "or"]
-    assert not list_service.has_list(text, potential_lists)
\ No newline at end of file
+    assert list_service.get_list_spans(text, potential_lists) == []
+
+# list of verbs tests
+@pytest.fixture
+def verb_list_service():
+    wordlist_service = Mock()
+    wordlist_service.get_noun_exceptions = Mock(return_value=[])
+    wordlist_service.get_verb_exceptions = Mock(return_value=[])
+    wordlist_service.get_verb_noun_exceptions = Mock(return_value=["list"])
+    wordlist_service.get_weak_verbs_list = Mock(return_value=[])
+    return Lists(POS(wordlist_service), wordlist_service, Mock())
+
+def test_has_list_of_verbs(verb_list_service):
+    verb_list_service.pos_service.tokenise_words = Mock(return_value=[("i", "PRP"), ("edit", "VB"), ("and", "CC"), ("delete", "VB"), ("posts", "NNS")])
+    assert verb_list_service.has_list_of_verbs("i edit and delete posts")
+
+def test_has_list_of_verbs_starting_with_noun_verb_exception(verb_list_service):
+    verb_list_service.pos_service.tokenise_words = Mock(return_value=[("list", "NN"), ("or", "CC"), ("delete", "VB"), ("posts", "NNS")])
+    assert verb_list_service.has_list_of_verbs("list or delete posts")
+
+def test_has_no_list_of_verbs(verb_list_service):
+    verb_list_service.pos_service.tokenise_words = Mock(return_value=[("edit", "VB"), ("posts", "NNS"), ("and", "CC"), ("delete", "VB")])
+    assert not verb_list_service.has_list_of_verbs("edit posts and delete")
+    verb_list_service.pos_service.tokenise_words = Mock(return_value=[("edit", "VB"), ("and", "CC"), ("list", "NN")])
+    assert not verb_list_service.has_list_of_verbs("edit and list")
+    assert not verb_list_service.has_list_of_verbs(None)
@@ -0,0 +1,91 @@
+import os
+import shutil
+import nltk
+import pytest
+
+from unittest.mock import Mock, patch
+from main.repositories.NltkResourceRepository import NltkResourceRepository
+from main.services.NltkDataService import NltkDataService, get_nltk_data_dir
+
+BASE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+
+@pytest.fixture
+def nltk_data_service(tmp_path):
+    nltk_resource_repository = Mock()
+    nltk_resource_repository.get_nltk_resources.return_value = [("punkt_tab", "tokenizers/punkt_tab/english/"), ("averaged_perceptron_tagger_eng", "taggers/averaged_perceptron_tagger_eng/")]
+    return NltkDataService(nltk_resource_repository, str(tmp_path / "nltk_data"))
+
+@pytest.fixture(autouse=True)
+def nltk_data_path():
+    path = list(nltk.data.path)
+    yield
+    nltk.data.path[:] = path
+
+def make_package(path, *files):
+    os.makedirs(path, exist_ok=True)
+    for file in files:
+        with open(os.path.join(path, file), "w") as f:
+            f.write("data")
+
+# manifest tests
+def test_manifest_lists_only_the_packages_the_pipeline_uses():
+    resources = NltkResourceRepository(BASE_PATH).get_nltk_resources()
+    assert resources == [("punkt_tab", "tokenizers/punkt_tab/english/"), ("averaged_perceptron_tagger_eng", "taggers/averaged_perceptron_tagger_eng/")]
+
+def test_data_dir_is_next_to_src(monkeypatch):
+    monkeypatch.delenv("NLTK_DATA_DIR", raising=False)
+    assert get_nltk_data_dir("/app/src") == "/app/nltk_data"
+    monkeypatch.setenv("NLTK_DATA_DIR", "/opt/nltk_data")
+    assert get_nltk_data_dir("/app/src") == "/opt/nltk_data"
+
+# verification tests
+def test_data_dir_is_searched_first(nltk_data_service):
+    nltk_data_service.use_data_dir()
+    nltk_data_service.use_data_dir()
+    assert nltk.data.path[0] == nltk_data_service.nltk_data_dir
+    assert nltk.data.path.count(nltk_data_service.nltk_data_dir) == 1
+
+def test_missing_resources_are_reported(nltk_data_service):
+    def find(resource):
+        if resource.startswith("taggers"):
+            raise LookupError(resource)
+    with patch("nltk.data.find", side_effect=find):
+        assert nltk_data_service.find_missing_resources() == ["averaged_perceptron_tagger_eng"]
+        with pytest.raises(LookupError, match="averaged_perceptron_tagger_eng"):
+            nltk_data_service.verify()
+
+def test_installed_resources_are_found(nltk_data_service):
+    make_package(os.path.join(nltk_data_service.nltk_data_dir, "tokenizers", "punkt_tab", "english"), "sentence_starters.txt")
+    make_package(os.path.join(nltk_data_service.nltk_data_dir, "taggers", "averaged_perceptron_tagger_eng"), "weights.json")
+    assert nltk_data_service.find_missing_resources() == []
+
+# install tests
+def test_install_copies_only_manifest_packages(nltk_data_service, tmp_path):
+    source = tmp_path / "source"
+    make_package(source / "tokenizers" / "punkt_tab" / "english", "sentence_starters.txt")
+    make_package(source / "corpora" / "wordnet", "data.noun")
+    make_package(tmp_path / "tagger" / "averaged_perceptron_tagger_eng", "weights.json")
+    shutil.make_archive(str(source / "taggers" / "averaged_perceptron_tagger_eng"), "zip", tmp_path / "tagger")
+
+    nltk_data_service.install_from_source(str(source))
+    installed = nltk_data_service.nltk_data_dir
+    assert os.path.isfile(os.path.join(installed, "tokenizers", "punkt_tab", "english", "sentence_starters.txt"))
+    assert os.path.isfile(os.path.join(installed, "taggers", "averaged_perceptron_tagger_eng", "weights.json"))
+    assert not os.path.exists(os.path.join(installed, "corpora"))
+
+def test_install_fails_when_source_lacks_a_package(nltk_data_service, tmp_path):
+    make_package(tmp_path / "source" / "tokenizers" / "punkt_tab" / "english", "sentence_starters.txt")
+    with pytest.raises(LookupError, match="averaged_perceptron_tagger_eng"):
+        nltk_data_service.install_from_source(str(tmp_path / "source"))
+
+def test_download_fetches_only_manifest_packages_and_drops_archives(nltk_data_service):
+    def download(package, download_dir, **kwargs):
+        category = "tokenizers" if package == "punkt_tab" else "taggers"
+        make_package(os.path.join(download_dir, category, package), "data")
+        make_package(os.path.join(download_dir, category), package + ".zip")
+        return True
+    with patch("nltk.download", side_effect=download) as nltk_download:
+        nltk_data_service.download()
+    assert [call.args[0] for call in nltk_download.call_args_list] == ["punkt_tab", "averaged_perceptron_tagger_eng"]
+    assert not os.path.exists(os.path.join(nltk_data_service.nltk_data_dir, "tokenizers", "punkt_tab.zip"))
+    assert os.path.isdir(os.path.join(nltk_data_service.nltk_data_dir, "tokenizers", "punkt_tab"))
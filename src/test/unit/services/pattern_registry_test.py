@@ -0,0 +1,30 @@
+import pytest
+
+from main.services.NLPService import PatternRegistry
+
+@pytest.fixture
+def pattern_registry():
+    return PatternRegistry()
+
+# compiled pattern tests
+def test_pattern_is_compiled_once(pattern_registry):
+    pattern = pattern_registry.get_pattern(r'\[\d+\]')
+    assert pattern_registry.get_pattern(r'\[\d+\]') is pattern
+    assert pattern.sub('', "text[1]") == "text"
+
+def test_alternation_pattern_escapes_items(pattern_registry):
+    pattern = pattern_registry.get_alternation_pattern("punctuation", [". ", "? "])
+    assert pattern.split("one. two? three") == ["one", "two", "three"]
+
+def test_alternation_pattern_is_only_recompiled_when_items_change(pattern_registry):
+    items = ["and", "or"]
+    pattern = pattern_registry.get_alternation_pattern("conjunctions", items, r'(?<!\w)(?:', r')(?!\w)')
+    assert pattern_registry.get_alternation_pattern("conjunctions", items, r'(?<!\w)(?:', r')(?!\w)') is pattern
+    items.append("&")
+    updated_pattern = pattern_registry.get_alternation_pattern("conjunctions", items, r'(?<!\w)(?:', r')(?!\w)')
+    assert updated_pattern is not pattern
+    assert updated_pattern.split("cats & dogs") == ["cats ", " dogs"]
+
+def test_chunk_parser_is_built_once(pattern_registry):
+    grammar = "NP: {<DT>?<JJ>*<NN.*>+}"
+    assert pattern_registry.get_chunk_parser(grammar) is pattern_registry.get_chunk_parser(grammar)
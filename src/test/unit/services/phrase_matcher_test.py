@@ -0,0 +1,105 @@
+import pytest
+
+from unittest.mock import Mock
+from main.models.AnalysisContext import AnalysisContext
+from main.services.NLPService import PhraseMatcher
+from main.services.WordlistService import WordlistOverlay, WordlistSnapshot, get_current_tenant, set_current_tenant
+
+@pytest.fixture
+def word_list_service():
+    word_list_service = Mock()
+    word_list_service.get_vague_terms_list = Mock(return_value=("easy", "user friendly"))
+    word_list_service.get_escape_clause_list = Mock(return_value=("if possible", "as needed"))
+    word_list_service.get_quantifiers_list = Mock(return_value=("some", "a few", "few"))
+    return word_list_service
+
+@pytest.fixture
+def phrase_matcher(word_list_service):
+    return PhraseMatcher(word_list_service)
+
+# matching tests
+def test_find_phrases_returns_positions_for_every_wordlist(phrase_matcher):
+    text = "some pages should be easy to read if possible"
+    matches = phrase_matcher.find_phrases(text)
+    assert matches == {
+        "vague_terms": [("easy", 21, 25)],
+        "escape_clauses": [("if possible", 34, 45)],
+        "quantifiers": [("some", 0, 4)]
+    }
+    assert text[34:45] == "if possible"
+
+def test_find_phrases_finds_overlapping_terms(phrase_matcher):
+    matches = phrase_matcher.find_phrases("show a few results")
+    assert matches["quantifiers"] == [("a few", 5, 10), ("few", 7, 10)]
+
+def test_find_phrases_ignores_partial_phrases(phrase_matcher):
+    matches = phrase_matcher.find_phrases("user profiles if")
+    assert matches == {"vague_terms": [], "escape_clauses": [], "quantifiers": []}
+
+def test_find_terms_keeps_wordlist_order_without_duplicates(phrase_matcher):
+    assert phrase_matcher.find_terms("few users and some admins and some guests", "quantifiers") == ["some", "few"]
+
+def test_find_phrases_is_memoised_in_analysis_context(phrase_matcher):
+    analysis_context = AnalysisContext()
+    matches = phrase_matcher.find_phrases("some text", analysis_context)
+    assert phrase_matcher.find_phrases("some text", analysis_context) is matches
+
+# rebuild tests
+def test_trie_is_only_rebuilt_when_a_wordlist_changes(phrase_matcher, word_list_service):
+    phrase_matcher.find_phrases("text")
+    version = phrase_matcher.version
+    phrase_matcher.find_phrases("text")
+    assert phrase_matcher.version == version
+
+def test_changed_wordlist_updates_trie(phrase_matcher, word_list_service):
+    assert phrase_matcher.find_terms("a few things as needed", "quantifiers") == ["a few", "few"]
+    word_list_service.get_quantifiers_list = Mock(return_value=("few", "many"))
+    assert phrase_matcher.find_terms("a few things as needed and many more", "quantifiers") == ["few", "many"]
+    assert phrase_matcher.find_terms("as needed", "escape_clauses") == ["as needed"]
+    assert "a" not in phrase_matcher.root.children
+
+def test_removing_a_term_keeps_longer_terms_sharing_its_prefix(phrase_matcher, word_list_service):
+    word_list_service.get_vague_terms_list = Mock(return_value=("user friendly",))
+    word_list_service.get_quantifiers_list = Mock(return_value=("user",))
+    phrase_matcher.refresh()
+    word_list_service.get_quantifiers_list = Mock(return_value=())
+    assert phrase_matcher.find_phrases("user friendly")["vague_terms"] == [("user friendly", 0, 13)]
+    assert phrase_matcher.find_phrases("user friendly")["quantifiers"] == []
+
+# tenant tests
+def test_tenant_additions_are_only_matched_for_that_tenant(phrase_matcher, word_list_service):
+    base = WordlistSnapshot(("some", "few"), 1)
+    word_list_service.get_quantifiers_list = Mock(side_effect=lambda: WordlistOverlay("team-a", base, WordlistSnapshot(("several", "few"), 1)) if get_current_tenant() == "team-a" else base.words)
+    try:
+        set_current_tenant("team-a")
+        assert phrase_matcher.find_terms("several users and few admins", "quantifiers") == ["few", "several"]
+        set_current_tenant("team-b")
+        assert phrase_matcher.find_terms("several users and few admins", "quantifiers") == ["few"]
+    finally:
+        set_current_tenant(None)
+    assert phrase_matcher.find_terms("several users and few admins", "quantifiers") == ["few"]
+
+def test_tenants_without_additions_are_not_stored(phrase_matcher, word_list_service):
+    try:
+        for i in range(5):
+            set_current_tenant(f"team-{i}")
+            phrase_matcher.find_phrases("some users")
+    finally:
+        set_current_tenant(None)
+    assert all(tenant == None for tenant, wordlist_name in phrase_matcher.wordlists)
+    assert len(phrase_matcher.tenants) == 0
+
+def test_least_recently_used_tenant_is_dropped(monkeypatch, phrase_matcher, word_list_service):
+    from main.services import NLPService as nlp_service_module
+    monkeypatch.setattr(nlp_service_module, "MAX_TENANTS", 2)
+    base = WordlistSnapshot(("some",), 1)
+    word_list_service.get_quantifiers_list = Mock(side_effect=lambda: WordlistOverlay(get_current_tenant(), base, WordlistSnapshot((f"{get_current_tenant()}-word",), 1)))
+    try:
+        for tenant in ["team-a", "team-b", "team-a", "team-c"]:
+            set_current_tenant(tenant)
+            phrase_matcher.find_phrases("some users")
+    finally:
+        set_current_tenant(None)
+    assert list(phrase_matcher.tenants) == ["team-a", "team-c"]
+    assert ("team-b", "quantifiers") not in phrase_matcher.wordlists
+    assert "team-b-word" not in phrase_matcher.root.children
@@ -1,7 +1,10 @@
 import pytest
 
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
+from main.models.AnalysisContext import AnalysisContext
+from main.models.TokenFeatures import IS_NOUN, IS_VERB
 from main.services.NLPService import POS
+from main.services.TaggingCacheService import TaggingCacheService
 
 @pytest.fixture
 def pos_service():
@@ -153,101 +156,276 @@ def test_extract_noun_phrases_no_noun_phrases(pos_service):
     result = pos_service.extract_noun_phrases(text)
     assert result == []
 
+def test_extract_noun_phrase_spans_gives_offsets_of_repeated_phrases(pos_service):
+    text = "the dog saw the cat and the dog"
+    pos_tags = [("the", "DT"), ("dog", "NN"), ("saw", "VBD"), ("the", "DT"), ("cat", "NN"), ("and", "CC"), ("the", "DT"), ("dog", "NN")]
+    result = pos_service.extract_noun_phrase_spans(text, pos_tags)
+    assert result == [("the dog", 0, 7), ("the cat", 12, 19), ("the dog", 24, 31)]
+
+def test_extract_noun_phrase_spans_skips_phrases_not_in_text(pos_service):
+    text = "the user's dog"
+    pos_tags = [("the", "DT"), ("user", "NN"), ("'s", "POS"), ("dog", "NN")]
+    result = pos_service.extract_noun_phrase_spans(text, pos_tags)
+    assert result == [("the user", 0, 8), ("dog", 11, 14)]
+
+# tests for tokenising with an analysis context
+@pytest.fixture
+def tagger():
+    return Mock(tag_sents=Mock(side_effect=lambda sentences: [[(word, 'NN') for word in sentence] for sentence in sentences]))
+
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.split())
+@patch('main.services.NLPService.sent_tokenize', side_effect=lambda text: [sent for sent in text.split(". ") if sent])
+def test_tokenise_words_is_memoised_in_context(sent_tokenize, word_tokenize, pos_service, tagger):
+    pos_service.tagger = tagger
+    analysis_context = AnalysisContext()
+    first = pos_service.tokenise_words("the dog", analysis_context)
+    second = pos_service.tokenise_words("the dog", analysis_context)
+    assert first == second == [('the', 'NN'), ('dog', 'NN')]
+    assert tagger.tag_sents.call_count == 1
+    assert analysis_context.tagger_calls == 1
+
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.split())
+@patch('main.services.NLPService.sent_tokenize', side_effect=lambda text: [sent for sent in text.split(". ") if sent])
+def test_tokenise_words_counts_each_distinct_text(sent_tokenize, word_tokenize, pos_service, tagger):
+    pos_service.tagger = tagger
+    analysis_context = AnalysisContext()
+    pos_service.tokenise_words("the dog", analysis_context)
+    pos_service.tokenise_words("the cat", analysis_context)
+    assert analysis_context.tagger_calls == 2
+
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.split())
+@patch('main.services.NLPService.sent_tokenize', side_effect=lambda text: [sent for sent in text.split(". ") if sent])
+def test_tokenise_words_without_context_always_tags(sent_tokenize, word_tokenize, pos_service, tagger):
+    pos_service.tagger = tagger
+    pos_service.tokenise_words("the dog")
+    pos_service.tokenise_words("the dog")
+    assert tagger.tag_sents.call_count == 2
+
+# tests for batch tokenising
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.split())
+@patch('main.services.NLPService.sent_tokenize', side_effect=lambda text: [sent for sent in text.split(". ") if sent])
+def test_tokenise_words_batch_tags_all_texts_in_one_call(sent_tokenize, word_tokenize, pos_service, tagger):
+    pos_service.tagger = tagger
+    result = pos_service.tokenise_words_batch(["the dog. a cat", "the dog", "a bird"])
+    assert result == [
+        [('the', 'NN'), ('dog', 'NN'), ('a', 'NN'), ('cat', 'NN')],
+        [('the', 'NN'), ('dog', 'NN')],
+        [('a', 'NN'), ('bird', 'NN')]
+    ]
+    assert tagger.tag_sents.call_count == 1
+
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.split())
+@patch('main.services.NLPService.sent_tokenize', side_effect=lambda text: [sent for sent in text.split(". ") if sent])
+def test_tokenise_words_batch_only_tags_new_texts(sent_tokenize, word_tokenize, pos_service, tagger):
+    pos_service.tagger = tagger
+    analysis_context = AnalysisContext()
+    pos_service.tokenise_words("the dog", analysis_context)
+    pos_service.tokenise_words_batch(["the dog", "a bird"], analysis_context)
+    assert tagger.tag_sents.call_args_list[-1].args[0] == [["a", "bird"]]
+    assert analysis_context.tagger_calls == 2
+
+def test_tokenise_words_batch_empty_texts_do_not_call_tagger(pos_service, tagger):
+    pos_service.tagger = tagger
+    assert pos_service.tokenise_words_batch([]) == []
+    tagger.tag_sents.assert_not_called()
+
 # tests for has required number of verbs and nouns
+def set_wordlists(pos_service, noun_exceptions=[], verb_exceptions=[], verb_noun_exceptions=[], weak_verbs=[]):
+    pos_service.wordlist_service.get_noun_exceptions = Mock(return_value=noun_exceptions)
+    pos_service.wordlist_service.get_verb_exceptions = Mock(return_value=verb_exceptions)
+    pos_service.wordlist_service.get_verb_noun_exceptions = Mock(return_value=verb_noun_exceptions)
+    pos_service.wordlist_service.get_weak_verbs_list = Mock(return_value=weak_verbs)
+    pos_service.wordlist_service.version = 1
+
 def test_has_required_number_verb_and_noun_sufficient(pos_service):
-    pos_service.is_noun = Mock(side_effect=[True, False])
-    pos_service.is_verb = Mock(return_value=True)
+    set_wordlists(pos_service)
     pos = [('dog', 'NN'), ('run', 'VB')]
     result = pos_service.has_required_number_verb_and_noun(pos, 1, 1)
     assert result == (True, True)
 
 def test_has_required_number_verb_and_noun_insufficient_nouns(pos_service):
-    pos_service.is_noun = Mock(return_value=False)
-    pos_service.is_verb = Mock(return_value=True)
-    pos_service.get_potential_verbs_nouns = Mock(return_value=(True, False))
+    set_wordlists(pos_service)
     pos = [('run', 'VB')]
     result = pos_service.has_required_number_verb_and_noun(pos, 1, 1)
     assert result == (True, False)
 
 def test_has_required_number_verb_and_noun_insufficient_verbs(pos_service):
-    pos_service.is_noun = Mock(return_value=True)
-    pos_service.is_verb = Mock(return_value=False)
-    pos_service.get_potential_verbs_nouns = Mock(return_value=(False, True))
+    set_wordlists(pos_service)
     pos = [('dog', 'NN')]
     result = pos_service.has_required_number_verb_and_noun(pos, 1, 1)
     assert result == (False, True)
 
 def test_has_required_number_verb_and_noun_empty_pos(pos_service):
-    pos_service.is_noun = Mock(return_value=True)
-    pos_service.is_verb = Mock(return_value=True)
+    set_wordlists(pos_service)
     pos_service.get_potential_verbs_nouns = Mock(return_value=(False, False))
     pos = []
     result = pos_service.has_required_number_verb_and_noun(pos, 1, 1)
     assert result == (False, False)
+    pos_service.get_potential_verbs_nouns.assert_not_called()
+
+def test_has_required_number_verb_and_noun_no_pos(pos_service):
+    assert pos_service.has_required_number_verb_and_noun(None, 1, 1) == (True, True)
 
 def test_has_required_number_verb_and_noun_ignore_i_as_noun(pos_service):
-    pos_service.is_noun = Mock(return_value=False)
-    pos_service.is_verb = Mock(return_value=True)
-    pos_service.get_potential_verbs_nouns = Mock(return_value=(True, False))
-    pos = [('I', 'NN'), ('run', 'VB')]
-    result = pos_service.has_required_number_verb_and_noun(pos, 1, 1, True)
-    assert result == (True, False)
+    set_wordlists(pos_service, noun_exceptions=['i'])
+    pos = [('i', 'NN'), ('run', 'VB')]
+    assert pos_service.has_required_number_verb_and_noun(pos, 1, 1, True) == (True, False)
+    assert pos_service.has_required_number_verb_and_noun(pos, 1, 1) == (True, True)
+
+def test_has_required_number_verb_and_noun_verb_exception_is_a_noun(pos_service):
+    set_wordlists(pos_service, noun_exceptions=['i'], verb_exceptions=['login'])
+    pos = [('i', 'NN'), ('login', 'VB'), ('run', 'VB')]
+    assert pos_service.has_required_number_verb_and_noun(pos, 1, 2, True) == (False, True)
+    assert pos_service.has_required_number_verb_and_noun(pos, 1, 1, True) == (True, True)
 
 def test_has_required_number_verb_and_noun_insufficient_nouns_but_found_potential_noun(pos_service):
-    pos_service.is_noun = Mock(return_value=False)
-    pos_service.is_verb = Mock(return_value=True)
-    pos_service.get_potential_verbs_nouns = Mock(return_value=(True, True))
-    pos = [('I', 'VB'), ('run', 'VB')]
+    set_wordlists(pos_service, verb_noun_exceptions=['list'])
+    pos = [('list', 'VB'), ('run', 'VB')]
     result = pos_service.has_required_number_verb_and_noun(pos, 1, 1, True)
     assert result == (True, True)
 
 def test_has_required_number_verb_and_noun_insufficient_verbs_but_found_potential_verb(pos_service):
-    pos_service.is_noun = Mock(return_value=True)
-    pos_service.is_verb = Mock(return_value=False)
-    pos_service.get_potential_verbs_nouns = Mock(return_value=(True, True))
-    pos = [('I', 'NN'), ('run', 'NN')]
+    set_wordlists(pos_service, verb_noun_exceptions=['list'])
+    pos = [('user', 'NN'), ('list', 'NN')]
     result = pos_service.has_required_number_verb_and_noun(pos, 1, 1, True)
     assert result == (True, True)
 
 def test_has_required_number_verb_and_noun_insufficient_nouns_and_not_found_potential_noun(pos_service):
-    pos_service.is_noun = Mock(return_value=False)
-    pos_service.is_verb = Mock(return_value=True)
-    pos_service.get_potential_verbs_nouns = Mock(return_value=(True, False))
-    pos = [('I', 'VB'), ('run', 'VB')]
+    set_wordlists(pos_service, verb_noun_exceptions=['list'])
+    pos = [('walk', 'VB'), ('run', 'VB')]
     result = pos_service.has_required_number_verb_and_noun(pos, 1, 1, True)
     assert result == (True, False)
 
 def test_has_required_number_verb_and_noun_insufficient_verbs_and_not_found_potential_verb(pos_service):
-    pos_service.is_noun = Mock(return_value=True)
-    pos_service.is_verb = Mock(return_value=False)
-    pos_service.get_potential_verbs_nouns = Mock(return_value=(False, True))
-    pos = [('I', 'NN'), ('run', 'NN')]
+    set_wordlists(pos_service, verb_noun_exceptions=['list'])
+    pos = [('user', 'NN'), ('dog', 'NN')]
     result = pos_service.has_required_number_verb_and_noun(pos, 1, 1, True)
     assert result == (False, True)
 
+def test_has_required_number_verb_and_noun_potential_word_is_not_spare(pos_service):
+    set_wordlists(pos_service, verb_noun_exceptions=['list'])
+    pos = [('list', 'VB')]
+    assert pos_service.has_required_number_verb_and_noun(pos, 1, 1) == (True, False)
+
 # tests for get potential verbs and nouns
 def test_get_potential_verbs_nouns_potential(pos_service):
+    set_wordlists(pos_service)
+    features = pos_service.get_token_features([('run', 'VB')])
     pos_service.check_potential_verbs_or_nouns = Mock(return_value=True)
-    result = pos_service.get_potential_verbs_nouns(False, True, ['run'], ['dog'], 1, 1)
+    result = pos_service.get_potential_verbs_nouns(False, True, features, IS_NOUN, 1, 1)
     assert result == (True, True)
+    pos_service.check_potential_verbs_or_nouns.assert_called_once_with(features, IS_VERB, IS_NOUN, 1, 1)
 
 def test_get_potential_verbs_nouns_no_potential(pos_service):
+    set_wordlists(pos_service)
+    features = pos_service.get_token_features([('dog', 'NN')])
     pos_service.check_potential_verbs_or_nouns = Mock(return_value=False)
-    result = pos_service.get_potential_verbs_nouns(False, False, [], ['dog'], 1, 1)
+    result = pos_service.get_potential_verbs_nouns(False, False, features, IS_NOUN, 1, 1)
     assert result == (False, False)
+    pos_service.check_potential_verbs_or_nouns.assert_not_called()
 
 # tests for check potential verbs or nouns
 def test_check_potential_verbs_or_nouns_sufficient_potential(pos_service):
-    pos_service.is_potential_noun_or_verb = Mock(side_effect=[True, False])
-    result = pos_service.check_potential_verbs_or_nouns(['run'], ['dog'], 1, 0)
+    set_wordlists(pos_service, verb_noun_exceptions=['list'])
+    features = pos_service.get_token_features([('list', 'VB'), ('run', 'VB')])
+    result = pos_service.check_potential_verbs_or_nouns(features, IS_VERB, IS_NOUN, 1, 1)
     assert result == True
 
 def test_check_potential_verbs_or_nouns_insufficient_potential(pos_service):
-    pos_service.is_potential_noun_or_verb = Mock(side_effect=[False, False])
-    result = pos_service.check_potential_verbs_or_nouns(['run'], [], 1, 0)
+    set_wordlists(pos_service, verb_noun_exceptions=['list'])
+    features = pos_service.get_token_features([('walk', 'VB'), ('run', 'VB')])
+    result = pos_service.check_potential_verbs_or_nouns(features, IS_VERB, IS_NOUN, 1, 1)
     assert result == False
 
 def test_check_potential_verbs_or_nouns_no_missing(pos_service):
-    pos_service.is_potential_noun_or_verb = Mock(side_effect=[False])
-    result = pos_service.check_potential_verbs_or_nouns(['run'], ['dog'], 0, 1)
+    set_wordlists(pos_service)
+    features = pos_service.get_token_features([('run', 'VB'), ('dog', 'NN')])
+    result = pos_service.check_potential_verbs_or_nouns(features, IS_VERB, IS_NOUN, 0, 1)
     assert result == True
+
+# token feature tests
+def test_token_features_match_the_token_checks(pos_service):
+    set_wordlists(pos_service, noun_exceptions=['i'], verb_exceptions=['login'], verb_noun_exceptions=['list', 'login', 'the'], weak_verbs=['may', 'support', 'login'])
+    pos = [('i', 'PRP'), ('i', 'NN'), ('may', 'MD'), ('login', 'VB'), ('support', 'VB'), ('the', 'DT'), ('list', 'NNS'), ('quickly', 'RB')]
+    features = pos_service.get_token_features(pos)
+    assert features.words == tuple(word for word, tag in pos)
+    assert list(features.is_noun) == [pos_service.is_noun(token) for token in pos]
+    assert list(features.is_noun_ignoring_i) == [pos_service.is_noun(token, True) for token in pos]
+    assert list(features.is_verb) == [pos_service.is_verb(token) for token in pos]
+    assert list(features.is_modal) == [pos_service.is_modal(token) for token in pos]
+    assert list(features.is_potential_noun_or_verb) == [pos_service.is_potential_noun_or_verb(token) for token in pos]
+    assert list(features.is_weak_verb) == [0, 0, 1, 0, 1, 0, 0, 0]
+    assert features.count(IS_NOUN) == 3
+    assert features.find(IS_VERB) == 4
+    assert features.find_nth(IS_NOUN, 2) == 3
+    assert features.find_nth(IS_NOUN, 4) == -1
+
+def test_token_features_are_memoised_for_the_same_tags(pos_service):
+    set_wordlists(pos_service)
+    analysis_context = AnalysisContext()
+    pos = [('dog', 'NN')]
+    features = pos_service.get_token_features(pos, analysis_context)
+    assert pos_service.get_token_features(pos, analysis_context) is features
+    assert pos_service.get_token_features(list(pos), analysis_context) is not features
+    pos_service.wordlist_service.version = 2
+    assert pos_service.get_token_features(pos, analysis_context) is not features
+
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.split())
+@patch('main.services.NLPService.sent_tokenize', side_effect=lambda text: text.split(". "))
+def test_single_sentence_tags_are_reused_for_noun_phrases(sent_tokenize, word_tokenize, pos_service, tagger):
+    pos_service.tagger = tagger
+    analysis_context = AnalysisContext()
+    pos_service.tokenise_words_batch(["the dog", "the dog. a cat"], analysis_context)
+    assert analysis_context.get_word_tags("the dog") == [("the", "NN"), ("dog", "NN")]
+    assert analysis_context.get_word_tags("the dog. a cat") == None
+    assert pos_service.extract_noun_phrases("the dog", analysis_context) == ["the dog"]
+    assert tagger.tag_sents.call_count == 1
+
+# noun phrase chunking tests
+def test_extract_noun_phrases_from_tags(pos_service):
+    pos_tags = [("the", "DT"), ("quick", "JJ"), ("fox", "NN"), ("jumps", "VBZ"), ("over", "IN"), ("dogs", "NNS")]
+    assert pos_service.extract_noun_phrases_from_tags(pos_tags) == ["the quick fox", "dogs"]
+
+def test_noun_phrase_parser_is_built_once(pos_service):
+    assert pos_service.get_noun_phrase_parser() is pos_service.get_noun_phrase_parser()
+
+# tests for the persistent tagging cache
+@pytest.fixture
+def tagging_cache_service(tmp_path):
+    tagging_cache_service = TaggingCacheService(str(tmp_path / "tagging_cache.sqlite3"))
+    tagging_cache_service.set_model_identity("model")
+    yield tagging_cache_service
+    tagging_cache_service.close()
+
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.split())
+@patch('main.services.NLPService.sent_tokenize', side_effect=lambda text: [sent for sent in text.split(". ") if sent])
+def test_tokenise_words_batch_reuses_tags_from_persistent_cache(sent_tokenize, word_tokenize, tagger, tagging_cache_service):
+    first_process = POS(Mock(), tagging_cache_service=tagging_cache_service)
+    first_process.tagger = tagger
+    first_process.tokenise_words_batch(["the dog. a cat", "a bird"])
+    second_process = POS(Mock(), tagging_cache_service=tagging_cache_service)
+    second_process.tagger = tagger
+    analysis_context = AnalysisContext()
+    result = second_process.tokenise_words_batch(["the dog. a cat", "a bird", "a fish"], analysis_context)
+    assert result[0] == [('the', 'NN'), ('dog', 'NN'), ('a', 'NN'), ('cat', 'NN')]
+    assert tagger.tag_sents.call_args_list[-1].args[0] == [["a", "fish"]]
+    assert analysis_context.get_word_tags("a bird") == [('a', 'NN'), ('bird', 'NN')]
+    assert analysis_context.get_word_tags("the dog. a cat") == None
+
+@patch('main.services.NLPService.word_tokenize', side_effect=lambda text: text.split())
+def test_noun_phrase_spans_are_kept_in_persistent_cache(word_tokenize, pos_service, tagging_cache_service):
+    pos_service.tagging_cache_service = tagging_cache_service
+    pos_service.tagger = Mock(tag_sents=Mock(return_value=[[("the", "DT"), ("dog", "NN")]]))
+    assert pos_service.get_noun_phrase_spans("the dog") == [("the dog", 0, 7)]
+    assert pos_service.get_noun_phrase_spans("the dog") == [("the dog", 0, 7)]
+    assert pos_service.tagger.tag_sents.call_count == 1
+
+def test_noun_phrase_spans_use_cached_word_tags_from_the_same_lookup(pos_service, tagging_cache_service):
+    tagging_cache_service.put_many("word_tags", {"the dog": [[("the", "DT"), ("dog", "NN")]]})
+    pos_service.tagging_cache_service = Mock(wraps=tagging_cache_service)
+    pos_service.tagger = Mock()
+    analysis_context = AnalysisContext()
+    assert pos_service.get_noun_phrase_spans("the dog", analysis_context) == [("the dog", 0, 7)]
+    pos_service.tagger.tag_sents.assert_not_called()
+    pos_service.tagging_cache_service.get_many.assert_not_called()
+    assert analysis_context.get_word_tags("the dog") == [("the", "DT"), ("dog", "NN")]
@@ -0,0 +1,103 @@
+import json
+import os
+import pytest
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from main.services.PredictionLogService import PredictionLogService, convert_legacy_log
+
+@pytest.fixture
+def log_file(tmp_path):
+    return str(tmp_path / "prediction_log.jsonl")
+
+@pytest.fixture
+def prediction_log_service(log_file):
+    return PredictionLogService(log_file, 10, 200, 2)
+
+def read_records(log_file):
+    with open(log_file, "r") as file:
+        return [json.loads(line) for line in file]
+
+# logging tests
+def test_log_attempt_appends_json_lines(prediction_log_service, log_file):
+    prediction_log_service.log_attempt("us", 1, "story one", [])
+    prediction_log_service.log_attempt("ac", 2, ["ac one"], [{"title": "AC 1", "defects": []}])
+    prediction_log_service.flush()
+    records = read_records(log_file)
+    assert [record["type"] for record in records] == ["us", "ac"]
+    assert records[1]["input"] == ["ac one"]
+    assert "timestamp" in records[0]
+    assert prediction_log_service.written_records == 2
+
+def test_full_buffer_drops_records(prediction_log_service):
+    prediction_log_service.start_writer = lambda: None
+    for i in range(12):
+        prediction_log_service.log_attempt("us", i, "story", [])
+    assert prediction_log_service.dropped_records == 2
+    assert prediction_log_service.records.qsize() == 10
+
+def test_records_that_cannot_be_serialised_are_dropped(prediction_log_service, log_file):
+    prediction_log_service.log_attempt("us", 1, "story one", [])
+    prediction_log_service.log_attempt("us", 2, {"not", "json"}, [])
+    prediction_log_service.log_attempt("us", 3, "story three", [])
+    prediction_log_service.flush()
+    assert [record["us_number"] for record in read_records(log_file)] == [1, 3]
+    assert prediction_log_service.dropped_records == 1
+    assert prediction_log_service.written_records == 2
+    assert prediction_log_service.writer.is_alive()
+
+# rotation tests
+def test_log_is_rotated_when_too_big(prediction_log_service, log_file):
+    prediction_log_service.write_records([{"input": "x" * 300}])
+    prediction_log_service.write_records([{"input": "y"}])
+    assert read_records(log_file) == [{"input": "y"}]
+    assert read_records(log_file + ".1") == [{"input": "x" * 300}]
+
+def test_oldest_rotated_log_is_dropped(prediction_log_service, log_file):
+    for letter in ["a", "b", "c", "d"]:
+        prediction_log_service.write_records([{"input": letter * 300}])
+    assert read_records(log_file) == [{"input": "d" * 300}]
+    assert read_records(log_file + ".1") == [{"input": "c" * 300}]
+    assert read_records(log_file + ".2") == [{"input": "b" * 300}]
+
+@pytest.mark.skipif(fcntl == None, reason="file locks are only taken where fcntl is available")
+def test_log_is_locked_between_processes_while_rotating(prediction_log_service, log_file):
+    lock_held = []
+    rotate_if_needed = prediction_log_service.rotate_if_needed
+    def check_lock():
+        with open(prediction_log_service.lock_file, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                lock_held.append(False)
+            except BlockingIOError:
+                lock_held.append(True)
+        rotate_if_needed()
+    prediction_log_service.rotate_if_needed = check_lock
+    prediction_log_service.write_records([{"input": "x"}])
+    assert lock_held == [True]
+    assert os.path.dirname(prediction_log_service.lock_file) == os.path.dirname(log_file)
+
+def test_log_rotated_by_another_process_is_not_rotated_again(prediction_log_service, log_file):
+    other_process = PredictionLogService(log_file, 10, 200, 2)
+    prediction_log_service.write_records([{"input": "x" * 300}])
+    other_process.write_records([{"input": "y"}])
+    prediction_log_service.write_records([{"input": "z"}])
+    assert read_records(log_file) == [{"input": "y"}, {"input": "z"}]
+    assert read_records(log_file + ".1") == [{"input": "x" * 300}]
+
+# legacy conversion tests
+def test_convert_legacy_log(tmp_path, log_file):
+    legacy_log_file = str(tmp_path / "prediction_log.json")
+    legacy_log = {
+        "2024-05-02T10:00:00": {"type": "ac", "us_number": 3, "input": ["ac"], "output": []},
+        "2024-05-01T10:00:00": {"type": "us", "us_number": 0, "input": "story", "output": []}
+    }
+    with open(legacy_log_file, "w") as file:
+        json.dump(legacy_log, file)
+    assert convert_legacy_log(legacy_log_file, log_file) == 2
+    records = read_records(log_file)
+    assert records[0] == {"timestamp": "2024-05-01T10:00:00", "type": "us", "us_number": 0, "input": "story", "output": []}
+    assert records[1]["type"] == "ac"
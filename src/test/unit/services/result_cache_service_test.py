@@ -0,0 +1,108 @@
+import pytest
+
+from unittest.mock import Mock, patch
+from main.models.Defect import Defect
+from main.services.ResultCacheService import AC_RESULT, STORY_RESULT, ResultCacheService
+from main.repositories.EscapeClauseRepository import EscapeClauseRepository
+from main.repositories.NounExceptionRepository import NounExceptionRepository
+from main.repositories.QuantifiersRespository import QuantifiersRepository
+from main.repositories.VagueTermsRepository import VagueTermsRepository
+from main.repositories.VerbExceptionRepository import VerbExceptionRepository
+from main.repositories.VerbNounExceptionRepository import VerbNounExceptionRepository
+from main.repositories.WeakVerbsRepository import WeakVerbsRepository
+from main.services.WordlistService import WordlistService, set_current_tenant
+
+@pytest.fixture
+def word_list_service():
+    return Mock(version=1)
+
+@pytest.fixture
+def result_cache_service(word_list_service):
+    return ResultCacheService(word_list_service, 2, 60)
+
+# lookup tests
+def test_get_returns_cached_defect_records(result_cache_service):
+    defect_records = (Defect.get("Atomic", "message"),)
+    result_cache_service.put(STORY_RESULT, "As a user, I want x", defect_records)
+    assert result_cache_service.get(STORY_RESULT, "As a user, I want x") is defect_records
+    assert result_cache_service.get(STORY_RESULT, "As a user, I want x") == defect_records
+    assert result_cache_service.hits == 2
+    assert result_cache_service.misses == 0
+
+def test_get_counts_misses(result_cache_service):
+    assert result_cache_service.get(STORY_RESULT, "As a user, I want x") == None
+    assert result_cache_service.misses == 1
+
+def test_texts_differing_only_in_case_share_a_result(result_cache_service):
+    result_cache_service.put(STORY_RESULT, "As a User, I want X", {})
+    assert result_cache_service.get(STORY_RESULT, "as a user, i want x") == {}
+
+def test_stories_and_acs_are_cached_separately(result_cache_service):
+    result_cache_service.put(STORY_RESULT, "text", {"Atomic": ["message"]})
+    assert result_cache_service.get(AC_RESULT, "text") == None
+
+def test_tenants_are_cached_separately(result_cache_service):
+    result_cache_service.put(STORY_RESULT, "As a user, I want x", {"Atomic": ["message"]})
+    try:
+        set_current_tenant("team-a")
+        assert result_cache_service.get(STORY_RESULT, "As a user, I want x") == None
+    finally:
+        set_current_tenant(None)
+    assert result_cache_service.get(STORY_RESULT, "As a user, I want x") == {"Atomic": ["message"]}
+
+# eviction tests
+def test_least_recently_used_result_is_evicted(result_cache_service):
+    result_cache_service.put(STORY_RESULT, "one", {})
+    result_cache_service.put(STORY_RESULT, "two", {})
+    result_cache_service.get(STORY_RESULT, "one")
+    result_cache_service.put(STORY_RESULT, "three", {})
+    assert len(result_cache_service) == 2
+    assert result_cache_service.get(STORY_RESULT, "two") == None
+    assert result_cache_service.get(STORY_RESULT, "one") == {}
+
+@patch("main.services.ResultCacheService.time.monotonic")
+def test_expired_result_is_not_served(monotonic, result_cache_service):
+    monotonic.return_value = 100.0
+    result_cache_service.put(STORY_RESULT, "one", {})
+    monotonic.return_value = 160.0
+    assert result_cache_service.get(STORY_RESULT, "one") == None
+    assert len(result_cache_service) == 0
+
+def test_wordlist_change_drops_every_result(result_cache_service, word_list_service):
+    result_cache_service.put(STORY_RESULT, "one", {})
+    word_list_service.version = 2
+    assert result_cache_service.get(STORY_RESULT, "one") == None
+    assert len(result_cache_service) == 0
+
+def create_word_list_service(data_path):
+    return WordlistService(
+        VerbNounExceptionRepository(data_path),
+        NounExceptionRepository(data_path),
+        VerbExceptionRepository(data_path),
+        VagueTermsRepository(data_path),
+        EscapeClauseRepository(data_path),
+        QuantifiersRepository(data_path),
+        WeakVerbsRepository(data_path)
+    )
+
+def test_wordlist_change_by_another_process_drops_every_result(tmp_path, monkeypatch):
+    from main.services import WordlistService as word_list_service_module
+    monkeypatch.setattr(word_list_service_module, "WORDLIST_CHECK_INTERVAL", 0.0)
+    data_dir = tmp_path / "main" / "data"
+    data_dir.mkdir(parents=True)
+    for file in ["noun_exceptions.txt", "verb_exceptions.txt", "verb_noun_exceptions.txt", "vague_terms.txt", "escape_clauses.txt", "quantifiers.txt", "weak_verbs.txt"]:
+        (data_dir / file).write_text("first")
+    word_list_service = create_word_list_service(str(tmp_path))
+    other_word_list_service = create_word_list_service(str(tmp_path))
+    result_cache_service = ResultCacheService(word_list_service, 2, 60)
+    result_cache_service.put(STORY_RESULT, "one", {})
+    assert result_cache_service.get(STORY_RESULT, "one") == {}
+    other_word_list_service.add_noun_exception("second")
+    assert result_cache_service.get(STORY_RESULT, "one") == None
+    assert "second" in word_list_service.get_noun_exceptions()
+
+def test_zero_size_cache_is_turned_off(word_list_service):
+    result_cache_service = ResultCacheService(word_list_service, 0, 60)
+    result_cache_service.put(STORY_RESULT, "one", {})
+    assert result_cache_service.get(STORY_RESULT, "one") == None
+    assert result_cache_service.misses == 0
@@ -0,0 +1,125 @@
+import pickle
+import pytest
+
+from main.services import TaggingCacheService as tagging_cache_module
+
+from main.services.TaggingCacheService import NOUN_PHRASES, SENTENCE_TAGS, WORD_TAGS, WRITE_BATCH_SIZE, TaggingCacheService
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / "tagging_cache.sqlite3")
+
+@pytest.fixture
+def tagging_cache_service(cache_file):
+    tagging_cache_service = TaggingCacheService(cache_file, 3)
+    tagging_cache_service.set_model_identity("model-a")
+    yield tagging_cache_service
+    tagging_cache_service.close()
+
+# lookup tests
+def test_stored_values_are_found_by_kind_and_text(tagging_cache_service):
+    tagging_cache_service.put_many(SENTENCE_TAGS, {"the dog": [[["the", "DT"], ["dog", "NN"]]]})
+    assert tagging_cache_service.get_many(SENTENCE_TAGS, ["the dog", "a cat"]) == {"the dog": [[["the", "DT"], ["dog", "NN"]]]}
+    assert tagging_cache_service.get_many(WORD_TAGS, ["the dog"]) == {}
+
+def test_nothing_is_cached_without_a_model_identity(cache_file):
+    tagging_cache_service = TaggingCacheService(cache_file)
+    tagging_cache_service.put_many(NOUN_PHRASES, {"the dog": [["the dog", 0, 7]]})
+    assert tagging_cache_service.get_many(NOUN_PHRASES, ["the dog"]) == {}
+
+def test_values_from_another_model_are_not_served(tagging_cache_service, cache_file):
+    tagging_cache_service.put_many(WORD_TAGS, {"the dog": [[["the", "DT"], ["dog", "NN"]]]})
+    other_process = TaggingCacheService(cache_file)
+    other_process.set_model_identity("model-b")
+    assert other_process.get_many(WORD_TAGS, ["the dog"]) == {}
+    other_process.put_many(WORD_TAGS, {"a cat": [[["a", "DT"], ["cat", "NN"]]]})
+    assert other_process.count() == 1
+    other_process.close()
+
+def test_values_are_shared_between_instances(tagging_cache_service, cache_file):
+    tagging_cache_service.put_many(WORD_TAGS, {"the dog": [[["the", "DT"], ["dog", "NN"]]]})
+    tagging_cache_service.flush()
+    other_process = TaggingCacheService(cache_file)
+    other_process.set_model_identity("model-a")
+    assert "the dog" in other_process.get_many(WORD_TAGS, ["the dog"])
+    other_process.close()
+
+def test_kinds_of_one_text_are_looked_up_together(tagging_cache_service):
+    tagging_cache_service.put_many(WORD_TAGS, {"the dog": [[["the", "DT"], ["dog", "NN"]]]})
+    tagging_cache_service.flush()
+    tagging_cache_service.put_many(NOUN_PHRASES, {"the dog": [["the dog", 0, 7]]})
+    assert tagging_cache_service.get_kinds([NOUN_PHRASES, WORD_TAGS, SENTENCE_TAGS], "the dog") == {
+        NOUN_PHRASES: [["the dog", 0, 7]],
+        WORD_TAGS: [[["the", "DT"], ["dog", "NN"]]]
+    }
+
+# write batching tests
+def test_values_are_written_in_batches(cache_file):
+    tagging_cache_service = TaggingCacheService(cache_file)
+    tagging_cache_service.set_model_identity("model-a")
+    other_process = TaggingCacheService(cache_file)
+    other_process.set_model_identity("model-a")
+    tagging_cache_service.put_many(WORD_TAGS, {"the dog": []})
+    assert tagging_cache_service.get_many(WORD_TAGS, ["the dog"]) == {"the dog": []}
+    assert other_process.get_many(WORD_TAGS, ["the dog"]) == {}
+    tagging_cache_service.put_many(WORD_TAGS, {f"text {i}": [] for i in range(WRITE_BATCH_SIZE)})
+    assert other_process.get_many(WORD_TAGS, ["the dog"]) == {"the dog": []}
+    other_process.close()
+    tagging_cache_service.close()
+
+def test_held_values_are_written_after_the_write_interval(monkeypatch, tagging_cache_service, cache_file):
+    monkeypatch.setattr(tagging_cache_module, "WRITE_INTERVAL", 0)
+    tagging_cache_service.put_many(WORD_TAGS, {"the dog": []})
+    other_process = TaggingCacheService(cache_file)
+    other_process.set_model_identity("model-a")
+    assert other_process.get_many(WORD_TAGS, ["the dog"]) == {"the dog": []}
+    other_process.close()
+
+def test_held_values_are_written_on_close(cache_file):
+    tagging_cache_service = TaggingCacheService(cache_file)
+    tagging_cache_service.set_model_identity("model-a")
+    tagging_cache_service.put_many(WORD_TAGS, {"the dog": []})
+    tagging_cache_service.close()
+    other_process = TaggingCacheService(cache_file)
+    other_process.set_model_identity("model-a")
+    assert other_process.get_many(WORD_TAGS, ["the dog"]) == {"the dog": []}
+    other_process.close()
+
+# eviction tests
+def test_oldest_entries_are_evicted_past_the_size_cap(tagging_cache_service):
+    tagging_cache_service.put_many(WORD_TAGS, {"one": [], "two": []})
+    tagging_cache_service.put_many(WORD_TAGS, {"three": [], "four": []})
+    assert tagging_cache_service.count() == 3
+    assert set(tagging_cache_service.get_many(WORD_TAGS, ["three", "four"])) == {"three", "four"}
+    assert len(tagging_cache_service.get_many(WORD_TAGS, ["one", "two"])) == 1
+
+def test_entries_are_only_counted_every_count_interval(monkeypatch, cache_file):
+    monkeypatch.setattr(tagging_cache_module, "WRITE_BATCH_SIZE", 1)
+    monkeypatch.setattr(tagging_cache_module, "COUNT_INTERVAL", 3)
+    tagging_cache_service = TaggingCacheService(cache_file, 100)
+    tagging_cache_service.set_model_identity("model-a")
+    counts = []
+    original_evict = tagging_cache_service.evict
+    tagging_cache_service.evict = lambda connection: counts.append(original_evict(connection))
+    for i in range(7):
+        tagging_cache_service.put_many(WORD_TAGS, {f"text {i}": []})
+    assert len(counts) == 3
+    assert tagging_cache_service.entries == 7
+    tagging_cache_service.close()
+
+def test_approximate_count_past_the_size_cap_evicts(tagging_cache_service):
+    tagging_cache_service.put_many(WORD_TAGS, {"one": [], "two": [], "three": []})
+    tagging_cache_service.flush()
+    tagging_cache_service.put_many(WORD_TAGS, {"four": []})
+    tagging_cache_service.flush()
+    assert tagging_cache_service.entries == 3
+    assert tagging_cache_service.count() == 3
+
+# worker process tests
+def test_only_settings_are_sent_to_worker_processes(tagging_cache_service, cache_file):
+    tagging_cache_service.count()
+    worker_cache = pickle.loads(pickle.dumps(tagging_cache_service))
+    assert worker_cache.cache_file == cache_file
+    assert worker_cache.max_entries == 3
+    assert worker_cache.connection == None
+    assert worker_cache.model_identity == None
@@ -0,0 +1,222 @@
+import os
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+from main.repositories.EscapeClauseRepository import EscapeClauseRepository
+from main.repositories.NounExceptionRepository import NounExceptionRepository
+from main.repositories.QuantifiersRespository import QuantifiersRepository
+from main.repositories.VagueTermsRepository import VagueTermsRepository
+from main.repositories.VerbExceptionRepository import VerbExceptionRepository
+from main.repositories.VerbNounExceptionRepository import VerbNounExceptionRepository
+from main.repositories.WeakVerbsRepository import WeakVerbsRepository
+from main.repositories.WordlistFileRepository import WordlistFileRepository
+from main.services.WordlistService import WordlistService, set_current_tenant
+
+@pytest.fixture
+def data_path(tmp_path):
+    data_dir = tmp_path / "main" / "data"
+    data_dir.mkdir(parents=True)
+    files = ["noun_exceptions.txt", "verb_exceptions.txt", "verb_noun_exceptions.txt", "vague_terms.txt", "escape_clauses.txt", "quantifiers.txt", "weak_verbs.txt"]
+    for file in files:
+        (data_dir / file).write_text("first\nsecond")
+    return str(tmp_path)
+
+@pytest.fixture
+def word_list_service(data_path):
+    return WordlistService(
+        VerbNounExceptionRepository(data_path),
+        NounExceptionRepository(data_path),
+        VerbExceptionRepository(data_path),
+        VagueTermsRepository(data_path),
+        EscapeClauseRepository(data_path),
+        QuantifiersRepository(data_path),
+        WeakVerbsRepository(data_path)
+    )
+
+# loading tests
+def test_exceptions_are_loaded_into_frozenset(word_list_service):
+    assert word_list_service.get_noun_exceptions() == frozenset(["first", "second"])
+    assert isinstance(word_list_service.get_verb_exceptions(), frozenset)
+    assert isinstance(word_list_service.get_verb_noun_exceptions(), frozenset)
+
+def test_phrase_lists_keep_file_order(word_list_service):
+    assert word_list_service.get_vague_terms_list() == ("first", "second")
+    assert word_list_service.get_escape_clause_list() == ("first", "second")
+    assert word_list_service.get_quantifiers_list() == ("first", "second")
+
+def test_list_is_only_read_once(word_list_service):
+    word_list_service.noun_exceptions.load = Mock(return_value=["first"])
+    word_list_service.get_noun_exceptions()
+    word_list_service.get_noun_exceptions()
+    word_list_service.get_noun_exceptions()
+    assert word_list_service.noun_exceptions.load.call_count == 1
+
+def test_version_increases_on_load(word_list_service):
+    version = word_list_service.version
+    word_list_service.get_weak_verbs_list()
+    assert word_list_service.version == version + 1
+    word_list_service.get_weak_verbs_list()
+    assert word_list_service.version == version + 1
+
+# invalidation tests
+def test_adding_exception_reloads_list(word_list_service):
+    word_list_service.get_noun_exceptions()
+    version = word_list_service.version
+    updated = word_list_service.add_noun_exception("third")
+    assert updated == ["first", "second", "third"]
+    assert "third" in word_list_service.get_noun_exceptions()
+    assert word_list_service.version == version + 1
+
+def test_changed_file_is_reloaded_after_check_interval(word_list_service):
+    word_list_service.get_verb_exceptions()
+    with open(word_list_service.verb_exceptions.path, "w") as file:
+        file.write("changed")
+    modified_time = word_list_service.verb_exceptions.snapshot.version[1]
+    os.utime(word_list_service.verb_exceptions.path, ns=(modified_time + 10**9, modified_time + 10**9))
+    assert "changed" not in word_list_service.get_verb_exceptions()
+    word_list_service.verb_exceptions.last_checked = None
+    assert word_list_service.get_verb_exceptions() == frozenset(["changed"])
+
+# concurrent update tests
+def test_adding_existing_word_leaves_list_unchanged(word_list_service):
+    word_list_service.get_noun_exceptions()
+    version = word_list_service.version
+    assert word_list_service.add_noun_exception(" second ") == ["first", "second"]
+    assert word_list_service.version == version
+
+def test_adding_word_drops_duplicates_from_file(word_list_service):
+    with open(word_list_service.verb_noun_exceptions.path, "w") as file:
+        file.write("first\nsecond\nfirst\n\nsecond")
+    assert word_list_service.add_verb_noun_exception("third") == ["first", "second", "third"]
+    with open(word_list_service.verb_noun_exceptions.path) as file:
+        assert file.read() == "first\nsecond\nthird"
+
+def test_file_is_replaced_rather_than_written_in_place(word_list_service):
+    path = word_list_service.noun_exceptions.path
+    inode = os.stat(path).st_ino
+    word_list_service.add_noun_exception("third")
+    assert os.stat(path).st_ino != inode
+    assert sorted(os.listdir(os.path.dirname(path))) == sorted([".noun_exceptions.txt.lock", "noun_exceptions.txt", "verb_exceptions.txt", "verb_noun_exceptions.txt", "vague_terms.txt", "escape_clauses.txt", "quantifiers.txt", "weak_verbs.txt"])
+
+def test_snapshot_is_not_changed_by_a_write(word_list_service):
+    snapshot = word_list_service.get_wordlist(word_list_service.noun_exceptions)
+    word_list_service.add_noun_exception("third")
+    assert snapshot.words == ("first", "second")
+    assert word_list_service.get_noun_exceptions() == frozenset(["first", "second", "third"])
+
+def test_concurrent_writers_keep_every_word(word_list_service):
+    words = [f"word{i}" for i in range(50)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(word_list_service.add_verb_exception, words + words))
+    with open(word_list_service.verb_exceptions.path) as file:
+        lines = file.read().split("\n")
+    assert lines[:2] == ["first", "second"]
+    assert sorted(lines[2:]) == sorted(words)
+    assert word_list_service.get_verb_exceptions() == frozenset(["first", "second"] + words)
+
+def test_other_process_sees_a_write_within_the_same_clock_tick(word_list_service, data_path):
+    other_service = WordlistService(
+        VerbNounExceptionRepository(data_path),
+        NounExceptionRepository(data_path),
+        VerbExceptionRepository(data_path),
+        VagueTermsRepository(data_path),
+        EscapeClauseRepository(data_path),
+        QuantifiersRepository(data_path),
+        WeakVerbsRepository(data_path)
+    )
+    other_service.get_noun_exceptions()
+    modified_time = other_service.noun_exceptions.snapshot.version[1]
+    word_list_service.add_noun_exception("third")
+    os.utime(word_list_service.noun_exceptions.path, ns=(modified_time, modified_time))
+    other_service.noun_exceptions.last_checked = None
+    assert "third" in other_service.get_noun_exceptions()
+
+# tenant overlay tests
+@pytest.fixture
+def tenant_word_list_service(data_path):
+    def get_tenant_repository(tenant, repository):
+        return WordlistFileRepository(data_path, f"/main/data/tenants/{tenant}/{os.path.basename(repository.full_path)}", required=False)
+    yield WordlistService(
+        VerbNounExceptionRepository(data_path),
+        NounExceptionRepository(data_path),
+        VerbExceptionRepository(data_path),
+        VagueTermsRepository(data_path),
+        EscapeClauseRepository(data_path),
+        QuantifiersRepository(data_path),
+        WeakVerbsRepository(data_path),
+        get_tenant_repository
+    )
+    set_current_tenant(None)
+
+def test_tenant_additions_are_only_seen_by_that_tenant(tenant_word_list_service):
+    set_current_tenant("team-a")
+    assert tenant_word_list_service.add_noun_exception("third") == ["first", "second", "third"]
+    assert "third" in tenant_word_list_service.get_noun_exceptions()
+    set_current_tenant("team-b")
+    assert "third" not in tenant_word_list_service.get_noun_exceptions()
+    set_current_tenant(None)
+    assert tenant_word_list_service.get_noun_exceptions() == frozenset(["first", "second"])
+
+def test_tenant_without_additions_shares_the_base_set(tenant_word_list_service):
+    base = tenant_word_list_service.get_verb_exceptions()
+    set_current_tenant("team-a")
+    assert tenant_word_list_service.get_verb_exceptions() is base
+
+def test_overlay_keeps_only_the_delta_and_is_reused(tenant_word_list_service):
+    base = tenant_word_list_service.get_wordlist(tenant_word_list_service.vague_terms)
+    set_current_tenant("team-a")
+    tenant_word_list_service.replace_words("vague", ["first", "fast", "fast", "simple"])
+    overlay = tenant_word_list_service.get_vague_terms_list()
+    assert overlay.base is base
+    assert overlay.added == ("fast", "simple")
+    assert list(overlay) == ["first", "second", "fast", "simple"]
+    assert len(overlay) == 4
+    assert tenant_word_list_service.get_vague_terms_list() is overlay
+
+def test_tenant_can_only_delete_its_own_additions(tenant_word_list_service):
+    set_current_tenant("team-a")
+    tenant_word_list_service.add_word("verb", "third")
+    assert not tenant_word_list_service.delete_word("verb", "first")
+    assert tenant_word_list_service.delete_word("verb", "third")
+    assert tenant_word_list_service.get_words("verb") == ["first", "second"]
+    set_current_tenant(None)
+    assert tenant_word_list_service.get_words("verb") == ["first", "second"]
+
+def test_word_in_shared_list_is_not_copied_to_tenant(tenant_word_list_service, data_path):
+    set_current_tenant("team-a")
+    tenant_word_list_service.add_word("nounverb", "first")
+    assert not os.path.exists(os.path.join(data_path, "main", "data", "tenants", "team-a", "verb_noun_exceptions.txt"))
+
+def test_tenant_without_additions_keeps_no_lists_and_is_checked_once_per_interval(tenant_word_list_service):
+    tenant_word_list_service.tenant_repository_factory = Mock(side_effect=tenant_word_list_service.tenant_repository_factory)
+    set_current_tenant("team-a")
+    tenant_word_list_service.get_noun_exceptions()
+    tenant_word_list_service.get_noun_exceptions()
+    assert tenant_word_list_service.tenant_repository_factory.call_count == 1
+    assert tenant_word_list_service.tenant_wordlists["team-a"].additions == {}
+
+def test_least_recently_used_tenant_is_dropped(tenant_word_list_service, monkeypatch):
+    from main.services import WordlistService as word_list_service_module
+    monkeypatch.setattr(word_list_service_module, "MAX_TENANTS", 2)
+    for tenant in ["team-a", "team-b", "team-a", "team-c"]:
+        set_current_tenant(tenant)
+        tenant_word_list_service.get_noun_exceptions()
+    assert list(tenant_word_list_service.tenant_wordlists) == ["team-a", "team-c"]
+
+def test_tenant_additions_written_by_another_process_are_found(tenant_word_list_service, data_path, monkeypatch):
+    from main.services import WordlistService as word_list_service_module
+    monkeypatch.setattr(word_list_service_module, "WORDLIST_CHECK_INTERVAL", 0.0)
+    set_current_tenant("team-a")
+    assert "third" not in tenant_word_list_service.get_noun_exceptions()
+    tenant_dir = os.path.join(data_path, "main", "data", "tenants", "team-a")
+    os.makedirs(tenant_dir)
+    with open(os.path.join(tenant_dir, "noun_exceptions.txt"), "w") as file:
+        file.write("third")
+    assert "third" in tenant_word_list_service.get_noun_exceptions()
+
+def test_invalid_tenant_is_rejected():
+    with pytest.raises(ValueError):
+        set_current_tenant("../team-a")
+    with pytest.raises(ValueError):
+        set_current_tenant("")
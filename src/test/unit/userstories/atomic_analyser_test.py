@@ -4,6 +4,7 @@ from unittest.mock import Mock
 from main.models.UserStory import UserStory
 from main.resources.USErrorMessages import USErrorMessages
 from main.resources.USErrorTypes import USErrorTypes
+from main.services.NLPService import NLPService, PatternRegistry
 from main.services.userstories.UserStoryAnalyser import Atomic
 
 @pytest.fixture
@@ -12,7 +13,10 @@ def user_story():
 
 @pytest.fixture
 def atomic_analyser():
-    return Atomic(Mock(), Mock(), Mock(), USErrorTypes(), USErrorMessages())
+    word_list_service = Mock()
+    nlp_service = Mock(wordlist_service=word_list_service, pattern_registry=PatternRegistry())
+    nlp_service.get_conjunctions_pattern = lambda: NLPService.get_conjunctions_pattern(nlp_service)
+    return Atomic(Mock(), word_list_service, nlp_service, USErrorTypes(), USErrorMessages())
 
 @pytest.fixture
 def user_story_defect_types():
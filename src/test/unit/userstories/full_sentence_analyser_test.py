@@ -24,25 +24,23 @@ def user_story_error_messages():
 
 # check role tests
 def test_missing_noun_but_missing_role_not_reported_to_be_missing_noun(full_sentence_analyser, user_story, user_story_defect_types, user_story_error_messages):
-    user_story.defects = {user_story_defect_types.well_formed: [user_story_error_messages.missing_role]}
+    user_story.add_defect(user_story_defect_types.well_formed, user_story_error_messages.missing_role)
     full_sentence_analyser.check_role_missing_noun = Mock(return_value=True)
     full_sentence_analyser.check_role(user_story)
     assert user_story_defect_types.full_sentence not in user_story.defects
 
 def test_missing_noun_and_not_missing_role_reported_to_be_missing_noun(full_sentence_analyser, user_story, user_story_defect_types, user_story_error_messages):
-    user_story.defects = {user_story_defect_types.well_formed: [user_story_error_messages.missing_means]}
+    user_story.add_defect(user_story_defect_types.well_formed, user_story_error_messages.missing_means)
     full_sentence_analyser.check_role_missing_noun = Mock(return_value=True)
     full_sentence_analyser.check_role(user_story)
     assert user_story_error_messages.role_doesnt_end_with_noun in user_story.defects[user_story_defect_types.full_sentence]
 
 def test_missing_noun_and_full_sentence_reported_to_be_missing_noun(full_sentence_analyser, user_story, user_story_defect_types, user_story_error_messages):
-    user_story.defects = {}
     full_sentence_analyser.check_role_missing_noun = Mock(return_value=True)
     full_sentence_analyser.check_role(user_story)
     assert user_story_error_messages.role_doesnt_end_with_noun in user_story.defects[user_story_defect_types.full_sentence]
 
 def test_not_missing_noun_not_reported_to_be_missing_noun(full_sentence_analyser, user_story, user_story_defect_types, user_story_error_messages):
-    user_story.defects = {}
     full_sentence_analyser.check_role_missing_noun = Mock(return_value=False)
     full_sentence_analyser.check_role(user_story)
     assert user_story_defect_types.full_sentence not in user_story.defects
@@ -73,35 +71,32 @@ def test_role_with_no_pos_returns_true(full_sentence_analyser, user_story_defect
 
 # check means tests
 def test_means_missing_verb_reported_when_not_full_sentence_but_has_means(full_sentence_analyser, user_story, user_story_defect_types, user_story_error_messages):
-    user_story.defects = {user_story_defect_types.well_formed: [user_story_error_messages.missing_role]}
+    user_story.add_defect(user_story_defect_types.well_formed, user_story_error_messages.missing_role)
     full_sentence_analyser.check_means_pos = Mock(return_value=(True, False))
     full_sentence_analyser.check_means_starts_with_i = Mock(return_value=True)
     full_sentence_analyser.check_means(user_story)
     assert user_story_error_messages.means_missing_second_verb in user_story.defects[user_story_defect_types.full_sentence]
 
 def test_means_missing_noun_reported_when_not_full_sentence_but_has_means(full_sentence_analyser, user_story, user_story_defect_types, user_story_error_messages):
-    user_story.defects = {user_story_defect_types.well_formed: [user_story_error_messages.missing_role]}
+    user_story.add_defect(user_story_defect_types.well_formed, user_story_error_messages.missing_role)
     full_sentence_analyser.check_means_pos = Mock(return_value=(False, True))
     full_sentence_analyser.check_means_starts_with_i = Mock(return_value=True)
     full_sentence_analyser.check_means(user_story)
     assert user_story_error_messages.means_missing_noun in user_story.defects[user_story_defect_types.full_sentence]
 
 def test_means_missing_verb_reported_when_full_sentence(full_sentence_analyser, user_story, user_story_defect_types, user_story_error_messages):
-    user_story.defects = {}
     full_sentence_analyser.check_means_pos = Mock(return_value=(True, False))
     full_sentence_analyser.check_means_starts_with_i = Mock(return_value=True)
     full_sentence_analyser.check_means(user_story)
     assert user_story_error_messages.means_missing_second_verb in user_story.defects[user_story_defect_types.full_sentence]
 
 def test_means_missing_noun_reported_when_full_sentence(full_sentence_analyser, user_story, user_story_defect_types, user_story_error_messages):
-    user_story.defects = {}
     full_sentence_analyser.check_means_pos = Mock(return_value=(False, True))
     full_sentence_analyser.check_means_starts_with_i = Mock(return_value=True)
     full_sentence_analyser.check_means(user_story)
     assert user_story_error_messages.means_missing_noun in user_story.defects[user_story_defect_types.full_sentence]
 
 def test_means_no_issues_not_reported(full_sentence_analyser, user_story, user_story_defect_types):
-    user_story.defects = {}
     full_sentence_analyser.check_means_pos = Mock(return_value=(False, False))
     full_sentence_analyser.check_means_starts_with_i = Mock(return_value=True)
     full_sentence_analyser.check_means(user_story)
@@ -1,6 +1,7 @@
 import pytest
 
 from unittest.mock import Mock
+from main.models.TokenFeatures import TokenFeatures
 from main.models.UserStory import UserStory
 from main.resources.USErrorMessages import USErrorMessages
 from main.resources.USErrorTypes import USErrorTypes
@@ -43,6 +44,14 @@ def story_missing_means():
 def story_missing_ends():
     return "As a user, I want to be able to login"
 
+def token_features(words, nouns=(), verbs=()):
+    features = TokenFeatures(tuple(words))
+    for i in nouns:
+        features.is_noun[i] = features.is_noun_ignoring_i[i] = 1
+    for i in verbs:
+        features.is_verb[i] = 1
+    return features
+
 @pytest.fixture
 def pos_list():
     return [('This', 'DT'), ('is', 'VBZ'), ('a', 'DT'), ('test', 'NN')]
@@ -255,30 +264,28 @@ def test_remove_ends_empty_story(user_story_preprocessor):
 
 # find position of first noun tests
 def test_find_position_of_end_of_noun_with_noun(user_story_preprocessor, pos_list, pos_text):
-    user_story_preprocessor.nlp_service.is_noun = Mock(side_effect=[False, False, False, True])
-    user_story_preprocessor.nlp_service.is_verb = Mock(side_effect=[False, False, True])
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features(pos_text.split(), nouns=[3], verbs=[1]))
     result = user_story_preprocessor.find_position_of_end_of_noun(pos_list, pos_text.split())
     assert result == 4
 
 def test_find_position_of_end_of_noun_without_noun(user_story_preprocessor, pos_list, pos_text):
-    user_story_preprocessor.nlp_service.is_noun = Mock(return_value=False)
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features(pos_text.split()))
     result = user_story_preprocessor.find_position_of_end_of_noun(pos_list, pos_text.split())
     assert result == len(pos_list) + 1
 
 def test_find_position_of_end_of_noun_empty_list(user_story_preprocessor):
     pos = []
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features([]))
     result = user_story_preprocessor.find_position_of_end_of_noun(pos, [])
     assert result == 1
 
 def test_find_position_of_end_of_noun_noun_at_start(user_story_preprocessor, pos_list, pos_text):
-    user_story_preprocessor.nlp_service.is_noun = Mock(side_effect=[True, False, False, False])
-    user_story_preprocessor.nlp_service.is_verb = Mock(return_value=False)
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features(pos_text.split(), nouns=[0]))
     result = user_story_preprocessor.find_position_of_end_of_noun(pos_list, pos_text.split())
     assert result == 1
 
 def test_find_position_of_end_of_noun_noun_followed_by_comma(user_story_preprocessor, pos_list, pos_text):
-    user_story_preprocessor.nlp_service.is_noun = Mock(side_effect=[False, True, False, False])
-    user_story_preprocessor.nlp_service.is_verb = Mock(return_value=False)
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features(pos_text.split(), nouns=[1]))
     result = user_story_preprocessor.find_position_of_end_of_noun(pos_list, pos_text.split())
     assert result == 2
 
@@ -356,8 +363,7 @@ def test_find_potential_ends_with_valid_ends(user_story_preprocessor):
     story.means="I want to log in so that I can access my account"
     story.means_pos = ['PRON', 'VERB', 'PART', 'VERB', 'ADP', 'PRON', 'VERB', 'DET', 'NOUN']
     
-    user_story_preprocessor.nlp_service.is_noun = Mock(side_effect=[True, False, False, False, False, False, False, False])
-    user_story_preprocessor.nlp_service.is_verb = Mock(side_effect=[False, True, False, True, False, False, False, False])
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features(story.means_pos, nouns=[0], verbs=[1, 3, 6]))
     
     result = user_story_preprocessor.find_potential_ends(story)
     
@@ -369,8 +375,7 @@ def test_find_potential_ends_no_ends_indicator(user_story_preprocessor):
     story.means="I want to log in"
     story.means_pos = ['PRON', 'VERB', 'PART', 'VERB']
     
-    user_story_preprocessor.nlp_service.is_noun = Mock(side_effect=[False, False, False, False])
-    user_story_preprocessor.nlp_service.is_verb = Mock(side_effect=[False, True, False, True])
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features(story.means_pos, verbs=[1, 3]))
     
     result = user_story_preprocessor.find_potential_ends(story)
     
@@ -382,8 +387,7 @@ def test_find_potential_ends_insufficient_nouns_verbs(user_story_preprocessor):
     story.means="logging in so that I can access my account"
     story.means_pos = ['VERB', 'ADP', 'PRON', 'VERB', 'DET', 'NOUN']
     
-    user_story_preprocessor.nlp_service.is_noun = Mock(side_effect=[False, False, False, False, False, True])
-    user_story_preprocessor.nlp_service.is_verb = Mock(side_effect=[True, False, False, True, False, False])
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features(story.means_pos, nouns=[5], verbs=[0, 3]))
     
     result = user_story_preprocessor.find_potential_ends(story, min_nouns=2, min_verbs=2)
     
@@ -395,8 +399,7 @@ def test_find_potential_ends_with_custom_noun_verb_counts(user_story_preprocesso
     story.means="as a user I want to log in so that I can access my account"
     story.means_pos = ['ADP', 'DET', 'NOUN', 'PRON', 'VERB', 'PART', 'VERB', 'ADP', 'PRON', 'VERB', 'DET', 'NOUN']
     
-    user_story_preprocessor.nlp_service.is_noun = Mock(side_effect=[False, False, True, False, False, False, False, False, False, False, False, True])
-    user_story_preprocessor.nlp_service.is_verb = Mock(side_effect=[False, False, False, True, True, False, True])
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features(story.means_pos, nouns=[2, 11], verbs=[4, 6, 9]))
     
     result = user_story_preprocessor.find_potential_ends(story, min_nouns=1, min_verbs=1)
     
@@ -408,10 +411,27 @@ def test_find_potential_ends_no_verbs(user_story_preprocessor):
     story.means="access my account so that I can view my dashboard"
     story.means_pos = ['VERB', 'DET', 'NOUN', 'ADP', 'PRON', 'VERB', 'DET', 'NOUN']
     
-    user_story_preprocessor.nlp_service.is_noun = Mock(side_effect=[False, False, True, False, False, False, False, True])
-    user_story_preprocessor.nlp_service.is_verb = Mock(side_effect=[True, False, False, False, False, True, False, False])
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features(story.means_pos, nouns=[2, 7], verbs=[0, 5]))
     
     result = user_story_preprocessor.find_potential_ends(story, min_nouns=1, min_verbs=0)
     
     assert result == "so that I can view my dashboard"
-    assert story.means == "access my account"
\ No newline at end of file
+    assert story.means == "access my account"
+
+# batch preprocessing
+def test_pre_process_story_texts_tags_all_chunks_in_one_batch(user_story_preprocessor, valid_story, story_missing_ends):
+    user_story_preprocessor.nlp_service.get_string_without_punctuation = Mock(side_effect=lambda text: text)
+    user_story_preprocessor.nlp_service.get_token_features = Mock(return_value=token_features([]))
+    processed = user_story_preprocessor.pre_process_story_texts([valid_story, story_missing_ends])
+    batch = user_story_preprocessor.nlp_service.tokenise_words_batch.call_args.args[0]
+    assert user_story_preprocessor.nlp_service.tokenise_words_batch.call_count == 1
+    assert "as a user," in batch
+    assert "so that i can access my account." in batch
+    assert [can_process for story, can_process in processed] == [True, True]
+    assert processed[0][0].analysis_context is processed[1][0].analysis_context
+
+def test_pre_process_story_texts_does_not_tag_unprocessable_stories(user_story_preprocessor):
+    user_story_preprocessor.nlp_service.get_string_without_punctuation = Mock(side_effect=lambda text: text)
+    processed = user_story_preprocessor.pre_process_story_texts(["so that I can log in, as a user I want to log in"])
+    assert user_story_preprocessor.nlp_service.tokenise_words_batch.call_args.args[0] == []
+    assert not processed[0][1]
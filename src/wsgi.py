@@ -0,0 +1,9 @@
+import os
+
+# Entry point for a production WSGI server, run from src with: gunicorn -c gunicorn.conf.py wsgi:app
+# Uses the production config unless CONFIG_TYPE says otherwise.
+os.environ.setdefault('CONFIG_TYPE', 'config.ProductionConfig')
+
+from app import create_app
+
+app = create_app()